@@ -7,10 +7,16 @@ from flask_cors import CORS
 # from flask_limiter.util import get_remote_address
 from flask_restx import Api
 
+from app.cache import cache_stats, init_cache
 from app.config import config
-from app.db import close_db, init_db
+from app.db import close_db, get_pool_stats, init_db
 from app.extensions import socketio
+from app.indexes import index_cli
+from app.migrations import migrate_cli
+from app.presence import init_presence
 from app.socketio_handlers import register_socketio_events
+from app.stats import start_scheduled_jobs, stats_cli
+from app.utils.decorators import admin_required
 
 # Initialize extensions
 jwt = JWTManager()
@@ -32,6 +38,8 @@ def create_app(config_name='development'):
     os.makedirs(os.path.join(upload_folder, 'discussions'), exist_ok=True)
     os.makedirs(os.path.join(upload_folder, 'chat'), exist_ok=True)
     os.makedirs(os.path.join(upload_folder, 'timeline'), exist_ok=True)
+    os.makedirs(os.path.join(upload_folder, 'reports'), exist_ok=True)
+    os.makedirs(os.path.join(upload_folder, 'certificates'), exist_ok=True)
 
     # Initialize extensions with app
     jwt.init_app(app)
@@ -40,6 +48,8 @@ def create_app(config_name='development'):
     # Register database teardown
     app.teardown_appcontext(close_db)
 
+    init_cache(app)
+
     # Configure CORS (allow file uploads)
     CORS(app, resources={
         r"/api/*": {"origins": app.config['CORS_ORIGINS']},
@@ -72,6 +82,8 @@ def create_app(config_name='development'):
         admin_dashboard,
         reports,
         certificates,
+        jobs,
+        notifications,
     )
 
     api.add_namespace(auth.api, path='/auth')
@@ -88,12 +100,26 @@ def create_app(config_name='development'):
     api.add_namespace(admin_dashboard.api, path='/admin')
     api.add_namespace(reports.api, path='/reports')
     api.add_namespace(certificates.api, path='/certificates')
+    api.add_namespace(jobs.api, path='/jobs')
+    api.add_namespace(notifications.api, path='/notifications')
 
     # Health check endpoint
     @app.route('/api/health')
     def health():
         return {'status': 'healthy', 'message': 'Chronicle API is running'}
 
+    @app.route('/api/health/db-pool')
+    @admin_required
+    def db_pool_stats():
+        """Connection pool statistics for the current worker process."""
+        return get_pool_stats()
+
+    @app.route('/api/health/cache')
+    @admin_required
+    def response_cache_stats():
+        """Response cache backend and per-route hit/miss counters."""
+        return cache_stats()
+
     # Serve uploaded files
     @app.route('/uploads/<path:filename>')
     def uploaded_file(filename):
@@ -101,13 +127,16 @@ def create_app(config_name='development'):
         return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
 
     # Initialize database indexes
-    with app.app_context():
-        try:
-            init_db(app)
-        except Exception as e:
-            print(f"Warning: Could not initialize database: {e}")
-
-    socketio.init_app(app, cors_allowed_origins=app.config.get('CORS_ORIGINS', ['*']))
+    app.cli.add_command(index_cli)
+    app.cli.add_command(migrate_cli)
+    app.cli.add_command(stats_cli)
+    try:
+        init_db(app)
+    except Exception as e:
+        print(f"Warning: Could not initialize database: {e}")
+    start_scheduled_jobs(app)
+
+    socketio.init_app(app, cors_allowed_origins=app.config.get('CORS_ORIGINS', ['*']), **init_presence(app))
     register_socketio_events(socketio)
 
     return app
@@ -14,6 +14,8 @@ from app.blueprints import (
     admin_dashboard,
     reports,
     certificates,
+    jobs,
+    notifications,
 )
 
 __all__ = [
@@ -31,4 +33,6 @@ __all__ = [
     'admin_dashboard',
     'reports',
     'certificates',
+    'jobs',
+    'notifications',
 ]
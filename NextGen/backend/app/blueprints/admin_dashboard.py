@@ -6,16 +6,14 @@ from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt
 
 from app.db import get_db
+from app.models.activity import ActivityEventHelper
+from app.models.rollups import GRANULARITIES, DailyRollupHelper
+from app.models.stats import StatsCounterHelper
+from app.utils.parallel import query_timeout_ms, run_parallel
 
 api = Namespace('admin', description='Administrative dashboard, analytics, and monitoring')
 
-
-def _serialize_datetime(value):
-    if isinstance(value, datetime):
-        if value.tzinfo is None:
-            value = value.replace(tzinfo=timezone.utc)
-        return value.isoformat()
-    return None
+MAX_HOURLY_DAYS = 31
 
 
 def _ensure_staff_access():
@@ -31,58 +29,26 @@ def _safe_collection(db, name):
     return getattr(db, name, db[name])
 
 
-def _timeseries_for_collection(db, collection_name, field='created_at', days=7, limit=500):
-    """Build a simple time-series for the last N days."""
-    collection = _safe_collection(db, collection_name)
-    now = datetime.now(timezone.utc)
-    start_date = (now - timedelta(days=days - 1)).date()
-    day_order = []
-    counts = {}
-    for offset in range(days):
-        day = start_date + timedelta(days=offset)
-        key = day.isoformat()
-        day_order.append(key)
-        counts[key] = 0
-
-    cursor = collection.find({}, {field: 1, 'updated_at': 1}).sort(field, -1).limit(limit)
-    for doc in cursor:
-        ts = doc.get(field) or doc.get('updated_at')
-        if isinstance(ts, datetime):
-            if ts.tzinfo is None:
-                ts = ts.replace(tzinfo=timezone.utc)
-            day_key = ts.date().isoformat()
-            if day_key in counts:
-                counts[day_key] += 1
-    return [{'day': key, 'count': counts[key]} for key in day_order]
-
-
-def _recent_activity(db, limit=20):
-    """Collect recent events from different collections."""
-    sources = [
-        ('notice', 'notices', 'title'),
-        ('discussion', 'discussions', 'title'),
-        ('timeline', 'timeline_posts', 'content'),
-        ('quiz', 'quizzes', 'title'),
-        ('material', 'materials', 'title'),
-    ]
-    events = []
-    for kind, collection_name, title_field in sources:
-        collection = _safe_collection(db, collection_name)
-        cursor = collection.find(
-            {},
-            {title_field: 1, 'created_at': 1, 'updated_at': 1, 'author_name': 1, 'created_by': 1},
-        ).sort('updated_at', -1).limit(limit)
-        for doc in cursor:
-            ts = doc.get('updated_at') or doc.get('created_at')
-            events.append({
-                'type': kind,
-                'title': doc.get(title_field) or 'Untitled',
-                'author': doc.get('author_name'),
-                'created_by': str(doc.get('created_by')) if doc.get('created_by') else None,
-                'timestamp': _serialize_datetime(ts),
-            })
-    events.sort(key=lambda item: item['timestamp'] or '', reverse=True)
-    return events[:limit]
+def _with_timings(payload, results):
+    """Attach per-subquery timings to the body and a ``Server-Timing`` header."""
+    payload['timings'] = results.report()
+    payload['partial'] = results.partial
+    return payload, 200, {'Server-Timing': results.server_timing()}
+
+
+def _parse_timeseries_args(default_days):
+    try:
+        days = int(request.args.get('days', default_days))
+    except (TypeError, ValueError):
+        api.abort(400, 'days must be an integer.')
+    if not 1 <= days <= DailyRollupHelper.MAX_DAYS:
+        api.abort(400, f'days must be between 1 and {DailyRollupHelper.MAX_DAYS}.')
+    granularity = (request.args.get('granularity') or 'day').lower()
+    if granularity not in GRANULARITIES:
+        api.abort(400, f"granularity must be one of: {', '.join(GRANULARITIES)}.")
+    if granularity == 'hour' and days > MAX_HOURLY_DAYS:
+        api.abort(400, f'Hourly granularity is limited to {MAX_HOURLY_DAYS} days.')
+    return days, granularity
 
 
 summary_model = api.model('AdminSummary', {
@@ -99,7 +65,10 @@ summary_model = api.model('AdminSummary', {
 })
 
 activity_model = api.model('AdminActivity', {
+    'id': fields.String(),
     'type': fields.String(),
+    'action': fields.String(),
+    'target_id': fields.String(),
     'title': fields.String(),
     'author': fields.String(),
     'created_by': fields.String(),
@@ -111,15 +80,22 @@ dashboard_model = api.model('AdminDashboard', {
     'trends': fields.Raw(),
     'recent_activity': fields.List(fields.Nested(activity_model)),
     'quick_actions': fields.List(fields.Raw()),
+    'timings': fields.Raw(description='Per-subquery duration (ms) and status'),
+    'partial': fields.Boolean(description='True when a subquery failed or timed out'),
 })
 
 statistics_model = api.model('AdminStatistics', {
     'timeseries': fields.Raw(),
+    'days': fields.Integer(),
+    'granularity': fields.String(),
+    'timings': fields.Raw(description='Per-subquery duration (ms) and status'),
+    'partial': fields.Boolean(description='True when a subquery failed or timed out'),
 })
 
 activity_list_model = api.model('AdminActivityList', {
     'count': fields.Integer(),
     'logs': fields.List(fields.Nested(activity_model)),
+    'next_cursor': fields.String(),
 })
 
 user_analytics_model = api.model('UserAnalytics', {
@@ -127,6 +103,8 @@ user_analytics_model = api.model('UserAnalytics', {
     'per_semester': fields.List(fields.Raw()),
     'monthly_growth': fields.Raw(),
     'total_students': fields.Integer(),
+    'timings': fields.Raw(description='Per-subquery duration (ms) and status'),
+    'partial': fields.Boolean(description='True when a subquery failed or timed out'),
 })
 
 content_analytics_model = api.model('ContentAnalytics', {
@@ -134,6 +112,8 @@ content_analytics_model = api.model('ContentAnalytics', {
     'discussions': fields.Raw(),
     'timeline': fields.Raw(),
     'quizzes': fields.Raw(),
+    'timings': fields.Raw(description='Per-subquery duration (ms) and status'),
+    'partial': fields.Boolean(description='True when a subquery failed or timed out'),
 })
 
 
@@ -146,24 +126,14 @@ class AdminDashboard(Resource):
     def get(self):
         role = _ensure_staff_access()
         db = get_db()
-        summary = {
-            'students': _safe_collection(db, 'students').count_documents({}),
-            'staff': _safe_collection(db, 'users').count_documents({'user_type': {'$in': ['Staff', 'Admin']}}),
-            'courses': _safe_collection(db, 'courses').count_documents({}),
-            'subjects': _safe_collection(db, 'subjects').count_documents({}),
-            'notices': _safe_collection(db, 'notices').count_documents({}),
-            'materials': _safe_collection(db, 'materials').count_documents({}),
-            'discussions': _safe_collection(db, 'discussions').count_documents({}),
-            'quizzes': _safe_collection(db, 'quizzes').count_documents({}),
-            'timeline_posts': _safe_collection(db, 'timeline_posts').count_documents({}),
-            'chat_messages': _safe_collection(db, 'chat_messages').count_documents({}),
-        }
-
-        trends = {
-            'students': _timeseries_for_collection(db, 'students', days=7),
-            'notices': _timeseries_for_collection(db, 'notices', days=7),
-            'timeline_posts': _timeseries_for_collection(db, 'timeline_posts', days=7),
+        trend_series = ('students', 'notices', 'timeline_posts')
+        queries = {
+            'summary': lambda: StatsCounterHelper.get_all(db),
+            'recent_activity': lambda: ActivityEventHelper.list_events(db, limit=15)[0],
         }
+        for series in trend_series:
+            queries[f'trend:{series}'] = lambda series=series: DailyRollupHelper.timeseries(db, series, days=7)
+        results = run_parallel(queries)
 
         quick_actions = [
             {'label': 'Create notice', 'href': '/admin/notices/new', 'description': 'Publish an announcement'},
@@ -171,37 +141,48 @@ class AdminDashboard(Resource):
             {'label': 'Upload material', 'href': '/admin/materials/new', 'description': 'Share study resources'},
         ]
 
-        return {
-            'summary': summary,
-            'trends': trends,
-            'recent_activity': _recent_activity(db, limit=15),
+        return _with_timings({
+            'summary': results.get('summary', {}),
+            'trends': {series: results.get(f'trend:{series}', []) for series in trend_series},
+            'recent_activity': [ActivityEventHelper.to_dict(event) for event in results.get('recent_activity', [])],
             'quick_actions': quick_actions,
             'role': role,
-        }
+        }, results)
 
 
 @api.route('/statistics')
 class AdminStatistics(Resource):
     """Aggregate statistics for charts."""
 
+    @api.doc(params={
+        'days': 'Number of UTC days to cover, today included (default 10, max 366)',
+        'granularity': 'Bucket size: hour, day (default) or week',
+    })
     @api.marshal_with(statistics_model)
     @jwt_required()
     def get(self):
         _ensure_staff_access()
+        days, granularity = _parse_timeseries_args(default_days=10)
         db = get_db()
-        timeseries = {
-            'students': _timeseries_for_collection(db, 'students', days=10),
-            'discussions': _timeseries_for_collection(db, 'discussions', days=10),
-            'timeline_posts': _timeseries_for_collection(db, 'timeline_posts', days=10),
-            'chat_messages': _timeseries_for_collection(db, 'chat_messages', days=10),
-        }
-        return {'timeseries': timeseries}
+        series_names = ('students', 'discussions', 'timeline_posts', 'chat_messages')
+        results = run_parallel({
+            series: lambda series=series: DailyRollupHelper.timeseries(db, series, days=days, granularity=granularity)
+            for series in series_names
+        })
+        timeseries = {series: results.get(series, []) for series in series_names}
+        return _with_timings({'timeseries': timeseries, 'days': days, 'granularity': granularity}, results)
 
 
 @api.route('/activity-logs')
 class ActivityLogs(Resource):
     """Recent activity feed."""
 
+    @api.doc(params={
+        'limit': 'Number of events to return (default 25, max 100)',
+        'cursor': 'next_cursor from the previous page',
+        'type': f"Only events of this type: {', '.join(ActivityEventHelper.TYPES)}",
+        'actor': 'Only events by this user id',
+    })
     @api.marshal_with(activity_list_model)
     @jwt_required()
     def get(self):
@@ -211,9 +192,22 @@ class ActivityLogs(Resource):
         except (TypeError, ValueError):
             limit = 25
         limit = max(5, min(limit, 100))
+        event_type = request.args.get('type') or None
+        if event_type and event_type not in ActivityEventHelper.TYPES:
+            api.abort(400, f"type must be one of: {', '.join(ActivityEventHelper.TYPES)}.")
         db = get_db()
-        logs = _recent_activity(db, limit=limit)
-        return {'count': len(logs), 'logs': logs}
+        try:
+            events, next_cursor = ActivityEventHelper.list_events(
+                db,
+                limit=limit,
+                cursor=request.args.get('cursor'),
+                event_type=event_type,
+                actor_id=request.args.get('actor'),
+            )
+        except ValueError as exc:
+            api.abort(400, str(exc))
+        logs = [ActivityEventHelper.to_dict(event) for event in events]
+        return {'count': len(logs), 'logs': logs, 'next_cursor': next_cursor}
 
 
 @api.route('/user-analytics')
@@ -225,44 +219,50 @@ class UserAnalytics(Resource):
     def get(self):
         _ensure_staff_access()
         db = get_db()
-        per_course = []
-        pipeline = [
-            {'$group': {'_id': '$course', 'count': {'$sum': 1}}},
-            {'$sort': {'count': -1}},
-        ]
-        for item in _safe_collection(db, 'students').aggregate(pipeline):
-            per_course.append({'course': item['_id'] or 'Unknown', 'count': item['count']})
-
-        per_semester = []
-        pipeline = [
-            {'$group': {'_id': '$semester', 'count': {'$sum': 1}}},
-            {'$sort': {'_id': 1}},
-        ]
-        for item in _safe_collection(db, 'students').aggregate(pipeline):
-            per_semester.append({'semester': item['_id'] or 'N/A', 'count': item['count']})
-
+        students = _safe_collection(db, 'students')
+        max_ms = query_timeout_ms()
         now = datetime.now(timezone.utc)
         last_30 = now - timedelta(days=30)
         prev_30 = last_30 - timedelta(days=30)
 
-        recent = _safe_collection(db, 'students').count_documents({'created_at': {'$gte': last_30}})
-        previous = _safe_collection(db, 'students').count_documents({
-            'created_at': {'$gte': prev_30, '$lt': last_30}
+        results = run_parallel({
+            'per_course': lambda: list(students.aggregate([
+                {'$group': {'_id': '$course', 'count': {'$sum': 1}}},
+                {'$sort': {'count': -1}},
+            ], maxTimeMS=max_ms)),
+            'per_semester': lambda: list(students.aggregate([
+                {'$group': {'_id': '$semester', 'count': {'$sum': 1}}},
+                {'$sort': {'_id': 1}},
+            ], maxTimeMS=max_ms)),
+            'recent': lambda: students.count_documents({'created_at': {'$gte': last_30}}, maxTimeMS=max_ms),
+            'previous': lambda: students.count_documents({
+                'created_at': {'$gte': prev_30, '$lt': last_30}
+            }, maxTimeMS=max_ms),
+            'total_students': lambda: StatsCounterHelper.get_all(db)['students'],
         })
+
+        per_course = [
+            {'course': item['_id'] or 'Unknown', 'count': item['count']}
+            for item in results.get('per_course', [])
+        ]
+        per_semester = [
+            {'semester': item['_id'] or 'N/A', 'count': item['count']}
+            for item in results.get('per_semester', [])
+        ]
+        recent = results.get('recent', 0)
+        previous = results.get('previous', 0)
         growth = {
             'recent': recent,
             'previous': previous,
             'trend': recent - previous,
         }
 
-        total_students = _safe_collection(db, 'students').count_documents({})
-
-        return {
+        return _with_timings({
             'per_course': per_course,
             'per_semester': per_semester,
             'monthly_growth': growth,
-            'total_students': total_students,
-        }
+            'total_students': results.get('total_students', 0),
+        }, results)
 
 
 @api.route('/content-analytics')
@@ -274,43 +274,49 @@ class ContentAnalytics(Resource):
     def get(self):
         _ensure_staff_access()
         db = get_db()
-        notices_by_type = []
-        pipeline = [
-            {'$group': {'_id': '$type', 'count': {'$sum': 1}}},
-            {'$sort': {'count': -1}},
+        max_ms = query_timeout_ms()
+
+        def first(collection_name, pipeline):
+            return next(_safe_collection(db, collection_name).aggregate(pipeline, maxTimeMS=max_ms), None)
+
+        results = run_parallel({
+            'notices_by_type': lambda: list(_safe_collection(db, 'notices').aggregate([
+                {'$group': {'_id': '$type', 'count': {'$sum': 1}}},
+                {'$sort': {'count': -1}},
+            ], maxTimeMS=max_ms)),
+            'discussions': lambda: first('discussions', [
+                {'$group': {
+                    '_id': None,
+                    'total': {'$sum': 1},
+                    'reply_count': {'$sum': '$reply_count'},
+                    'likes_count': {'$sum': {'$ifNull': ['$likes_count', 0]}},
+                }}
+            ]),
+            'timeline': lambda: first('timeline_posts', [
+                {'$group': {
+                    '_id': None,
+                    'total': {'$sum': 1},
+                    'likes': {'$sum': '$likes_count'},
+                    'comments': {'$sum': '$comments_count'},
+                }}
+            ]),
+            'quizzes': lambda: list(_safe_collection(db, 'quizzes').aggregate([
+                {'$group': {
+                    '_id': '$status',
+                    'count': {'$sum': 1},
+                }}
+            ], maxTimeMS=max_ms)),
+        })
+
+        notices_by_type = [
+            {'type': item['_id'] or 'general', 'count': item['count']}
+            for item in results.get('notices_by_type', [])
         ]
-        for item in _safe_collection(db, 'notices').aggregate(pipeline):
-            notices_by_type.append({'type': item['_id'] or 'general', 'count': item['count']})
-
-        discussion_agg = _safe_collection(db, 'discussions').aggregate([
-            {'$group': {
-                '_id': None,
-                'total': {'$sum': 1},
-                'reply_count': {'$sum': '$reply_count'},
-                'likes_count': {'$sum': {'$ifNull': ['$likes_count', 0]}},
-            }}
-        ])
-        discussion_stats = next(discussion_agg, {'total': 0, 'reply_count': 0, 'likes_count': 0})
-
-        timeline_agg = _safe_collection(db, 'timeline_posts').aggregate([
-            {'$group': {
-                '_id': None,
-                'total': {'$sum': 1},
-                'likes': {'$sum': '$likes_count'},
-                'comments': {'$sum': '$comments_count'},
-            }}
-        ])
-        timeline_stats = next(timeline_agg, {'total': 0, 'likes': 0, 'comments': 0})
-
-        quiz_agg = _safe_collection(db, 'quizzes').aggregate([
-            {'$group': {
-                '_id': '$status',
-                'count': {'$sum': 1},
-            }}
-        ])
-        quiz_stats = [{'status': item['_id'] or 'draft', 'count': item['count']} for item in quiz_agg]
-
-        return {
+        discussion_stats = results.get('discussions') or {'total': 0, 'reply_count': 0, 'likes_count': 0}
+        timeline_stats = results.get('timeline') or {'total': 0, 'likes': 0, 'comments': 0}
+        quiz_stats = [{'status': item['_id'] or 'draft', 'count': item['count']} for item in results.get('quizzes', [])]
+
+        return _with_timings({
             'notices_by_type': notices_by_type,
             'discussions': {
                 'threads': discussion_stats.get('total', 0),
@@ -323,4 +329,4 @@ class ContentAnalytics(Resource):
                 'comments': timeline_stats.get('comments', 0),
             },
             'quizzes': quiz_stats,
-        }
+        }, results)
@@ -2,7 +2,7 @@
 import os
 from datetime import datetime
 
-from flask import current_app, request, send_file
+from flask import current_app, request
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import get_jwt, jwt_required
 from bson import ObjectId
@@ -10,8 +10,12 @@ from bson.errors import InvalidId
 
 from app.db import get_db
 from app.models.certificate import CertificateHelper, CertificateTypeHelper
+from app.models.job import JobHelper
+from app.tasks.background import enqueue_certificate_issuance
 from app.utils.decorators import admin_required, staff_required, student_required
-from app.utils.pdf_generator import CertificatePDF
+from app.utils.documents import certificate_artifact, certificate_artifacts, record_certificate_file
+from app.utils.export import STREAM_BATCH_SIZE, iter_batches, stream_zip
+from app.utils.pdf_cache import RenderTimeout, ensure_rendered, send_pdf
 from app.utils.email import send_certificate_issued_email
 
 api = Namespace('certificates', description='Certificate management operations')
@@ -43,6 +47,21 @@ certificate_model = api.model('Certificate', {
 })
 
 
+bulk_certificate_model = api.model('BulkCertificateIssue', {
+    'certificate_type_id': fields.String(required=True, description='Certificate type ID'),
+    'issue_date': fields.String(required=True, description='Issue date (YYYY-MM-DD)'),
+    'student_ids': fields.List(fields.String, description='Students to certify; otherwise use the filters'),
+    'course': fields.String(description='Filter: course name'),
+    'semester': fields.Integer(description='Filter: semester'),
+    'batch': fields.String(description='Filter: batch'),
+    'remarks': fields.String(description='Remarks for every certificate'),
+    'notify': fields.Boolean(description='Email each student (default true)'),
+})
+
+BULK_FILTER_FIELDS = ('course', 'semester', 'batch')
+BULK_ISSUE_TASK = 'chronicle.issue_certificates'
+
+
 def _parse_object_id(value, field_name):
     if not value:
         return None
@@ -326,6 +345,91 @@ class CertificateList(Resource):
         }, 201
 
 
+@api.route('/bulk')
+class CertificateBulkIssue(Resource):
+    """Issue one certificate type to a whole class."""
+
+    @api.doc('bulk_issue_certificates')
+    @api.expect(bulk_certificate_model, validate=False)
+    @jwt_required()
+    @staff_required
+    def post(self):
+        """Queue bulk issuance; poll /api/jobs/<job_id> for progress."""
+        data = request.get_json() or {}
+        if not data.get('certificate_type_id') or not data.get('issue_date'):
+            return {'success': False, 'message': 'certificate_type_id and issue_date are required'}, 400
+
+        db = get_db()
+        certificate_type_oid = _parse_object_id(data['certificate_type_id'], 'certificate_type_id')
+        if not CertificateTypeHelper.find_by_id(db, certificate_type_oid):
+            return {'success': False, 'message': 'Certificate type not found'}, 404
+        issue_date = _parse_issue_date(data['issue_date'])
+
+        student_ids = data.get('student_ids') or []
+        if not isinstance(student_ids, list):
+            return {'success': False, 'message': 'student_ids must be a list'}, 400
+        student_oids = [_parse_object_id(value, 'student_ids') for value in student_ids]
+
+        filters = {field: data[field] for field in BULK_FILTER_FIELDS if data.get(field) not in (None, '')}
+        if 'semester' in filters:
+            try:
+                filters['semester'] = int(filters['semester'])
+            except (TypeError, ValueError):
+                return {'success': False, 'message': 'semester must be an integer'}, 400
+        if not student_oids and not filters:
+            return {'success': False, 'message': 'Provide student_ids or at least one of course, semester, batch'}, 400
+
+        job = enqueue_certificate_issuance(
+            certificate_type_oid,
+            issue_date,
+            student_ids=student_oids,
+            filters=filters,
+            remarks=data.get('remarks'),
+            notify=data.get('notify', True) is not False,
+            created_by=get_jwt().get('user_id'),
+        )
+        job_id = str(job['_id'])
+        return {
+            'success': True,
+            'message': 'Bulk certificate issuance queued',
+            'job_id': job_id,
+        }, 202, {'Location': f'/api/jobs/{job_id}'}
+
+
+def _batch_pdf_files(db, batch_id, upload_folder):
+    """Yield ``(arcname, path)`` for every certificate of a bulk batch, re-rendering evicted PDFs."""
+    seen = set()
+    for batch in iter_batches(CertificateHelper.find_by_batch(db, batch_id), STREAM_BATCH_SIZE):
+        for _, pdf in certificate_artifacts(db, batch, upload_folder):
+            ensure_rendered(pdf)
+            arcname = pdf.download_name
+            if arcname in seen:
+                arcname = f'{os.path.splitext(arcname)[0]}_{pdf.key[:8]}.pdf'
+            seen.add(arcname)
+            yield arcname, pdf.path
+
+
+@api.route('/bulk/<string:job_id>/download')
+class CertificateBulkDownload(Resource):
+    """Download every certificate of a bulk issuance as one ZIP."""
+
+    @api.doc('download_bulk_certificates')
+    @jwt_required()
+    @staff_required
+    def get(self, job_id):
+        db = get_db()
+        job = JobHelper.find_by_id(db, job_id)
+        if not job or job.get('task') != BULK_ISSUE_TASK:
+            return {'success': False, 'message': 'Bulk issuance not found'}, 404
+        if job.get('status') != 'succeeded':
+            return {'success': False, 'message': f"Bulk issuance is {job.get('status')}"}, 409
+
+        return stream_zip(
+            _batch_pdf_files(db, job['_id'], current_app.config['UPLOAD_FOLDER']),
+            f'certificates-{job_id}',
+        )
+
+
 @api.route('/<string:certificate_id>')
 class CertificateDetail(Resource):
     """Certificate detail access."""
@@ -379,35 +483,17 @@ class CertificateDownload(Resource):
         if claims.get('role') == 'student' and str(certificate.get('student_id')) != claims.get('user_id'):
             return {'success': False, 'message': 'Access denied'}, 403
 
-        student = db.students.find_one({'_id': certificate.get('student_id')})
-        cert_type = db.certificate_types.find_one({'_id': certificate.get('certificate_type_id')})
-        if not student or not cert_type:
-            return {'success': False, 'message': 'Invalid certificate data'}, 400
-
-        upload_folder = current_app.config['UPLOAD_FOLDER']
-        cert_dir = os.path.join(upload_folder, 'certificates')
-        os.makedirs(cert_dir, exist_ok=True)
-
-        pdf_filename = f"certificate_{certificate_id}.pdf"
-        pdf_path = os.path.join(cert_dir, pdf_filename)
-
-        certificate_pdf = CertificatePDF(pdf_path)
-        certificate_pdf.generate(
-            student.get('name', 'Student'),
-            student.get('roll_no', '-'),
-            student.get('course', '-'),
-            cert_type.get('certificate_type', 'Certificate'),
-            certificate.get('issue_date'),
-            certificate_id,
-        )
-
-        db.certificates.update_one(
-            {'_id': certificate['_id']},
-            {'$set': {'certificate_file': f"/uploads/certificates/{pdf_filename}"}}
-        )
+        try:
+            pdf = certificate_artifact(db, certificate, current_app.config['UPLOAD_FOLDER'])
+        except ValueError as exc:
+            return {'success': False, 'message': str(exc)}, 400
 
-        download_name = f"{student.get('roll_no', 'certificate')}_{cert_type.get('certificate_type', 'Certificate')}.pdf"
-        return send_file(pdf_path, as_attachment=True, download_name=download_name)
+        try:
+            response = send_pdf(pdf)
+        except RenderTimeout as exc:
+            return {'success': False, 'message': str(exc)}, 503
+        record_certificate_file(db, certificate, pdf)
+        return response
 
 
 @api.route('/student/my-certificates')
@@ -15,9 +15,11 @@ from app.models import (
     ChatSessionHelper,
     GroupChatHelper,
     ChatMessageHelper,
+    ChatReadStateHelper,
     save_chat_attachment,
 )
 from app.utils.file_handler import FileHandler
+from app.utils.serialization import ModelSerializer
 
 api = Namespace('chats', description='Chat and messaging operations')
 
@@ -74,10 +76,16 @@ attachment_model = api.model('ChatAttachment', {
     'uploaded_at': fields.String(),
 })
 
+attachment_serializer = ModelSerializer(
+    attachment_model,
+    overrides={'file_url': lambda item: FileHandler.upload_url(item.get('path'))},
+)
+
 message_model = api.model('ChatMessage', {
     'id': fields.String(),
     'chat_id': fields.String(),
     'group_id': fields.String(),
+    'seq': fields.Integer(description='Position in the conversation, assigned by the server'),
     'sender_id': fields.String(),
     'content': fields.String(),
     'attachments': fields.List(fields.Nested(attachment_model)),
@@ -85,9 +93,14 @@ message_model = api.model('ChatMessage', {
     'meta': fields.Raw(),
     'created_at': fields.String(),
     'updated_at': fields.String(),
-    'read_by': fields.List(fields.String()),
 })
 
+message_serializer = ModelSerializer(
+    message_model,
+    overrides={'id': '_id', 'attachments': attachment_serializer},
+    defaults={'message_type': 'text', 'meta': {}},
+)
+
 chat_session_model = api.model('ChatSession', {
     'id': fields.String(),
     'participants': fields.List(fields.String()),
@@ -96,6 +109,7 @@ chat_session_model = api.model('ChatSession', {
     'last_message_at': fields.String(),
     'created_at': fields.String(),
     'updated_at': fields.String(),
+    'unread_count': fields.Integer(),
 })
 
 group_chat_model = api.model('GroupChat', {
@@ -111,6 +125,14 @@ group_chat_model = api.model('GroupChat', {
     'last_message_at': fields.String(),
     'created_at': fields.String(),
     'updated_at': fields.String(),
+    'unread_count': fields.Integer(),
+})
+
+read_state_model = api.model('ChatReadState', {
+    'user_id': fields.String(),
+    'read_up_to': fields.Integer(description='Seq of the newest message the member has read'),
+    'delivered_up_to': fields.Integer(description='Seq of the newest message delivered to the member'),
+    'updated_at': fields.String(),
 })
 
 message_create_model = api.model('MessageCreate', {
@@ -143,6 +165,11 @@ file_upload_parser.add_argument(
 )
 
 
+def _with_unread(docs, to_dict, user_id, field):
+    counts = ChatReadStateHelper.unread_counts(get_db(), user_id, [doc['_id'] for doc in docs], field)
+    return [{**to_dict(doc), 'unread_count': counts.get(doc['_id'], 0)} for doc in docs]
+
+
 def _handle_attachments(files):
     attachments = []
     upload_folder = _chat_upload_folder()
@@ -170,7 +197,7 @@ class ChatList(Resource):
     def get(self):
         user_id, _, _ = _user_claims()
         sessions = ChatSessionHelper.list_for_user(get_db(), user_id)
-        return [ChatSessionHelper.to_dict(session) for session in sessions]
+        return _with_unread(sessions, ChatSessionHelper.to_dict, user_id, 'chat_id')
 
 
 @api.route('/participants')
@@ -286,7 +313,7 @@ class ChatMessages(Resource):
     """Fetch or send messages for a chat session."""
 
     @api.doc(params={'limit': 'Number of messages to return (default 50)'})
-    @api.marshal_list_with(message_model)
+    @api.response(200, 'Success', [message_model])
     @jwt_required()
     def get(self, chat_id):
         user_id, _, _ = _user_claims()
@@ -319,7 +346,9 @@ class ChatMessages(Resource):
             before=before_dt,
             search=search,
         )
-        return [ChatMessageHelper.to_dict(msg) for msg in messages]
+        if messages and not before_dt and not search:
+            ChatReadStateHelper.mark_delivered(get_db(), user_id, chat_id, messages[-1].get('seq'))
+        return message_serializer.list_response(messages)
 
     @api.expect(message_create_model, validate=False)
     @api.expect(file_upload_parser)
@@ -367,6 +396,23 @@ class ChatMessages(Resource):
         return message_payload, 201
 
 
+@api.route('/<string:chat_id>/read-state')
+class ChatReadState(Resource):
+    """How far each participant has read and received the chat."""
+
+    @api.marshal_list_with(read_state_model)
+    @jwt_required()
+    def get(self, chat_id):
+        user_id, _, _ = _user_claims()
+        session = ChatSessionHelper.find_by_id(get_db(), chat_id)
+        if not session:
+            api.abort(404, 'Chat not found.')
+        if _oid(user_id) not in session.get('participants', []):
+            api.abort(403, 'You are not a participant of this chat.')
+        states = ChatReadStateHelper.for_conversation(get_db(), chat_id, session.get('participants', []))
+        return [ChatReadStateHelper.to_dict(state) for state in states]
+
+
 @api.route('/group-chats')
 class GroupChatList(Resource):
     """List or create group chats."""
@@ -376,7 +422,7 @@ class GroupChatList(Resource):
     def get(self):
         user_id, _, _ = _user_claims()
         groups = GroupChatHelper.list_for_user(get_db(), user_id)
-        return [GroupChatHelper.to_dict(group) for group in groups]
+        return _with_unread(groups, GroupChatHelper.to_dict, user_id, 'group_id')
 
     @api.expect(group_create_model)
     @api.marshal_with(group_chat_model)
@@ -432,7 +478,7 @@ class GroupChatMessages(Resource):
     """Fetch or send messages in a group chat."""
 
     @api.doc(params={'limit': 'Number of messages to return (default 50)'})
-    @api.marshal_list_with(message_model)
+    @api.response(200, 'Success', [message_model])
     @jwt_required()
     def get(self, group_id):
         group = GroupChatHelper.find_by_id(get_db(), group_id)
@@ -465,7 +511,9 @@ class GroupChatMessages(Resource):
             before=before_dt,
             search=search,
         )
-        return [ChatMessageHelper.to_dict(msg) for msg in messages]
+        if messages and not before_dt and not search:
+            ChatReadStateHelper.mark_delivered(get_db(), user_id, group_id, messages[-1].get('seq'))
+        return message_serializer.list_response(messages)
 
     @api.expect(message_create_model, validate=False)
     @api.expect(file_upload_parser)
@@ -510,3 +558,20 @@ class GroupChatMessages(Resource):
         message_payload = ChatMessageHelper.to_dict(message)
         socketio.emit('message_received', {**message_payload, 'room': _group_room(group_id)}, room=_group_room(group_id))
         return message_payload, 201
+
+
+@api.route('/group-chats/<string:group_id>/read-state')
+class GroupChatReadState(Resource):
+    """How far each member has read and received the group."""
+
+    @api.marshal_list_with(read_state_model)
+    @jwt_required()
+    def get(self, group_id):
+        group = GroupChatHelper.find_by_id(get_db(), group_id)
+        if not group:
+            api.abort(404, 'Group chat not found.')
+        user_id, _, _ = _user_claims()
+        if _oid(user_id) not in group.get('member_ids', []):
+            api.abort(403, 'You are not a member of this group.')
+        states = ChatReadStateHelper.for_conversation(get_db(), group_id, group.get('member_ids', []))
+        return [ChatReadStateHelper.to_dict(state) for state in states]
@@ -4,7 +4,9 @@ from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt
 from bson import ObjectId
 
+from app.cache import cached_response
 from app.db import get_db
+from app.models.counts import child_counts
 from app.models.course import CourseHelper
 from app.utils.decorators import staff_required, admin_required
 
@@ -38,6 +40,7 @@ class CourseList(Resource):
 
     @api.doc('get_all_courses')
     @jwt_required()
+    @cached_response('courses', 'subjects')
     def get(self):
         """Get all courses with optional filtering."""
         db = get_db()
@@ -69,8 +72,12 @@ class CourseList(Resource):
         skip = (page - 1) * limit
         courses = list(db.courses.find(query).sort('course_name', 1).skip(skip).limit(limit))
 
-        # Convert to dict
-        courses_list = [CourseHelper.to_dict(c) for c in courses]
+        # Convert to dict, with every page's subject counts from one aggregation
+        subject_counts = child_counts(db, 'subjects', 'course_id', [c['_id'] for c in courses])
+        courses_list = [
+            {**CourseHelper.to_dict(c), 'subject_count': subject_counts[c['_id']]['count']}
+            for c in courses
+        ]
 
         return {
             'success': True,
@@ -188,13 +195,7 @@ class CourseDetail(Resource):
                 return {'success': False, 'message': 'Course name already in use'}, 400
 
         if update_data:
-            from datetime import datetime
-            update_data['updated_at'] = datetime.utcnow()
-
-            db.courses.update_one(
-                {'_id': ObjectId(course_id)},
-                {'$set': update_data}
-            )
+            CourseHelper.update_course(db, course_id, update_data)
 
         # Get updated course
         updated_course = CourseHelper.find_by_id(db, course_id)
@@ -233,7 +234,7 @@ class CourseDetail(Resource):
             }, 400
 
         # Delete course
-        db.courses.delete_one({'_id': ObjectId(course_id)})
+        CourseHelper.delete_course(db, course_id)
 
         return {
             'success': True,
@@ -247,6 +248,7 @@ class CourseSubjects(Resource):
 
     @api.doc('get_course_subjects')
     @jwt_required()
+    @cached_response('courses', 'subjects')
     def get(self, course_id):
         """Get all subjects for a specific course."""
         db = get_db()
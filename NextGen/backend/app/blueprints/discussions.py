@@ -13,9 +13,11 @@ from app.models.discussion import (
     DiscussionReplyHelper,
     build_attachment_metadata,
 )
+from app.models.digest import DigestHelper
 from app.utils.file_handler import FileHandler
 from app.utils.email import send_discussion_reply_email
 from app.utils.notification_helpers import get_account_contact
+from app.worker.digest import buffer_items
 
 api = Namespace('discussions', description='Discussion forum operations')
 
@@ -142,12 +144,15 @@ def _notify_discussion_reply(db, discussion, replier_id, replier_name):
     if not contact:
         return
 
-    send_discussion_reply_email(
-        contact['email'],
-        contact.get('name', 'Member'),
-        discussion.get('title', 'Discussion'),
-        replier_name or 'A classmate',
-    )
+    title = discussion.get('title', 'Discussion')
+    replier = replier_name or 'A classmate'
+    frequencies = DigestHelper.frequencies(db, [contact['id']])
+    if frequencies:
+        buffer_items(db, [contact], frequencies, 'discussion_reply', f'New Reply: {title}',
+                     f'{replier} replied to your discussion.')
+        return
+
+    send_discussion_reply_email(contact['email'], contact.get('name', 'Member'), title, replier)
 
 
 @api.route('')
@@ -418,12 +423,10 @@ class DiscussionLike(Resource):
     @jwt_required()
     def post(self, discussion_id):
         db = get_db()
-        discussion = DiscussionHelper.find_by_id(db, discussion_id)
-        if not discussion:
-            api.abort(404, 'Discussion not found.')
-
         user_id, _, _ = _current_user()
         updated = DiscussionHelper.toggle_like(db, discussion_id, user_id)
+        if not updated:
+            api.abort(404, 'Discussion not found.')
         return DiscussionHelper.to_dict(updated, include_internal=True)
 
 
@@ -434,9 +437,8 @@ class ReplyLike(Resource):
     @jwt_required()
     def post(self, reply_id):
         db = get_db()
-        reply = DiscussionReplyHelper.find_by_id(db, reply_id)
-        if not reply:
-            api.abort(404, 'Reply not found.')
         user_id, _, _ = _current_user()
         updated = DiscussionReplyHelper.toggle_like(db, reply_id, user_id)
+        if not updated:
+            api.abort(404, 'Reply not found.')
         return DiscussionReplyHelper.to_dict(updated)
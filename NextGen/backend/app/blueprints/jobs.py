@@ -0,0 +1,65 @@
+"""Background job status endpoints."""
+from flask import current_app, send_from_directory
+from flask_restx import Namespace, Resource, fields
+from flask_jwt_extended import jwt_required, get_jwt
+
+from app.db import get_db
+from app.models.job import JobHelper
+
+api = Namespace('jobs', description='Background job status and results')
+
+
+job_model = api.model('Job', {
+    'id': fields.String(),
+    'task': fields.String(description='Task name, e.g. chronicle.generate_report'),
+    'status': fields.String(description='queued, running, succeeded or failed'),
+    'progress': fields.Integer(description='0-100'),
+    'message': fields.String(),
+    'result': fields.Raw(description='Task result; artefacts are /uploads/... or /api/jobs/<id>/result paths'),
+    'error': fields.String(),
+    'attempts': fields.Integer(),
+    'created_by': fields.String(),
+    'created_at': fields.String(),
+    'updated_at': fields.String(),
+    'started_at': fields.String(),
+    'finished_at': fields.String(),
+})
+
+
+@api.route('/<string:job_id>')
+class JobStatus(Resource):
+    """Poll a queued job."""
+
+    @api.doc('get_job')
+    @api.marshal_with(job_model)
+    @jwt_required()
+    def get(self, job_id):
+        job = JobHelper.find_by_id(get_db(), job_id)
+        if not job:
+            api.abort(404, 'Job not found.')
+
+        claims = get_jwt()
+        if claims.get('role') not in {'staff', 'admin'} and str(job.get('created_by')) != claims.get('user_id'):
+            api.abort(403, 'Access denied.')
+        return JobHelper.to_dict(job)
+
+
+@api.route('/<string:job_id>/result')
+class JobResult(Resource):
+    """Download a job's private result file (report exports)."""
+
+    @api.doc('get_job_result')
+    @jwt_required()
+    def get(self, job_id):
+        job = JobHelper.find_by_id(get_db(), job_id)
+        if not job:
+            api.abort(404, 'Job not found.')
+
+        # Exports carry personal data: only whoever queued the job, or an admin.
+        claims = get_jwt()
+        if claims.get('role') != 'admin' and str(job.get('created_by')) != claims.get('user_id'):
+            api.abort(403, 'Access denied.')
+        filename = (job.get('result') or {}).get('filename')
+        if job.get('status') != 'succeeded' or not filename:
+            api.abort(404, 'Job has no result file.')
+        return send_from_directory(current_app.config['JOB_RESULTS_FOLDER'], filename, as_attachment=True, max_age=0)
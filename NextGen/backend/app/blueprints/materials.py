@@ -14,16 +14,13 @@ from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 
+from app.cache import cached_response
 from app.db import get_db
 from app.models.material import StudyMaterialHelper
+from app.tasks.background import enqueue_publication_notification
 from app.utils.decorators import staff_required
 from app.utils.file_handler import FileHandler
-from app.utils.email import send_study_material_email
-from app.utils.notification_helpers import (
-    resolve_course_name,
-    resolve_subject_name,
-    get_student_recipients,
-)
+from app.utils.serialization import ModelSerializer
 
 api = Namespace('materials', description='Study material operations')
 
@@ -64,6 +61,20 @@ material_list_model = api.model('MaterialList', {
     'materials': fields.List(fields.Nested(material_model)),
 })
 
+material_serializer = ModelSerializer(
+    material_model,
+    overrides={
+        'id': '_id',
+        'attachments': ModelSerializer(
+            attachment_model,
+            overrides={'file_url': lambda item: FileHandler.upload_url(item.get('path'))},
+            defaults={'download_count': 0},
+        ),
+    },
+    defaults={'download_count': 0},
+)
+material_list_serializer = ModelSerializer(material_list_model, overrides={'materials': material_serializer})
+
 material_create_model = api.model('MaterialCreate', {
     'title': fields.String(required=True, description='Material title'),
     'description': fields.String(description='Rich text description'),
@@ -115,36 +126,11 @@ def _material_to_dict(material):
     return StudyMaterialHelper.to_dict(material)
 
 
-def _notify_material_upload(db, material):
+def _notify_material_upload(material, created_by=None):
+    """Queue the new-material emails; the fan-out runs as a background job."""
     if not material:
-        return
-
-    course_name = resolve_course_name(db, material.get('course_id'))
-    subject_name = resolve_subject_name(db, material.get('subject_id'))
-    semester = material.get('semester')
-
-    recipients = get_student_recipients(
-        db,
-        course_name=course_name,
-        semester=semester,
-        fallback_to_all=True,
-    )
-    if not recipients:
-        current_app.logger.info(
-            'No recipients found for study material notification "%s".',
-            material.get('title'),
-        )
-        return
-
-    subject_label = subject_name or course_name or 'your course'
-    title = material.get('title', 'Study Material')
-    for recipient in recipients:
-        send_study_material_email(
-            recipient['email'],
-            recipient.get('name', 'Student'),
-            title,
-            subject_label,
-        )
+        return None
+    return enqueue_publication_notification('material', material['_id'], created_by=created_by)
 
 
 @api.route('')
@@ -160,7 +146,8 @@ class MaterialList(Resource):
         'semester': 'Filter by semester number',
         'search': 'Search in title or description',
     })
-    @api.marshal_with(material_list_model)
+    @api.response(200, 'Success', material_list_model)
+    @cached_response('materials')
     def get(self):
         """Retrieve materials with optional filtering."""
         db = get_db()
@@ -199,17 +186,17 @@ class MaterialList(Resource):
             filters=filters,
             page=page,
             limit=limit,
-            sort=[('created_at', -1)],
+            sort=StudyMaterialHelper.LIST_SORT,
             search=search
         )
 
-        return {
+        return material_list_serializer.response({
             'success': True,
             'page': page,
             'limit': limit,
             'total': total,
-            'materials': [_material_to_dict(item) for item in items],
-        }
+            'materials': items,
+        })
 
     @api.expect(material_create_model)
     @api.marshal_with(material_model)
@@ -248,7 +235,7 @@ class MaterialList(Resource):
             created_by=created_by
         )
 
-        _notify_material_upload(db, material)
+        _notify_material_upload(material, created_by)
 
         return _material_to_dict(material), 201
 
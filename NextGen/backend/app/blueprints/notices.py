@@ -7,16 +7,13 @@ from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt, verify_jwt_in_request
 from werkzeug.datastructures import FileStorage
 
+from app.cache import cached_response
 from app.db import get_db
 from app.models.notice import NoticeHelper
+from app.tasks.background import enqueue_publication_notification
 from app.utils.decorators import staff_required
 from app.utils.file_handler import FileHandler
-from app.utils.email import send_notice_email
-from app.utils.notification_helpers import (
-    get_student_recipients,
-    get_staff_recipients,
-    combine_recipients,
-)
+from app.utils.serialization import ModelSerializer
 
 api = Namespace('notices', description='Notice management operations')
 
@@ -68,6 +65,21 @@ notice_list_model = api.model('NoticeList', {
     'notices': fields.List(fields.Nested(notice_model)),
 })
 
+
+def _cover_image_url(notice):
+    cover_image = notice.get('cover_image')
+    if cover_image and cover_image.startswith('/uploads/'):
+        return FileHandler.get_file_url(cover_image.replace('/uploads/', ''))
+    return None
+
+
+notice_serializer = ModelSerializer(
+    notice_model,
+    overrides={'id': '_id', 'cover_image_url': _cover_image_url},
+    defaults={'is_featured': False},
+)
+notice_list_serializer = ModelSerializer(notice_list_model, overrides={'notices': notice_serializer})
+
 upload_parser = api.parser()
 upload_parser.add_argument('file', location='files', type=FileStorage, required=True, help='Image file')
 
@@ -119,40 +131,11 @@ def _is_staff_or_admin(claims):
     return claims.get('role') in {'staff', 'admin'}
 
 
-def _notify_notice_publication(db, notice):
+def _notify_notice_publication(notice, created_by=None):
+    """Queue the publication emails; the fan-out runs as a background job."""
     if not notice or notice.get('status') != 'published':
-        return
-
-    student_recipients = get_student_recipients(db, fallback_to_all=True)
-    staff_recipients = get_staff_recipients(db)
-    recipients = combine_recipients(student_recipients, staff_recipients)
-
-    if not recipients:
-        current_app.logger.info('No recipients available for notice "%s".', notice.get('title'))
-        return
-
-    notice_type = (notice.get('type') or 'Notice').title()
-    title = notice.get('title', 'New Notice')
-
-    for recipient in recipients:
-        send_notice_email(
-            recipient['email'],
-            recipient.get('name', 'Chronicle Member'),
-            title,
-            notice_type,
-        )
-
-
-def _apply_public_filters(filters):
-    now = datetime.now(timezone.utc)
-    filters.setdefault('status', 'published')
-    filters.setdefault('publish_start', {'$lte': now})
-    filters.setdefault('$or', [
-        {'publish_end': {'$exists': False}},
-        {'publish_end': None},
-        {'publish_end': {'$gte': now}},
-    ])
-    return filters
+        return None
+    return enqueue_publication_notification('notice', notice['_id'], created_by=created_by)
 
 
 def _serialize_notice(notice):
@@ -171,7 +154,8 @@ class NoticeList(Resource):
         'include_inactive': 'Include notices outside publish window (staff only)',
         'limit': 'Limit number of results',
     })
-    @api.marshal_with(notice_list_model)
+    @api.response(200, 'Success', notice_list_model)
+    @cached_response('notices')
     def get(self):
         """Get list of notices."""
         db = get_db()
@@ -214,7 +198,7 @@ class NoticeList(Resource):
             filters.setdefault('status', 'published')
 
         if not include_inactive:
-            filters = _apply_public_filters(filters)
+            filters = NoticeHelper.public_query(filters)
 
         try:
             limit = int(args.get('limit', 0))
@@ -227,14 +211,14 @@ class NoticeList(Resource):
             db,
             filters=filters,
             limit=limit,
-            sort=[('publish_start', -1), ('created_at', -1)]
+            sort=NoticeHelper.PUBLIC_SORT
         )
 
-        return {
+        return notice_list_serializer.response({
             'success': True,
             'count': len(notices),
-            'notices': [_serialize_notice(notice) for notice in notices]
-        }
+            'notices': notices,
+        })
 
     @api.expect(notice_create_model)
     @api.marshal_with(notice_model)
@@ -287,7 +271,7 @@ class NoticeList(Resource):
             created_by=created_by
         )
 
-        _notify_notice_publication(db, notice)
+        _notify_notice_publication(notice, created_by)
 
         return _serialize_notice(notice), 201
 
@@ -402,25 +386,26 @@ class NoticeDetail(Resource):
 class NoticeByType(Resource):
     """Get notices by type."""
 
-    @api.marshal_with(notice_list_model)
+    @api.response(200, 'Success', notice_list_model)
+    @cached_response('notices')
     def get(self, notice_type):
         """List notices filtered by type."""
         notice_type = notice_type.lower()
         if notice_type not in NoticeHelper.ALLOWED_TYPES:
             api.abort(400, 'Invalid notice type. Allowed: news, events, meetings.')
 
-        filters = _apply_public_filters({'type': notice_type})
+        filters = NoticeHelper.public_query({'type': notice_type})
         notices = NoticeHelper.list_notices(
             get_db(),
             filters=filters,
-            sort=[('publish_start', -1), ('created_at', -1)]
+            sort=NoticeHelper.PUBLIC_SORT
         )
 
-        return {
+        return notice_list_serializer.response({
             'success': True,
             'count': len(notices),
-            'notices': [_serialize_notice(notice) for notice in notices]
-        }
+            'notices': notices,
+        })
 
 
 @api.route('/latest')
@@ -428,7 +413,8 @@ class NoticeLatest(Resource):
     """Get latest published notices."""
 
     @api.doc('latest_notices', params={'limit': 'Number of notices to return (default 5)'})
-    @api.marshal_with(notice_list_model)
+    @api.response(200, 'Success', notice_list_model)
+    @cached_response('notices')
     def get(self):
         """List latest notices."""
         try:
@@ -438,19 +424,19 @@ class NoticeLatest(Resource):
         except (TypeError, ValueError):
             limit = 5
 
-        filters = _apply_public_filters({})
+        filters = NoticeHelper.public_query({})
         notices = NoticeHelper.list_notices(
             get_db(),
             filters=filters,
             limit=limit,
-            sort=[('publish_start', -1), ('created_at', -1)]
+            sort=NoticeHelper.PUBLIC_SORT
         )
 
-        return {
+        return notice_list_serializer.response({
             'success': True,
             'count': len(notices),
-            'notices': [_serialize_notice(notice) for notice in notices]
-        }
+            'notices': notices,
+        })
 
 
 @api.route('/featured')
@@ -458,7 +444,8 @@ class NoticeFeatured(Resource):
     """Get featured notices."""
 
     @api.doc('featured_notices', params={'limit': 'Number of featured notices (default 5)'})
-    @api.marshal_with(notice_list_model)
+    @api.response(200, 'Success', notice_list_model)
+    @cached_response('notices')
     def get(self):
         """List featured notices."""
         try:
@@ -468,19 +455,19 @@ class NoticeFeatured(Resource):
         except (TypeError, ValueError):
             limit = 5
 
-        filters = _apply_public_filters({'is_featured': True})
+        filters = NoticeHelper.public_query({'is_featured': True})
         notices = NoticeHelper.list_notices(
             get_db(),
             filters=filters,
             limit=limit,
-            sort=[('publish_start', -1), ('created_at', -1)]
+            sort=NoticeHelper.PUBLIC_SORT
         )
 
-        return {
+        return notice_list_serializer.response({
             'success': True,
             'count': len(notices),
-            'notices': [_serialize_notice(notice) for notice in notices]
-        }
+            'notices': notices,
+        })
 
 
 @api.route('/<string:notice_id>/image')
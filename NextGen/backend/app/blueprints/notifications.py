@@ -0,0 +1,139 @@
+"""In-app notification center."""
+from flask import request
+from flask_restx import Namespace, Resource, fields
+from flask_jwt_extended import jwt_required, get_jwt
+
+from app.db import get_db
+from app.models.digest import FREQUENCIES, DigestHelper
+from app.models.notification import NotificationHelper
+
+api = Namespace('notifications', description='In-app notifications for the signed-in user')
+
+
+notification_model = api.model('Notification', {
+    'id': fields.String(),
+    'type': fields.String(description=', '.join(NotificationHelper.TYPES)),
+    'title': fields.String(),
+    'body': fields.String(),
+    'link': fields.String(description='Client route of the notified item'),
+    'target_id': fields.String(),
+    'read': fields.Boolean(),
+    'read_at': fields.String(),
+    'created_at': fields.String(),
+})
+
+notification_list_model = api.model('NotificationList', {
+    'count': fields.Integer(),
+    'notifications': fields.List(fields.Nested(notification_model)),
+    'next_cursor': fields.String(),
+    'unread': fields.Integer(),
+})
+
+unread_model = api.model('NotificationUnread', {
+    'unread': fields.Integer(),
+})
+
+mark_read_model = api.model('NotificationMarkRead', {
+    'ids': fields.List(fields.String, description='Notification ids; omit to mark everything read'),
+})
+
+mark_read_result_model = api.model('NotificationMarkReadResult', {
+    'updated': fields.Integer(),
+    'unread': fields.Integer(),
+})
+
+preferences_model = api.model('NotificationPreferences', {
+    'email': fields.String(enum=list(FREQUENCIES),
+                           description='immediate, or one combined daily/weekly digest email'),
+})
+
+
+def _current_user_id():
+    return get_jwt().get('user_id')
+
+
+@api.route('')
+@api.route('/')
+class NotificationList(Resource):
+    """Newest notifications first."""
+
+    @api.doc(params={
+        'limit': 'Number of notifications to return (default 20, max 100)',
+        'cursor': 'next_cursor from the previous page',
+        'unread': 'true to list unread notifications only',
+    })
+    @api.marshal_with(notification_list_model)
+    @jwt_required()
+    def get(self):
+        try:
+            limit = int(request.args.get('limit', 20))
+        except (TypeError, ValueError):
+            limit = 20
+        limit = max(1, min(limit, 100))
+        unread_only = request.args.get('unread', '').lower() in {'1', 'true', 'yes'}
+
+        db = get_db()
+        user_id = _current_user_id()
+        try:
+            docs, next_cursor = NotificationHelper.list_for_user(
+                db, user_id, limit=limit, cursor=request.args.get('cursor'), unread_only=unread_only,
+            )
+        except ValueError as exc:
+            api.abort(400, str(exc))
+        notifications = [NotificationHelper.to_dict(doc) for doc in docs]
+        return {
+            'count': len(notifications),
+            'notifications': notifications,
+            'next_cursor': next_cursor,
+            'unread': NotificationHelper.unread_count(db, user_id),
+        }
+
+
+@api.route('/unread-count')
+class NotificationUnreadCount(Resource):
+    """Badge count: one counter lookup."""
+
+    @api.marshal_with(unread_model)
+    @jwt_required()
+    def get(self):
+        return {'unread': NotificationHelper.unread_count(get_db(), _current_user_id())}
+
+
+@api.route('/mark-read')
+class NotificationMarkRead(Resource):
+    """Mark notifications read in bulk."""
+
+    @api.expect(mark_read_model)
+    @api.marshal_with(mark_read_result_model)
+    @jwt_required()
+    def post(self):
+        data = request.get_json(silent=True) or {}
+        ids = data.get('ids')
+        if ids is not None and not isinstance(ids, list):
+            api.abort(400, 'ids must be a list of notification ids.')
+
+        db = get_db()
+        user_id = _current_user_id()
+        updated = NotificationHelper.mark_read(db, user_id, ids)
+        return {'updated': updated, 'unread': NotificationHelper.unread_count(db, user_id)}
+
+
+@api.route('/preferences')
+class NotificationPreferences(Resource):
+    """How notification emails are delivered to the signed-in user."""
+
+    @api.marshal_with(preferences_model)
+    @jwt_required()
+    def get(self):
+        return {'email': DigestHelper.get_frequency(get_db(), _current_user_id())}
+
+    @api.expect(preferences_model)
+    @api.marshal_with(preferences_model)
+    @jwt_required()
+    def put(self):
+        data = request.get_json(silent=True) or {}
+        try:
+            frequency = DigestHelper.set_frequency(get_db(), _current_user_id(), data.get('email'))
+        except ValueError as exc:
+            api.abort(400, str(exc))
+        return {'email': frequency}
@@ -2,19 +2,14 @@
 import random
 from datetime import datetime, timezone
 
-from flask import request, current_app
+from flask import request
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt
 
 from app.db import get_db
 from app.models.quiz import QuizHelper, QuestionHelper, QuizAttemptHelper, evaluate_answers
+from app.tasks.background import enqueue_publication_notification
 from app.utils.decorators import staff_required, student_required
-from app.utils.email import send_quiz_published_email
-from app.utils.notification_helpers import (
-    resolve_course_name,
-    resolve_subject_name,
-    get_student_recipients,
-)
 
 api = Namespace('quizzes', description='Quiz management and assessment')
 
@@ -131,34 +126,11 @@ def _get_claims():
         return {}
 
 
-def _notify_quiz_publication(db, quiz):
-    """Send notifications when a quiz becomes published."""
+def _notify_quiz_publication(quiz, created_by=None):
+    """Queue notifications when a quiz becomes published; the fan-out runs as a background job."""
     if not quiz or quiz.get('status') != 'published':
-        return
-
-    course_name = resolve_course_name(db, quiz.get('course_id'))
-    subject_name = resolve_subject_name(db, quiz.get('subject_id'))
-    recipients = get_student_recipients(
-        db,
-        course_name=course_name,
-        semester=quiz.get('semester'),
-        fallback_to_all=True,
-    )
-    if not recipients:
-        current_app.logger.info(
-            'No student recipients found for quiz %s publication email.',
-            str(quiz.get('_id')),
-        )
-        return
-
-    subject_display = subject_name or course_name or 'your course'
-    for student in recipients:
-        send_quiz_published_email(
-            student['email'],
-            student.get('name', 'Student'),
-            quiz.get('title', 'New Quiz'),
-            subject_display,
-        )
+        return None
+    return enqueue_publication_notification('quiz', quiz['_id'], created_by=created_by)
 
 
 @api.route('')
@@ -223,7 +195,7 @@ class QuizList(Resource):
             filters=filters,
             page=page,
             limit=limit,
-            sort=[('created_at', -1)],
+            sort=QuizHelper.LIST_SORT,
             search=args.get('search')
         )
 
@@ -265,7 +237,7 @@ class QuizList(Resource):
             allow_multiple_attempts=data.get('allow_multiple_attempts', False),
             created_by=claims.get('user_id')
         )
-        _notify_quiz_publication(db, quiz)
+        _notify_quiz_publication(quiz, claims.get('user_id'))
         return QuizHelper.to_dict(quiz), 201
 
 
@@ -307,7 +279,7 @@ class QuizDetail(Resource):
             api.abort(404, 'Quiz not found.')
 
         if existing.get('status') != 'published' and updated.get('status') == 'published':
-            _notify_quiz_publication(db, updated)
+            _notify_quiz_publication(updated, claims.get('user_id'))
 
         return QuizHelper.to_dict(updated)
 
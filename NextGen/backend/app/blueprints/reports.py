@@ -1,15 +1,17 @@
 """Reporting endpoints for CSV/PDF generation."""
-import os
 from datetime import datetime, timezone
 
-from flask import current_app, request, send_file
-from flask_restx import Namespace, Resource, fields
+from flask import current_app, request
+from flask_restx import Namespace, Resource, fields, marshal
 from flask_jwt_extended import jwt_required, get_jwt
 from bson import ObjectId
 
 from app.db import get_db
-from app.tasks.background import enqueue_report_generation
-from app.utils.pdf_generator import generate_student_report_pdf
+from app.tasks.background import enqueue_pdf_generation, enqueue_report_generation
+from app.models.counts import child_counts
+from app.utils.export import EXPORT_FORMATS, STREAM_BATCH_SIZE, iter_batches, stream_rows
+from app.utils.pdf_cache import RenderTimeout, send_pdf
+from app.utils.documents import student_report_artifact
 
 api = Namespace('reports', description='Reporting and export endpoints')
 
@@ -35,147 +37,226 @@ report_model = api.model('ReportResponse', {
     'records': fields.Integer(),
     'rows': fields.List(fields.Raw()),
     'queued': fields.Boolean(),
+    'job_id': fields.String(description='Poll /api/jobs/<job_id> when queued'),
     'message': fields.String(),
 })
 
 
+REPORT_PARAMS = {
+    'format': f"Response format: {', '.join(EXPORT_FORMATS)} (default json). csv and ndjson stream as attachments.",
+    'limit': 'Maximum number of rows (default: all)',
+    'async': 'Queue the report as a background job and return 202 with its job_id (true/false)',
+}
+
+STUDENT_COLUMNS = ('id', 'roll_no', 'name', 'email', 'course', 'semester', 'batch', 'created_at')
+QUIZ_COLUMNS = (
+    'id', 'title', 'course_id', 'subject_id', 'status', 'attempts', 'avg_percentage', 'created_at', 'updated_at',
+)
+DISCUSSION_COLUMNS = (
+    'id', 'title', 'course_id', 'subject_id', 'reply_count', 'likes_count', 'created_at', 'updated_at',
+)
+
+
+def _parse_export_args():
+    fmt = (request.args.get('format') or 'json').lower()
+    if fmt not in EXPORT_FORMATS:
+        api.abort(400, f"format must be one of: {', '.join(EXPORT_FORMATS)}.")
+    try:
+        limit = int(request.args.get('limit', 0))
+    except (TypeError, ValueError):
+        api.abort(400, 'limit must be an integer.')
+    if limit < 0:
+        api.abort(400, 'limit must not be negative.')
+    return fmt, limit
+
+
+def _report_cursor(collection, projection, sort_field, limit):
+    cursor = collection.find({}, projection).sort(sort_field, -1).batch_size(STREAM_BATCH_SIZE)
+    if limit:
+        cursor = cursor.limit(limit)
+    return cursor
+
+
+def _str_id(value):
+    return str(value) if value else None
+
+
+def _student_rows(db, limit=0):
+    projection = {
+        '_id': 1,
+        'roll_no': 1,
+        'name': 1,
+        'email': 1,
+        'course': 1,
+        'semester': 1,
+        'batch': 1,
+        'created_at': 1,
+    }
+    for student in _report_cursor(db.students, projection, 'created_at', limit):
+        yield {
+            'id': str(student['_id']),
+            'roll_no': student.get('roll_no'),
+            'name': student.get('name'),
+            'email': student.get('email'),
+            'course': student.get('course'),
+            'semester': student.get('semester'),
+            'batch': student.get('batch'),
+            'created_at': _serialize_dt(student.get('created_at')),
+        }
+
+
+def _quiz_rows(db, limit=0):
+    projection = {
+        '_id': 1,
+        'title': 1,
+        'course_id': 1,
+        'subject_id': 1,
+        'status': 1,
+        'created_at': 1,
+        'updated_at': 1,
+    }
+    cursor = _report_cursor(db.quizzes, projection, 'created_at', limit)
+    # One grouped aggregation per cursor batch instead of a count per quiz.
+    for batch in iter_batches(cursor, STREAM_BATCH_SIZE):
+        attempts = child_counts(
+            db, 'quiz_attempts', 'quiz_id', [quiz['_id'] for quiz in batch],
+            accumulators={'avg_percentage': {'$avg': '$percentage'}},
+        )
+        for quiz in batch:
+            stats = attempts[quiz['_id']]
+            average = stats['avg_percentage']
+            yield {
+                'id': str(quiz['_id']),
+                'title': quiz.get('title'),
+                'course_id': _str_id(quiz.get('course_id')),
+                'subject_id': _str_id(quiz.get('subject_id')),
+                'status': quiz.get('status'),
+                'attempts': stats['count'],
+                'avg_percentage': round(average, 2) if average is not None else None,
+                'created_at': _serialize_dt(quiz.get('created_at')),
+                'updated_at': _serialize_dt(quiz.get('updated_at')),
+            }
+
+
+def _discussion_rows(db, limit=0):
+    projection = {
+        '_id': 1,
+        'title': 1,
+        'course_id': 1,
+        'subject_id': 1,
+        'reply_count': 1,
+        'likes_count': 1,
+        'created_at': 1,
+        'updated_at': 1,
+    }
+    for discussion in _report_cursor(db.discussions, projection, 'updated_at', limit):
+        yield {
+            'id': str(discussion['_id']),
+            'title': discussion.get('title'),
+            'course_id': _str_id(discussion.get('course_id')),
+            'subject_id': _str_id(discussion.get('subject_id')),
+            'reply_count': discussion.get('reply_count', 0),
+            'likes_count': discussion.get('likes_count', 0),
+            'created_at': _serialize_dt(discussion.get('created_at')),
+            'updated_at': _serialize_dt(discussion.get('updated_at')),
+        }
+
+
+# name -> (row generator, columns, source collection); also used by the worker.
+REPORTS = {
+    'students': (_student_rows, STUDENT_COLUMNS, 'students'),
+    'quizzes': (_quiz_rows, QUIZ_COLUMNS, 'quizzes'),
+    'discussions': (_discussion_rows, DISCUSSION_COLUMNS, 'discussions'),
+}
+
+
+def _queue_report(name):
+    filters = request.args.to_dict()
+    filters.pop('async', None)
+    job = enqueue_report_generation(name, filters, created_by=get_jwt().get('user_id'))
+    job_id = str(job['_id'])
+    return marshal({
+        'generated_at': _serialize_dt(datetime.now(timezone.utc)),
+        'records': 0,
+        'rows': [],
+        'queued': True,
+        'job_id': job_id,
+        'message': f'{name.capitalize()} report queued for background generation.',
+    }, report_model), 202, {'Location': f'/api/jobs/{job_id}'}
+
+
+def _report_response(name, rows, columns, fmt, message):
+    """Stream csv/ndjson straight from the cursor; json keeps the original envelope."""
+    if fmt != 'json':
+        filename = f"{name}-report-{datetime.now(timezone.utc).strftime('%Y%m%d')}"
+        return stream_rows(rows, columns, fmt, filename)
+    rows = list(rows)
+    return marshal({
+        'generated_at': _serialize_dt(datetime.now(timezone.utc)),
+        'records': len(rows),
+        'rows': rows,
+        'queued': False,
+        'message': message,
+    }, report_model)
+
+
 @api.route('/students')
 class StudentReport(Resource):
     """Export student roster data."""
 
-    @api.marshal_with(report_model)
+    @api.doc(params=REPORT_PARAMS)
+    @api.response(200, 'Success', report_model)
+    @api.response(202, 'Queued', report_model)
     @jwt_required()
     def get(self):
         _ensure_staff()
-        async_mode = request.args.get('async') == 'true'
-        if async_mode:
-            enqueue_report_generation('students', request.args.to_dict())
-            return {
-                'generated_at': _serialize_dt(datetime.now(timezone.utc)),
-                'records': 0,
-                'rows': [],
-                'queued': True,
-                'message': 'Student report queued for background generation.',
-            }, 202
-
-        db = get_db()
-        projection = {
-            '_id': 1,
-            'roll_no': 1,
-            'name': 1,
-            'email': 1,
-            'course': 1,
-            'semester': 1,
-            'batch': 1,
-            'created_at': 1,
-        }
-        rows = []
-        for student in db.students.find({}, projection).sort('created_at', -1):
-            rows.append({
-                'id': str(student['_id']),
-                'roll_no': student.get('roll_no'),
-                'name': student.get('name'),
-                'email': student.get('email'),
-                'course': student.get('course'),
-                'semester': student.get('semester'),
-                'batch': student.get('batch'),
-                'created_at': _serialize_dt(student.get('created_at')),
-            })
-        return {
-            'generated_at': _serialize_dt(datetime.now(timezone.utc)),
-            'records': len(rows),
-            'rows': rows,
-            'queued': False,
-            'message': 'Student roster generated.',
-        }
+        fmt, limit = _parse_export_args()
+        if request.args.get('async') == 'true':
+            return _queue_report('students')
+        return _report_response(
+            'students', _student_rows(get_db(), limit), STUDENT_COLUMNS, fmt, 'Student roster generated.',
+        )
 
 
 @api.route('/quizzes')
 class QuizReport(Resource):
     """Export quiz performance summary."""
 
-    @api.marshal_with(report_model)
+    @api.doc(params=REPORT_PARAMS)
+    @api.response(200, 'Success', report_model)
+    @api.response(202, 'Queued', report_model)
     @jwt_required()
     def get(self):
         _ensure_staff()
-        db = get_db()
-        rows = []
-        projection = {
-            '_id': 1,
-            'title': 1,
-            'course_id': 1,
-            'subject_id': 1,
-            'status': 1,
-            'created_at': 1,
-            'updated_at': 1,
-        }
-        quizzes = db.quizzes.find({}, projection).sort('created_at', -1)
-        for quiz in quizzes:
-            attempt_count = db.quiz_attempts.count_documents({'quiz_id': quiz['_id']})
-            rows.append({
-                'id': str(quiz['_id']),
-                'title': quiz.get('title'),
-                'course_id': str(quiz.get('course_id')) if quiz.get('course_id') else None,
-                'subject_id': str(quiz.get('subject_id')) if quiz.get('subject_id') else None,
-                'status': quiz.get('status'),
-                'attempts': attempt_count,
-                'created_at': _serialize_dt(quiz.get('created_at')),
-                'updated_at': _serialize_dt(quiz.get('updated_at')),
-            })
-        return {
-            'generated_at': _serialize_dt(datetime.now(timezone.utc)),
-            'records': len(rows),
-            'rows': rows,
-            'queued': False,
-            'message': 'Quiz report ready.',
-        }
+        fmt, limit = _parse_export_args()
+        if request.args.get('async') == 'true':
+            return _queue_report('quizzes')
+        return _report_response('quizzes', _quiz_rows(get_db(), limit), QUIZ_COLUMNS, fmt, 'Quiz report ready.')
 
 
 @api.route('/discussions')
 class DiscussionReport(Resource):
     """Export discussion participation metrics."""
 
-    @api.marshal_with(report_model)
+    @api.doc(params=REPORT_PARAMS)
+    @api.response(200, 'Success', report_model)
+    @api.response(202, 'Queued', report_model)
     @jwt_required()
     def get(self):
         _ensure_staff()
-        db = get_db()
-        rows = []
-        projection = {
-            '_id': 1,
-            'title': 1,
-            'course_id': 1,
-            'subject_id': 1,
-            'reply_count': 1,
-            'likes_count': 1,
-            'created_at': 1,
-            'updated_at': 1,
-        }
-        discussions = db.discussions.find({}, projection).sort('updated_at', -1)
-        for discussion in discussions:
-            rows.append({
-                'id': str(discussion['_id']),
-                'title': discussion.get('title'),
-                'course_id': str(discussion.get('course_id')) if discussion.get('course_id') else None,
-                'subject_id': str(discussion.get('subject_id')) if discussion.get('subject_id') else None,
-                'reply_count': discussion.get('reply_count', 0),
-                'likes_count': discussion.get('likes_count', 0),
-                'created_at': _serialize_dt(discussion.get('created_at')),
-                'updated_at': _serialize_dt(discussion.get('updated_at')),
-            })
-        return {
-            'generated_at': _serialize_dt(datetime.now(timezone.utc)),
-            'records': len(rows),
-            'rows': rows,
-            'queued': False,
-            'message': 'Discussion report ready.',
-        }
+        fmt, limit = _parse_export_args()
+        if request.args.get('async') == 'true':
+            return _queue_report('discussions')
+        return _report_response(
+            'discussions', _discussion_rows(get_db(), limit), DISCUSSION_COLUMNS, fmt, 'Discussion report ready.',
+        )
 
 
 @api.route('/student/<string:student_id>/performance-report')
 class StudentPerformanceReport(Resource):
     """Generate PDF performance report for a student."""
 
+    @api.doc(params={'async': 'Render in the background and return 202 with a job_id (true/false)'})
     @jwt_required()
     def get(self, student_id):
         _ensure_staff()
@@ -189,54 +270,12 @@ class StudentPerformanceReport(Resource):
         if not student:
             api.abort(404, 'Student not found.')
 
-        quiz_results = list(db.quiz_attempts.aggregate([
-            {'$match': {'student_id': oid}},
-            {'$lookup': {
-                'from': 'quizzes',
-                'localField': 'quiz_id',
-                'foreignField': '_id',
-                'as': 'quiz'
-            }},
-            {'$unwind': '$quiz'},
-            {'$project': {
-                'quiz_title': '$quiz.title',
-                'score': 1,
-                'total_marks': '$quiz.total_marks',
-                'percentage': 1,
-                'date': '$submitted_at'
-            }}
-        ]))
-
-        formatted_results = []
-        for result in quiz_results:
-            submitted_at = result.get('date')
-            if isinstance(submitted_at, datetime):
-                submitted_str = submitted_at.strftime('%Y-%m-%d')
-            else:
-                submitted_str = str(submitted_at)
-            formatted_results.append({
-                'quiz_title': result.get('quiz_title'),
-                'score': result.get('score', 0),
-                'total_marks': result.get('total_marks', 0),
-                'percentage': result.get('percentage', 0),
-                'date': submitted_str,
-            })
-
-        student_payload = {
-            'name': student.get('name'),
-            'roll_no': student.get('roll_no'),
-            'course': student.get('course'),
-            'semester': student.get('semester'),
-            'batch': student.get('batch', 'N/A'),
-        }
-
-        upload_folder = current_app.config['UPLOAD_FOLDER']
-        reports_dir = os.path.join(upload_folder, 'reports')
-        os.makedirs(reports_dir, exist_ok=True)
+        if request.args.get('async') == 'true':
+            job = enqueue_pdf_generation('student_report', oid, created_by=get_jwt().get('user_id'))
+            job_id = str(job['_id'])
+            return {'queued': True, 'job_id': job_id}, 202, {'Location': f'/api/jobs/{job_id}'}
 
-        pdf_filename = f"report_{student_id}_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.pdf"
-        pdf_path = os.path.join(reports_dir, pdf_filename)
-
-        generate_student_report_pdf(student_payload, formatted_results, None, pdf_path)
-
-        return send_file(pdf_path, as_attachment=True, download_name=pdf_filename)
+        try:
+            return send_pdf(student_report_artifact(db, student, current_app.config['UPLOAD_FOLDER']))
+        except RenderTimeout as exc:
+            api.abort(503, str(exc))
@@ -4,7 +4,9 @@ from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt
 from werkzeug.datastructures import FileStorage
 
+from app.blueprints.timeline import post_list_serializer
 from app.db import get_db
+from app.models.like import LikeHelper
 from app.models.student import StudentHelper
 from app.models.timeline import TimelinePostHelper
 from app.utils.decorators import student_required, admin_required
@@ -189,26 +191,16 @@ class StudentList(Resource):
         status = request.args.get('status', 'Active')
 
         # Build query
-        query = {}
-        if status:
-            query['status'] = status
-        if course:
-            query['course'] = course
-        if semester:
-            query['semester'] = int(semester)
-        if search:
-            query['$or'] = [
-                {'name': {'$regex': search, '$options': 'i'}},
-                {'roll_no': {'$regex': search, '$options': 'i'}},
-                {'email': {'$regex': search, '$options': 'i'}}
-            ]
+        query = StudentHelper.list_query(
+            status=status, course=course, semester=int(semester) if semester else None, search=search,
+        )
 
         # Get total count
         total = db.students.count_documents(query)
 
         # Get students with pagination
         skip = (page - 1) * limit
-        students = list(db.students.find(query).sort('created_at', -1).skip(skip).limit(limit))
+        students = list(db.students.find(query).sort(StudentHelper.LIST_SORT).skip(skip).limit(limit))
 
         # Convert to dict
         students_list = [StudentHelper.to_dict(s) for s in students]
@@ -359,7 +351,7 @@ class StudentDetail(Resource):
             FileHandler.delete_file(filepath)
 
         # Delete student
-        db.students.delete_one({'_id': ObjectId(student_id)})
+        StudentHelper.delete_student(db, student_id)
 
         return {
             'success': True,
@@ -372,8 +364,10 @@ class StudentTimeline(Resource):
     """Timeline posts authored by the specified student."""
 
     @api.doc(params={
-        'page': 'Page number (default 1)',
+        'cursor': 'Continuation token from a previous response (preferred over page)',
+        'page': 'Page number for clients without cursor support (default 1)',
         'limit': 'Items per page (default 10, max 50)',
+        'include_total': 'Include an approximate, briefly cached total (default false)',
     })
     @jwt_required()
     def get(self, student_id):
@@ -386,34 +380,44 @@ class StudentTimeline(Resource):
         current_user_id = claims.get('user_id')
         role = claims.get('role')
 
+        cursor = request.args.get('cursor') or None
         try:
             page = int(request.args.get('page', 1))
         except (TypeError, ValueError):
             page = 1
+        page = max(page, 1)
         try:
             limit = int(request.args.get('limit', 10))
         except (TypeError, ValueError):
             limit = 10
         limit = max(1, min(limit, 50))
 
-        total, posts = TimelinePostHelper.list_user_posts(
-            db,
-            student_id,
-            page=page,
-            limit=limit,
-            viewer_role=role,
-            viewer_id=current_user_id,
-        )
-        serialized = [
-            TimelinePostHelper.to_dict(post, current_user_id=current_user_id) for post in posts
-        ]
-        has_more = page * limit < total
-        return {
+        try:
+            posts, next_cursor = TimelinePostHelper.list_user_posts(
+                db,
+                student_id,
+                limit=limit,
+                cursor=cursor,
+                page=page,
+                viewer_role=role,
+                viewer_id=current_user_id,
+            )
+        except ValueError as exc:
+            return {'success': False, 'message': str(exc)}, 400
+        total = None
+        if str(request.args.get('include_total', '')).lower() in {'1', 'true', 'yes', 'on'}:
+            total = TimelinePostHelper.count_user_posts(
+                db, student_id, viewer_role=role, viewer_id=current_user_id
+            )
+        LikeHelper.annotate(db, posts, current_user_id)
+        has_more = next_cursor is not None
+        return post_list_serializer.response({
             'success': True,
-            'page': page,
+            'page': None if cursor else page,
             'limit': limit,
             'total': total,
             'has_more': has_more,
-            'next_page': page + 1 if has_more else None,
-            'posts': serialized,
-        }, 200
+            'next_page': page + 1 if has_more and not cursor else None,
+            'next_cursor': next_cursor,
+            'posts': posts,
+        })
@@ -4,6 +4,7 @@ from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt
 from bson import ObjectId
 
+from app.cache import cached_response
 from app.db import get_db
 from app.models.subject import SubjectHelper
 from app.models.course import CourseHelper
@@ -41,6 +42,7 @@ class SubjectList(Resource):
 
     @api.doc('get_all_subjects')
     @jwt_required()
+    @cached_response('subjects', 'courses')
     def get(self):
         """Get all subjects with optional filtering."""
         db = get_db()
@@ -231,13 +233,7 @@ class SubjectDetail(Resource):
                 return {'success': False, 'message': 'Subject code already in use for this course'}, 400
 
         if update_data:
-            from datetime import datetime
-            update_data['updated_at'] = datetime.utcnow()
-
-            db.subjects.update_one(
-                {'_id': ObjectId(subject_id)},
-                {'$set': update_data}
-            )
+            SubjectHelper.update_subject(db, subject_id, update_data)
 
         # Get updated subject
         updated_subject = SubjectHelper.find_by_id(db, subject_id)
@@ -263,7 +259,7 @@ class SubjectDetail(Resource):
         # For now, allow deletion
 
         # Delete subject
-        db.subjects.delete_one({'_id': ObjectId(subject_id)})
+        SubjectHelper.delete_subject(db, subject_id)
 
         return {
             'success': True,
@@ -277,6 +273,7 @@ class SubjectBySemester(Resource):
 
     @api.doc('get_subjects_by_semester')
     @jwt_required()
+    @cached_response('subjects', 'courses')
     def get(self, semester):
         """Get all subjects for a specific semester across all courses."""
         db = get_db()
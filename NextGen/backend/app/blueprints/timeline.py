@@ -8,6 +8,7 @@ from flask_jwt_extended import jwt_required, get_jwt
 from werkzeug.datastructures import FileStorage
 
 from app.db import get_db
+from app.models.like import LikeHelper
 from app.models.timeline import (
     TimelinePostHelper,
     TimelineCommentHelper,
@@ -16,6 +17,7 @@ from app.models.timeline import (
 from app.models.student import StudentHelper
 from app.models.user import UserHelper
 from app.utils.file_handler import FileHandler
+from app.utils.serialization import ModelSerializer
 
 api = Namespace('timeline', description='Timeline and activity feed operations')
 
@@ -58,9 +60,23 @@ post_list_model = api.model('TimelinePostList', {
     'total': fields.Integer(),
     'has_more': fields.Boolean(),
     'next_page': fields.Integer(),
+    'next_cursor': fields.String(description='Opaque token for the next page'),
     'posts': fields.List(fields.Nested(post_model)),
 })
 
+
+def _media_count(post):
+    media_count = post.get('media_count')
+    return media_count if media_count is not None else len(post.get('media') or [])
+
+
+post_serializer = ModelSerializer(
+    post_model,
+    overrides={'id': '_id', 'media_count': _media_count},
+    defaults={'visibility': 'public', 'likes_count': 0, 'comments_count': 0, 'is_liked': False},
+)
+post_list_serializer = ModelSerializer(post_list_model, overrides={'posts': post_serializer})
+
 comment_model = api.model('TimelineComment', {
     'id': fields.String(),
     'post_id': fields.String(),
@@ -147,23 +163,31 @@ def _ensure_post_permissions(post, current_user_id, role):
     return is_owner
 
 
+def _is_truthy(value):
+    return str(value).lower() in {'1', 'true', 'yes', 'on'}
+
+
 @api.route('')
 class TimelineFeed(Resource):
     """Paginated timeline feed for the authenticated user."""
 
     @api.doc(params={
-        'page': 'Page number (default 1)',
+        'cursor': 'Continuation token from a previous response (preferred over page)',
+        'page': 'Page number for clients without cursor support (default 1)',
         'limit': 'Items per page (default 10, max 50)',
         'before': 'ISO timestamp to fetch posts created before this time',
+        'include_total': 'Include an approximate, briefly cached total (default false)',
     })
-    @api.marshal_with(post_list_model)
+    @api.response(200, 'Success', post_list_model)
     @jwt_required()
     def get(self):
         params = request.args
+        cursor = params.get('cursor') or None
         try:
             page = int(params.get('page', 1))
         except (TypeError, ValueError):
             page = 1
+        page = max(page, 1)
         try:
             limit = int(params.get('limit', 10))
         except (TypeError, ValueError):
@@ -172,18 +196,28 @@ class TimelineFeed(Resource):
         before = params.get('before')
 
         current_user_id, role, _, _ = _current_user_details()
-        total, posts = TimelinePostHelper.list_feed(get_db(), role, current_user_id, page=page, limit=limit, before=before)
-        serialized = [TimelinePostHelper.to_dict(post, current_user_id=current_user_id) for post in posts]
-        has_more = page * limit < total
-        return {
+        db = get_db()
+        try:
+            posts, next_cursor = TimelinePostHelper.list_feed(
+                db, role, current_user_id, limit=limit, cursor=cursor, page=page, before=before
+            )
+        except ValueError as exc:
+            api.abort(400, str(exc))
+        total = None
+        if _is_truthy(params.get('include_total')):
+            total = TimelinePostHelper.count_feed(db, role, current_user_id)
+        LikeHelper.annotate(db, posts, current_user_id)
+        has_more = next_cursor is not None
+        return post_list_serializer.response({
             'success': True,
-            'page': page,
+            'page': None if cursor else page,
             'limit': limit,
             'total': total,
             'has_more': has_more,
-            'next_page': page + 1 if has_more else None,
-            'posts': serialized,
-        }
+            'next_page': page + 1 if has_more and not cursor else None,
+            'next_cursor': next_cursor,
+            'posts': posts,
+        })
 
 
 @api.route('/post')
@@ -239,7 +273,7 @@ class TimelinePostCreate(Resource):
             audience=payload.get('audience') or [],
             author_avatar=avatar,
         )
-        return TimelinePostHelper.to_dict(post, current_user_id=current_user_id), 201
+        return TimelinePostHelper.to_dict(post), 201
 
 
 @api.route('/<string:post_id>')
@@ -249,11 +283,12 @@ class TimelinePostDetail(Resource):
     @api.marshal_with(post_model)
     @jwt_required()
     def get(self, post_id):
-        post = TimelinePostHelper.find_by_id(get_db(), post_id)
+        db = get_db()
+        post = TimelinePostHelper.find_by_id(db, post_id)
         if not post:
             api.abort(404, 'Timeline post not found.')
         current_user_id, _, _, _ = _current_user_details()
-        return TimelinePostHelper.to_dict(post, current_user_id=current_user_id)
+        return TimelinePostHelper.serialize(db, post, current_user_id=current_user_id)
 
     @api.expect(post_create_model, validate=False)
     @api.marshal_with(post_model)
@@ -278,7 +313,7 @@ class TimelinePostDetail(Resource):
             payload['audience'] = data['audience']
 
         updated = TimelinePostHelper.update_post(db, post_id, payload)
-        return TimelinePostHelper.to_dict(updated, current_user_id=current_user_id)
+        return TimelinePostHelper.serialize(db, updated, current_user_id=current_user_id)
 
     @jwt_required()
     def delete(self, post_id):
@@ -312,23 +347,20 @@ class TimelinePostLike(Resource):
     def post(self, post_id):
         db = get_db()
         current_user_id, _, _, _ = _current_user_details()
-        post = TimelinePostHelper.find_by_id(db, post_id)
-        if not post:
+        updated = TimelinePostHelper.set_like(db, post_id, current_user_id, like=None)
+        if not updated:
             api.abort(404, 'Timeline post not found.')
-        already_liked = TimelinePostHelper.to_dict(post, current_user_id=current_user_id)['is_liked']
-        updated = TimelinePostHelper.set_like(db, post_id, current_user_id, like=not already_liked)
-        return TimelinePostHelper.to_dict(updated, current_user_id=current_user_id)
+        return TimelinePostHelper.to_dict(updated, is_liked=updated['is_liked'])
 
     @api.marshal_with(post_model)
     @jwt_required()
     def delete(self, post_id):
         db = get_db()
         current_user_id, _, _, _ = _current_user_details()
-        post = TimelinePostHelper.find_by_id(db, post_id)
-        if not post:
-            api.abort(404, 'Timeline post not found.')
         updated = TimelinePostHelper.set_like(db, post_id, current_user_id, like=False)
-        return TimelinePostHelper.to_dict(updated, current_user_id=current_user_id)
+        if not updated:
+            api.abort(404, 'Timeline post not found.')
+        return TimelinePostHelper.to_dict(updated, is_liked=False)
 
 
 @api.route('/<string:post_id>/comment')
@@ -358,7 +390,7 @@ class TimelineCommentCreate(Resource):
             author_role=role,
             content=content,
         )
-        return TimelineCommentHelper.to_dict(comment, current_user_id=current_user_id), 201
+        return TimelineCommentHelper.to_dict(comment), 201
 
 
 @api.route('/<string:post_id>/comments')
@@ -389,7 +421,7 @@ class TimelineCommentList(Resource):
 
         current_user_id, _, _, _ = _current_user_details()
         total, comments = TimelineCommentHelper.list_comments(db, post_id, page=page, limit=limit)
-        serialized = [TimelineCommentHelper.to_dict(comment, current_user_id=current_user_id) for comment in comments]
+        serialized = TimelineCommentHelper.serialize_many(db, comments, current_user_id=current_user_id)
         return {
             'success': True,
             'page': page,
@@ -422,7 +454,7 @@ class TimelineCommentDetail(Resource):
         if 'content' in data:
             payload['content'] = (data.get('content') or '').strip()
         updated = TimelineCommentHelper.update_comment(db, comment_id, payload)
-        return TimelineCommentHelper.to_dict(updated, current_user_id=current_user_id)
+        return TimelineCommentHelper.serialize(db, updated, current_user_id=current_user_id)
 
     @jwt_required()
     def delete(self, comment_id):
@@ -448,10 +480,8 @@ class TimelineCommentLike(Resource):
     @jwt_required()
     def post(self, comment_id):
         db = get_db()
-        comment = TimelineCommentHelper.find_by_id(db, comment_id)
-        if not comment:
-            api.abort(404, 'Comment not found.')
         current_user_id, _, _, _ = _current_user_details()
-        current_state = TimelineCommentHelper.to_dict(comment, current_user_id=current_user_id)['is_liked']
-        updated = TimelineCommentHelper.set_like(db, comment_id, current_user_id, like=not current_state)
-        return TimelineCommentHelper.to_dict(updated, current_user_id=current_user_id)
+        updated = TimelineCommentHelper.set_like(db, comment_id, current_user_id, like=None)
+        if not updated:
+            api.abort(404, 'Comment not found.')
+        return TimelineCommentHelper.to_dict(updated, is_liked=updated['is_liked'])
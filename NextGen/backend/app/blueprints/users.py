@@ -375,13 +375,7 @@ class UserDetail(Resource):
                 return {'success': False, 'message': 'Email already in use'}, 400
 
         if update_data:
-            from datetime import datetime
-            update_data['updated_at'] = datetime.utcnow()
-
-            db.users.update_one(
-                {'_id': ObjectId(user_id)},
-                {'$set': update_data}
-            )
+            UserHelper.update_user(db, user, update_data)
 
         # Get updated user
         updated_user = UserHelper.find_by_id(db, user_id)
@@ -416,7 +410,7 @@ class UserDetail(Resource):
             FileHandler.delete_file(filepath)
 
         # Delete user
-        db.users.delete_one({'_id': ObjectId(user_id)})
+        UserHelper.delete_user(db, user)
 
         return {
             'success': True,
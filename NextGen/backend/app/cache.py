@@ -0,0 +1,256 @@
+"""Response cache for public read endpoints with tag-based invalidation.
+
+Entries are keyed by route, normalized query args and the caller's role.
+Every key also embeds the current version of each of its tags, so
+``invalidate_tags('notices')`` just bumps a counter. Older entries stop
+being addressable and age out by TTL. Redis (``REDIS_URL``) is used when
+reachable; otherwise an in-process LRU keeps the same behaviour per worker.
+"""
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, request
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - redis is optional
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCacheBackend:
+    """Bounded LRU kept in the worker process."""
+
+    name = 'memory'
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def tag_versions(self, tags):
+        with self._lock:
+            return [self._versions.get(tag, 0) for tag in tags]
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tags):
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+
+    def size(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class RedisCacheBackend:
+    """Shared cache across workers; tag versions are plain INCR counters."""
+
+    name = 'redis'
+
+    def __init__(self, client, prefix):
+        self.client = client
+        self.prefix = prefix
+
+    def _tag_key(self, tag):
+        return f'{self.prefix}:tag:{tag}'
+
+    def tag_versions(self, tags):
+        values = self.client.mget([self._tag_key(tag) for tag in tags])
+        return [int(value or 0) for value in values]
+
+    def get(self, key):
+        return self.client.get(f'{self.prefix}:{key}')
+
+    def set(self, key, value, ttl):
+        self.client.setex(f'{self.prefix}:{key}', ttl, value)
+
+    def invalidate(self, tags):
+        pipe = self.client.pipeline(transaction=False)
+        for tag in tags:
+            pipe.incr(self._tag_key(tag))
+        pipe.execute()
+
+    def size(self):
+        return None
+
+
+class ResponseCache:
+    """Cache front-end that tracks hit/miss metrics per route."""
+
+    def __init__(self, backend, default_ttl=60):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._routes = {}
+        self._invalidations = {}
+
+    def _count(self, route, key):
+        with self._lock:
+            stats = self._routes.setdefault(route, {'hits': 0, 'misses': 0, 'stores': 0, 'errors': 0})
+            stats[key] += 1
+
+    def build_key(self, route, tags, parts):
+        versions = self.backend.tag_versions(tags)
+        raw = '|'.join([route, *(f'{tag}={version}' for tag, version in zip(tags, versions)), *parts])
+        return f"{route}:{hashlib.sha1(raw.encode('utf-8')).hexdigest()}"
+
+    def get(self, route, key):
+        try:
+            value = self.backend.get(key)
+        except Exception:  # a cache outage must never fail the request
+            self._count(route, 'errors')
+            return None
+        self._count(route, 'hits' if value is not None else 'misses')
+        return value
+
+    def set(self, route, key, value, ttl=None):
+        try:
+            self.backend.set(key, value, ttl or self.default_ttl)
+        except Exception:
+            self._count(route, 'errors')
+            return
+        self._count(route, 'stores')
+
+    def invalidate(self, tags):
+        try:
+            self.backend.invalidate(tags)
+        except Exception:
+            logger.warning('Cache invalidation failed for tags %s', tags, exc_info=True)
+        with self._lock:
+            for tag in tags:
+                self._invalidations[tag] = self._invalidations.get(tag, 0) + 1
+
+    def stats(self):
+        with self._lock:
+            routes = {route: dict(stats) for route, stats in self._routes.items()}
+            invalidations = dict(self._invalidations)
+        for stats in routes.values():
+            lookups = stats['hits'] + stats['misses']
+            stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else None
+        return {
+            'backend': self.backend.name,
+            'default_ttl': self.default_ttl,
+            'entries': self.backend.size(),
+            'routes': routes,
+            'invalidations': invalidations,
+        }
+
+
+_cache = None
+
+
+def _build_backend(app):
+    choice = (app.config.get('CACHE_BACKEND') or 'redis').lower()
+    if choice == 'off':
+        return None
+    if choice == 'redis' and redis is not None and app.config.get('REDIS_URL'):
+        client = redis.Redis.from_url(
+            app.config['REDIS_URL'],
+            socket_connect_timeout=1,
+            socket_timeout=1,
+        )
+        try:
+            client.ping()
+            return RedisCacheBackend(client, app.config.get('CACHE_KEY_PREFIX', 'chronicle:cache'))
+        except Exception as exc:
+            app.logger.warning('Redis cache unavailable (%s); using in-process cache.', exc)
+    return MemoryCacheBackend(int(app.config.get('CACHE_MAX_ENTRIES', 1024)))
+
+
+def init_cache(app):
+    """Create the process-wide response cache from ``CACHE_BACKEND``."""
+    global _cache
+    backend = _build_backend(app)
+    _cache = ResponseCache(backend, int(app.config.get('CACHE_DEFAULT_TTL', 60))) if backend else None
+    return _cache
+
+
+def invalidate_tags(*tags):
+    """Drop every cached response carrying one of ``tags`` (no-op without a cache)."""
+    if _cache is not None and tags:
+        _cache.invalidate(tags)
+
+
+def cache_stats():
+    if _cache is None:
+        return {'backend': 'off'}
+    return _cache.stats()
+
+
+def _request_role():
+    try:
+        verify_jwt_in_request(optional=True)
+        return get_jwt().get('role') or 'anonymous'
+    except Exception:
+        return 'anonymous'
+
+
+def _normalized_args():
+    return [f'{key}={value}' for key, value in sorted(request.args.items(multi=True))]
+
+
+def cached_response(*tags, ttl=None):
+    """Cache a Resource GET's successful JSON response under ``tags``."""
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            cache = _cache
+            if cache is None:
+                return fn(*args, **kwargs)
+
+            route = request.url_rule.rule if request.url_rule else request.path
+            try:
+                key = cache.build_key(route, tags, [request.path, _request_role(), *_normalized_args()])
+            except Exception:
+                cache._count(route, 'errors')
+                return fn(*args, **kwargs)
+            body = cache.get(route, key)
+            if body is not None:
+                return Response(body, status=200, mimetype='application/json')
+
+            result = fn(*args, **kwargs)
+            if isinstance(result, Response):
+                if result.status_code == 200 and result.mimetype == 'application/json':
+                    cache.set(route, key, result.get_data(), ttl)
+                return result
+
+            # Imported here: app.utils pulls in the model helpers, which import this module.
+            from app.utils.serialization import dumps
+
+            payload, status = (result[0], result[1]) if isinstance(result, tuple) else (result, 200)
+            if status != 200 or (isinstance(result, tuple) and len(result) > 2):
+                return result
+            body = dumps(payload)
+            cache.set(route, key, body, ttl)
+            return Response(body, status=200, mimetype='application/json')
+
+        return wrapper
+
+    return decorator
@@ -23,15 +23,56 @@ class Config:
     # MongoDB
     MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017')
     MONGO_DB_NAME = os.getenv('MONGO_DB_NAME', 'chronicle_db')
+    MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', 100))
+    MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', 0))
+    MONGO_MAX_IDLE_TIME_MS = int(os.getenv('MONGO_MAX_IDLE_TIME_MS', 60000))
+    MONGO_CONNECT_TIMEOUT_MS = int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', 5000))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))
+    MONGO_SOCKET_TIMEOUT_MS = int(os.getenv('MONGO_SOCKET_TIMEOUT_MS', 30000))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000))
+    # off | background | blocking -- see app.db.init_db
+    INDEX_SYNC_MODE = os.getenv('INDEX_SYNC_MODE', 'background')
+
+    # Parallel read fan-out for admin analytics -- see app.utils.parallel
+    QUERY_MAX_WORKERS = int(os.getenv('QUERY_MAX_WORKERS', 8))
+    QUERY_TIMEOUT_MS = int(os.getenv('QUERY_TIMEOUT_MS', 2000))
+
+    # Dashboard jobs, in seconds between runs (0 disables) -- see app.stats
+    STATS_RECONCILE_SECONDS = int(os.getenv('STATS_RECONCILE_SECONDS', 900))
+    ROLLUP_REFRESH_SECONDS = int(os.getenv('ROLLUP_REFRESH_SECONDS', 3600))
+
+    # Background jobs: celery | thread | eager -- see app.worker.executor
+    TASK_EXECUTOR = os.getenv('TASK_EXECUTOR', 'thread')
+    TASK_MAX_WORKERS = int(os.getenv('TASK_MAX_WORKERS', 2))
+
+    # Generated PDF cache -- see app.utils.pdf_cache (0 workers renders in-process)
+    PDF_RENDER_WORKERS = int(os.getenv('PDF_RENDER_WORKERS', 2))
+    PDF_RENDER_TIMEOUT = int(os.getenv('PDF_RENDER_TIMEOUT', 30))
+    PDF_CACHE_MAX_BYTES = int(os.getenv('PDF_CACHE_MAX_BYTES', 256 * 1024 * 1024))
 
     # Redis
     REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
 
+    # Socket.IO across worker processes: redis | memory -- see app.presence
+    SOCKETIO_BACKEND = os.getenv('SOCKETIO_BACKEND', 'redis')
+    SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE')  # defaults to REDIS_URL with the redis backend
+    PRESENCE_TTL_SECONDS = int(os.getenv('PRESENCE_TTL_SECONDS', 60))
+    PRESENCE_FLUSH_SECONDS = float(os.getenv('PRESENCE_FLUSH_SECONDS', 2))  # 0 sends status changes at once
+    PRESENCE_KEY_PREFIX = os.getenv('PRESENCE_KEY_PREFIX', 'chronicle:presence')
+
+    # Response cache: redis | memory | off -- see app.cache
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'redis')
+    CACHE_DEFAULT_TTL = int(os.getenv('CACHE_DEFAULT_TTL', 60))
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 1024))
+    CACHE_KEY_PREFIX = os.getenv('CACHE_KEY_PREFIX', 'chronicle:cache')
+
     # CORS
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:5173').split(',')
 
     # File Upload
     UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', '/tmp/uploads')
+    # Report exports hold personal data: kept outside UPLOAD_FOLDER, served by GET /api/jobs/<id>/result
+    JOB_RESULTS_FOLDER = os.getenv('JOB_RESULTS_FOLDER', '/tmp/job-results')
     MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))  # 16MB
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'pdf', 'doc', 'docx', 'rtf'}
 
@@ -47,6 +88,16 @@ class Config:
     RESEND_API_KEY = os.getenv('RESEND_API_KEY')
     MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER', 'chronicle@kmats.in')
 
+    # Email delivery: resend | fake -- see app.utils.mail_providers and app.worker.outbox
+    EMAIL_PROVIDER = os.getenv('EMAIL_PROVIDER', 'resend')
+    EMAIL_RATE_LIMIT = float(os.getenv('EMAIL_RATE_LIMIT', 2))  # provider requests per second, 0 = unlimited
+    OUTBOX_SWEEP_SECONDS = int(os.getenv('OUTBOX_SWEEP_SECONDS', 300))
+
+    # Email digests for users who chose daily/weekly delivery -- see app.worker.digest
+    DIGEST_HOUR = int(os.getenv('DIGEST_HOUR', 7))  # UTC
+    DIGEST_WEEKDAY = int(os.getenv('DIGEST_WEEKDAY', 0))  # Monday = 0
+    DIGEST_SWEEP_SECONDS = int(os.getenv('DIGEST_SWEEP_SECONDS', 900))
+
     # API Documentation
     API_TITLE = os.getenv('API_TITLE', 'Chronicle API')
     API_VERSION = os.getenv('API_VERSION', '1.0')
@@ -72,6 +123,16 @@ class TestingConfig(Config):
     TESTING = True
     MONGO_URI = 'mongodb://localhost:27017'
     MONGO_DB_NAME = 'chronicle_test_db'
+    CACHE_BACKEND = 'memory'
+    SOCKETIO_BACKEND = 'memory'
+    STATS_RECONCILE_SECONDS = 0
+    ROLLUP_REFRESH_SECONDS = 0
+    TASK_EXECUTOR = 'eager'
+    PDF_RENDER_WORKERS = 0
+    EMAIL_PROVIDER = 'fake'
+    EMAIL_RATE_LIMIT = 0
+    OUTBOX_SWEEP_SECONDS = 0
+    DIGEST_SWEEP_SECONDS = 0
 
 
 config = {
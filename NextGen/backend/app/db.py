@@ -1,108 +1,214 @@
 """MongoDB database connection."""
-from pymongo import MongoClient
+import os
+import threading
+from collections.abc import Mapping
+
+from pymongo import MongoClient, monitoring
 from flask import current_app, g
 
 
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Track connection pool activity so the pool can be sized from real traffic."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _bump(self, address, key, delta=1):
+        with self._lock:
+            stats = self._stats.setdefault(_format_address(address), {
+                'created': 0,
+                'closed': 0,
+                'open': 0,
+                'checked_out': 0,
+                'checkouts': 0,
+                'checkout_failures': 0,
+                'cleared': 0,
+            })
+            stats[key] += delta
+
+    def snapshot(self):
+        with self._lock:
+            return {address: dict(stats) for address, stats in self._stats.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+    def pool_created(self, event):
+        # Register the server so it is reported even before the first connection.
+        self._bump(event.address, 'open', 0)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._bump(event.address, 'cleared')
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._bump(event.address, 'created')
+        self._bump(event.address, 'open')
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._bump(event.address, 'closed')
+        self._bump(event.address, 'open', -1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._bump(event.address, 'checkout_failures')
+
+    def connection_checked_out(self, event):
+        self._bump(event.address, 'checkouts')
+        self._bump(event.address, 'checked_out')
+
+    def connection_checked_in(self, event):
+        self._bump(event.address, 'checked_out', -1)
+
+
+pool_stats = PoolStatsListener()
+
+
+def _format_address(address):
+    if isinstance(address, tuple):
+        return f'{address[0]}:{address[1]}'
+    return str(address)
+
+
+def _config_value(config, key, default=None):
+    """Read a setting from a Flask config, a plain dict, or a config class."""
+    if isinstance(config, Mapping):
+        return config.get(key, default)
+    return getattr(config, key, default)
+
+
+def _client_options(config):
+    return {
+        'maxPoolSize': int(_config_value(config, 'MONGO_MAX_POOL_SIZE', 100)),
+        'minPoolSize': int(_config_value(config, 'MONGO_MIN_POOL_SIZE', 0)),
+        'maxIdleTimeMS': int(_config_value(config, 'MONGO_MAX_IDLE_TIME_MS', 60000)),
+        'connectTimeoutMS': int(_config_value(config, 'MONGO_CONNECT_TIMEOUT_MS', 5000)),
+        'serverSelectionTimeoutMS': int(_config_value(config, 'MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000)),
+        'socketTimeoutMS': int(_config_value(config, 'MONGO_SOCKET_TIMEOUT_MS', 30000)),
+        'waitQueueTimeoutMS': int(_config_value(config, 'MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000)),
+    }
+
+
+def _reset_after_fork():
+    """Drop the inherited client in a forked child; it is rebuilt on first use."""
+    global _client, _client_pid, _client_lock
+    _client = None
+    _client_pid = None
+    _client_lock = threading.Lock()
+    pool_stats.reset()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_client(config=None):
+    """Return the process-wide MongoClient, creating it on first use.
+
+    The client is created lazily (``connect=False``) so it is safe to build
+    before a pre-fork server forks its workers; each worker process gets its
+    own client and connection pool.
+    """
+    global _client, _client_pid
+    if config is None:
+        config = current_app.config
+
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+
+    with _client_lock:
+        if _client is None or _client_pid != pid:
+            _client = MongoClient(
+                _config_value(config, 'MONGO_URI', 'mongodb://localhost:27017'),
+                connect=False,
+                event_listeners=[pool_stats],
+                **_client_options(config)
+            )
+            _client_pid = pid
+    return _client
+
+
+def get_database(config=None):
+    """Return the application database outside of a request (scripts, workers)."""
+    if config is None:
+        config = current_app.config
+    return get_client(config)[_config_value(config, 'MONGO_DB_NAME', 'chronicle_db')]
+
+
 def get_db():
-    """Get database connection from Flask g object or create new one."""
+    """Get the application database backed by the shared pooled client."""
     if 'db' not in g:
-        client = MongoClient(current_app.config['MONGO_URI'])
-        g.db = client[current_app.config['MONGO_DB_NAME']]
-        g.client = client
+        g.db = get_database(current_app.config)
     return g.db
 
 
 def close_db(e=None):
-    """Close database connection."""
-    client = g.pop('client', None)
-    if client is not None:
-        client.close()
+    """Release the request's database handle; the pooled client stays open."""
+    g.pop('db', None)
+
+
+def close_client():
+    """Close the process-wide client (worker shutdown, end of scripts)."""
+    global _client, _client_pid
+    with _client_lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
+
+
+def get_pool_stats():
+    """Return pool configuration and per-server connection counters."""
+    options = {}
+    if _client is not None:
+        pool_options = _client.options.pool_options
+        options = {
+            'max_pool_size': pool_options.max_pool_size,
+            'min_pool_size': pool_options.min_pool_size,
+            'max_idle_time_seconds': pool_options.max_idle_time_seconds,
+            'connect_timeout': pool_options.connect_timeout,
+            'wait_queue_timeout': pool_options.wait_queue_timeout,
+        }
+    return {
+        'pid': os.getpid(),
+        'initialized': _client is not None and _client_pid == os.getpid(),
+        'options': options,
+        'servers': pool_stats.snapshot(),
+    }
 
 
 def init_db(app):
-    """Initialize database indexes."""
-    with app.app_context():
-        db = get_db()
-
-        # Create indexes for students collection
-        db.students.create_index('roll_no', unique=True)
-        db.students.create_index('email', unique=True)
-
-        # Create indexes for users collection
-        db.users.create_index('login_id', unique=True)
-        db.users.create_index('email', unique=True)
-
-        # Create indexes for courses collection
-        db.courses.create_index('course_code', unique=True)
-        db.courses.create_index('course_name', unique=True)
-
-        # Create indexes for subjects collection
-        db.subjects.create_index('subject_code')
-        db.subjects.create_index('course_id')
-        db.subjects.create_index('semester')
-        db.subjects.create_index([('course_id', 1), ('subject_code', 1)], unique=True)
-
-        # Create indexes for notices collection
-        db.notices.create_index('type')
-        db.notices.create_index('status')
-        db.notices.create_index('is_featured')
-        db.notices.create_index('publish_start')
-        db.notices.create_index([('is_featured', 1), ('publish_start', -1)])
-
-        # Create indexes for materials collection
-        db.materials.create_index('course_id')
-        db.materials.create_index('subject_id')
-        db.materials.create_index('semester')
-        db.materials.create_index('title')
-        db.materials.create_index([('created_at', -1)])
-
-        # Create indexes for quizzes, questions, and attempts
-        db.quizzes.create_index('course_id')
-        db.quizzes.create_index('subject_id')
-        db.quizzes.create_index('semester')
-        db.quizzes.create_index('status')
-        db.quizzes.create_index([('created_at', -1)])
-
-        db.questions.create_index('quiz_id')
-
-        db.quiz_attempts.create_index('quiz_id')
-        db.quiz_attempts.create_index('student_id')
-        db.quiz_attempts.create_index('percentage')
-
-        # Create indexes for discussions and replies
-        db.discussions.create_index('course_id')
-        db.discussions.create_index('subject_id')
-        db.discussions.create_index('semester')
-        db.discussions.create_index([('updated_at', -1)])
-        db.discussions.create_index([('title', 'text'), ('content', 'text')])
-
-        db.discussion_replies.create_index('discussion_id')
-        db.discussion_replies.create_index('parent_reply_id')
-        db.discussion_replies.create_index([('created_at', 1)])
-
-        # Create indexes for chat sessions and messages
-        db.chat_sessions.create_index('participants')
-        db.chat_sessions.create_index([('updated_at', -1)])
-        db.group_chats.create_index('member_ids')
-        db.group_chats.create_index([('updated_at', -1)])
-        db.chat_messages.create_index('chat_id')
-        db.chat_messages.create_index('group_id')
-        db.chat_messages.create_index([('created_at', -1)])
-
-        # Create indexes for timeline posts and comments
-        db.timeline_posts.create_index([('created_at', -1)])
-        db.timeline_posts.create_index('created_by')
-        db.timeline_posts.create_index('visibility')
-        db.timeline_comments.create_index('post_id')
-        db.timeline_comments.create_index([('created_at', 1)])
-
-        # Certificate indexes
-        db.certificate_types.create_index('certificate_type', unique=True)
-        db.certificate_types.create_index('status')
-        db.certificates.create_index('student_id')
-        db.certificates.create_index('certificate_type_id')
-        db.certificates.create_index('status')
-        db.certificates.create_index([('student_id', 1), ('certificate_type_id', 1)])
-        db.certificates.create_index([('issue_date', -1)])
-
-        print("Database indexes created successfully")
+    """Bring indexes in line with the manifest according to ``INDEX_SYNC_MODE``.
+
+    ``background`` (default) applies the manifest in a daemon thread,
+    ``blocking`` applies it before the app starts serving, and ``off`` leaves
+    it to ``flask chronicle-indexes sync``. Either way the work is skipped when
+    the stored manifest hash is current.
+    """
+    from app.indexes import start_background_sync, sync_indexes
+
+    mode = (app.config.get('INDEX_SYNC_MODE') or 'background').lower()
+    if mode == 'off':
+        return
+    if mode == 'blocking':
+        sync_indexes(get_database(app.config), logger=app.logger)
+        return
+    start_background_sync(app)
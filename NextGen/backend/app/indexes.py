@@ -0,0 +1,555 @@
+"""Declarative MongoDB index manifest and idempotent index synchronisation."""
+import hashlib
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+
+import click
+from flask.cli import AppGroup
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+from app.models.activity import ActivityEventHelper
+from app.models.job import JobHelper
+from app.models.outbox import EmailOutboxHelper
+
+
+META_COLLECTION = 'schema_meta'
+MANIFEST_DOC_ID = 'indexes'
+LOCK_DOC_ID = 'indexes_lock'
+LOCK_TTL = timedelta(minutes=10)
+
+# Options that change index behaviour; a mismatch means drop and rebuild.
+_COMPARED_OPTIONS = ('unique', 'sparse', 'expireAfterSeconds', 'partialFilterExpression')
+
+
+INDEX_MANIFEST = {
+    'students': [
+        IndexModel([('roll_no', ASCENDING)], unique=True),
+        IndexModel([('email', ASCENDING)], unique=True),
+        IndexModel([('status', ASCENDING), ('course', ASCENDING), ('semester', ASCENDING)]),
+        IndexModel([('created_at', DESCENDING)]),
+    ],
+    'users': [
+        IndexModel([('login_id', ASCENDING)], unique=True),
+        IndexModel([('email', ASCENDING)], unique=True),
+        IndexModel([('status', ASCENDING)]),
+        IndexModel([('created_at', DESCENDING)]),
+    ],
+    'courses': [
+        IndexModel([('course_code', ASCENDING)], unique=True),
+        IndexModel([('course_name', ASCENDING)], unique=True),
+    ],
+    'subjects': [
+        IndexModel([('subject_code', ASCENDING)]),
+        IndexModel([('semester', ASCENDING)]),
+        IndexModel([('course_id', ASCENDING), ('subject_code', ASCENDING)], unique=True),
+        IndexModel([('course_id', ASCENDING), ('semester', ASCENDING), ('subject_name', ASCENDING)]),
+    ],
+    'notices': [
+        IndexModel([('type', ASCENDING)]),
+        IndexModel([('status', ASCENDING)]),
+        IndexModel([('is_featured', ASCENDING)]),
+        IndexModel([('publish_start', ASCENDING)]),
+        IndexModel([('status', ASCENDING), ('publish_start', DESCENDING), ('created_at', DESCENDING)]),
+        IndexModel([
+            ('is_featured', ASCENDING), ('status', ASCENDING),
+            ('publish_start', DESCENDING), ('created_at', DESCENDING),
+        ]),
+        IndexModel([('created_at', DESCENDING)]),
+    ],
+    'materials': [
+        IndexModel([('course_id', ASCENDING)]),
+        IndexModel([('subject_id', ASCENDING)]),
+        IndexModel([('semester', ASCENDING)]),
+        IndexModel([('title', ASCENDING)]),
+        IndexModel([('created_at', DESCENDING)]),
+    ],
+    'quizzes': [
+        IndexModel([('course_id', ASCENDING)]),
+        IndexModel([('subject_id', ASCENDING)]),
+        IndexModel([('semester', ASCENDING)]),
+        IndexModel([('status', ASCENDING)]),
+        IndexModel([('created_at', DESCENDING)]),
+    ],
+    'questions': [
+        IndexModel([('quiz_id', ASCENDING)]),
+    ],
+    'quiz_attempts': [
+        IndexModel([('quiz_id', ASCENDING), ('student_id', ASCENDING)]),
+        IndexModel([('student_id', ASCENDING), ('submitted_at', DESCENDING)]),
+        IndexModel([('percentage', ASCENDING)]),
+    ],
+    'discussions': [
+        IndexModel([('course_id', ASCENDING)]),
+        IndexModel([('subject_id', ASCENDING)]),
+        IndexModel([('semester', ASCENDING)]),
+        IndexModel([('updated_at', DESCENDING)]),
+        IndexModel([('created_at', DESCENDING)]),
+        IndexModel([('title', TEXT), ('content', TEXT)]),
+    ],
+    'discussion_replies': [
+        IndexModel([('discussion_id', ASCENDING), ('created_at', ASCENDING)]),
+        IndexModel([('parent_reply_id', ASCENDING)]),
+    ],
+    'chat_sessions': [
+        IndexModel([('participants', ASCENDING), ('updated_at', DESCENDING)]),
+        IndexModel([('updated_at', DESCENDING)]),
+    ],
+    'group_chats': [
+        IndexModel([('member_ids', ASCENDING), ('updated_at', DESCENDING)]),
+        IndexModel([('updated_at', DESCENDING)]),
+    ],
+    'chat_messages': [
+        IndexModel([('chat_id', ASCENDING), ('created_at', DESCENDING)]),
+        IndexModel([('group_id', ASCENDING), ('created_at', DESCENDING)]),
+        IndexModel([('chat_id', ASCENDING), ('seq', ASCENDING)]),
+        IndexModel([('group_id', ASCENDING), ('seq', ASCENDING)]),
+        IndexModel([('created_at', DESCENDING)]),
+    ],
+    'chat_read_state': [
+        IndexModel([('conversation_id', ASCENDING), ('user_id', ASCENDING)], unique=True),
+    ],
+    'timeline_posts': [
+        IndexModel([('created_at', DESCENDING)]),
+        IndexModel([('visibility', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)]),
+        IndexModel([('created_by', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)]),
+    ],
+    'likes': [
+        IndexModel([('target_id', ASCENDING), ('user_id', ASCENDING)], unique=True),
+    ],
+    'timeline_comments': [
+        IndexModel([('post_id', ASCENDING), ('created_at', ASCENDING)]),
+    ],
+    'activity_events': [
+        IndexModel([('created_at', ASCENDING)], expireAfterSeconds=ActivityEventHelper.RETENTION_DAYS * 24 * 3600),
+        IndexModel([('type', ASCENDING), ('_id', DESCENDING)]),
+        IndexModel([('actor_id', ASCENDING), ('_id', DESCENDING)]),
+    ],
+    'daily_rollups': [
+        IndexModel([('series', ASCENDING), ('day', ASCENDING)], unique=True),
+    ],
+    'jobs': [
+        IndexModel([('created_at', ASCENDING)], expireAfterSeconds=JobHelper.RETENTION_DAYS * 24 * 3600),
+    ],
+    'email_outbox': [
+        IndexModel([('job_id', ASCENDING), ('to', ASCENDING)], unique=True),
+        IndexModel([('job_id', ASCENDING), ('status', ASCENDING), ('next_attempt_at', ASCENDING)]),
+        IndexModel([('status', ASCENDING), ('next_attempt_at', ASCENDING)]),
+        IndexModel([('claim', ASCENDING)], sparse=True),
+        IndexModel([('expires_at', ASCENDING)], expireAfterSeconds=0),
+    ],
+    'notifications': [
+        IndexModel([('recipient_id', ASCENDING), ('_id', DESCENDING)]),
+        IndexModel([('recipient_id', ASCENDING), ('read_at', ASCENDING), ('_id', DESCENDING)]),
+        IndexModel([('job_id', ASCENDING), ('recipient_id', ASCENDING)], unique=True,
+                   partialFilterExpression={'job_id': {'$exists': True}}),
+        IndexModel([('expires_at', ASCENDING)], expireAfterSeconds=0),
+    ],
+    'email_digest_buffer': [
+        IndexModel([('due_at', ASCENDING)]),
+        IndexModel([('job_id', ASCENDING), ('recipient_id', ASCENDING)], unique=True,
+                   partialFilterExpression={'job_id': {'$exists': True}}),
+    ],
+    'certificate_types': [
+        IndexModel([('certificate_type', ASCENDING)], unique=True),
+        IndexModel([('status', ASCENDING)]),
+    ],
+    'certificates': [
+        IndexModel([('certificate_type_id', ASCENDING)]),
+        IndexModel([('status', ASCENDING)]),
+        IndexModel([('student_id', ASCENDING), ('certificate_type_id', ASCENDING)]),
+        IndexModel([('student_id', ASCENDING), ('issue_date', DESCENDING), ('created_at', DESCENDING)]),
+        IndexModel([('issue_date', DESCENDING), ('created_at', DESCENDING)]),
+        IndexModel([('batch_id', ASCENDING), ('_id', ASCENDING)], sparse=True),
+    ],
+}
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _spec(model):
+    """Return a JSON-friendly description of an IndexModel."""
+    document = dict(model.document)
+    document['key'] = [[field, direction] for field, direction in document['key'].items()]
+    return document
+
+
+def manifest_hash(manifest=None):
+    """Stable hash of the manifest; changes whenever an index is added or altered."""
+    manifest = manifest if manifest is not None else INDEX_MANIFEST
+    payload = {
+        collection: sorted((_spec(model) for model in models), key=lambda item: item['name'])
+        for collection, models in manifest.items()
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _options_differ(wanted, existing):
+    return any(wanted.get(option) != existing.get(option) for option in _COMPARED_OPTIONS
+               if option in wanted or option in existing)
+
+
+def diff_collection(collection, models):
+    """Compare manifest entries with ``list_indexes()`` for one collection.
+
+    Returns ``(missing, changed, extra)`` where ``missing`` and ``changed`` are
+    IndexModels to build and ``extra`` are names of indexes not in the manifest.
+    """
+    existing = {index['name']: index for index in collection.list_indexes()}
+    wanted = {model.document['name']: model for model in models}
+
+    missing, changed = [], []
+    for name, model in wanted.items():
+        current = existing.get(name)
+        if current is None:
+            missing.append(model)
+        elif _options_differ(model.document, current):
+            changed.append(model)
+
+    extra = [name for name in existing if name != '_id_' and name not in wanted]
+    return missing, changed, extra
+
+
+def _acquire_lock(db, owner):
+    now = _now()
+    try:
+        db[META_COLLECTION].update_one(
+            {'_id': LOCK_DOC_ID, 'expires_at': {'$lt': now}},
+            {'$set': {'owner': owner, 'expires_at': now + LOCK_TTL}},
+            upsert=True,
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+
+def _release_lock(db, owner):
+    db[META_COLLECTION].delete_one({'_id': LOCK_DOC_ID, 'owner': owner})
+
+
+def sync_indexes(db, force=False, prune=False, logger=None):
+    """Apply the manifest to the database.
+
+    Skips all work when the stored manifest hash matches, unless ``force`` is
+    set. Only one process applies the manifest at a time; others return early.
+    """
+    log = logger.info if logger else print
+    current_hash = manifest_hash()
+    meta = db[META_COLLECTION]
+
+    if not force:
+        stored = meta.find_one({'_id': MANIFEST_DOC_ID}, {'hash': 1})
+        if stored and stored.get('hash') == current_hash:
+            return {'status': 'up_to_date', 'hash': current_hash, 'created': [], 'dropped': []}
+
+    owner = f'{threading.get_ident()}:{current_hash[:12]}:{_now().timestamp()}'
+    if not _acquire_lock(db, owner):
+        return {'status': 'locked', 'hash': current_hash, 'created': [], 'dropped': []}
+
+    created, dropped = [], []
+    try:
+        for collection_name, models in INDEX_MANIFEST.items():
+            collection = db[collection_name]
+            missing, changed, extra = diff_collection(collection, models)
+            for model in changed:
+                collection.drop_index(model.document['name'])
+                dropped.append(f"{collection_name}.{model.document['name']}")
+            if prune:
+                for name in extra:
+                    collection.drop_index(name)
+                    dropped.append(f'{collection_name}.{name}')
+            to_build = missing + changed
+            if to_build:
+                names = collection.create_indexes(to_build)
+                created.extend(f'{collection_name}.{name}' for name in names)
+
+        meta.update_one(
+            {'_id': MANIFEST_DOC_ID},
+            {'$set': {'hash': current_hash, 'applied_at': _now()}},
+            upsert=True,
+        )
+    finally:
+        _release_lock(db, owner)
+
+    log(f'Index manifest applied: {len(created)} created, {len(dropped)} dropped.')
+    return {'status': 'applied', 'hash': current_hash, 'created': created, 'dropped': dropped}
+
+
+def start_background_sync(app):
+    """Run ``sync_indexes`` in a daemon thread so worker start-up is not blocked."""
+    def _run():
+        from app.db import get_database
+
+        try:
+            sync_indexes(get_database(app.config), logger=app.logger)
+        except PyMongoError as exc:
+            app.logger.warning('Index synchronisation failed: %s', exc)
+
+    thread = threading.Thread(target=_run, name='chronicle-index-sync', daemon=True)
+    thread.start()
+    return thread
+
+
+index_cli = AppGroup('chronicle-indexes', help='Manage MongoDB indexes from the manifest.')
+
+
+@index_cli.command('sync')
+@click.option('--force', is_flag=True, help='Re-check every collection even if the manifest hash matches.')
+@click.option('--prune', is_flag=True, help='Drop indexes that are not listed in the manifest.')
+def sync_command(force, prune):
+    """Create or update indexes to match the manifest."""
+    from app.db import get_db
+
+    result = sync_indexes(get_db(), force=force, prune=prune)
+    click.echo(f"{result['status']} ({result['hash'][:12]})")
+    for name in result['created']:
+        click.echo(f'  + {name}')
+    for name in result['dropped']:
+        click.echo(f'  - {name}')
+
+
+@index_cli.command('status')
+def status_command():
+    """Show indexes that differ from the manifest without changing anything."""
+    from app.db import get_db
+
+    db = get_db()
+    stored = db[META_COLLECTION].find_one({'_id': MANIFEST_DOC_ID}) or {}
+    current_hash = manifest_hash()
+    click.echo(f'manifest: {current_hash[:12]}  applied: {(stored.get("hash") or "never")[:12]}')
+    for collection_name, models in INDEX_MANIFEST.items():
+        missing, changed, extra = diff_collection(db[collection_name], models)
+        for model in missing:
+            click.echo(f"  missing  {collection_name}.{model.document['name']}")
+        for model in changed:
+            click.echo(f"  changed  {collection_name}.{model.document['name']}")
+        for name in extra:
+            click.echo(f'  extra    {collection_name}.{name}')
+
+
+class QueryShape:
+    """A canonical filter/sort pair issued by a model helper."""
+
+    def __init__(self, name, collection, query, sort=None, limit=50):
+        self.name = name
+        self.collection = collection
+        self.query = query
+        self.sort = sort or []
+        self.limit = limit
+
+    def explain(self, db):
+        cursor = db[self.collection].find(self.query)
+        if self.sort:
+            cursor = cursor.sort(self.sort)
+        if self.limit:
+            cursor = cursor.limit(self.limit)
+        return cursor.explain()
+
+
+def query_shapes():
+    """Collect the hot query shapes from the model helpers' own query builders."""
+    from bson import ObjectId
+
+    from app.models import (
+        ActivityEventHelper, CertificateHelper, ChatMessageHelper, ChatReadStateHelper, ChatSessionHelper,
+        DailyRollupHelper, DigestHelper, DiscussionHelper, DiscussionReplyHelper, GroupChatHelper, LikeHelper,
+        NoticeHelper, NotificationHelper, QuizAttemptHelper, QuizHelper, StudentHelper, StudyMaterialHelper,
+        SubjectHelper, TimelineCommentHelper, TimelinePostHelper,
+    )
+    from app.models.timeline import FEED_SORT, encode_cursor
+    from app.utils.notification_helpers import staff_recipients_query, student_recipients_query
+
+    user_id = ObjectId()
+    now = _now()
+    feed_cursor = encode_cursor({'_id': ObjectId(), 'created_at': now})
+    event_cursor = str(ObjectId())
+    student_feed = TimelinePostHelper.feed_query('student', user_id)
+    user_posts = TimelinePostHelper.user_posts_query(user_id, viewer_role='student')
+    return [
+        QueryShape('chat_messages.list_messages(chat)', 'chat_messages',
+                   ChatMessageHelper.messages_query(chat_id=user_id), ChatMessageHelper.LIST_SORT),
+        QueryShape('chat_messages.list_messages(chat, before)', 'chat_messages',
+                   ChatMessageHelper.messages_query(chat_id=user_id, before=now), ChatMessageHelper.LIST_SORT),
+        QueryShape('chat_messages.list_messages(group)', 'chat_messages',
+                   ChatMessageHelper.messages_query(group_id=user_id), ChatMessageHelper.LIST_SORT),
+        QueryShape('chat_messages.unread_counts(chat)', 'chat_messages',
+                   ChatReadStateHelper.unread_query(user_id, 'chat_id', {user_id: 1, ObjectId(): None}), limit=0),
+        QueryShape('chat_messages.unread_counts(group)', 'chat_messages',
+                   ChatReadStateHelper.unread_query(user_id, 'group_id', {user_id: 1, ObjectId(): None}), limit=0),
+        QueryShape('chat_read_state.unread_counts', 'chat_read_state',
+                   ChatReadStateHelper.watermarks_query(user_id, [user_id]), limit=0),
+        QueryShape('chat_read_state.for_conversation', 'chat_read_state',
+                   ChatReadStateHelper.members_query(user_id, [user_id]), limit=0),
+        QueryShape('chat_sessions.list_for_user', 'chat_sessions',
+                   ChatSessionHelper.for_user_query(user_id), ChatSessionHelper.LIST_SORT),
+        QueryShape('group_chats.list_for_user', 'group_chats',
+                   GroupChatHelper.for_user_query(user_id), GroupChatHelper.LIST_SORT),
+        QueryShape('timeline_posts.list_feed(student)', 'timeline_posts', student_feed, FEED_SORT),
+        QueryShape('timeline_posts.list_feed(staff)', 'timeline_posts',
+                   TimelinePostHelper.feed_query('staff', user_id), FEED_SORT),
+        QueryShape('timeline_posts.list_feed(cursor)', 'timeline_posts',
+                   TimelinePostHelper.cursor_query(student_feed, feed_cursor), FEED_SORT),
+        QueryShape('timeline_posts.list_user_posts', 'timeline_posts', user_posts, FEED_SORT),
+        QueryShape('timeline_posts.list_user_posts(cursor)', 'timeline_posts',
+                   TimelinePostHelper.cursor_query(user_posts, feed_cursor), FEED_SORT),
+        QueryShape('likes.liked_ids', 'likes', LikeHelper.liked_query([ObjectId(), ObjectId()], user_id), limit=0),
+        QueryShape('timeline_comments.list_comments', 'timeline_comments',
+                   TimelineCommentHelper.post_query(user_id), TimelineCommentHelper.LIST_SORT),
+        QueryShape('discussion_replies.list_by_discussion', 'discussion_replies',
+                   DiscussionReplyHelper.discussion_query(user_id), DiscussionReplyHelper.LIST_SORT, limit=0),
+        QueryShape('discussions.list_discussions', 'discussions',
+                   DiscussionHelper.list_query(), DiscussionHelper.LIST_SORT),
+        QueryShape('quiz_attempts.list_for_student', 'quiz_attempts',
+                   QuizAttemptHelper.student_query(user_id), QuizAttemptHelper.STUDENT_SORT),
+        QueryShape('quiz_attempts.list_for_quiz', 'quiz_attempts', QuizAttemptHelper.quiz_query(user_id), limit=0),
+        QueryShape('quizzes.list_quizzes', 'quizzes',
+                   QuizHelper.list_query({'status': 'published'}), QuizHelper.LIST_SORT),
+        QueryShape('materials.list_materials', 'materials',
+                   StudyMaterialHelper.list_query({'semester': 1}), StudyMaterialHelper.LIST_SORT),
+        QueryShape('notices.list_public', 'notices', NoticeHelper.public_query(), NoticeHelper.PUBLIC_SORT),
+        QueryShape('notices.list_featured', 'notices',
+                   NoticeHelper.public_query({'is_featured': True}), NoticeHelper.PUBLIC_SORT),
+        QueryShape('students.get_student_recipients', 'students',
+                   student_recipients_query('Computer Science', 5), limit=0),
+        QueryShape('students.list', 'students', StudentHelper.list_query(), StudentHelper.LIST_SORT),
+        QueryShape('users.get_staff_recipients', 'users', staff_recipients_query(), limit=0),
+        QueryShape('subjects.find_by_course', 'subjects',
+                   SubjectHelper.course_query(user_id), SubjectHelper.COURSE_SORT, limit=0),
+        QueryShape('certificates.find_by_student', 'certificates',
+                   CertificateHelper.student_query(user_id), CertificateHelper.STUDENT_SORT, limit=0),
+        QueryShape('certificates.find_by_batch', 'certificates',
+                   CertificateHelper.batch_query(user_id), CertificateHelper.BATCH_SORT, limit=0),
+        QueryShape('email_outbox.claim', 'email_outbox', EmailOutboxHelper.due_query(),
+                   EmailOutboxHelper.CLAIM_SORT, limit=100),
+        QueryShape('email_outbox.claim(job)', 'email_outbox', EmailOutboxHelper.due_query(user_id),
+                   EmailOutboxHelper.CLAIM_SORT, limit=100),
+        QueryShape('notifications.list_for_user', 'notifications',
+                   NotificationHelper.list_query(user_id, cursor=event_cursor), NotificationHelper.LIST_SORT,
+                   limit=21),
+        QueryShape('notifications.list_for_user(unread)', 'notifications',
+                   NotificationHelper.list_query(user_id, unread_only=True), NotificationHelper.LIST_SORT, limit=21),
+        QueryShape('email_digest_buffer.has_due', 'email_digest_buffer', DigestHelper.due_query(now), limit=1),
+        QueryShape('activity_events.list_events', 'activity_events',
+                   ActivityEventHelper.list_query(), ActivityEventHelper.LIST_SORT),
+        QueryShape('activity_events.list_events(cursor)', 'activity_events',
+                   ActivityEventHelper.list_query(cursor=event_cursor), ActivityEventHelper.LIST_SORT),
+        QueryShape('activity_events.list_events(type)', 'activity_events',
+                   ActivityEventHelper.list_query(cursor=event_cursor, event_type='notice'),
+                   ActivityEventHelper.LIST_SORT),
+        QueryShape('activity_events.list_events(actor)', 'activity_events',
+                   ActivityEventHelper.list_query(cursor=event_cursor, actor_id=user_id),
+                   ActivityEventHelper.LIST_SORT),
+        QueryShape('daily_rollups.hours_by_day', 'daily_rollups',
+                   DailyRollupHelper.days_query('students', now, now), limit=0),
+        *(
+            QueryShape(f'{collection}.hourly_counts', collection, query, limit=0)
+            for collection, query in (DailyRollupHelper.source_query(series, now, now)
+                                      for series in DailyRollupHelper.SERIES)
+        ),
+    ]
+
+
+def _plan_stages(plan):
+    """Yield every stage name in an explain() plan tree."""
+    if isinstance(plan, dict):
+        stage = plan.get('stage')
+        if stage:
+            yield stage
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _plan_stages(item)
+
+
+def audit_query_shapes(db, shapes=None):
+    """Explain each shape and report COLLSCAN or blocking SORT stages."""
+    results = []
+    for shape in shapes or query_shapes():
+        explain = shape.explain(db)
+        winning = explain.get('queryPlanner', {}).get('winningPlan', {})
+        stages = list(_plan_stages(winning))
+        problems = sorted({stage for stage in stages if stage in {'COLLSCAN', 'SORT'}})
+        results.append({'name': shape.name, 'stages': stages, 'problems': problems})
+    return results
+
+
+def _seed_audit_database(db):
+    """Insert a handful of representative documents so every collection exists."""
+    from bson import ObjectId
+
+    oid = ObjectId()
+    now = _now()
+    samples = {
+        'chat_messages': [{'chat_id': oid, 'group_id': None, 'seq': 1, 'created_at': now},
+                          {'chat_id': None, 'group_id': oid, 'seq': 1, 'created_at': now}],
+        'chat_read_state': [{'conversation_id': oid, 'user_id': oid, 'read_up_to': 1, 'delivered_up_to': 1,
+                             'updated_at': now}],
+        'chat_sessions': [{'participants': [oid, ObjectId()], 'updated_at': now}],
+        'group_chats': [{'member_ids': [oid], 'updated_at': now}],
+        'timeline_posts': [{'visibility': 'public', 'created_by': oid, 'created_at': now}],
+        'timeline_comments': [{'post_id': oid, 'created_at': now}],
+        'likes': [{'target_type': 'timeline_post', 'target_id': oid, 'user_id': oid, 'created_at': now}],
+        'discussions': [{'title': 'Seed', 'content': 'Seed', 'created_at': now, 'updated_at': now}],
+        'discussion_replies': [{'discussion_id': oid, 'parent_reply_id': None, 'created_at': now}],
+        'quizzes': [{'status': 'published', 'created_at': now}],
+        'quiz_attempts': [{'quiz_id': oid, 'student_id': oid, 'submitted_at': now, 'percentage': 50}],
+        'materials': [{'semester': 1, 'created_at': now}],
+        'notices': [{'status': 'published', 'is_featured': True, 'publish_start': now, 'created_at': now}],
+        'students': [{'roll_no': 'AUDIT1', 'email': 'audit@example.com', 'status': 'Active',
+                      'course': 'Computer Science', 'semester': 5, 'created_at': now}],
+        'users': [{'login_id': 'audit', 'email': 'audit@example.com', 'status': 'Active', 'created_at': now}],
+        'subjects': [{'course_id': oid, 'subject_code': 'AUD', 'semester': 1, 'subject_name': 'Audit'}],
+        'activity_events': [{'type': 'notice', 'action': 'created', 'actor_id': oid, 'created_at': now}],
+        'daily_rollups': [{'series': 'students', 'day': now, 'count': 0, 'hours': [0] * 24}],
+        'jobs': [{'task': 'chronicle.generate_report', 'status': 'queued', 'created_at': now}],
+        'email_outbox': [{'job_id': oid, 'to': 'audit@example.com', 'status': 'pending', 'next_attempt_at': now,
+                          'created_at': now}],
+        'notifications': [{'type': 'notice', 'recipient_id': oid, 'job_id': oid, 'read_at': None,
+                           'created_at': now}],
+        'email_digest_buffer': [{'recipient_id': oid, 'job_id': oid, 'frequency': 'daily', 'due_at': now,
+                                 'created_at': now}],
+        'certificates': [{'student_id': oid, 'certificate_type_id': oid, 'issue_date': now, 'created_at': now,
+                          'batch_id': oid}],
+    }
+    for collection_name, documents in samples.items():
+        db[collection_name].insert_many(documents)
+
+
+@index_cli.command('audit')
+@click.option('--seed', is_flag=True,
+              help='Run against a throw-away "<MONGO_DB_NAME>_index_audit" database seeded with sample data.')
+@click.pass_context
+def audit_command(ctx, seed):
+    """Explain the canonical query shapes; exit non-zero on COLLSCAN or in-memory SORT."""
+    from flask import current_app
+
+    from app.db import get_client, get_db
+
+    if seed:
+        client = get_client()
+        audit_name = f"{current_app.config['MONGO_DB_NAME']}_index_audit"
+        client.drop_database(audit_name)
+        db = client[audit_name]
+        sync_indexes(db, force=True)
+        _seed_audit_database(db)
+    else:
+        db = get_db()
+
+    failures = 0
+    try:
+        for result in audit_query_shapes(db):
+            status = 'FAIL' if result['problems'] else 'ok'
+            failures += bool(result['problems'])
+            click.echo(f"{status:4}  {result['name']:45} {' > '.join(result['stages'])}")
+    finally:
+        if seed:
+            client.drop_database(audit_name)
+
+    if failures:
+        click.echo(f'{failures} query shape(s) are not served by an index.')
+        ctx.exit(1)
@@ -0,0 +1,78 @@
+"""One-off data migrations, run with ``flask chronicle-migrate <name>``."""
+import click
+from flask.cli import AppGroup
+
+migrate_cli = AppGroup('chronicle-migrate', help='Run one-off data migrations.')
+
+
+@migrate_cli.command('likes')
+@click.option('--batch-size', default=500, show_default=True, help='Cursor batch size per collection.')
+def migrate_likes_command(batch_size):
+    """Move embedded liked_by arrays into the likes collection."""
+    from app.db import get_db
+    from app.models.like import LikeHelper
+
+    moved = LikeHelper.migrate_embedded(get_db(), batch_size=batch_size)
+    for collection_name, count in moved.items():
+        click.echo(f'{collection_name}: {count} document(s) migrated')
+
+
+@migrate_cli.command('like-counts')
+@click.option('--batch-size', default=500, show_default=True, help='Targets recounted per aggregation.')
+def migrate_like_counts_command(batch_size):
+    """Recompute likes_count on every likeable collection from the likes collection."""
+    from app.db import get_db
+    from app.models.like import LikeHelper
+
+    for collection_name, count in LikeHelper.recount(get_db(), batch_size=batch_size).items():
+        click.echo(f'{collection_name}: {count} document(s) corrected')
+
+
+@migrate_cli.command('activity')
+@click.option('--limit', default=500, show_default=True, help='Most recent documents to import per collection.')
+def migrate_activity_command(limit):
+    """Seed activity_events from existing content so the admin feed is not empty."""
+    from app.db import get_db
+    from app.models.activity import ActivityEventHelper
+
+    sources = [
+        ('notice', 'notices', 'title'),
+        ('discussion', 'discussions', 'title'),
+        ('timeline', 'timeline_posts', 'content'),
+        ('quiz', 'quizzes', 'title'),
+        ('material', 'materials', 'title'),
+    ]
+    inserted = ActivityEventHelper.backfill(get_db(), sources, limit=limit)
+    click.echo(f'{inserted} activity event(s) imported')
+
+
+@migrate_cli.command('reply-counts')
+@click.option('--batch-size', default=500, show_default=True, help='Discussions recounted per aggregation.')
+def migrate_reply_counts_command(batch_size):
+    """Recompute discussions.reply_count from discussion_replies."""
+    from app.db import get_db
+    from app.models.discussion import DiscussionHelper
+
+    fixed = DiscussionHelper.recount_replies(get_db(), batch_size=batch_size)
+    click.echo(f'{fixed} discussion(s) corrected')
+
+
+@migrate_cli.command('unread-counters')
+def migrate_unread_counters_command():
+    """Rebuild notification_counters from the unread notifications."""
+    from app.db import get_db
+    from app.models.notification import NotificationHelper
+
+    fixed = NotificationHelper.recount(get_db())
+    click.echo(f'{fixed} unread counter(s) corrected')
+
+
+@migrate_cli.command('read-watermarks')
+@click.option('--batch-size', default=500, show_default=True, help='Watermarks written per bulk write.')
+def migrate_read_watermarks_command(batch_size):
+    """Number existing chat messages and replace their read_by/delivered_to arrays with watermarks."""
+    from app.db import get_db
+    from app.models.chat import ChatReadStateHelper
+
+    numbered, written, cleaned = ChatReadStateHelper.migrate_embedded(get_db(), batch_size=batch_size)
+    click.echo(f'{numbered} message(s) numbered, {written} watermark(s) written, {cleaned} message(s) cleaned')
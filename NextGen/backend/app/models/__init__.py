@@ -6,8 +6,24 @@ from app.models.subject import SubjectHelper
 from app.models.notice import NoticeHelper
 from app.models.material import StudyMaterialHelper
 from app.models.quiz import QuizHelper, QuestionHelper, QuizAttemptHelper
+from app.models.like import LikeHelper
+from app.models.stats import StatsCounterHelper
+from app.models.rollups import DailyRollupHelper
+from app.models.activity import ActivityEventHelper
+from app.models.job import JobHelper
+from app.models.outbox import EmailOutboxHelper
+from app.models.notification import NotificationHelper
+from app.models.digest import DigestHelper
 from app.models.discussion import DiscussionHelper, DiscussionReplyHelper
-from app.models.chat import ChatSessionHelper, GroupChatHelper, ChatMessageHelper, save_chat_attachment
+from app.models.chat import (
+    ChatSessionHelper,
+    GroupChatHelper,
+    ChatMessageHelper,
+    ChatReadStateHelper,
+    contact_ids,
+    is_member,
+    save_chat_attachment,
+)
 from app.models.timeline import TimelinePostHelper, TimelineCommentHelper, build_media_metadata
 from app.models.certificate import CertificateHelper, CertificateTypeHelper
 
@@ -21,11 +37,22 @@ __all__ = [
     'QuizHelper',
     'QuestionHelper',
     'QuizAttemptHelper',
+    'LikeHelper',
+    'StatsCounterHelper',
+    'DailyRollupHelper',
+    'ActivityEventHelper',
+    'JobHelper',
+    'EmailOutboxHelper',
+    'NotificationHelper',
+    'DigestHelper',
     'DiscussionHelper',
     'DiscussionReplyHelper',
     'ChatSessionHelper',
     'GroupChatHelper',
     'ChatMessageHelper',
+    'ChatReadStateHelper',
+    'contact_ids',
+    'is_member',
     'save_chat_attachment',
     'TimelinePostHelper',
     'TimelineCommentHelper',
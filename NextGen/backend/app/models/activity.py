@@ -0,0 +1,201 @@
+"""Append-only activity log kept in the ``activity_events`` collection."""
+import atexit
+import logging
+import threading
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Socket.IO room every staff/admin connection joins for live activity.
+ADMIN_ROOM = 'admin:activity'
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _oid(value):
+    if not value:
+        return None
+    if isinstance(value, ObjectId):
+        return value
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        return None
+
+
+def _serialize_datetime(value):
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+    return None
+
+
+class ActivityEventHelper:
+    """Content events recorded by the model helpers and read newest-first.
+
+    ``record`` only appends to an in-process buffer; a daemon thread writes
+    the buffer with one ``insert_many`` per flush and pushes the new events
+    to ``ADMIN_ROOM``. Event ids are assigned at record time, so ``_id``
+    order is event order and every read is a single ``_id`` range scan.
+    Events expire after ``RETENTION_DAYS`` through a TTL index.
+    """
+
+    TYPES = ('notice', 'discussion', 'timeline', 'quiz', 'material')
+    RETENTION_DAYS = 90
+    BATCH_SIZE = 100
+    FLUSH_INTERVAL = 1.0
+    TITLE_LENGTH = 140
+    LIST_SORT = [('_id', -1)]
+
+    _buffer = []
+    _lock = threading.Lock()
+    _wakeup = threading.Event()
+    _flusher = None
+
+    @staticmethod
+    def _collection(db):
+        return db.activity_events
+
+    @classmethod
+    def build(cls, event_type, action, doc, title_field='title', actor_id=None):
+        title = (doc.get(title_field) or 'Untitled').strip() or 'Untitled'
+        return {
+            '_id': ObjectId(),
+            'type': event_type,
+            'action': action,
+            'target_id': doc.get('_id'),
+            'title': title[:cls.TITLE_LENGTH],
+            'actor_id': _oid(actor_id) or doc.get('updated_by') or doc.get('created_by'),
+            'author': doc.get('author_name'),
+            'created_at': _now(),
+        }
+
+    @classmethod
+    def record(cls, db, event_type, action, doc, title_field='title', actor_id=None):
+        """Queue an event for ``doc``; it is written by the next flush."""
+        if not doc:
+            return
+        event = cls.build(event_type, action, doc, title_field=title_field, actor_id=actor_id)
+        with cls._lock:
+            cls._buffer.append((db, event))
+            full = len(cls._buffer) >= cls.BATCH_SIZE
+            if cls._flusher is None or not cls._flusher.is_alive():
+                cls._flusher = threading.Thread(target=cls._run, name='chronicle-activity-flush', daemon=True)
+                cls._flusher.start()
+        if full:
+            cls._wakeup.set()
+
+    @classmethod
+    def _run(cls):
+        while True:
+            cls._wakeup.wait(cls.FLUSH_INTERVAL)
+            cls._wakeup.clear()
+            cls.flush()
+
+    @classmethod
+    def flush(cls):
+        """Write every buffered event; returns how many were inserted."""
+        with cls._lock:
+            pending, cls._buffer = cls._buffer, []
+        if not pending:
+            return 0
+
+        batches = {}
+        for db, event in pending:
+            batches.setdefault(db.name, (db, []))[1].append(event)
+        written = []
+        for db, events in batches.values():
+            try:
+                cls._collection(db).insert_many(events, ordered=False)
+                written.extend(events)
+            except PyMongoError as exc:
+                logger.warning('Dropped %d activity event(s): %s', len(events), exc)
+        if written:
+            cls._publish(written)
+        return len(written)
+
+    @classmethod
+    def _publish(cls, events):
+        try:
+            from app.extensions import socketio
+
+            socketio.emit('activity', [cls.to_dict(event) for event in events], to=ADMIN_ROOM)
+        except Exception:  # no Socket.IO server in CLI and worker processes
+            logger.debug('Activity push skipped', exc_info=True)
+
+    @staticmethod
+    def list_query(cursor=None, event_type=None, actor_id=None):
+        """Filter for ``list_events``; raises ValueError on a malformed cursor or actor id."""
+        query = {}
+        if cursor:
+            before = _oid(cursor)
+            if before is None:
+                raise ValueError('Invalid pagination cursor.')
+            query['_id'] = {'$lt': before}
+        if event_type:
+            query['type'] = event_type
+        if actor_id:
+            actor = _oid(actor_id)
+            if actor is None:
+                raise ValueError('Invalid actor id.')
+            query['actor_id'] = actor
+        return query
+
+    @classmethod
+    def list_events(cls, db, limit=25, cursor=None, event_type=None, actor_id=None):
+        """Return ``(events, next_cursor)`` newest first; ``cursor`` is the last event id seen."""
+        query = cls.list_query(cursor=cursor, event_type=event_type, actor_id=actor_id)
+        events = list(cls._collection(db).find(query).sort(cls.LIST_SORT).limit(limit + 1))
+        next_cursor = str(events[limit - 1]['_id']) if len(events) > limit else None
+        return events[:limit], next_cursor
+
+    @classmethod
+    def backfill(cls, db, sources, limit=500):
+        """Seed the log from existing documents; skips documents already logged."""
+        inserted = 0
+        for event_type, collection_name, title_field in sources:
+            cursor = db[collection_name].find(
+                {},
+                {title_field: 1, 'created_at': 1, 'updated_at': 1, 'author_name': 1,
+                 'created_by': 1, 'updated_by': 1},
+            ).sort('updated_at', -1).limit(limit)
+            docs = list(cursor)
+            logged = set(cls._collection(db).distinct('target_id', {'target_id': {'$in': [d['_id'] for d in docs]}}))
+            events = []
+            for doc in docs:
+                if doc['_id'] in logged:
+                    continue
+                event = cls.build(event_type, 'updated', doc, title_field=title_field)
+                timestamp = doc.get('updated_at') or doc.get('created_at')
+                if isinstance(timestamp, datetime):
+                    event['created_at'] = timestamp
+                    # Keep _id order equal to event time; the random tail keeps ids unique.
+                    event['_id'] = ObjectId(ObjectId.from_datetime(timestamp).binary[:4] + event['_id'].binary[4:])
+                events.append(event)
+            if events:
+                cls._collection(db).insert_many(events, ordered=False)
+                inserted += len(events)
+        return inserted
+
+    @staticmethod
+    def to_dict(event):
+        return {
+            'id': str(event['_id']),
+            'type': event.get('type'),
+            'action': event.get('action'),
+            'target_id': str(event['target_id']) if event.get('target_id') else None,
+            'title': event.get('title') or 'Untitled',
+            'author': event.get('author'),
+            'created_by': str(event['actor_id']) if event.get('actor_id') else None,
+            'timestamp': _serialize_datetime(event.get('created_at')),
+        }
+
+
+atexit.register(ActivityEventHelper.flush)
@@ -86,6 +86,9 @@ class CertificateTypeHelper:
 class CertificateHelper:
     """Helper methods for certificates collection."""
 
+    STUDENT_SORT = [('issue_date', -1), ('created_at', -1)]
+    BATCH_SORT = [('_id', 1)]
+
     @staticmethod
     def create_certificate(
         db,
@@ -112,6 +115,56 @@ class CertificateHelper:
         doc['_id'] = result.inserted_id
         return doc
 
+    @staticmethod
+    def existing_student_ids(db, certificate_type_id, student_ids):
+        """Return the students among ``student_ids`` who already hold this certificate type (one query)."""
+        if not student_ids:
+            return set()
+        return set(db.certificates.distinct('student_id', {
+            'certificate_type_id': certificate_type_id,
+            'student_id': {'$in': list(student_ids)},
+        }))
+
+    @staticmethod
+    def create_many(db, student_ids, certificate_type_id, issue_date, remarks=None, batch_id=None):
+        """Insert one certificate per student with a single ``insert_many``; returns the documents."""
+        now = datetime.utcnow()
+        docs = [
+            {
+                'student_id': student_id,
+                'certificate_type_id': certificate_type_id,
+                'issue_date': issue_date,
+                'certificate_file': None,
+                'remarks': remarks or '',
+                'status': 'Active',
+                'batch_id': batch_id,
+                'created_at': now,
+                'updated_at': now,
+            }
+            for student_id in student_ids
+        ]
+        if docs:
+            # insert_many fills in each document's _id.
+            db.certificates.insert_many(docs, ordered=False)
+        return docs
+
+    @staticmethod
+    def mark_notified(db, certificate_ids):
+        """Record that the holders of these certificates were emailed and notified."""
+        ids = list(certificate_ids)
+        if ids:
+            db.certificates.update_many({'_id': {'$in': ids}}, {'$set': {'notified_at': datetime.utcnow()}})
+
+    @staticmethod
+    def batch_query(batch_id):
+        return {'batch_id': batch_id}
+
+    @staticmethod
+    def find_by_batch(db, batch_id, projection=None):
+        """Certificates issued by one bulk job, in insertion order."""
+        cursor = db.certificates.find(CertificateHelper.batch_query(batch_id), projection)
+        return cursor.sort(CertificateHelper.BATCH_SORT)
+
     @staticmethod
     def find_by_id(db, certificate_id):
         """Find certificate by ID."""
@@ -124,15 +177,19 @@ class CertificateHelper:
         return db.certificates.find_one({'_id': oid})
 
     @staticmethod
-    def find_by_student(db, student_id, status=None):
-        """Return certificates for a student."""
+    def student_query(student_id, status=None):
         query = {
             'student_id': ObjectId(student_id) if not isinstance(student_id, ObjectId) else student_id
         }
         if status:
             query['status'] = status
-        cursor = db.certificates.find(query).sort([('issue_date', -1), ('created_at', -1)])
-        return list(cursor)
+        return query
+
+    @staticmethod
+    def find_by_student(db, student_id, status=None):
+        """Return certificates for a student."""
+        cursor = db.certificates.find(CertificateHelper.student_query(student_id, status))
+        return list(cursor.sort(CertificateHelper.STUDENT_SORT))
 
     @staticmethod
     def list_certificates(db, filters=None, sort=None):
@@ -4,7 +4,10 @@ from datetime import datetime, timezone
 
 from bson import ObjectId
 from bson.errors import InvalidId
+from pymongo import DESCENDING, ReturnDocument, UpdateOne
 
+from app.models.stats import StatsCounterHelper
+from app.utils.export import iter_batches
 from app.utils.file_handler import FileHandler
 
 
@@ -48,10 +51,16 @@ def _serialize_attachment(attachment):
 class ChatSessionHelper:
     """Helper methods for one-to-one chat sessions."""
 
+    LIST_SORT = [('updated_at', -1)]
+
     @staticmethod
     def _collection(db):
         return db.chat_sessions
 
+    @staticmethod
+    def for_user_query(oid):
+        return {'participants': oid}
+
     @classmethod
     def find_or_create(cls, db, user_a, user_b, participant_meta=None):
         participants = sorted({_oid(user_a), _oid(user_b)})
@@ -88,8 +97,8 @@ class ChatSessionHelper:
             return []
         return list(
             cls._collection(db)
-            .find({'participants': oid})
-            .sort('updated_at', -1)
+            .find(cls.for_user_query(oid))
+            .sort(cls.LIST_SORT)
             .limit(limit)
         )
 
@@ -114,7 +123,8 @@ class ChatSessionHelper:
     def delete(cls, db, chat_id):
         result = cls._collection(db).delete_one({'_id': _oid(chat_id)})
         if result.deleted_count:
-            db.chat_messages.delete_many({'chat_id': _oid(chat_id)})
+            removed = db.chat_messages.delete_many({'chat_id': _oid(chat_id)}).deleted_count
+            StatsCounterHelper.increment(db, 'chat_messages', -removed)
         return result.deleted_count > 0
 
     @staticmethod
@@ -135,10 +145,16 @@ class ChatSessionHelper:
 class GroupChatHelper:
     """Helper methods for group chat rooms."""
 
+    LIST_SORT = [('updated_at', -1)]
+
     @staticmethod
     def _collection(db):
         return db.group_chats
 
+    @staticmethod
+    def for_user_query(oid):
+        return {'member_ids': oid}
+
     @classmethod
     def create_group(cls, db, name, created_by, member_ids=None, description=None,
                      course_id=None, subject_id=None, semester=None, member_meta=None):
@@ -167,7 +183,7 @@ class GroupChatHelper:
         oid = _oid(user_id)
         if oid is None:
             return []
-        return list(cls._collection(db).find({'member_ids': oid}).sort('updated_at', -1))
+        return list(cls._collection(db).find(cls.for_user_query(oid)).sort(cls.LIST_SORT))
 
     @classmethod
     def find_by_id(cls, db, group_id):
@@ -223,7 +239,8 @@ class GroupChatHelper:
     def delete(cls, db, group_id):
         result = cls._collection(db).delete_one({'_id': _oid(group_id)})
         if result.deleted_count:
-            db.chat_messages.delete_many({'group_id': _oid(group_id)})
+            removed = db.chat_messages.delete_many({'group_id': _oid(group_id)}).deleted_count
+            StatsCounterHelper.increment(db, 'chat_messages', -removed)
         return result.deleted_count > 0
 
     @staticmethod
@@ -251,6 +268,8 @@ class GroupChatHelper:
 class ChatMessageHelper:
     """Helper methods for chat messages."""
 
+    LIST_SORT = [('created_at', -1)]
+
     @staticmethod
     def _collection(db):
         return db.chat_messages
@@ -265,6 +284,7 @@ class ChatMessageHelper:
         message = {
             'chat_id': _oid(chat_id),
             'group_id': _oid(group_id),
+            'seq': cls._next_seq(db, chat_id=chat_id, group_id=group_id),
             'sender_id': _oid(sender_id),
             'content': content,
             'attachments': attachments or [],
@@ -272,15 +292,31 @@ class ChatMessageHelper:
             'meta': meta or {},
             'created_at': now,
             'updated_at': now,
-            'read_by': [_oid(sender_id)],
-            'delivered_to': [],
         }
         result = cls._collection(db).insert_one(message)
         message['_id'] = result.inserted_id
+        StatsCounterHelper.increment(db, 'chat_messages')
         return message
 
-    @classmethod
-    def list_messages(cls, db, chat_id=None, group_id=None, before=None, limit=50, search=None):
+    @staticmethod
+    def _next_seq(db, chat_id=None, group_id=None):
+        """Allocate the conversation's next message ``seq`` with one atomic ``$inc``.
+
+        ObjectIds are minted per process, so ids from different workers in the
+        same second are not in insert order; ``seq`` is, apart from messages
+        whose allocation and insert interleave within milliseconds.
+        """
+        parent = db.chat_sessions if chat_id else db.group_chats
+        counter = parent.find_one_and_update(
+            {'_id': _oid(chat_id or group_id)},
+            {'$inc': {'message_seq': 1}},
+            projection={'message_seq': 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        return counter['message_seq'] if counter else None
+
+    @staticmethod
+    def messages_query(chat_id=None, group_id=None, before=None, search=None):
         query = {}
         if chat_id:
             query['chat_id'] = _oid(chat_id)
@@ -290,20 +326,56 @@ class ChatMessageHelper:
             query['created_at'] = {'$lt': before}
         if search:
             query['content'] = {'$regex': search, '$options': 'i'}
+        return query
+
+    @classmethod
+    def list_messages(cls, db, chat_id=None, group_id=None, before=None, limit=50, search=None):
+        query = cls.messages_query(chat_id=chat_id, group_id=group_id, before=before, search=search)
 
         return list(
             cls._collection(db)
             .find(query)
-            .sort('created_at', -1)
+            .sort(cls.LIST_SORT)
             .limit(limit)
         )[::-1]
 
     @classmethod
-    def mark_read(cls, db, message_ids, user_id):
-        cls._collection(db).update_many(
-            {'_id': {'$in': [_oid(mid) for mid in message_ids]}},
-            {'$addToSet': {'read_by': _oid(user_id)}}
-        )
+    def find_in(cls, db, message_id, chat_id=None, group_id=None):
+        """``{'_id', 'seq'}`` of ``message_id`` when it belongs to the given chat or group, else None."""
+        query = {'_id': _oid(message_id)}
+        if chat_id:
+            query['chat_id'] = _oid(chat_id)
+        elif group_id:
+            query['group_id'] = _oid(group_id)
+        else:
+            return None
+        if query['_id'] is None:
+            return None
+        return cls._collection(db).find_one(query, {'seq': 1})
+
+    @classmethod
+    def backfill_seq(cls, db, batch_size=500):
+        """Number messages written before ``seq`` existed; returns how many were numbered.
+
+        They get ``0, -1, -2, ...`` from the newest back, so they sort before
+        any message numbered since (which start at 1) whenever this runs.
+        """
+        collection = cls._collection(db)
+        numbered = 0
+        for field in ('chat_id', 'group_id'):
+            for conversation_id in collection.distinct(field, {'seq': {'$exists': False}, field: {'$ne': None}}):
+                cursor = collection.find(
+                    {field: conversation_id, 'seq': {'$exists': False}}, {'_id': 1},
+                ).sort([('created_at', DESCENDING), ('_id', DESCENDING)]).batch_size(batch_size)
+                position = 0
+                for batch in iter_batches(cursor, batch_size):
+                    collection.bulk_write([
+                        UpdateOne({'_id': doc['_id']}, {'$set': {'seq': position - offset}})
+                        for offset, doc in enumerate(batch)
+                    ], ordered=False)
+                    position -= len(batch)
+                    numbered += len(batch)
+        return numbered
 
     @staticmethod
     def to_dict(message):
@@ -313,6 +385,7 @@ class ChatMessageHelper:
             'id': str(message['_id']),
             'chat_id': str(message['chat_id']) if message.get('chat_id') else None,
             'group_id': str(message['group_id']) if message.get('group_id') else None,
+            'seq': message.get('seq'),
             'sender_id': str(message.get('sender_id')) if message.get('sender_id') else None,
             'content': message.get('content'),
             'attachments': [_serialize_attachment(a) for a in message.get('attachments', [])],
@@ -320,11 +393,170 @@ class ChatMessageHelper:
             'meta': message.get('meta', {}),
             'created_at': _serialize_dt(message.get('created_at')),
             'updated_at': _serialize_dt(message.get('updated_at')),
-            'read_by': [str(uid) for uid in message.get('read_by', [])],
-            'delivered_to': [str(uid) for uid in message.get('delivered_to', [])],
         }
 
 
+class ChatReadStateHelper:
+    """Per-user read and delivery watermarks for chats and groups.
+
+    One ``chat_read_state`` document per ``(conversation_id, user_id)``, where
+    the conversation is a chat session or group id, holds the ``seq`` of the
+    newest message the user has read (``read_up_to``) and received
+    (``delivered_up_to``). ``seq`` is allocated by the conversation in insert
+    order (see ``ChatMessageHelper._next_seq``), so a watermark covers every
+    earlier message and messages carry no per-reader state. Watermarks only
+    move forward (``$max``), so late or repeated receipts change nothing.
+    """
+
+    @staticmethod
+    def _collection(db):
+        return db.chat_read_state
+
+    @staticmethod
+    def members_query(conversation_oid, member_oids):
+        return {'conversation_id': conversation_oid, 'user_id': {'$in': member_oids}}
+
+    @staticmethod
+    def watermarks_query(user_oid, conversation_oids):
+        return {'conversation_id': {'$in': conversation_oids}, 'user_id': user_oid}
+
+    @staticmethod
+    def unread_query(user_oid, field, watermarks):
+        """Messages from others past each ``{conversation_oid: read_up_to}`` watermark (None: all)."""
+        return {
+            '$or': [
+                {field: oid, 'seq': {'$gt': seq}} if seq is not None else {field: oid}
+                for oid, seq in watermarks.items()
+            ],
+            'sender_id': {'$ne': user_oid},
+        }
+
+    @classmethod
+    def _advance(cls, db, user_id, conversation_id, seq, fields):
+        user_oid, conversation_oid = _oid(user_id), _oid(conversation_id)
+        if user_oid is None or conversation_oid is None or seq is None:
+            return False
+        before = cls._collection(db).find_one_and_update(
+            {'conversation_id': conversation_oid, 'user_id': user_oid},
+            {'$max': {field: seq for field in fields}, '$set': {'updated_at': _now()}},
+            projection={fields[0]: 1},
+            upsert=True,
+        )
+        previous = (before or {}).get(fields[0])
+        return previous is None or previous < seq
+
+    @classmethod
+    def mark_read(cls, db, user_id, conversation_id, seq):
+        """Read (and so received) everything up to message ``seq``; True when the read watermark moved."""
+        return cls._advance(db, user_id, conversation_id, seq, ('read_up_to', 'delivered_up_to'))
+
+    @classmethod
+    def mark_delivered(cls, db, user_id, conversation_id, seq):
+        return cls._advance(db, user_id, conversation_id, seq, ('delivered_up_to',))
+
+    @classmethod
+    def for_conversation(cls, db, conversation_id, member_ids):
+        """Watermarks of the conversation's current ``member_ids``; departed members are left out."""
+        return list(cls._collection(db).find(cls.members_query(
+            _oid(conversation_id), [oid for oid in (_oid(value) for value in member_ids) if oid],
+        )))
+
+    @classmethod
+    def unread_counts(cls, db, user_id, conversation_ids, field='chat_id'):
+        """``{conversation_id: unread}`` for chats (``field='chat_id'``) or groups (``'group_id'``).
+
+        One read of the user's watermarks, then one aggregation counting
+        other people's messages past each watermark on the ``(field, seq)``
+        index.
+        """
+        user_oid = _oid(user_id)
+        ids = [oid for oid in (_oid(value) for value in conversation_ids) if oid]
+        if user_oid is None or not ids:
+            return {}
+        watermarks = dict.fromkeys(ids)
+        query = cls.watermarks_query(user_oid, ids)
+        for doc in cls._collection(db).find(query, {'conversation_id': 1, 'read_up_to': 1}):
+            watermarks[doc['conversation_id']] = doc.get('read_up_to')
+        counts = dict.fromkeys(ids, 0)
+        for row in ChatMessageHelper._collection(db).aggregate([
+            {'$match': cls.unread_query(user_oid, field, watermarks)},
+            {'$group': {'_id': f'${field}', 'count': {'$sum': 1}}},
+        ]):
+            counts[row['_id']] = row['count']
+        return counts
+
+    @classmethod
+    def migrate_embedded(cls, db, batch_size=500):
+        """Number older messages, fold their ``read_by``/``delivered_to`` arrays into watermarks, drop them.
+
+        Returns ``(numbered, watermarks, cleaned)`` counts. Safe to re-run.
+        """
+        messages = ChatMessageHelper._collection(db)
+        numbered = ChatMessageHelper.backfill_seq(db, batch_size=batch_size)
+        written = 0
+        for field, targets in (('read_by', ('read_up_to', 'delivered_up_to')), ('delivered_to', ('delivered_up_to',))):
+            rows = messages.aggregate([
+                {'$match': {field: {'$exists': True, '$ne': []}}},
+                {'$unwind': f'${field}'},
+                {'$group': {
+                    '_id': {'user_id': f'${field}', 'conversation_id': {'$ifNull': ['$chat_id', '$group_id']}},
+                    'up_to': {'$max': '$seq'},
+                }},
+            ], allowDiskUse=True)
+            for batch in iter_batches(rows, batch_size):
+                cls._collection(db).bulk_write([
+                    UpdateOne(
+                        {'conversation_id': row['_id']['conversation_id'], 'user_id': row['_id']['user_id']},
+                        {'$max': {target: row['up_to'] for target in targets}, '$set': {'updated_at': _now()}},
+                        upsert=True,
+                    )
+                    for row in batch
+                ], ordered=False)
+                written += len(batch)
+        cleaned = messages.update_many(
+            {'$or': [{'read_by': {'$exists': True}}, {'delivered_to': {'$exists': True}}]},
+            {'$unset': {'read_by': '', 'delivered_to': ''}},
+        ).modified_count
+        return numbered, written, cleaned
+
+    @staticmethod
+    def to_dict(state):
+        return {
+            'user_id': str(state['user_id']),
+            'read_up_to': state.get('read_up_to'),
+            'delivered_up_to': state.get('delivered_up_to'),
+            'updated_at': _serialize_dt(state.get('updated_at')),
+        }
+
+
+def contact_ids(db, user_id):
+    """Ids of everyone sharing a direct chat or a group with ``user_id``, as strings."""
+    oid = _oid(user_id)
+    if not oid:
+        return set()
+    contacts = set()
+    for session in ChatSessionHelper._collection(db).find({'participants': oid}, {'participants': 1, '_id': 0}):
+        contacts.update(session.get('participants', []))
+    for group in GroupChatHelper._collection(db).find({'member_ids': oid}, {'member_ids': 1, '_id': 0}):
+        contacts.update(group.get('member_ids', []))
+    contacts.discard(oid)
+    return {str(contact) for contact in contacts if contact}
+
+
+def is_member(db, user_id, chat_id=None, group_id=None):
+    """True when ``user_id`` currently participates in the chat session or belongs to the group."""
+    user_oid = _oid(user_id)
+    if not user_oid:
+        return False
+    if chat_id:
+        query, collection = {'_id': _oid(chat_id), 'participants': user_oid}, ChatSessionHelper._collection(db)
+    elif group_id:
+        query, collection = {'_id': _oid(group_id), 'member_ids': user_oid}, GroupChatHelper._collection(db)
+    else:
+        return False
+    return query['_id'] is not None and collection.find_one(query, {'_id': 1}) is not None
+
+
 def save_chat_attachment(file_storage, upload_folder):
     """Persist chat attachment and return metadata."""
     file_storage.stream.seek(0)
@@ -0,0 +1,22 @@
+"""Per-parent child counts computed with one grouped aggregation."""
+
+
+def child_counts(db, collection_name, parent_field, parent_ids, query=None, accumulators=None):
+    """Return ``{parent_id: {'count': n, ...}}`` for every id in ``parent_ids``.
+
+    One ``$match``/``$group`` replaces a ``count_documents`` per parent.
+    ``accumulators`` adds extra ``$group`` fields (``{'avg': {'$avg': '$x'}}``);
+    parents without children get a zero count and ``None`` for the extras.
+    """
+    ids = list(dict.fromkeys(pid for pid in parent_ids if pid is not None))
+    if not ids:
+        return {}
+    accumulators = accumulators or {}
+    counts = {pid: {'count': 0, **dict.fromkeys(accumulators)} for pid in ids}
+    pipeline = [
+        {'$match': {**(query or {}), parent_field: {'$in': ids}}},
+        {'$group': {'_id': f'${parent_field}', 'count': {'$sum': 1}, **accumulators}},
+    ]
+    for doc in db[collection_name].aggregate(pipeline):
+        counts[doc.pop('_id')] = doc
+    return counts
@@ -2,6 +2,9 @@
 from datetime import datetime
 from bson import ObjectId
 
+from app.cache import invalidate_tags
+from app.models.stats import StatsCounterHelper
+
 
 class CourseHelper:
     """Helper class for Course operations."""
@@ -24,8 +27,25 @@ class CourseHelper:
 
         result = db.courses.insert_one(course_data)
         course_data['_id'] = result.inserted_id
+        StatsCounterHelper.increment(db, 'courses')
+        invalidate_tags('courses')
         return course_data
 
+    @staticmethod
+    def update_course(db, course_id, update_data):
+        """Apply a partial update to a course."""
+        update_data = {**update_data, 'updated_at': datetime.utcnow()}
+        db.courses.update_one({'_id': ObjectId(course_id)}, {'$set': update_data})
+        invalidate_tags('courses')
+
+    @staticmethod
+    def delete_course(db, course_id):
+        """Delete a course."""
+        result = db.courses.delete_one({'_id': ObjectId(course_id)})
+        StatsCounterHelper.increment(db, 'courses', -result.deleted_count)
+        invalidate_tags('courses')
+        return result.deleted_count > 0
+
     @staticmethod
     def find_by_id(db, course_id):
         """Find course by ID."""
@@ -0,0 +1,142 @@
+"""Email digest preferences and the ``email_digest_buffer`` they fill."""
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import BulkWriteError
+
+FREQUENCIES = ('immediate', 'daily', 'weekly')
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _oid(value):
+    if not value:
+        return None
+    if isinstance(value, ObjectId):
+        return value
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        return None
+
+
+def next_digest_at(frequency, hour, weekday, now=None):
+    """The first digest send time after ``now``: ``hour`` UTC daily, or on ``weekday`` (Monday=0) weekly."""
+    now = now or _now()
+    due = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if frequency == 'weekly':
+        due += timedelta(days=(weekday - now.weekday()) % 7)
+        if due <= now:
+            due += timedelta(days=7)
+    elif due <= now:
+        due += timedelta(days=1)
+    return due
+
+
+class DigestHelper:
+    """Per-user email frequency and the events held back for digest users.
+
+    ``notification_preferences`` stores ``{_id: user_id, email: frequency}``
+    only for users who left the ``immediate`` default, so a fan-out resolves
+    its whole audience with one ``$in`` read. Buffered events carry the
+    recipient's address and their ``due_at`` send time; the digest job
+    groups due events per address, queues one email each and deletes them.
+    """
+
+    DEFAULT_FREQUENCY = 'immediate'
+    MAX_ITEMS = 25  # listed per digest; the rest are summarised as a count
+
+    @staticmethod
+    def _collection(db):
+        return db.email_digest_buffer
+
+    @staticmethod
+    def _preferences(db):
+        return db.notification_preferences
+
+    @classmethod
+    def get_frequency(cls, db, user_id):
+        doc = cls._preferences(db).find_one({'_id': _oid(user_id)}, {'email': 1})
+        return doc.get('email', cls.DEFAULT_FREQUENCY) if doc else cls.DEFAULT_FREQUENCY
+
+    @classmethod
+    def set_frequency(cls, db, user_id, frequency):
+        if frequency not in FREQUENCIES:
+            raise ValueError(f"Email frequency must be one of: {', '.join(FREQUENCIES)}")
+        user_oid = _oid(user_id)
+        if frequency == cls.DEFAULT_FREQUENCY:
+            cls._preferences(db).delete_one({'_id': user_oid})
+        else:
+            cls._preferences(db).update_one(
+                {'_id': user_oid}, {'$set': {'email': frequency, 'updated_at': _now()}}, upsert=True,
+            )
+        return frequency
+
+    @classmethod
+    def frequencies(cls, db, user_ids):
+        """``{user_id: frequency}`` for the given users that chose a digest."""
+        ids = [oid for oid in (_oid(value) for value in user_ids) if oid]
+        if not ids:
+            return {}
+        return {doc['_id']: doc['email'] for doc in cls._preferences(db).find({'_id': {'$in': ids}})}
+
+    @classmethod
+    def add_many(cls, db, items, hour, weekday, job_id=None):
+        """Buffer ``{'recipient_id', 'email', 'name', 'frequency', 'kind', 'title', 'body'}`` items.
+
+        ``(job_id, recipient_id)`` is unique, so a redelivered fan-out buffers
+        nothing twice. Returns how many items were new.
+        """
+        now = _now()
+        due = {frequency: next_digest_at(frequency, hour, weekday, now) for frequency in FREQUENCIES[1:]}
+        docs = []
+        for item in items:
+            doc = {**item, 'due_at': due[item['frequency']], 'created_at': now}
+            if job_id is not None:
+                doc['job_id'] = job_id
+            docs.append(doc)
+        if not docs:
+            return 0
+        try:
+            return len(cls._collection(db).insert_many(docs, ordered=False).inserted_ids)
+        except BulkWriteError as exc:
+            if any(error.get('code') != 11000 for error in exc.details.get('writeErrors', [])):
+                raise
+            return exc.details.get('nInserted', 0)
+
+    @staticmethod
+    def due_query(cutoff=None):
+        return {'due_at': {'$lte': cutoff or _now()}}
+
+    @classmethod
+    def has_due(cls, db, cutoff=None):
+        return cls._collection(db).find_one(cls.due_query(cutoff), {'_id': 1}) is not None
+
+    @classmethod
+    def due_groups(cls, db, cutoff):
+        """Due items grouped per email address, oldest first, in one aggregation.
+
+        Grouping by address rather than recipient matters because the outbox is
+        unique per ``(job_id, to)``. Two accounts sharing an address (say a
+        student and a staff login) get one merged digest. Otherwise the second
+        digest would be dropped and its items deleted unsent.
+        """
+        return cls._collection(db).aggregate([
+            {'$match': {'due_at': {'$lte': cutoff}}},
+            {'$sort': {'email': 1, 'created_at': 1}},
+            {'$group': {
+                '_id': '$email',
+                'email': {'$last': '$email'},
+                'name': {'$last': '$name'},
+                'frequency': {'$last': '$frequency'},
+                'ids': {'$push': '$_id'},
+                'items': {'$push': {'kind': '$kind', 'title': '$title', 'body': '$body'}},
+            }},
+        ], allowDiskUse=True)
+
+    @classmethod
+    def remove(cls, db, ids):
+        return cls._collection(db).delete_many({'_id': {'$in': list(ids)}}).deleted_count
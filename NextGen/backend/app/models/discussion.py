@@ -4,13 +4,24 @@ from datetime import datetime, timezone
 
 from bson import ObjectId
 from bson.errors import InvalidId
+from pymongo import UpdateOne
 
+from app.models.activity import ActivityEventHelper
+from app.models.counts import child_counts
+from app.models.like import LikeHelper
+from app.models.stats import StatsCounterHelper
+from app.utils.export import iter_batches
 from app.utils.file_handler import FileHandler
 
+# Legacy documents may still embed liked_by; keep it out of reads.
+LIKE_PROJECTION = {'liked_by': 0}
+
 
 class DiscussionHelper:
     """Helper methods for discussion threads."""
 
+    LIST_SORT = [('updated_at', -1)]
+
     @staticmethod
     def _collection(db):
         return db.discussions
@@ -42,7 +53,6 @@ class DiscussionHelper:
             'semester': semester,
             'attachments': attachments or [],
             'likes_count': 0,
-            'liked_by': [],
             'reply_count': 0,
             'created_at': now,
             'updated_at': now,
@@ -52,6 +62,8 @@ class DiscussionHelper:
         }
         result = cls._collection(db).insert_one(discussion)
         discussion['_id'] = result.inserted_id
+        StatsCounterHelper.increment(db, 'discussions')
+        ActivityEventHelper.record(db, 'discussion', 'created', discussion)
         return discussion
 
     @classmethod
@@ -68,24 +80,30 @@ class DiscussionHelper:
 
         update_data['updated_at'] = cls._now()
         cls._collection(db).update_one({'_id': oid}, {'$set': update_data})
-        return cls.find_by_id(db, oid)
+        discussion = cls.find_by_id(db, oid)
+        ActivityEventHelper.record(db, 'discussion', 'updated', discussion)
+        return discussion
 
     @classmethod
     def find_by_id(cls, db, discussion_id):
         oid = cls._oid(discussion_id)
         if oid is None:
             return None
-        return cls._collection(db).find_one({'_id': oid})
+        return cls._collection(db).find_one({'_id': oid}, LIKE_PROJECTION)
 
-    @classmethod
-    def list_discussions(cls, db, filters=None, page=1, limit=20, search=None):
+    @staticmethod
+    def list_query(filters=None, search=None):
         query = filters.copy() if filters else {}
         if search:
             regex = {'$regex': search, '$options': 'i'}
             query['$or'] = [{'title': regex}, {'content': regex}]
+        return query
 
+    @classmethod
+    def list_discussions(cls, db, filters=None, page=1, limit=20, search=None):
+        query = cls.list_query(filters, search)
         skip = max(page - 1, 0) * limit
-        cursor = cls._collection(db).find(query).sort('updated_at', -1)
+        cursor = cls._collection(db).find(query, LIKE_PROJECTION).sort(cls.LIST_SORT)
         total = cls._collection(db).count_documents(query)
         items = list(cursor.skip(skip).limit(limit))
         return total, items
@@ -95,11 +113,31 @@ class DiscussionHelper:
         oid = cls._oid(discussion_id)
         if oid is None:
             return False
-        # also delete replies
+        # also delete replies and every like on the thread
+        reply_ids = db.discussion_replies.distinct('_id', {'discussion_id': oid})
+        LikeHelper.delete_for_targets(db, [oid, *reply_ids])
         db.discussion_replies.delete_many({'discussion_id': oid})
         result = cls._collection(db).delete_one({'_id': oid})
+        StatsCounterHelper.increment(db, 'discussions', -result.deleted_count)
         return result.deleted_count > 0
 
+    @classmethod
+    def recount_replies(cls, db, batch_size=500):
+        """Reset drifted ``reply_count`` values from the replies collection; returns how many changed."""
+        fixed = 0
+        cursor = cls._collection(db).find({}, {'reply_count': 1}).batch_size(batch_size)
+        for batch in iter_batches(cursor, batch_size):
+            counts = child_counts(db, 'discussion_replies', 'discussion_id', [doc['_id'] for doc in batch])
+            updates = [
+                UpdateOne({'_id': doc['_id']}, {'$set': {'reply_count': counts[doc['_id']]['count']}})
+                for doc in batch
+                if doc.get('reply_count', 0) != counts[doc['_id']]['count']
+            ]
+            if updates:
+                cls._collection(db).bulk_write(updates, ordered=False)
+                fixed += len(updates)
+        return fixed
+
     @classmethod
     def add_attachments(cls, db, discussion_id, attachments):
         oid = cls._oid(discussion_id)
@@ -130,27 +168,8 @@ class DiscussionHelper:
 
     @classmethod
     def toggle_like(cls, db, discussion_id, user_id):
-        oid = cls._oid(discussion_id)
-        uid = cls._oid(user_id)
-        if oid is None or uid is None:
-            return None
-        discussion = cls.find_by_id(db, oid)
-        if not discussion:
-            return None
-        liked_by = discussion.get('liked_by', [])
-        if uid in liked_by:
-            update = {
-                '$pull': {'liked_by': uid},
-                '$inc': {'likes_count': -1},
-            }
-        else:
-            update = {
-                '$addToSet': {'liked_by': uid},
-                '$inc': {'likes_count': 1},
-            }
-        update['$set'] = {'updated_at': cls._now()}
-        cls._collection(db).update_one({'_id': oid}, update)
-        return cls.find_by_id(db, oid)
+        """Toggle the user's like; return the updated discussion or None if missing."""
+        return LikeHelper.apply(db, LikeHelper.DISCUSSION, discussion_id, user_id, projection=LIKE_PROJECTION)
 
     @staticmethod
     def _serialize_datetime(value):
@@ -176,6 +195,7 @@ class DiscussionHelper:
 
     @classmethod
     def to_dict(cls, discussion, include_internal=False):
+        """Serialize a discussion; ``include_internal`` adds the viewer's like state."""
         if not discussion:
             return None
         data = {
@@ -195,13 +215,15 @@ class DiscussionHelper:
             'author_role': discussion.get('author_role'),
         }
         if include_internal:
-            data['liked_by'] = [str(uid) for uid in discussion.get('liked_by', [])]
+            data['is_liked'] = bool(discussion.get('is_liked'))
         return data
 
 
 class DiscussionReplyHelper:
     """Helper methods for discussion replies."""
 
+    LIST_SORT = [('created_at', 1)]
+
     @staticmethod
     def _collection(db):
         return db.discussion_replies
@@ -231,7 +253,6 @@ class DiscussionReplyHelper:
             'content': content,
             'attachments': attachments or [],
             'likes_count': 0,
-            'liked_by': [],
             'created_at': now,
             'updated_at': now,
             'created_by': cls._oid(author_id),
@@ -260,11 +281,17 @@ class DiscussionReplyHelper:
         oid = cls._oid(reply_id)
         if oid is None:
             return None
-        return cls._collection(db).find_one({'_id': oid})
+        return cls._collection(db).find_one({'_id': oid}, LIKE_PROJECTION)
+
+    @classmethod
+    def discussion_query(cls, discussion_id):
+        return {'discussion_id': cls._oid(discussion_id)}
 
     @classmethod
     def list_by_discussion(cls, db, discussion_id):
-        return list(cls._collection(db).find({'discussion_id': cls._oid(discussion_id)}).sort('created_at', 1))
+        return list(
+            cls._collection(db).find(cls.discussion_query(discussion_id), LIKE_PROJECTION).sort(cls.LIST_SORT)
+        )
 
     @classmethod
     def delete_reply(cls, db, reply_id):
@@ -274,38 +301,20 @@ class DiscussionReplyHelper:
         reply = cls._collection(db).find_one({'_id': oid})
         if not reply:
             return False
-        cls._collection(db).delete_many({'parent_reply_id': oid})
-        cls._collection(db).delete_one({'_id': oid})
+        child_ids = cls._collection(db).distinct('_id', {'parent_reply_id': oid})
+        LikeHelper.delete_for_targets(db, [oid, *child_ids])
+        removed = cls._collection(db).delete_many({'parent_reply_id': oid}).deleted_count
+        removed += cls._collection(db).delete_one({'_id': oid}).deleted_count
         db.discussions.update_one(
             {'_id': reply['discussion_id']},
-            {'$inc': {'reply_count': -1}, '$set': {'updated_at': cls._now()}}
+            {'$inc': {'reply_count': -removed}, '$set': {'updated_at': cls._now()}}
         )
         return True
 
     @classmethod
     def toggle_like(cls, db, reply_id, user_id):
-        oid = cls._oid(reply_id)
-        uid = cls._oid(user_id)
-        if oid is None or uid is None:
-            return None
-        reply = cls.find_by_id(db, oid)
-        if not reply:
-            return None
-
-        liked_by = reply.get('liked_by', [])
-        if uid in liked_by:
-            update = {
-                '$pull': {'liked_by': uid},
-                '$inc': {'likes_count': -1},
-            }
-        else:
-            update = {
-                '$addToSet': {'liked_by': uid},
-                '$inc': {'likes_count': 1},
-            }
-        update['$set'] = {'updated_at': cls._now()}
-        cls._collection(db).update_one({'_id': oid}, update)
-        return cls.find_by_id(db, oid)
+        """Toggle the user's like; return the updated reply or None if missing."""
+        return LikeHelper.apply(db, LikeHelper.DISCUSSION_REPLY, reply_id, user_id, projection=LIKE_PROJECTION)
 
     @classmethod
     def add_attachments(cls, db, reply_id, attachments):
@@ -0,0 +1,126 @@
+"""Background job records kept in the ``jobs`` collection."""
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+
+STATUSES = ('queued', 'running', 'succeeded', 'failed')
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _oid(value):
+    if not value:
+        return None
+    if isinstance(value, ObjectId):
+        return value
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        return None
+
+
+def _serialize_datetime(value):
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+    return None
+
+
+class JobHelper:
+    """Status, progress and result of one queued task.
+
+    A job is created before its task is dispatched and the worker only ever
+    moves it forward: ``queued`` -> ``running`` -> ``succeeded``/``failed``.
+    Records expire ``RETENTION_DAYS`` after creation through a TTL index.
+    """
+
+    RETENTION_DAYS = 7
+
+    @staticmethod
+    def _collection(db):
+        return db.jobs
+
+    @classmethod
+    def create(cls, db, task, params=None, created_by=None):
+        now = _now()
+        doc = {
+            'task': task,
+            'params': params or {},
+            'status': 'queued',
+            'progress': 0,
+            'message': None,
+            'result': None,
+            'error': None,
+            'attempts': 0,
+            'created_by': _oid(created_by),
+            'created_at': now,
+            'updated_at': now,
+            'started_at': None,
+            'finished_at': None,
+        }
+        doc['_id'] = cls._collection(db).insert_one(doc).inserted_id
+        return doc
+
+    @classmethod
+    def find_by_id(cls, db, job_id):
+        oid = _oid(job_id)
+        if oid is None:
+            return None
+        return cls._collection(db).find_one({'_id': oid})
+
+    @classmethod
+    def start(cls, db, job_id):
+        """Mark a job running; returns None if it already finished (duplicate delivery)."""
+        now = _now()
+        return cls._collection(db).find_one_and_update(
+            {'_id': _oid(job_id), 'status': {'$in': ['queued', 'running']}},
+            {'$set': {'status': 'running', 'started_at': now, 'updated_at': now, 'error': None},
+             '$inc': {'attempts': 1}},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    @classmethod
+    def set_progress(cls, db, job_id, progress, message=None):
+        update = {'progress': max(0, min(100, int(progress))), 'updated_at': _now()}
+        if message is not None:
+            update['message'] = message
+        cls._collection(db).update_one({'_id': _oid(job_id), 'status': 'running'}, {'$set': update})
+
+    @classmethod
+    def succeed(cls, db, job_id, result=None, message=None):
+        now = _now()
+        update = {'status': 'succeeded', 'progress': 100, 'result': result, 'updated_at': now, 'finished_at': now}
+        if message is not None:
+            update['message'] = message
+        cls._collection(db).update_one({'_id': _oid(job_id)}, {'$set': update})
+
+    @classmethod
+    def fail(cls, db, job_id, error):
+        now = _now()
+        cls._collection(db).update_one(
+            {'_id': _oid(job_id)},
+            {'$set': {'status': 'failed', 'error': str(error), 'updated_at': now, 'finished_at': now}},
+        )
+
+    @staticmethod
+    def to_dict(job):
+        return {
+            'id': str(job['_id']),
+            'task': job.get('task'),
+            'status': job.get('status'),
+            'progress': job.get('progress', 0),
+            'message': job.get('message'),
+            'result': job.get('result'),
+            'error': job.get('error'),
+            'attempts': job.get('attempts', 0),
+            'created_by': str(job['created_by']) if job.get('created_by') else None,
+            'created_at': _serialize_datetime(job.get('created_at')),
+            'updated_at': _serialize_datetime(job.get('updated_at')),
+            'started_at': _serialize_datetime(job.get('started_at')),
+            'finished_at': _serialize_datetime(job.get('finished_at')),
+        }
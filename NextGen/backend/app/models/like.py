@@ -0,0 +1,206 @@
+"""Like storage shared by posts, comments, discussions and replies."""
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from app.models.counts import child_counts
+from app.utils.export import iter_batches
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _oid(value):
+    if not value:
+        return None
+    if isinstance(value, ObjectId):
+        return value
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        return None
+
+
+class LikeHelper:
+    """One document per (target, user) pair; targets keep only a ``likes_count``."""
+
+    TIMELINE_POST = 'timeline_post'
+    TIMELINE_COMMENT = 'timeline_comment'
+    DISCUSSION = 'discussion'
+    DISCUSSION_REPLY = 'discussion_reply'
+
+    # Collections that embedded ``liked_by`` before likes moved out.
+    TARGET_COLLECTIONS = {
+        TIMELINE_POST: 'timeline_posts',
+        TIMELINE_COMMENT: 'timeline_comments',
+        DISCUSSION: 'discussions',
+        DISCUSSION_REPLY: 'discussion_replies',
+    }
+
+    @staticmethod
+    def _collection(db):
+        return db.likes
+
+    @classmethod
+    def add(cls, db, target_type, target_id, user_id):
+        """Record a like; return True only if it did not already exist."""
+        tid = _oid(target_id)
+        uid = _oid(user_id)
+        if tid is None or uid is None:
+            return False
+        try:
+            cls._collection(db).insert_one({
+                'target_type': target_type,
+                'target_id': tid,
+                'user_id': uid,
+                'created_at': _now(),
+            })
+        except DuplicateKeyError:
+            return False
+        return True
+
+    @classmethod
+    def remove(cls, db, target_id, user_id):
+        """Remove a like; return True only if one was deleted."""
+        tid = _oid(target_id)
+        uid = _oid(user_id)
+        if tid is None or uid is None:
+            return False
+        return cls._collection(db).delete_one({'target_id': tid, 'user_id': uid}).deleted_count > 0
+
+    @classmethod
+    def has_liked(cls, db, target_id, user_id):
+        tid = _oid(target_id)
+        uid = _oid(user_id)
+        if tid is None or uid is None:
+            return False
+        return cls._collection(db).find_one({'target_id': tid, 'user_id': uid}, {'_id': 1}) is not None
+
+    @staticmethod
+    def liked_query(target_oids, user_oid):
+        return {'target_id': {'$in': target_oids}, 'user_id': user_oid}
+
+    @classmethod
+    def liked_ids(cls, db, target_ids, user_id):
+        """Return the subset of ``target_ids`` the user has liked, in one query."""
+        uid = _oid(user_id)
+        tids = [tid for tid in (_oid(value) for value in target_ids) if tid is not None]
+        if uid is None or not tids:
+            return set()
+        cursor = cls._collection(db).find(cls.liked_query(tids, uid), {'target_id': 1, '_id': 0})
+        return {doc['target_id'] for doc in cursor}
+
+    @classmethod
+    def annotate(cls, db, targets, user_id):
+        """Set ``is_liked`` on each target document with one batched lookup."""
+        liked = cls.liked_ids(db, [target['_id'] for target in targets], user_id)
+        for target in targets:
+            target['is_liked'] = target['_id'] in liked
+        return targets
+
+    @classmethod
+    def apply(cls, db, target_type, target_id, user_id, like=None, projection=None):
+        """Like, unlike or (``like=None``) toggle, and return the target's post-image.
+
+        This takes two writes, not one conditional update on the target. Who
+        liked what lives in ``likes`` (not in an array on the target), so the
+        insert/delete on the unique ``(target_id, user_id)`` key decides
+        whether the state changed. Then ``likes_count`` moves by exactly that
+        delta in the ``find_one_and_update`` that reads the target back.
+        Concurrent togglers therefore cannot drift the counter. A toggle costs
+        three round trips when it turns into a like. A crash between the two
+        writes leaves the counter one off until ``recount`` (``flask
+        chronicle-migrate like-counts``) repairs it.
+
+        The returned document carries ``is_liked`` for the acting user;
+        ``None`` means the target does not exist.
+        """
+        tid = _oid(target_id)
+        uid = _oid(user_id)
+        if tid is None or uid is None:
+            return None
+
+        if like is None:
+            if cls.remove(db, tid, uid):
+                liked, delta = False, -1
+            else:
+                liked = True
+                delta = 1 if cls.add(db, target_type, tid, uid) else 0
+        elif like:
+            liked = True
+            delta = 1 if cls.add(db, target_type, tid, uid) else 0
+        else:
+            liked = False
+            delta = -1 if cls.remove(db, tid, uid) else 0
+
+        update = {'$set': {'updated_at': _now()}}
+        if delta:
+            update['$inc'] = {'likes_count': delta}
+        target = db[cls.TARGET_COLLECTIONS[target_type]].find_one_and_update(
+            {'_id': tid},
+            update,
+            projection=projection,
+            return_document=ReturnDocument.AFTER,
+        )
+        if target is None:
+            if delta > 0:
+                cls.remove(db, tid, uid)
+            return None
+        target['is_liked'] = liked
+        return target
+
+    @classmethod
+    def recount(cls, db, batch_size=500):
+        """Reset drifted ``likes_count`` values from the likes collection; returns changes per collection."""
+        fixed = {}
+        for collection_name in cls.TARGET_COLLECTIONS.values():
+            collection = db[collection_name]
+            changed = 0
+            cursor = collection.find({}, {'likes_count': 1}).batch_size(batch_size)
+            for batch in iter_batches(cursor, batch_size):
+                counts = child_counts(db, 'likes', 'target_id', [doc['_id'] for doc in batch])
+                updates = [
+                    UpdateOne({'_id': doc['_id']}, {'$set': {'likes_count': counts[doc['_id']]['count']}})
+                    for doc in batch
+                    if doc.get('likes_count', 0) != counts[doc['_id']]['count']
+                ]
+                if updates:
+                    collection.bulk_write(updates, ordered=False)
+                    changed += len(updates)
+            fixed[collection_name] = changed
+        return fixed
+
+    @classmethod
+    def delete_for_targets(cls, db, target_ids):
+        tids = [tid for tid in (_oid(value) for value in target_ids) if tid is not None]
+        if tids:
+            cls._collection(db).delete_many({'target_id': {'$in': tids}})
+
+    @classmethod
+    def migrate_embedded(cls, db, batch_size=500):
+        """Move embedded ``liked_by`` arrays into the likes collection.
+
+        Counters are reset to the number of distinct likers so drifted
+        ``likes_count`` values are corrected along the way. Safe to re-run.
+        """
+        moved = {}
+        for target_type, collection_name in cls.TARGET_COLLECTIONS.items():
+            collection = db[collection_name]
+            count = 0
+            cursor = collection.find({'liked_by': {'$exists': True}}, {'liked_by': 1})
+            for doc in cursor.batch_size(batch_size):
+                likers = {uid for uid in (_oid(value) for value in doc.get('liked_by') or []) if uid is not None}
+                for uid in likers:
+                    cls.add(db, target_type, doc['_id'], uid)
+                total = cls._collection(db).count_documents({'target_id': doc['_id']})
+                collection.update_one(
+                    {'_id': doc['_id']},
+                    {'$unset': {'liked_by': ''}, '$set': {'likes_count': total}},
+                )
+                count += 1
+            moved[collection_name] = count
+        return moved
@@ -4,6 +4,9 @@ from datetime import datetime, timezone
 from bson import ObjectId
 from bson.errors import InvalidId
 
+from app.cache import invalidate_tags
+from app.models.activity import ActivityEventHelper
+from app.models.stats import StatsCounterHelper
 from app.utils.file_handler import FileHandler
 
 
@@ -11,6 +14,7 @@ class StudyMaterialHelper:
     """Helper methods for StudyMaterial collection."""
 
     COLLECTION = 'materials'
+    LIST_SORT = [('created_at', -1)]
 
     @staticmethod
     def _collection(db):
@@ -52,6 +56,9 @@ class StudyMaterialHelper:
 
         result = cls._collection(db).insert_one(material)
         material['_id'] = result.inserted_id
+        StatsCounterHelper.increment(db, 'materials')
+        invalidate_tags('materials')
+        ActivityEventHelper.record(db, 'material', 'created', material)
         return material
 
     @classmethod
@@ -62,15 +69,18 @@ class StudyMaterialHelper:
             return None
         return cls._collection(db).find_one({'_id': oid})
 
-    @classmethod
-    def list_materials(cls, db, filters=None, page=1, limit=20, sort=None, search=None):
-        """Retrieve paginated list of materials."""
+    @staticmethod
+    def list_query(filters=None, search=None):
         query = filters.copy() if filters else {}
-
         if search:
             regex = {'$regex': search, '$options': 'i'}
             query['$or'] = [{'title': regex}, {'description': regex}]
+        return query
 
+    @classmethod
+    def list_materials(cls, db, filters=None, page=1, limit=20, sort=None, search=None):
+        """Retrieve paginated list of materials."""
+        query = cls.list_query(filters, search)
         collection = cls._collection(db)
 
         skip = max(page - 1, 0) * limit
@@ -99,8 +109,11 @@ class StudyMaterialHelper:
         result = cls._collection(db).update_one({'_id': oid}, {'$set': update_payload})
         if result.matched_count == 0:
             return None
+        invalidate_tags('materials')
 
-        return cls.find_by_id(db, oid)
+        material = cls.find_by_id(db, oid)
+        ActivityEventHelper.record(db, 'material', 'updated', material, actor_id=updated_by)
+        return material
 
     @classmethod
     def delete_material(cls, db, material_id):
@@ -109,6 +122,8 @@ class StudyMaterialHelper:
         if oid is None:
             return False
         result = cls._collection(db).delete_one({'_id': oid})
+        StatsCounterHelper.increment(db, 'materials', -result.deleted_count)
+        invalidate_tags('materials')
         return result.deleted_count > 0
 
     @classmethod
@@ -131,6 +146,7 @@ class StudyMaterialHelper:
                 '$set': {'updated_at': now}
             }
         )
+        invalidate_tags('materials')
 
         return cls.find_by_id(db, oid)
 
@@ -148,6 +164,7 @@ class StudyMaterialHelper:
                 '$set': {'updated_at': cls._now()}
             }
         )
+        invalidate_tags('materials')
 
         return cls.find_by_id(db, oid)
 
@@ -165,6 +182,8 @@ class StudyMaterialHelper:
             update['$inc']['attachments.$[item].download_count'] = 1
             array_filters = [{'item.id': attachment_id}]
 
+        # No cache invalidation: downloads are the hottest path, and cached
+        # lists may show a download_count that is stale for up to the TTL.
         cls._collection(db).update_one(
             {'_id': oid},
             update,
@@ -3,6 +3,9 @@ from datetime import datetime, timezone
 from bson import ObjectId
 from bson.errors import InvalidId
 
+from app.cache import invalidate_tags
+from app.models.activity import ActivityEventHelper
+from app.models.stats import StatsCounterHelper
 from app.utils.file_handler import FileHandler
 
 
@@ -11,6 +14,7 @@ class NoticeHelper:
 
     ALLOWED_TYPES = {'news', 'events', 'meetings'}
     ALLOWED_STATUS = {'draft', 'published'}
+    PUBLIC_SORT = [('publish_start', -1), ('created_at', -1)]
 
     @staticmethod
     def _collection(db):
@@ -58,6 +62,9 @@ class NoticeHelper:
 
         result = cls._collection(db).insert_one(notice_data)
         notice_data['_id'] = result.inserted_id
+        StatsCounterHelper.increment(db, 'notices')
+        invalidate_tags('notices')
+        ActivityEventHelper.record(db, 'notice', 'created', notice_data)
         return notice_data
 
     @classmethod
@@ -68,6 +75,20 @@ class NoticeHelper:
             return None
         return cls._collection(db).find_one({'_id': oid})
 
+    @classmethod
+    def public_query(cls, filters=None):
+        """``filters`` narrowed to published notices inside their publish window."""
+        now = cls._now()
+        query = dict(filters or {})
+        query.setdefault('status', 'published')
+        query.setdefault('publish_start', {'$lte': now})
+        query.setdefault('$or', [
+            {'publish_end': {'$exists': False}},
+            {'publish_end': None},
+            {'publish_end': {'$gte': now}},
+        ])
+        return query
+
     @classmethod
     def list_notices(cls, db, filters=None, limit=None, sort=None):
         """Retrieve notices matching filters."""
@@ -101,8 +122,11 @@ class NoticeHelper:
 
         if result.matched_count == 0:
             return None
+        invalidate_tags('notices')
 
-        return cls.find_by_id(db, oid)
+        notice = cls.find_by_id(db, oid)
+        ActivityEventHelper.record(db, 'notice', 'updated', notice, actor_id=updated_by)
+        return notice
 
     @classmethod
     def delete_notice(cls, db, notice_id):
@@ -112,6 +136,8 @@ class NoticeHelper:
             return False
 
         result = cls._collection(db).delete_one({'_id': oid})
+        StatsCounterHelper.increment(db, 'notices', -result.deleted_count)
+        invalidate_tags('notices')
         return result.deleted_count > 0
 
     @classmethod
@@ -133,6 +159,7 @@ class NoticeHelper:
                 '$set': {'updated_at': cls._now()}
             }
         )
+        invalidate_tags('notices')
 
         return cls.find_by_id(db, oid)
 
@@ -150,6 +177,7 @@ class NoticeHelper:
                 '$set': {'updated_at': cls._now()}
             }
         )
+        invalidate_tags('notices')
 
         return cls.find_by_id(db, oid)
 
@@ -0,0 +1,195 @@
+"""In-app notifications kept in ``notifications`` with per-user unread counters."""
+import logging
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+
+def user_room(user_id):
+    """Socket.IO room every connection of ``user_id`` joins."""
+    return f'user:{user_id}'
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _oid(value):
+    if not value:
+        return None
+    if isinstance(value, ObjectId):
+        return value
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        return None
+
+
+def _serialize_datetime(value):
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+    return None
+
+
+class NotificationHelper:
+    """One notification document per recipient, written in bulk at publication time.
+
+    ``notification_counters`` keeps each user's unread count, moved by the
+    number of documents actually inserted or marked read, so the badge is a
+    single ``_id`` lookup. Listing is a keyset scan on ``(recipient_id, _id)``.
+    A fan-out job tags its documents with ``job_id`` (unique per recipient),
+    so a redelivered job inserts and counts nothing twice. Read notifications
+    expire ``READ_RETENTION_DAYS`` after being read; unread ones are kept.
+    """
+
+    TYPES = ('notice', 'quiz', 'material', 'certificate')
+    INSERT_BATCH = 1000
+    READ_RETENTION_DAYS = 30
+    LIST_SORT = [('_id', -1)]
+
+    @staticmethod
+    def _collection(db):
+        return db.notifications
+
+    @staticmethod
+    def _counters(db):
+        return db.notification_counters
+
+    @staticmethod
+    def build(kind, title, body=None, link=None, target_id=None):
+        """The shared part of a fan-out; ``create_many`` adds the recipient fields."""
+        return {'type': kind, 'title': title, 'body': body, 'link': link, 'target_id': target_id}
+
+    @classmethod
+    def create_many(cls, db, recipient_ids, notification, job_id=None):
+        """Insert ``notification`` for every recipient and bump their counters; returns how many were new."""
+        recipient_ids = list(dict.fromkeys(oid for oid in (_oid(value) for value in recipient_ids) if oid))
+        created = 0
+        for start in range(0, len(recipient_ids), cls.INSERT_BATCH):
+            now = _now()
+            docs = []
+            for recipient_id in recipient_ids[start:start + cls.INSERT_BATCH]:
+                doc = {**notification, '_id': ObjectId(), 'recipient_id': recipient_id,
+                       'read_at': None, 'created_at': now}
+                if job_id is not None:
+                    doc['job_id'] = job_id
+                docs.append(doc)
+            try:
+                cls._collection(db).insert_many(docs, ordered=False)
+                inserted = docs
+            except BulkWriteError as exc:
+                errors = exc.details.get('writeErrors', [])
+                if any(error.get('code') != 11000 for error in errors):
+                    raise
+                failed = {error['index'] for error in errors}
+                inserted = [doc for index, doc in enumerate(docs) if index not in failed]
+            cls._bump(db, Counter(doc['recipient_id'] for doc in inserted))
+            cls._publish(inserted)
+            created += len(inserted)
+        return created
+
+    @classmethod
+    def _bump(cls, db, deltas):
+        operations = [
+            UpdateOne({'_id': recipient_id}, {'$inc': {'unread': delta}}, upsert=True)
+            for recipient_id, delta in deltas.items() if delta
+        ]
+        if operations:
+            cls._counters(db).bulk_write(operations, ordered=False)
+
+    @classmethod
+    def _publish(cls, docs):
+        try:
+            from app.extensions import socketio
+
+            for doc in docs:
+                socketio.emit('notification', cls.to_dict(doc), to=user_room(doc['recipient_id']))
+        except Exception:  # no Socket.IO server in CLI and worker processes
+            logger.debug('Notification push skipped', exc_info=True)
+
+    @classmethod
+    def unread_count(cls, db, user_id):
+        counter = cls._counters(db).find_one({'_id': _oid(user_id)})
+        return max(counter.get('unread', 0), 0) if counter else 0
+
+    @staticmethod
+    def list_query(user_id, cursor=None, unread_only=False):
+        """Filter for ``list_for_user``; raises ValueError on a malformed cursor."""
+        query = {'recipient_id': _oid(user_id)}
+        if unread_only:
+            query['read_at'] = None
+        if cursor:
+            before = _oid(cursor)
+            if before is None:
+                raise ValueError('Invalid pagination cursor.')
+            query['_id'] = {'$lt': before}
+        return query
+
+    @classmethod
+    def list_for_user(cls, db, user_id, limit=20, cursor=None, unread_only=False):
+        """Return ``(notifications, next_cursor)`` newest first; ``cursor`` is the last id seen."""
+        query = cls.list_query(user_id, cursor=cursor, unread_only=unread_only)
+        docs = list(cls._collection(db).find(query).sort(cls.LIST_SORT).limit(limit + 1))
+        next_cursor = str(docs[limit - 1]['_id']) if len(docs) > limit else None
+        return docs[:limit], next_cursor
+
+    @classmethod
+    def mark_read(cls, db, user_id, notification_ids=None):
+        """Mark the given (or all) unread notifications read; returns how many changed."""
+        recipient_id = _oid(user_id)
+        query = {'recipient_id': recipient_id, 'read_at': None}
+        if notification_ids is not None:
+            query['_id'] = {'$in': [oid for oid in (_oid(value) for value in notification_ids) if oid]}
+        now = _now()
+        modified = cls._collection(db).update_many(
+            query,
+            {'$set': {'read_at': now, 'expires_at': now + timedelta(days=cls.READ_RETENTION_DAYS)}},
+        ).modified_count
+        if modified:
+            cls._bump(db, {recipient_id: -modified})
+        return modified
+
+    @classmethod
+    def recount(cls, db):
+        """Rebuild every unread counter from the notifications; returns how many counters changed."""
+        counts = {
+            row['_id']: row['count']
+            for row in cls._collection(db).aggregate([
+                {'$match': {'read_at': None}},
+                {'$group': {'_id': '$recipient_id', 'count': {'$sum': 1}}},
+            ])
+        }
+        operations = [
+            UpdateOne({'_id': counter['_id']}, {'$set': {'unread': counts.pop(counter['_id'], 0)}})
+            for counter in cls._counters(db).find({}, {'_id': 1})
+        ]
+        operations += [
+            UpdateOne({'_id': recipient_id}, {'$set': {'unread': count}}, upsert=True)
+            for recipient_id, count in counts.items()
+        ]
+        if not operations:
+            return 0
+        result = cls._counters(db).bulk_write(operations, ordered=False)
+        return result.modified_count + result.upserted_count
+
+    @staticmethod
+    def to_dict(doc):
+        return {
+            'id': str(doc['_id']),
+            'type': doc.get('type'),
+            'title': doc.get('title'),
+            'body': doc.get('body'),
+            'link': doc.get('link'),
+            'target_id': str(doc['target_id']) if doc.get('target_id') else None,
+            'read': doc.get('read_at') is not None,
+            'read_at': _serialize_datetime(doc.get('read_at')),
+            'created_at': _serialize_datetime(doc.get('created_at')),
+        }
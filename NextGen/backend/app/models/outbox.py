@@ -0,0 +1,173 @@
+"""Outgoing email queue kept in the ``email_outbox`` collection."""
+import random
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+STATUSES = ('pending', 'sending', 'sent', 'failed')
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+class EmailOutboxHelper:
+    """Pre-rendered messages waiting for the delivery worker.
+
+    Messages are written once per fan-out job (``(job_id, to)`` is unique, so
+    a redelivered job does not queue duplicates) and move ``pending`` ->
+    ``sending`` -> ``sent``. A failed send goes back to ``pending`` with an
+    exponential backoff until ``MAX_ATTEMPTS``, then stays ``failed``.
+    Finished messages expire ``RETENTION_DAYS`` later through a TTL index.
+    """
+
+    MAX_ATTEMPTS = 5
+    RETRY_BASE_SECONDS = 2
+    RETRY_MAX_SECONDS = 60
+    CLAIM_TIMEOUT = timedelta(minutes=10)
+    SWEEP_GRACE = timedelta(minutes=1)  # due this long without a claim: left for the sweep
+    RETENTION_DAYS = 7
+    CLAIM_SORT = [('next_attempt_at', 1)]
+
+    @staticmethod
+    def _collection(db):
+        return db.email_outbox
+
+    @classmethod
+    def add_many(cls, db, job_id, messages, source=None):
+        """Queue ``{'to', 'subject', 'html', 'text'}`` messages for ``job_id``; returns how many were new."""
+        now = _now()
+        docs = [
+            {
+                'job_id': job_id,
+                'source': source,
+                'to': message['to'],
+                'subject': message['subject'],
+                'html': message['html'],
+                'text': message.get('text'),
+                'status': 'pending',
+                'attempts': 0,
+                'next_attempt_at': now,
+                'error': None,
+                'created_at': now,
+                'updated_at': now,
+            }
+            for message in messages
+        ]
+        if not docs:
+            return 0
+        try:
+            return len(cls._collection(db).insert_many(docs, ordered=False).inserted_ids)
+        except BulkWriteError as exc:
+            if any(error.get('code') != 11000 for error in exc.details.get('writeErrors', [])):
+                raise
+            return exc.details.get('nInserted', 0)
+
+    @staticmethod
+    def due_query(job_id=None):
+        query = {'status': 'pending', 'next_attempt_at': {'$lte': _now()}}
+        if job_id is not None:
+            query['job_id'] = job_id
+        return query
+
+    @classmethod
+    def claim(cls, db, limit, job_id=None):
+        """Move up to ``limit`` due messages to ``sending`` and return them.
+
+        The ``status: pending`` guard on the update keeps concurrent workers
+        from claiming the same message twice.
+        """
+        collection = cls._collection(db)
+        ids = [
+            doc['_id']
+            for doc in collection.find(cls.due_query(job_id), {'_id': 1}).sort(cls.CLAIM_SORT).limit(limit)
+        ]
+        if not ids:
+            return []
+        token = ObjectId()
+        now = _now()
+        collection.update_many(
+            {'_id': {'$in': ids}, 'status': 'pending'},
+            {'$set': {'status': 'sending', 'claim': token, 'claimed_at': now, 'updated_at': now}},
+        )
+        return list(collection.find({'claim': token, 'status': 'sending'}))
+
+    @classmethod
+    def mark_sent(cls, db, ids):
+        now = _now()
+        cls._collection(db).update_many(
+            {'_id': {'$in': list(ids)}},
+            {'$set': {'status': 'sent', 'sent_at': now, 'updated_at': now, 'error': None,
+                      'expires_at': now + timedelta(days=cls.RETENTION_DAYS)},
+             '$inc': {'attempts': 1},
+             '$unset': {'claim': ''}},
+        )
+
+    @classmethod
+    def backoff(cls, attempts, retry_after=None):
+        """Seconds to wait before attempt ``attempts + 1``: exponential with jitter."""
+        delay = min(cls.RETRY_MAX_SECONDS, cls.RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0))
+        delay *= random.uniform(0.8, 1.2)
+        return max(delay, retry_after or 0)
+
+    @classmethod
+    def mark_failed(cls, db, ids, error, retryable=True, retry_after=None):
+        """Reschedule messages after a failed send; give up on exhausted or permanent failures.
+
+        Returns how many messages were rescheduled.
+        """
+        collection = cls._collection(db)
+        ids = list(ids)
+        now = _now()
+        expires_at = now + timedelta(days=cls.RETENTION_DAYS)
+        give_up = {'_id': {'$in': ids}, 'status': 'sending'}
+        if retryable:
+            give_up['attempts'] = {'$gte': cls.MAX_ATTEMPTS - 1}
+        collection.update_many(
+            give_up,
+            {'$set': {'status': 'failed', 'error': str(error), 'updated_at': now, 'expires_at': expires_at},
+             '$inc': {'attempts': 1},
+             '$unset': {'claim': ''}},
+        )
+        if not retryable:
+            return 0
+        attempts = max(
+            (doc.get('attempts', 0) + 1 for doc in collection.find({'_id': {'$in': ids}, 'status': 'sending'},
+                                                                   {'attempts': 1})),
+            default=0,
+        )
+        next_attempt_at = now + timedelta(seconds=cls.backoff(attempts, retry_after))
+        return collection.update_many(
+            {'_id': {'$in': ids}, 'status': 'sending'},
+            {'$set': {'status': 'pending', 'error': str(error), 'updated_at': now,
+                      'next_attempt_at': next_attempt_at},
+             '$inc': {'attempts': 1},
+             '$unset': {'claim': ''}},
+        ).modified_count
+
+    @classmethod
+    def has_overdue(cls, db):
+        """True when a message has been due for ``SWEEP_GRACE`` without any worker sending it."""
+        query = {'status': 'pending', 'next_attempt_at': {'$lt': _now() - cls.SWEEP_GRACE}}
+        return cls._collection(db).find_one(query, {'_id': 1}) is not None
+
+    @classmethod
+    def release_stale(cls, db):
+        """Return messages claimed by a worker that died mid-send to ``pending``."""
+        now = _now()
+        return cls._collection(db).update_many(
+            {'status': 'sending', 'claimed_at': {'$lt': now - cls.CLAIM_TIMEOUT}},
+            {'$set': {'status': 'pending', 'updated_at': now},
+             '$unset': {'claim': ''}},
+        ).modified_count
+
+    @classmethod
+    def count_by_status(cls, db, job_id):
+        counts = {status: 0 for status in STATUSES}
+        for row in cls._collection(db).aggregate([
+            {'$match': {'job_id': job_id}},
+            {'$group': {'_id': '$status', 'count': {'$sum': 1}}},
+        ]):
+            counts[row['_id']] = row['count']
+        return counts
@@ -6,11 +6,15 @@ from datetime import datetime, timedelta, timezone
 from bson import ObjectId
 from bson.errors import InvalidId
 
+from app.models.activity import ActivityEventHelper
+from app.models.stats import StatsCounterHelper
+
 
 class QuizHelper:
     """Helper methods for the quizzes collection."""
 
     STATUSES = {'draft', 'published'}
+    LIST_SORT = [('created_at', -1)]
 
     @staticmethod
     def _collection(db):
@@ -69,6 +73,8 @@ class QuizHelper:
 
         result = cls._collection(db).insert_one(quiz)
         quiz['_id'] = result.inserted_id
+        StatsCounterHelper.increment(db, 'quizzes')
+        ActivityEventHelper.record(db, 'quiz', 'created', quiz)
         return quiz
 
     @classmethod
@@ -95,7 +101,9 @@ class QuizHelper:
             payload['updated_by'] = cls._oid(updated_by)
 
         cls._collection(db).update_one({'_id': oid}, {'$set': payload})
-        return cls.find_by_id(db, oid)
+        quiz = cls.find_by_id(db, oid)
+        ActivityEventHelper.record(db, 'quiz', 'updated', quiz, actor_id=updated_by)
+        return quiz
 
     @classmethod
     def find_by_id(cls, db, quiz_id):
@@ -114,17 +122,22 @@ class QuizHelper:
         cls._questions_collection(db).delete_many({'quiz_id': oid})
         cls._attempts_collection(db).delete_many({'quiz_id': oid})
         result = cls._collection(db).delete_one({'_id': oid})
+        StatsCounterHelper.increment(db, 'quizzes', -result.deleted_count)
         return result.deleted_count > 0
 
-    @classmethod
-    def list_quizzes(cls, db, filters=None, page=1, limit=20, sort=None, search=None):
-        """Return paginated quizzes."""
-        collection = cls._collection(db)
+    @staticmethod
+    def list_query(filters=None, search=None):
         query = filters.copy() if filters else {}
-
         if search:
             regex = {'$regex': search, '$options': 'i'}
             query['$or'] = [{'title': regex}, {'description': regex}]
+        return query
+
+    @classmethod
+    def list_quizzes(cls, db, filters=None, page=1, limit=20, sort=None, search=None):
+        """Return paginated quizzes."""
+        collection = cls._collection(db)
+        query = cls.list_query(filters, search)
 
         skip = max(page - 1, 0) * limit
         cursor = collection.find(query)
@@ -355,6 +368,8 @@ class QuestionHelper:
 class QuizAttemptHelper:
     """Helper methods for quiz attempts."""
 
+    STUDENT_SORT = [('submitted_at', -1)]
+
     @staticmethod
     def _collection(db):
         return db.quiz_attempts
@@ -441,15 +456,21 @@ class QuizAttemptHelper:
             {'$set': {'time_spent_seconds': seconds}}
         )
 
+    @classmethod
+    def student_query(cls, student_id):
+        return {'student_id': cls._oid(student_id)}
+
+    @classmethod
+    def quiz_query(cls, quiz_id):
+        return {'quiz_id': cls._oid(quiz_id)}
+
     @classmethod
     def list_for_student(cls, db, student_id, limit=50):
-        return list(cls._collection(db).find(
-            {'student_id': cls._oid(student_id)}
-        ).sort('submitted_at', -1).limit(limit))
+        return list(cls._collection(db).find(cls.student_query(student_id)).sort(cls.STUDENT_SORT).limit(limit))
 
     @classmethod
     def list_for_quiz(cls, db, quiz_id):
-        return list(cls._collection(db).find({'quiz_id': cls._oid(quiz_id)}))
+        return list(cls._collection(db).find(cls.quiz_query(quiz_id)))
 
     @staticmethod
     def to_dict(attempt, include_answers=False):
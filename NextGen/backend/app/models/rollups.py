@@ -0,0 +1,162 @@
+"""Pre-rolled activity time-series kept in the ``daily_rollups`` collection."""
+from datetime import datetime, timedelta, timezone
+
+from pymongo import UpdateOne
+
+GRANULARITIES = ('hour', 'day', 'week')
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _aware(value):
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _day_start(value):
+    return _aware(value).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _days(start, end):
+    day = start
+    while day < end:
+        yield day
+        day += timedelta(days=1)
+
+
+class DailyRollupHelper:
+    """One document per (series, UTC day) with the day's total and 24 hourly counts.
+
+    ``refresh`` fills closed days incrementally; the current day is always
+    counted live. A chart therefore costs one indexed read of at most a year
+    of rollups plus one ``$dateTrunc`` aggregation over today's range, for
+    any ``days`` and granularity.
+    """
+
+    # series name -> (source collection, timestamp field)
+    SERIES = {
+        'students': ('students', 'created_at'),
+        'notices': ('notices', 'created_at'),
+        'discussions': ('discussions', 'created_at'),
+        'timeline_posts': ('timeline_posts', 'created_at'),
+        'chat_messages': ('chat_messages', 'created_at'),
+    }
+
+    MAX_DAYS = 366
+    # A full year plus a week so the oldest week bucket is never clipped by the backfill.
+    BACKFILL_DAYS = MAX_DAYS + 7
+
+    @staticmethod
+    def _collection(db):
+        return db.daily_rollups
+
+    @classmethod
+    def source_query(cls, series, start, end):
+        """``series``' source documents in ``[start, end)``, as ``(collection name, filter)``."""
+        collection_name, field = cls.SERIES[series]
+        return collection_name, {field: {'$gte': start, '$lt': end}}
+
+    @staticmethod
+    def days_query(series, start, end):
+        return {'series': series, 'day': {'$gte': start, '$lt': end}}
+
+    @classmethod
+    def hourly_counts(cls, db, series, start, end):
+        """Count source documents per UTC hour in ``[start, end)`` from a single index range."""
+        collection_name, query = cls.source_query(series, start, end)
+        field = cls.SERIES[series][1]
+        pipeline = [
+            {'$match': query},
+            {'$group': {
+                '_id': {'$dateTrunc': {'date': f'${field}', 'unit': 'hour'}},
+                'count': {'$sum': 1},
+            }},
+        ]
+        return {_aware(doc['_id']): doc['count'] for doc in db[collection_name].aggregate(pipeline)}
+
+    @classmethod
+    def _day_documents(cls, db, series, start, end):
+        hourly = cls.hourly_counts(db, series, start, end)
+        documents = []
+        for day in _days(start, end):
+            hours = [hourly.get(day + timedelta(hours=hour), 0) for hour in range(24)]
+            documents.append({'series': series, 'day': day, 'count': sum(hours), 'hours': hours})
+        return documents
+
+    @classmethod
+    def roll_up(cls, db, series, start, end):
+        """Recount and store the closed days in ``[start, end)``."""
+        documents = cls._day_documents(db, series, start, end)
+        if documents:
+            now = _now()
+            cls._collection(db).bulk_write([
+                UpdateOne(
+                    {'series': series, 'day': doc['day']},
+                    {'$set': {**doc, 'computed_at': now}},
+                    upsert=True,
+                )
+                for doc in documents
+            ], ordered=False)
+        return documents
+
+    @classmethod
+    def refresh(cls, db, now=None):
+        """Roll up every closed day after each series' newest stored day."""
+        today = _day_start(now or _now())
+        floor = today - timedelta(days=cls.BACKFILL_DAYS)
+        rolled = {}
+        for series in cls.SERIES:
+            last = cls._collection(db).find_one({'series': series}, {'day': 1}, sort=[('day', -1)])
+            start = max(_day_start(last['day']) + timedelta(days=1), floor) if last else floor
+            rolled[series] = len(cls.roll_up(db, series, start, today)) if start < today else 0
+        return rolled
+
+    @classmethod
+    def hours_by_day(cls, db, series, start, now=None):
+        """Return ``{day: [24 hourly counts]}`` from ``start`` through today."""
+        today = _day_start(now or _now())
+        cursor = cls._collection(db).find(
+            cls.days_query(series, start, today),
+            {'day': 1, 'hours': 1, '_id': 0},
+        )
+        hours = {_day_start(doc['day']): doc.get('hours') or [0] * 24 for doc in cursor}
+        gap = [day for day in _days(start, today) if day not in hours]
+        if gap:
+            # The scheduled job has not caught up yet; count the gap live without storing it.
+            for doc in cls._day_documents(db, series, gap[0], gap[-1] + timedelta(days=1)):
+                hours.setdefault(doc['day'], doc['hours'])
+        for doc in cls._day_documents(db, series, today, today + timedelta(days=1)):
+            hours[doc['day']] = doc['hours']
+        return hours
+
+    @classmethod
+    def timeseries(cls, db, series, days=7, granularity='day', now=None):
+        """Counts for the last ``days`` UTC days (today included) as ``[{'day', 'count'}]``.
+
+        ``day`` is the ISO start of each bucket; week buckets start on Monday
+        and are clipped to the requested range.
+        """
+        now = _aware(now or _now())
+        today = _day_start(now)
+        start = today - timedelta(days=days - 1)
+        hours = cls.hours_by_day(db, series, start, now)
+
+        if granularity == 'hour':
+            points = []
+            for day in _days(start, today + timedelta(days=1)):
+                for hour, count in enumerate(hours[day]):
+                    bucket = day + timedelta(hours=hour)
+                    if bucket > now:
+                        break
+                    points.append({'day': bucket.isoformat(), 'count': count})
+            return points
+
+        buckets = {}
+        for day in _days(start, today + timedelta(days=1)):
+            bucket = day - timedelta(days=day.weekday()) if granularity == 'week' else day
+            key = max(bucket, start).date().isoformat()
+            buckets[key] = buckets.get(key, 0) + sum(hours[day])
+        return [{'day': key, 'count': count} for key, count in buckets.items()]
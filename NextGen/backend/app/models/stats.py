@@ -0,0 +1,100 @@
+"""Materialized dashboard counters kept in the ``stats_counters`` collection."""
+import logging
+from datetime import datetime, timezone
+
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+STAFF_USER_TYPES = ('Staff', 'Admin')
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+class StatsCounterHelper:
+    """One ``{_id: name, value}`` document per dashboard counter.
+
+    Create and delete paths move the counters with ``$inc``; ``reconcile``
+    recounts the source collections so any drift (failed increments, writes
+    from outside the helpers) is corrected on the next run.
+    """
+
+    # counter name -> (source collection, filter); an empty filter uses the
+    # collection metadata count instead of a scan.
+    COUNTERS = {
+        'students': ('students', {}),
+        'staff': ('users', {'user_type': {'$in': list(STAFF_USER_TYPES)}}),
+        'courses': ('courses', {}),
+        'subjects': ('subjects', {}),
+        'notices': ('notices', {}),
+        'materials': ('materials', {}),
+        'discussions': ('discussions', {}),
+        'quizzes': ('quizzes', {}),
+        'timeline_posts': ('timeline_posts', {}),
+        'chat_messages': ('chat_messages', {}),
+    }
+
+    @staticmethod
+    def _collection(db):
+        return db.stats_counters
+
+    @staticmethod
+    def is_staff(user_type):
+        return user_type in STAFF_USER_TYPES
+
+    @classmethod
+    def increment(cls, db, name, delta=1):
+        """Move a counter by ``delta``; failures are logged and left to reconciliation."""
+        if not delta:
+            return
+        try:
+            cls._collection(db).update_one(
+                {'_id': name},
+                {'$inc': {'value': delta}, '$set': {'updated_at': _now()}},
+                upsert=True,
+            )
+        except PyMongoError as exc:
+            logger.warning('Could not update stats counter %s: %s', name, exc)
+
+    @classmethod
+    def _count(cls, db, name):
+        collection_name, query = cls.COUNTERS[name]
+        collection = db[collection_name]
+        if query:
+            return collection.count_documents(query)
+        return collection.estimated_document_count()
+
+    @classmethod
+    def reconcile(cls, db, names=None):
+        """Recount the given counters (all by default) and store the totals."""
+        values = {}
+        for name in names or cls.COUNTERS:
+            value = cls._count(db, name)
+            now = _now()
+            cls._collection(db).update_one(
+                {'_id': name},
+                {'$set': {'value': value, 'updated_at': now, 'reconciled_at': now}},
+                upsert=True,
+            )
+            values[name] = value
+        return values
+
+    @classmethod
+    def get_all(cls, db):
+        """Return every counter with one indexed read.
+
+        Counters that have never been reconciled only hold increments, so
+        they are counted once here before being served.
+        """
+        names = list(cls.COUNTERS)
+        docs = {
+            doc['_id']: doc
+            for doc in cls._collection(db).find({'_id': {'$in': names}}, {'value': 1, 'reconciled_at': 1})
+        }
+        values = {name: max(int(doc.get('value') or 0), 0) for name, doc in docs.items()}
+        unseeded = [name for name in names if not docs.get(name, {}).get('reconciled_at')]
+        if unseeded:
+            values.update(cls.reconcile(db, unseeded))
+        return values
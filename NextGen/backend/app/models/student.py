@@ -3,10 +3,32 @@ from datetime import datetime
 import bcrypt
 from bson import ObjectId
 
+from app.models.stats import StatsCounterHelper
+
 
 class StudentHelper:
     """Helper methods for Student collection."""
 
+    LIST_SORT = [('created_at', -1)]
+
+    @staticmethod
+    def list_query(status=None, course=None, semester=None, search=None):
+        """Filter for the student list; ``semester`` must already be an int."""
+        query = {}
+        if status:
+            query['status'] = status
+        if course:
+            query['course'] = course
+        if semester:
+            query['semester'] = semester
+        if search:
+            query['$or'] = [
+                {'name': {'$regex': search, '$options': 'i'}},
+                {'roll_no': {'$regex': search, '$options': 'i'}},
+                {'email': {'$regex': search, '$options': 'i'}}
+            ]
+        return query
+
     @staticmethod
     def create_student(db, roll_no, name, email, password, course, semester, batch=None, mob_no=None):
         """Create a new student."""
@@ -31,8 +53,16 @@ class StudentHelper:
 
         result = db.students.insert_one(student_data)
         student_data['_id'] = result.inserted_id
+        StatsCounterHelper.increment(db, 'students')
         return student_data
 
+    @staticmethod
+    def delete_student(db, student_id):
+        """Delete a student document."""
+        result = db.students.delete_one({'_id': ObjectId(student_id)})
+        StatsCounterHelper.increment(db, 'students', -result.deleted_count)
+        return result.deleted_count > 0
+
     @staticmethod
     def find_by_roll_no(db, roll_no):
         """Find student by roll number."""
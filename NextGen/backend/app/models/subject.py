@@ -2,10 +2,15 @@
 from datetime import datetime
 from bson import ObjectId
 
+from app.cache import invalidate_tags
+from app.models.stats import StatsCounterHelper
+
 
 class SubjectHelper:
     """Helper class for Subject operations."""
 
+    COURSE_SORT = [('semester', 1)]
+
     @staticmethod
     def create_subject(db, subject_name, subject_code, course_id, semester, subject_type, credits, description=None, created_by=None):
         """Create a new subject."""
@@ -25,8 +30,25 @@ class SubjectHelper:
 
         result = db.subjects.insert_one(subject_data)
         subject_data['_id'] = result.inserted_id
+        StatsCounterHelper.increment(db, 'subjects')
+        invalidate_tags('subjects')
         return subject_data
 
+    @staticmethod
+    def update_subject(db, subject_id, update_data):
+        """Apply a partial update to a subject."""
+        update_data = {**update_data, 'updated_at': datetime.utcnow()}
+        db.subjects.update_one({'_id': ObjectId(subject_id)}, {'$set': update_data})
+        invalidate_tags('subjects')
+
+    @staticmethod
+    def delete_subject(db, subject_id):
+        """Delete a subject."""
+        result = db.subjects.delete_one({'_id': ObjectId(subject_id)})
+        StatsCounterHelper.increment(db, 'subjects', -result.deleted_count)
+        invalidate_tags('subjects')
+        return result.deleted_count > 0
+
     @staticmethod
     def find_by_id(db, subject_id):
         """Find subject by ID."""
@@ -41,12 +63,16 @@ class SubjectHelper:
         return db.subjects.find_one({'subject_code': subject_code.upper()})
 
     @staticmethod
-    def find_by_course(db, course_id, semester=None):
-        """Find subjects by course and optionally by semester."""
+    def course_query(course_id, semester=None):
         query = {'course_id': ObjectId(course_id) if isinstance(course_id, str) else course_id}
         if semester:
             query['semester'] = semester
-        return list(db.subjects.find(query).sort('semester', 1))
+        return query
+
+    @staticmethod
+    def find_by_course(db, course_id, semester=None):
+        """Find subjects by course and optionally by semester."""
+        return list(db.subjects.find(SubjectHelper.course_query(course_id, semester)).sort(SubjectHelper.COURSE_SORT))
 
     @staticmethod
     def find_by_semester(db, semester):
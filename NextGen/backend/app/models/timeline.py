@@ -1,11 +1,18 @@
 """Timeline post and comment helpers for MongoDB."""
+import base64
+import json
 import os
+import threading
+import time
 import uuid
 from datetime import datetime, timezone
 
 from bson import ObjectId
 from bson.errors import InvalidId
 
+from app.models.activity import ActivityEventHelper
+from app.models.like import LikeHelper
+from app.models.stats import StatsCounterHelper
 from app.utils.file_handler import FileHandler
 
 
@@ -30,6 +37,67 @@ def _serialize_datetime(value):
     return None
 
 
+FEED_SORT = [('created_at', -1), ('_id', -1)]
+# Legacy documents may still embed liked_by; never ship it to the app.
+FEED_PROJECTION = {'liked_by': 0}
+TOTAL_CACHE_SECONDS = 60
+
+_total_cache = {}
+_total_cache_lock = threading.Lock()
+
+
+def encode_cursor(post):
+    """Build an opaque continuation token from the last post on a page."""
+    created_at = post.get('created_at')
+    if isinstance(created_at, datetime) and created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    payload = {
+        'c': created_at.isoformat() if isinstance(created_at, datetime) else None,
+        'i': str(post['_id']),
+    }
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Return ``(created_at, _id)`` from a continuation token; raise ValueError if malformed."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        created_at = datetime.fromisoformat(payload['c'])
+        oid = ObjectId(payload['i'])
+    except (TypeError, KeyError, ValueError, InvalidId, UnicodeError) as exc:
+        raise ValueError('Invalid pagination cursor.') from exc
+    return created_at, oid
+
+
+def keyset_filter(cursor):
+    """Match posts strictly after the cursor position in ``FEED_SORT`` order."""
+    created_at, oid = decode_cursor(cursor)
+    return {
+        'created_at': {'$lte': created_at},
+        '$or': [
+            {'created_at': {'$lt': created_at}},
+            {'_id': {'$lt': oid}},
+        ],
+    }
+
+
+def _cached_total(key, compute):
+    """Return an approximate count, recomputed at most every ``TOTAL_CACHE_SECONDS``."""
+    now = time.monotonic()
+    with _total_cache_lock:
+        cached = _total_cache.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+    value = compute()
+    with _total_cache_lock:
+        if len(_total_cache) > 10000:
+            _total_cache.clear()
+        _total_cache[key] = (now + TOTAL_CACHE_SECONDS, value)
+    return value
+
+
 def _serialize_media_item(item):
     if not item:
         return None
@@ -118,7 +186,6 @@ class TimelinePostHelper:
             'audience': audience or [],
             'comments_count': 0,
             'likes_count': 0,
-            'liked_by': [],
             'created_at': _now(),
             'updated_at': _now(),
             'created_by': _oid(author_id),
@@ -128,6 +195,8 @@ class TimelinePostHelper:
         }
         result = cls._collection(db).insert_one(document)
         document['_id'] = result.inserted_id
+        StatsCounterHelper.increment(db, 'timeline_posts')
+        ActivityEventHelper.record(db, 'timeline', 'created', document, title_field='content')
         return document
 
     @classmethod
@@ -144,7 +213,9 @@ class TimelinePostHelper:
 
         update_data['updated_at'] = _now()
         cls._collection(db).update_one({'_id': oid}, {'$set': update_data})
-        return cls.find_by_id(db, oid)
+        post = cls.find_by_id(db, oid)
+        ActivityEventHelper.record(db, 'timeline', 'updated', post, title_field='content')
+        return post
 
     @classmethod
     def append_media(cls, db, post_id, media_items):
@@ -181,7 +252,7 @@ class TimelinePostHelper:
         oid = _oid(post_id)
         if oid is None:
             return None
-        return cls._collection(db).find_one({'_id': oid})
+        return cls._collection(db).find_one({'_id': oid}, FEED_PROJECTION)
 
     @classmethod
     def delete_post(cls, db, post_id):
@@ -193,8 +264,11 @@ class TimelinePostHelper:
         if not post:
             return False
 
+        comment_ids = db.timeline_comments.distinct('_id', {'post_id': oid})
+        LikeHelper.delete_for_targets(db, [oid, *comment_ids])
         db.timeline_comments.delete_many({'post_id': oid})
         result = cls._collection(db).delete_one({'_id': oid})
+        StatsCounterHelper.increment(db, 'timeline_posts', -result.deleted_count)
         return result.deleted_count > 0, post
 
     @classmethod
@@ -217,7 +291,32 @@ class TimelinePostHelper:
         return query
 
     @classmethod
-    def list_feed(cls, db, role, user_id, page=1, limit=10, before=None):
+    def _page(cls, db, query, limit, cursor=None, page=None):
+        """Fetch one page in ``FEED_SORT`` order and the cursor for the next one.
+
+        With a ``cursor`` the page is located by keyset; ``page`` is kept for
+        older clients and falls back to ``skip``. One extra document is read to
+        decide whether another page exists, so no count is needed.
+        """
+        if cursor:
+            query = cls.cursor_query(query, cursor)
+        find = cls._collection(db).find(query, FEED_PROJECTION).sort(FEED_SORT)
+        if not cursor and page and page > 1:
+            find = find.skip((page - 1) * limit)
+        items = list(find.limit(limit + 1))
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor(items[-1])
+        return items, next_cursor
+
+    @staticmethod
+    def cursor_query(query, cursor):
+        """``query`` narrowed to the posts after ``cursor`` in ``FEED_SORT`` order."""
+        return {'$and': [query, keyset_filter(cursor)]}
+
+    @classmethod
+    def feed_query(cls, role, user_id, before=None):
         query = cls._visibility_query(role, user_id)
         if before:
             try:
@@ -225,18 +324,10 @@ class TimelinePostHelper:
                 query['created_at'] = {'$lt': before_dt}
             except ValueError:
                 pass
-
-        skip = max(page - 1, 0) * limit
-        cursor = cls._collection(db).find(query).sort('created_at', -1)
-        total = cls._collection(db).count_documents(query)
-        items = list(cursor.skip(skip).limit(limit))
-        return total, items
+        return query
 
     @classmethod
-    def list_user_posts(cls, db, user_id, page=1, limit=10, viewer_role=None, viewer_id=None):
-        oid = _oid(user_id)
-        if oid is None:
-            return 0, []
+    def user_posts_query(cls, oid, viewer_role=None, viewer_id=None):
         query = {'created_by': oid}
 
         viewer_oid = _oid(viewer_id) if viewer_id else None
@@ -247,47 +338,58 @@ class TimelinePostHelper:
                 permitted_visibility = {'public', 'campus'}
                 if viewer_role == 'student':
                     permitted_visibility.add('students')
-                query['visibility'] = {'$in': list(permitted_visibility)}
+                query['visibility'] = {'$in': sorted(permitted_visibility)}
+        return query
 
-        skip = max(page - 1, 0) * limit
-        cursor = cls._collection(db).find(query).sort('created_at', -1)
-        total = cls._collection(db).count_documents(query)
-        items = list(cursor.skip(skip).limit(limit))
-        return total, items
+    @classmethod
+    def list_feed(cls, db, role, user_id, limit=10, cursor=None, page=None, before=None):
+        """Return ``(posts, next_cursor)`` for the viewer's feed."""
+        query = cls.feed_query(role, user_id, before=before)
+        return cls._page(db, query, limit, cursor=cursor, page=page)
 
     @classmethod
-    def set_like(cls, db, post_id, user_id, like=True):
-        oid = _oid(post_id)
-        uid = _oid(user_id)
-        if oid is None or uid is None:
-            return None
+    def count_feed(cls, db, role, user_id):
+        """Approximate feed size, cached briefly so refreshes do not rescan the index."""
+        query = cls.feed_query(role, user_id)
+        key = ('feed', role, str(user_id))
+        return _cached_total(key, lambda: cls._collection(db).count_documents(query))
 
-        post = cls.find_by_id(db, oid)
-        if not post:
-            return None
+    @classmethod
+    def list_user_posts(cls, db, user_id, limit=10, cursor=None, page=None, viewer_role=None, viewer_id=None):
+        """Return ``(posts, next_cursor)`` for posts authored by ``user_id``."""
+        oid = _oid(user_id)
+        if oid is None:
+            return [], None
+        query = cls.user_posts_query(oid, viewer_role=viewer_role, viewer_id=viewer_id)
+        return cls._page(db, query, limit, cursor=cursor, page=page)
 
-        update = {'$set': {'updated_at': _now()}}
-        if like:
-            update['$addToSet'] = {'liked_by': uid}
-            inc_value = 1 if uid not in post.get('liked_by', []) else 0
-        else:
-            update['$pull'] = {'liked_by': uid}
-            inc_value = -1 if uid in post.get('liked_by', []) else 0
+    @classmethod
+    def count_user_posts(cls, db, user_id, viewer_role=None, viewer_id=None):
+        """Approximate number of the author's posts visible to the viewer."""
+        oid = _oid(user_id)
+        if oid is None:
+            return 0
+        query = cls.user_posts_query(oid, viewer_role=viewer_role, viewer_id=viewer_id)
+        key = ('user_posts', str(oid), repr(query.get('visibility')))
+        return _cached_total(key, lambda: cls._collection(db).count_documents(query))
 
-        if inc_value != 0:
-            update.setdefault('$inc', {})['likes_count'] = inc_value
+    @classmethod
+    def set_like(cls, db, post_id, user_id, like=True):
+        """Like, unlike or (``like=None``) toggle; return the updated post or None."""
+        return LikeHelper.apply(db, LikeHelper.TIMELINE_POST, post_id, user_id, like=like, projection=FEED_PROJECTION)
 
-        cls._collection(db).update_one({'_id': oid}, update)
-        return cls.find_by_id(db, oid)
+    @classmethod
+    def serialize(cls, db, post, current_user_id=None):
+        """Serialize a single post with the viewer's like state."""
+        if not post:
+            return None
+        return cls.to_dict(post, is_liked=LikeHelper.has_liked(db, post['_id'], current_user_id))
 
     @staticmethod
-    def to_dict(post, current_user_id=None):
+    def to_dict(post, is_liked=False):
         if not post:
             return None
         media_items = post.get('media', [])
-        liked_by = post.get('liked_by', [])
-        current_oid = _oid(current_user_id)
-        is_liked = current_oid in liked_by if current_oid is not None else False
         return {
             'id': str(post['_id']),
             'content': post.get('content'),
@@ -311,10 +413,16 @@ class TimelinePostHelper:
 class TimelineCommentHelper:
     """Helper methods for timeline comments."""
 
+    LIST_SORT = [('created_at', 1)]
+
     @staticmethod
     def _collection(db):
         return db.timeline_comments
 
+    @staticmethod
+    def post_query(oid):
+        return {'post_id': oid}
+
     @classmethod
     def create_comment(cls, db, post_id, author_id, author_name, author_role, content):
         oid = _oid(post_id)
@@ -325,7 +433,6 @@ class TimelineCommentHelper:
             'post_id': oid,
             'content': content,
             'likes_count': 0,
-            'liked_by': [],
             'created_at': _now(),
             'updated_at': _now(),
             'created_by': _oid(author_id),
@@ -343,8 +450,8 @@ class TimelineCommentHelper:
         if oid is None:
             return 0, []
         skip = max(page - 1, 0) * limit
-        cursor = cls._collection(db).find({'post_id': oid}).sort('created_at', 1)
-        total = cls._collection(db).count_documents({'post_id': oid})
+        cursor = cls._collection(db).find(cls.post_query(oid), FEED_PROJECTION).sort(cls.LIST_SORT)
+        total = cls._collection(db).count_documents(cls.post_query(oid))
         items = list(cursor.skip(skip).limit(limit))
         return total, items
 
@@ -353,7 +460,7 @@ class TimelineCommentHelper:
         oid = _oid(comment_id)
         if oid is None:
             return None
-        return cls._collection(db).find_one({'_id': oid})
+        return cls._collection(db).find_one({'_id': oid}, FEED_PROJECTION)
 
     @classmethod
     def update_comment(cls, db, comment_id, payload):
@@ -376,37 +483,32 @@ class TimelineCommentHelper:
         if not comment:
             return False
         cls._collection(db).delete_one({'_id': oid})
+        LikeHelper.delete_for_targets(db, [oid])
         db.timeline_posts.update_one({'_id': comment['post_id']}, {'$inc': {'comments_count': -1}, '$set': {'updated_at': _now()}})
         return True
 
     @classmethod
     def set_like(cls, db, comment_id, user_id, like=True):
-        oid = _oid(comment_id)
-        uid = _oid(user_id)
-        if oid is None or uid is None:
-            return None
-        comment = cls.find_by_id(db, oid)
+        """Like, unlike or (``like=None``) toggle; return the updated comment or None."""
+        return LikeHelper.apply(
+            db, LikeHelper.TIMELINE_COMMENT, comment_id, user_id, like=like, projection=FEED_PROJECTION
+        )
+
+    @classmethod
+    def serialize(cls, db, comment, current_user_id=None):
         if not comment:
             return None
-        update = {'$set': {'updated_at': _now()}}
-        if like:
-            update['$addToSet'] = {'liked_by': uid}
-            inc_value = 1 if uid not in comment.get('liked_by', []) else 0
-        else:
-            update['$pull'] = {'liked_by': uid}
-            inc_value = -1 if uid in comment.get('liked_by', []) else 0
-        if inc_value != 0:
-            update.setdefault('$inc', {})['likes_count'] = inc_value
-        cls._collection(db).update_one({'_id': oid}, update)
-        return cls.find_by_id(db, oid)
+        return cls.to_dict(comment, is_liked=LikeHelper.has_liked(db, comment['_id'], current_user_id))
+
+    @classmethod
+    def serialize_many(cls, db, comments, current_user_id=None):
+        LikeHelper.annotate(db, comments, current_user_id)
+        return [cls.to_dict(comment, is_liked=comment['is_liked']) for comment in comments]
 
     @staticmethod
-    def to_dict(comment, current_user_id=None):
+    def to_dict(comment, is_liked=False):
         if not comment:
             return None
-        liked_by = comment.get('liked_by', [])
-        current_oid = _oid(current_user_id)
-        is_liked = current_oid in liked_by if current_oid is not None else False
         return {
             'id': str(comment['_id']),
             'post_id': str(comment['post_id']),
@@ -3,6 +3,8 @@ from datetime import datetime
 import bcrypt
 from bson import ObjectId
 
+from app.models.stats import StatsCounterHelper
+
 
 class UserHelper:
     """Helper methods for User collection."""
@@ -26,8 +28,28 @@ class UserHelper:
 
         result = db.users.insert_one(user_data)
         user_data['_id'] = result.inserted_id
+        if StatsCounterHelper.is_staff(user_type):
+            StatsCounterHelper.increment(db, 'staff')
         return user_data
 
+    @staticmethod
+    def update_user(db, user, update_data):
+        """Apply a partial update and keep the staff counter in step with user_type."""
+        update_data = {**update_data, 'updated_at': datetime.utcnow()}
+        db.users.update_one({'_id': user['_id']}, {'$set': update_data})
+        if 'user_type' in update_data:
+            was_staff = StatsCounterHelper.is_staff(user.get('user_type'))
+            is_staff = StatsCounterHelper.is_staff(update_data['user_type'])
+            StatsCounterHelper.increment(db, 'staff', int(is_staff) - int(was_staff))
+
+    @staticmethod
+    def delete_user(db, user):
+        """Delete a user document."""
+        result = db.users.delete_one({'_id': user['_id']})
+        if result.deleted_count and StatsCounterHelper.is_staff(user.get('user_type')):
+            StatsCounterHelper.increment(db, 'staff', -1)
+        return result.deleted_count > 0
+
     @staticmethod
     def find_by_login_id(db, login_id):
         """Find user by login_id."""
@@ -0,0 +1,280 @@
+"""Socket.IO presence and room membership shared by every worker process.
+
+Each connected socket has a session (user id and role) and the rooms it
+joined. A user is online while at least one of their sockets is alive.
+Entries carry a deadline that the owning worker refreshes with
+``heartbeat``, so sockets of a worker that dies drop out after
+``PRESENCE_TTL_SECONDS`` without anyone cleaning up after it.
+
+With ``SOCKETIO_BACKEND=redis`` the store lives in Redis (``REDIS_URL``),
+and Socket.IO emits go through the same Redis as a message queue. Then a
+room emit from any process, a REST handler or a Celery task, reaches
+sockets held by every worker. The ``memory`` backend keeps the same
+behaviour inside a single process.
+
+Online/offline changes reach only the user's contacts: every socket joins
+``presence_room(contact)`` for each contact, and ``PresenceChanges``
+debounces a user's changes per process so a reload nets out to nothing.
+"""
+import logging
+import threading
+import time
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - redis is optional
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+SOCKETIO_CHANNEL = 'chronicle-socketio'
+
+
+def presence_room(user_id):
+    """Room of the sockets that want ``user_id``'s online status."""
+    return f'presence:{user_id}'
+
+
+class PresenceChanges:
+    """Users whose online state changed since the last flush, with the state they had before.
+
+    Only the first change in a window records the earlier state, so going
+    offline and back online within one flush interval is no change at all.
+    """
+
+    def __init__(self):
+        self._before = {}
+        self._lock = threading.Lock()
+
+    def record(self, user_id, was_online):
+        with self._lock:
+            self._before.setdefault(user_id, was_online)
+
+    def drain(self):
+        """``{user_id: was_online}`` recorded since the previous drain."""
+        with self._lock:
+            before, self._before = self._before, {}
+        return before
+
+
+class MemoryPresenceStore:
+    """Presence kept in the worker process; for a single process or tests."""
+
+    name = 'memory'
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._sessions = {}  # sid -> {'user_id', 'role', 'rooms', 'expires_at'}
+        self._lock = threading.Lock()
+
+    def _alive(self, now):
+        return {sid: session for sid, session in self._sessions.items() if session['expires_at'] > now}
+
+    def _user_sids(self, user_id, now):
+        return [sid for sid, session in self._alive(now).items() if session['user_id'] == user_id]
+
+    def connect(self, sid, user_id, role=None):
+        """Register a socket; True when it is the user's only live socket."""
+        now = time.monotonic()
+        with self._lock:
+            self._sessions[sid] = {'user_id': user_id, 'role': role, 'rooms': set(), 'expires_at': now + self.ttl}
+            return self._user_sids(user_id, now) == [sid]
+
+    def disconnect(self, sid):
+        """Forget a socket; returns ``(session, went_offline)``."""
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.pop(sid, None)
+            if session is None:
+                return None, False
+            return self._public(session), not self._user_sids(session['user_id'], now)
+
+    @staticmethod
+    def _public(session):
+        return {'user_id': session['user_id'], 'role': session['role'], 'rooms': set(session['rooms'])}
+
+    def session(self, sid):
+        with self._lock:
+            session = self._sessions.get(sid)
+            if session is None or session['expires_at'] <= time.monotonic():
+                return None
+            return self._public(session)
+
+    def heartbeat(self, sessions):
+        """Extend the deadline of this worker's ``{sid: user_id}`` sockets.
+
+        Returns the users who went offline because all their sockets expired.
+        """
+        now = time.monotonic()
+        with self._lock:
+            for sid in sessions:
+                if sid in self._sessions:
+                    self._sessions[sid]['expires_at'] = now + self.ttl
+            expired = {sid: session for sid, session in self._sessions.items() if session['expires_at'] <= now}
+            for sid in expired:
+                del self._sessions[sid]
+            online = {session['user_id'] for session in self._sessions.values()}
+            return sorted({session['user_id'] for session in expired.values()} - online)
+
+    def join(self, sid, room):
+        with self._lock:
+            if sid in self._sessions:
+                self._sessions[sid]['rooms'].add(room)
+
+    def leave(self, sid, room):
+        with self._lock:
+            if sid in self._sessions:
+                self._sessions[sid]['rooms'].discard(room)
+
+    def online_user_ids(self):
+        with self._lock:
+            return sorted({session['user_id'] for session in self._alive(time.monotonic()).values()})
+
+    def online_among(self, user_ids):
+        """The subset of ``user_ids`` with a live socket."""
+        with self._lock:
+            online = {session['user_id'] for session in self._alive(time.monotonic()).values()}
+        return online.intersection(user_ids)
+
+
+class RedisPresenceStore:
+    """Presence shared across workers.
+
+    ``{prefix}:sid:<sid>`` hashes and ``{prefix}:rooms:<sid>`` sets expire with
+    their TTL. ``{prefix}:user:<uid>`` and ``{prefix}:online`` are sorted sets
+    scored by deadline, so liveness is a score comparison and dead entries
+    are trimmed lazily.
+    """
+
+    name = 'redis'
+
+    def __init__(self, client, prefix='chronicle:presence', ttl=60):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def _key(self, kind, value=None):
+        return f'{self.prefix}:{kind}' if value is None else f'{self.prefix}:{kind}:{value}'
+
+    def _touch_user(self, pipe, sid, user_id, now):
+        deadline = now + self.ttl
+        user_key = self._key('user', user_id)
+        pipe.zadd(user_key, {sid: deadline})
+        pipe.expire(user_key, self.ttl)
+        pipe.zadd(self._key('online'), {user_id: deadline})
+
+    def connect(self, sid, user_id, role=None):
+        now = time.time()
+        user_key = self._key('user', user_id)
+        pipe = self.client.pipeline()
+        pipe.hset(self._key('sid', sid), mapping={'user_id': user_id, 'role': role or ''})
+        pipe.expire(self._key('sid', sid), self.ttl)
+        self._touch_user(pipe, sid, user_id, now)
+        pipe.zremrangebyscore(user_key, '-inf', now)
+        pipe.zcard(user_key)
+        return pipe.execute()[-1] == 1
+
+    def disconnect(self, sid):
+        session = self.session(sid)
+        if session is None:
+            return None, False
+        user_id = session['user_id']
+        user_key = self._key('user', user_id)
+        pipe = self.client.pipeline()
+        pipe.delete(self._key('sid', sid), self._key('rooms', sid))
+        pipe.zrem(user_key, sid)
+        pipe.zremrangebyscore(user_key, '-inf', time.time())
+        pipe.zcard(user_key)
+        went_offline = pipe.execute()[-1] == 0
+        if went_offline:
+            self.client.zrem(self._key('online'), user_id)
+        return session, went_offline
+
+    def session(self, sid):
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hgetall(self._key('sid', sid))
+        pipe.smembers(self._key('rooms', sid))
+        data, rooms = pipe.execute()
+        if not data:
+            return None
+        return {
+            'user_id': data[b'user_id'].decode(),
+            'role': data.get(b'role', b'').decode() or None,
+            'rooms': {room.decode() for room in rooms},
+        }
+
+    def heartbeat(self, sessions):
+        """Refresh this worker's sockets; returns users whose deadline passed (e.g. their worker died)."""
+        now = time.time()
+        pipe = self.client.pipeline(transaction=False)
+        for sid, user_id in sessions.items():
+            pipe.expire(self._key('sid', sid), self.ttl)
+            pipe.expire(self._key('rooms', sid), self.ttl)
+            self._touch_user(pipe, sid, user_id, now)
+        pipe.zrangebyscore(self._key('online'), '-inf', now)
+        pipe.zremrangebyscore(self._key('online'), '-inf', now)
+        return sorted(value.decode() for value in pipe.execute()[-2])
+
+    def join(self, sid, room):
+        pipe = self.client.pipeline(transaction=False)
+        pipe.sadd(self._key('rooms', sid), room)
+        pipe.expire(self._key('rooms', sid), self.ttl)
+        pipe.execute()
+
+    def leave(self, sid, room):
+        self.client.srem(self._key('rooms', sid), room)
+
+    def online_user_ids(self):
+        return sorted(value.decode() for value in self.client.zrangebyscore(self._key('online'), time.time(), '+inf'))
+
+    def online_among(self, user_ids):
+        """The subset of ``user_ids`` with a live socket: one ZMSCORE."""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return set()
+        now = time.time()
+        scores = self.client.zmscore(self._key('online'), user_ids)
+        return {user_id for user_id, score in zip(user_ids, scores) if score is not None and score > now}
+
+
+_store = None
+
+
+def _redis_client(app):
+    if redis is None or not app.config.get('REDIS_URL'):
+        return None
+    client = redis.Redis.from_url(app.config['REDIS_URL'], socket_connect_timeout=1, socket_timeout=1)
+    try:
+        client.ping()
+        return client
+    except Exception as exc:
+        app.logger.warning('Redis unavailable for Socket.IO (%s); running as a single process.', exc)
+        return None
+
+
+def init_presence(app):
+    """Create the process-wide presence store; returns the matching ``SocketIO.init_app`` options.
+
+    ``SOCKETIO_MESSAGE_QUEUE`` overrides the queue URL (e.g. ``memory://``
+    to join several in-process servers); otherwise the redis backend uses
+    ``REDIS_URL`` and the memory backend needs none.
+    """
+    global _store
+    ttl = int(app.config.get('PRESENCE_TTL_SECONDS', 60))
+    choice = (app.config.get('SOCKETIO_BACKEND') or 'redis').lower()
+    client = _redis_client(app) if choice == 'redis' else None
+    if client is not None:
+        _store = RedisPresenceStore(client, app.config.get('PRESENCE_KEY_PREFIX', 'chronicle:presence'), ttl)
+    else:
+        _store = MemoryPresenceStore(ttl)
+
+    queue = app.config.get('SOCKETIO_MESSAGE_QUEUE') or (app.config['REDIS_URL'] if client is not None else None)
+    return {'message_queue': queue, 'channel': SOCKETIO_CHANNEL} if queue else {}
+
+
+def get_presence():
+    """The store created by ``init_presence`` (an in-process one before that)."""
+    global _store
+    if _store is None:
+        _store = MemoryPresenceStore()
+    return _store
@@ -1,16 +1,36 @@
-"""Socket.IO event registrations for chat."""
+"""Socket.IO event registrations for chat.
+
+Sessions and room membership live in the shared presence store (see
+``app.presence``), so any worker can serve any socket. This process only
+remembers which sockets it holds, to keep their store entries alive.
+
+Presence is O(1) per change: a user's first tab coming online or last tab
+closing is recorded once, debounced for ``PRESENCE_FLUSH_SECONDS`` and sent
+as one ``status`` emit to ``presence_room(user)``, which only the sockets
+of that user's chat contacts join.
+"""
+import logging
 import os
-from collections import defaultdict
+import threading
 
 from flask import request, current_app
 from flask_jwt_extended import decode_token
 from flask_socketio import emit, join_room, leave_room
 
 from app.db import get_db
-from app.models import ChatMessageHelper, ChatSessionHelper, GroupChatHelper
+from app.models import (
+    ChatMessageHelper, ChatReadStateHelper, ChatSessionHelper, GroupChatHelper, contact_ids, is_member,
+)
+from app.models.activity import ADMIN_ROOM
+from app.models.notification import user_room
+from app.presence import PresenceChanges, get_presence, presence_room
 
-connected_users = {}
-user_rooms = defaultdict(set)
+logger = logging.getLogger(__name__)
+
+local_sockets = {}  # sid -> user_id for the sockets held by this process
+presence_changes = PresenceChanges()
+_background_lock = threading.Lock()
+_background_started = False
 
 
 def _authenticate_socket(token):
@@ -21,7 +41,8 @@ def _authenticate_socket(token):
     except Exception:
         return None, None
     identity = decoded.get('sub')
-    claims = decoded.get('claims') or {}
+    # additional_claims (role, user_type, ...) sit at the top level of the token
+    claims = decoded.get('claims') or decoded
     return identity, claims
 
 
@@ -33,83 +54,187 @@ def _room_for_group(group_id):
     return f'group:{group_id}'
 
 
+def _conversation(room):
+    """``{'chat_id': id}`` or ``{'group_id': id}`` for a ``chat:<id>``/``group:<id>`` room, else None."""
+    kind, _, conversation_id = (room or '').partition(':')
+    if kind not in ('chat', 'group') or not conversation_id:
+        return None
+    return {f'{kind}_id': conversation_id}
+
+
+def _receipt_target(data, user_id):
+    """``(room, conversation_id, seq)`` of a receipt from a member of the room for a message in it, else None."""
+    data = data or {}
+    room = data.get('room')
+    conversation = _conversation(room)
+    # ``message_ids`` is the pre-watermark payload: the newest id covers the rest
+    message_id = data.get('message_id') or max(data.get('message_ids') or [], default=None)
+    if not conversation or not message_id:
+        return None
+    db = get_db()
+    if not is_member(db, user_id, **conversation):
+        return None
+    message = ChatMessageHelper.find_in(db, message_id, **conversation)
+    if not message or message.get('seq') is None:
+        return None
+    return room, next(iter(conversation.values())), message['seq']
+
+
+def flush_presence(socketio):
+    """Send one ``status`` per user whose online state really changed since the last flush."""
+    before = presence_changes.drain()
+    if not before:
+        return 0
+    online = get_presence().online_among(before)
+    sent = 0
+    for user_id, was_online in before.items():
+        is_online = user_id in online
+        if is_online != was_online:
+            socketio.emit('status', {'event': 'online' if is_online else 'offline', 'user_id': user_id},
+                          to=presence_room(user_id))
+            sent += 1
+    return sent
+
+
+def _start_background(socketio, flush_seconds):
+    """Heartbeat this process's sockets every third of the presence TTL and flush status changes."""
+    global _background_started
+    with _background_lock:
+        if _background_started:
+            return
+        _background_started = True
+
+    def _heartbeat():
+        while True:
+            presence = get_presence()
+            socketio.sleep(max(presence.ttl / 3, 1))
+            try:
+                for user_id in presence.heartbeat(dict(local_sockets)):
+                    presence_changes.record(user_id, was_online=True)
+            except Exception:
+                logger.warning('Presence heartbeat failed', exc_info=True)
+
+    def _flush():
+        while True:
+            socketio.sleep(flush_seconds)
+            try:
+                flush_presence(socketio)
+            except Exception:
+                logger.warning('Presence flush failed', exc_info=True)
+
+    socketio.start_background_task(_heartbeat)
+    if flush_seconds > 0:
+        socketio.start_background_task(_flush)
+
+
+def _join(room):
+    join_room(room)
+    get_presence().join(request.sid, room)
+
+
+def _leave(room):
+    leave_room(room)
+    get_presence().leave(request.sid, room)
+
+
 def register_socketio_events(socketio):
     """Register Socket.IO event handlers."""
 
+    def _session():
+        return get_presence().session(request.sid)
+
+    def _presence_changed(user_id, was_online):
+        presence_changes.record(user_id, was_online)
+        if float(current_app.config.get('PRESENCE_FLUSH_SECONDS', 2)) <= 0:
+            flush_presence(socketio)
+
+    def _contacts(user_id):
+        try:
+            return contact_ids(get_db(), user_id)
+        except Exception:
+            logger.warning('Could not load contacts of %s for presence', user_id, exc_info=True)
+            return set()
+
     @socketio.on('connect')
     def handle_connect():
         token = request.args.get('token')
         user_id, claims = _authenticate_socket(token)
         if not user_id:
             return False  # disconnect
-        connected_users[request.sid] = {'user_id': user_id, 'claims': claims}
-        online_user_ids = [session['user_id'] for session in connected_users.values()]
-        emit('connected', {'user_id': user_id, 'online_users': online_user_ids})
-        emit('status', {'event': 'online', 'user_id': user_id}, broadcast=True, include_self=False)
+        presence = get_presence()
+        first_tab = presence.connect(request.sid, user_id, claims.get('role'))
+        local_sockets[request.sid] = user_id
+        _start_background(socketio, float(current_app.config.get('PRESENCE_FLUSH_SECONDS', 2)))
+        _join(user_room(user_id))
+        if claims.get('role') in {'staff', 'admin'}:
+            _join(ADMIN_ROOM)
+
+        contacts = _contacts(user_id)
+        for contact_id in contacts:
+            # Not recorded in the store: Socket.IO drops these rooms on disconnect.
+            join_room(presence_room(contact_id))
+        emit('connected', {'user_id': user_id, 'online_users': sorted(presence.online_among(contacts))})
+        if first_tab:
+            _presence_changed(user_id, was_online=False)
 
     @socketio.on('disconnect')
     def handle_disconnect():
-        session = connected_users.pop(request.sid, None)
+        local_sockets.pop(request.sid, None)
+        session, went_offline = get_presence().disconnect(request.sid)
         if not session:
             return
-        uid = session['user_id']
-        if uid in user_rooms:
-            for room in list(user_rooms[uid]):
-                leave_room(room)
-            user_rooms.pop(uid, None)
-        emit('status', {'event': 'offline', 'user_id': uid}, broadcast=True)
+        for room in session['rooms']:
+            leave_room(room)
+        if went_offline:
+            _presence_changed(session['user_id'], was_online=True)
 
     @socketio.on('join_chat')
     def handle_join_chat(data):
-        session = connected_users.get(request.sid)
+        session = _session()
         if not session:
             return
         chat_id = data.get('chat_id')
         if not chat_id:
             return
-        join_room(_room_for_chat(chat_id))
-        user_rooms[session['user_id']].add(_room_for_chat(chat_id))
+        _join(_room_for_chat(chat_id))
         emit('joined_chat', {'chat_id': chat_id})
 
     @socketio.on('leave_chat')
     def handle_leave_chat(data):
-        session = connected_users.get(request.sid)
+        session = _session()
         if not session:
             return
         chat_id = data.get('chat_id')
         if not chat_id:
             return
-        leave_room(_room_for_chat(chat_id))
-        user_rooms[session['user_id']].discard(_room_for_chat(chat_id))
+        _leave(_room_for_chat(chat_id))
         emit('left_chat', {'chat_id': chat_id})
 
     @socketio.on('join_group')
     def handle_join_group(data):
-        session = connected_users.get(request.sid)
+        session = _session()
         if not session:
             return
         group_id = data.get('group_id')
         if not group_id:
             return
-        join_room(_room_for_group(group_id))
-        user_rooms[session['user_id']].add(_room_for_group(group_id))
+        _join(_room_for_group(group_id))
         emit('joined_group', {'group_id': group_id})
 
     @socketio.on('leave_group')
     def handle_leave_group(data):
-        session = connected_users.get(request.sid)
+        session = _session()
         if not session:
             return
         group_id = data.get('group_id')
         if not group_id:
             return
-        leave_room(_room_for_group(group_id))
-        user_rooms[session['user_id']].discard(_room_for_group(group_id))
+        _leave(_room_for_group(group_id))
         emit('left_group', {'group_id': group_id})
 
     @socketio.on('typing_indicator')
     def handle_typing_indicator(data):
-        session = connected_users.get(request.sid)
+        session = _session()
         if not session:
             return
         room = data.get('room')
@@ -121,7 +246,7 @@ def register_socketio_events(socketio):
 
     @socketio.on('send_message')
     def handle_send_message(data):
-        session = connected_users.get(request.sid)
+        session = _session()
         if not session:
             return
 
@@ -184,14 +309,22 @@ def register_socketio_events(socketio):
 
     @socketio.on('read_receipt')
     def handle_read_receipt(data):
-        session = connected_users.get(request.sid)
-        if not session:
+        """Move the reader's watermark to ``message_id``'s seq; the room hears only when it moved."""
+        session = _session()
+        target = _receipt_target(data, session['user_id']) if session else None
+        if not target:
             return
-        message_ids = data.get('message_ids') or []
-        if not message_ids:
-            return
-        ChatMessageHelper.mark_read(get_db(), message_ids, session['user_id'])
-        emit('read_receipt', {
-            'message_ids': message_ids,
-            'user_id': session['user_id'],
-        }, room=data.get('room'), include_self=False)
+        room, conversation_id, seq = target
+        if ChatReadStateHelper.mark_read(get_db(), session['user_id'], conversation_id, seq):
+            emit('read_receipt', {
+                'room': room,
+                'user_id': session['user_id'],
+                'read_up_to': seq,
+            }, room=room, include_self=False)
+
+    @socketio.on('delivery_receipt')
+    def handle_delivery_receipt(data):
+        session = _session()
+        target = _receipt_target(data, session['user_id']) if session else None
+        if target:
+            ChatReadStateHelper.mark_delivered(get_db(), session['user_id'], target[1], target[2])
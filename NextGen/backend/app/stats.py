@@ -0,0 +1,119 @@
+"""Scheduled jobs: dashboard counter reconciliation, daily rollups, the email outbox sweep and digests."""
+import threading
+from datetime import datetime, timedelta, timezone
+
+import click
+from flask.cli import AppGroup
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+from app.models.rollups import DailyRollupHelper
+from app.models.stats import StatsCounterHelper
+
+LEASE_COLLECTION = 'job_leases'
+
+
+def claim_lease(db, name, seconds):
+    """Take the ``name`` lease for ``seconds``; False while another worker holds it."""
+    now = datetime.now(timezone.utc)
+    try:
+        db[LEASE_COLLECTION].update_one(
+            {'_id': name, 'next_run_at': {'$lt': now}},
+            {'$set': {'next_run_at': now + timedelta(seconds=seconds)}},
+            upsert=True,
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+
+def reconcile_counters(db, interval_seconds, logger=None):
+    """Recount every counter unless another worker already did in this interval."""
+    if not claim_lease(db, 'stats_reconcile', interval_seconds):
+        return None
+    values = StatsCounterHelper.reconcile(db)
+    if logger:
+        logger.info('Stats counters reconciled: %s', values)
+    return values
+
+
+def refresh_rollups(db, interval_seconds, logger=None):
+    """Roll up the days closed since the last run, once per interval across workers."""
+    if not claim_lease(db, 'daily_rollups', interval_seconds):
+        return None
+    rolled = DailyRollupHelper.refresh(db)
+    if logger:
+        logger.info('Daily rollups refreshed: %s', rolled)
+    return rolled
+
+
+def sweep_outbox(db, interval_seconds, logger=None):
+    from app.worker.outbox import sweep
+
+    return sweep(db, interval_seconds, logger=logger)
+
+
+def send_digests(db, interval_seconds, logger=None):
+    from app.worker.digest import sweep
+
+    return sweep(db, interval_seconds, logger=logger)
+
+
+def _start_periodic(app, name, interval, job):
+    if interval <= 0:
+        return None
+    stop = threading.Event()
+
+    def _run():
+        from app.db import get_database
+
+        while not stop.wait(interval):
+            try:
+                with app.app_context():
+                    job(get_database(app.config), interval, logger=app.logger)
+            except PyMongoError as exc:
+                app.logger.warning('Scheduled job %s failed: %s', name, exc)
+            except Exception:
+                # broker, template or job bugs must not end the loop for the life of the process
+                app.logger.exception('Scheduled job %s failed', name)
+
+    thread = threading.Thread(target=_run, name=f'chronicle-{name}', daemon=True)
+    thread.stop = stop
+    thread.start()
+    return thread
+
+
+def start_scheduled_jobs(app):
+    """Start the scheduled jobs in daemon threads.
+
+    Every worker runs the loops, but a lease in ``job_leases`` lets only one
+    of them do the work per interval. An interval of 0 disables a job.
+    """
+    return [
+        _start_periodic(app, 'stats-reconcile', int(app.config.get('STATS_RECONCILE_SECONDS') or 0),
+                        reconcile_counters),
+        _start_periodic(app, 'daily-rollups', int(app.config.get('ROLLUP_REFRESH_SECONDS') or 0),
+                        refresh_rollups),
+        _start_periodic(app, 'outbox-sweep', int(app.config.get('OUTBOX_SWEEP_SECONDS') or 0), sweep_outbox),
+        _start_periodic(app, 'email-digests', int(app.config.get('DIGEST_SWEEP_SECONDS') or 0), send_digests),
+    ]
+
+
+stats_cli = AppGroup('chronicle-stats', help='Maintain the materialized dashboard counters and rollups.')
+
+
+@stats_cli.command('reconcile')
+def reconcile_command():
+    """Recount every dashboard counter from its source collection now."""
+    from app.db import get_db
+
+    for name, value in StatsCounterHelper.reconcile(get_db()).items():
+        click.echo(f'{name}: {value}')
+
+
+@stats_cli.command('rollup')
+def rollup_command():
+    """Roll up every closed day that is not stored yet."""
+    from app.db import get_db
+
+    for series, days in DailyRollupHelper.refresh(get_db()).items():
+        click.echo(f'{series}: {days} day(s) rolled up')
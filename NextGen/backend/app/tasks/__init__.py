@@ -4,6 +4,11 @@ from .background import (
     enqueue_pdf_generation,
     enqueue_image_optimization,
     enqueue_report_generation,
+    enqueue_email_batch,
+    enqueue_certificate_issuance,
+    enqueue_publication_notification,
+    enqueue_outbox_delivery,
+    enqueue_digest_delivery,
     celery_app,
 )
 
@@ -12,5 +17,10 @@ __all__ = [
     'enqueue_pdf_generation',
     'enqueue_image_optimization',
     'enqueue_report_generation',
+    'enqueue_email_batch',
+    'enqueue_certificate_issuance',
+    'enqueue_publication_notification',
+    'enqueue_outbox_delivery',
+    'enqueue_digest_delivery',
     'celery_app',
 ]
@@ -1,11 +1,15 @@
-"""Lightweight background task helpers with optional Celery integration."""
+"""Background task helpers: every enqueue creates a tracked job; Celery is optional."""
 import os
-from datetime import datetime
+
+from app.db import close_client, get_db
+from app.models.job import JobHelper
 
 try:
     from celery import Celery
+    from celery.signals import worker_process_shutdown
 except ImportError:  # pragma: no cover - Celery is optional
     Celery = None
+    worker_process_shutdown = None
 
 
 CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', os.getenv('REDIS_URL', 'redis://localhost:6379/2'))
@@ -14,38 +18,69 @@ CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', CELERY_BROKER_URL)
 celery_app = Celery('chronicle_tasks', broker=CELERY_BROKER_URL, backend=CELERY_RESULT_BACKEND) if Celery else None
 
 
-def _log_task(message, payload=None):
-    """Fallback logging when Celery is not configured."""
-    print(f"[BackgroundTask] {datetime.utcnow().isoformat()} :: {message} :: {payload or {}}")
+if worker_process_shutdown is not None:
+    @worker_process_shutdown.connect
+    def _close_mongo_client(**kwargs):
+        """Close the worker process's pooled MongoClient on shutdown."""
+        close_client()
+
+
+def _enqueue(task, payload, created_by=None):
+    """Record a ``jobs`` document for ``task`` and dispatch it; returns the job."""
+    from app.worker.executor import dispatch
+
+    job = JobHelper.create(get_db(), task, payload, created_by=created_by)
+    dispatch(job)
+    return job
 
 
-def enqueue_email_notification(recipient, subject, body):
+def enqueue_email_notification(recipient, subject, body, created_by=None):
     task_payload = {'recipient': recipient, 'subject': subject, 'body': body}
-    if celery_app:
-        celery_app.send_task('chronicle.email_notification', kwargs=task_payload)
-    else:
-        _log_task('Email notification queued (sync fallback)', task_payload)
+    return _enqueue('chronicle.email_notification', task_payload, created_by)
 
 
-def enqueue_pdf_generation(entity, entity_id):
-    task_payload = {'entity': entity, 'entity_id': entity_id}
-    if celery_app:
-        celery_app.send_task('chronicle.generate_pdf', kwargs=task_payload)
-    else:
-        _log_task('PDF generation fallback', task_payload)
+def enqueue_pdf_generation(entity, entity_id, created_by=None):
+    task_payload = {'entity': entity, 'entity_id': str(entity_id)}
+    return _enqueue('chronicle.generate_pdf', task_payload, created_by)
 
 
-def enqueue_image_optimization(path):
+def enqueue_image_optimization(path, created_by=None):
     task_payload = {'path': path}
-    if celery_app:
-        celery_app.send_task('chronicle.optimize_image', kwargs=task_payload)
-    else:
-        _log_task('Image optimization fallback', task_payload)
+    return _enqueue('chronicle.optimize_image', task_payload, created_by)
 
 
-def enqueue_report_generation(report_type, filters=None):
+def enqueue_report_generation(report_type, filters=None, created_by=None):
     task_payload = {'report_type': report_type, 'filters': filters or {}}
-    if celery_app:
-        celery_app.send_task('chronicle.generate_report', kwargs=task_payload)
-    else:
-        _log_task('Report generation fallback', task_payload)
+    return _enqueue('chronicle.generate_report', task_payload, created_by)
+
+
+def enqueue_email_batch(messages, created_by=None):
+    task_payload = {'messages': list(messages)}
+    return _enqueue('chronicle.email_batch', task_payload, created_by)
+
+
+def enqueue_certificate_issuance(certificate_type_id, issue_date, student_ids=None, filters=None, remarks=None,
+                                 notify=True, created_by=None):
+    task_payload = {
+        'certificate_type_id': str(certificate_type_id),
+        'issue_date': issue_date.isoformat(),
+        'student_ids': [str(student_id) for student_id in student_ids or []],
+        'filters': filters or {},
+        'remarks': remarks,
+        'notify': notify,
+    }
+    return _enqueue('chronicle.issue_certificates', task_payload, created_by)
+
+
+def enqueue_publication_notification(kind, entity_id, created_by=None):
+    task_payload = {'kind': kind, 'entity_id': str(entity_id)}
+    return _enqueue('chronicle.notify_publication', task_payload, created_by)
+
+
+def enqueue_outbox_delivery(created_by=None):
+    return _enqueue('chronicle.deliver_outbox', {}, created_by)
+
+
+def enqueue_digest_delivery(cutoff, created_by=None):
+    task_payload = {'cutoff': cutoff.isoformat()}
+    return _enqueue('chronicle.send_digests', task_payload, created_by)
@@ -3,6 +3,8 @@ from app.utils.decorators import student_required, staff_required, admin_require
 from app.utils.file_handler import FileHandler
 from app.utils.email import (
     send_email,
+    send_message,
+    send_batch_emails,
     send_welcome_email,
     send_password_reset_email,
     send_certificate_issued_email,
@@ -31,6 +33,8 @@ __all__ = [
     'admin_required',
     'FileHandler',
     'send_email',
+    'send_message',
+    'send_batch_emails',
     'send_welcome_email',
     'send_password_reset_email',
     'send_certificate_issued_email',
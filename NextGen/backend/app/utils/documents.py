@@ -0,0 +1,136 @@
+"""Cached PDFs (certificates, student reports) built from database records.
+
+Shared by the download endpoints and the background worker. Each helper
+reads the records, returns a ``PdfArtifact`` whose key identifies the
+rendered bytes, and only renders when that key is not cached yet.
+"""
+import os
+from datetime import datetime
+
+from app.utils.pdf_cache import artifact, ensure_rendered
+from app.utils.pdf_generator import (
+    STUDENT_REPORT_TEMPLATE_VERSION,
+    certificate_version,
+    render_certificate,
+    render_student_report,
+)
+
+
+def certificate_artifact(db, certificate, upload_folder, student=None, cert_type=None):
+    """Describe the certificate PDF without rendering it.
+
+    Pass ``student``/``cert_type`` when they are already loaded (bulk issuance).
+    """
+    if student is None:
+        student = db.students.find_one({'_id': certificate.get('student_id')})
+    if cert_type is None:
+        cert_type = db.certificate_types.find_one({'_id': certificate.get('certificate_type_id')})
+    if not student or not cert_type:
+        raise ValueError('Invalid certificate data')
+
+    payload = {
+        'student_name': student.get('name', 'Student'),
+        'roll_no': student.get('roll_no', '-'),
+        'course': student.get('course', '-'),
+        'certificate_type': cert_type.get('certificate_type', 'Certificate'),
+        'issue_date': certificate.get('issue_date'),
+        'certificate_id': str(certificate['_id']),
+    }
+    download_name = f"{student.get('roll_no', 'certificate')}_{cert_type.get('certificate_type', 'Certificate')}.pdf"
+    return artifact(
+        'certificate', certificate_version(), payload, render_certificate,
+        os.path.join(upload_folder, 'certificates'), download_name, prefix='certificate_',
+    )
+
+
+def certificate_artifacts(db, certificates, upload_folder):
+    """Artifacts for many certificates with one students query and one types query."""
+    student_ids = {certificate.get('student_id') for certificate in certificates}
+    type_ids = {certificate.get('certificate_type_id') for certificate in certificates}
+    projection = {'name': 1, 'roll_no': 1, 'course': 1}
+    students = {doc['_id']: doc for doc in db.students.find({'_id': {'$in': list(student_ids)}}, projection)}
+    cert_types = {doc['_id']: doc for doc in db.certificate_types.find({'_id': {'$in': list(type_ids)}})}
+    artifacts = []
+    for certificate in certificates:
+        student = students.get(certificate.get('student_id'))
+        cert_type = cert_types.get(certificate.get('certificate_type_id'))
+        if student and cert_type:
+            artifacts.append((certificate, certificate_artifact(db, certificate, upload_folder, student, cert_type)))
+    return artifacts
+
+
+def record_certificate_file(db, certificate, pdf):
+    """Point ``certificate_file`` at the cached PDF; no write when it already does."""
+    certificate_file = f'/uploads/certificates/{os.path.basename(pdf.path)}'
+    if certificate.get('certificate_file') != certificate_file:
+        db.certificates.update_one({'_id': certificate['_id']}, {'$set': {'certificate_file': certificate_file}})
+    return certificate_file
+
+
+def render_certificate_pdf(db, certificate, upload_folder):
+    """Render (or reuse) the certificate PDF and record its path; returns the artifact."""
+    pdf = certificate_artifact(db, certificate, upload_folder)
+    ensure_rendered(pdf)
+    record_certificate_file(db, certificate, pdf)
+    return pdf
+
+
+def student_report_artifact(db, student, upload_folder):
+    """Describe a student's quiz performance report without rendering it."""
+    quiz_results = list(db.quiz_attempts.aggregate([
+        {'$match': {'student_id': student['_id']}},
+        {'$lookup': {
+            'from': 'quizzes',
+            'localField': 'quiz_id',
+            'foreignField': '_id',
+            'as': 'quiz'
+        }},
+        {'$unwind': '$quiz'},
+        {'$project': {
+            'quiz_title': '$quiz.title',
+            'score': 1,
+            'total_marks': '$quiz.total_marks',
+            'percentage': 1,
+            'date': '$submitted_at'
+        }},
+        # Deterministic order keeps the cache key stable between calls.
+        {'$sort': {'date': 1, '_id': 1}},
+    ]))
+
+    formatted_results = []
+    for result in quiz_results:
+        submitted_at = result.get('date')
+        if isinstance(submitted_at, datetime):
+            submitted_str = submitted_at.strftime('%Y-%m-%d')
+        else:
+            submitted_str = str(submitted_at)
+        formatted_results.append({
+            'quiz_title': result.get('quiz_title'),
+            'score': result.get('score', 0),
+            'total_marks': result.get('total_marks', 0),
+            'percentage': result.get('percentage', 0),
+            'date': submitted_str,
+        })
+
+    payload = {
+        'student': {
+            'name': student.get('name'),
+            'roll_no': student.get('roll_no'),
+            'course': student.get('course'),
+            'semester': student.get('semester'),
+            'batch': student.get('batch', 'N/A'),
+        },
+        'quiz_results': formatted_results,
+    }
+    download_name = f"report_{student.get('roll_no') or student['_id']}.pdf"
+    return artifact(
+        'student_report', STUDENT_REPORT_TEMPLATE_VERSION, payload, render_student_report,
+        os.path.join(upload_folder, 'reports'), download_name, prefix='student_report_',
+    )
+
+
+def render_student_report_pdf(db, student, upload_folder):
+    """Render (or reuse) a student's performance report; returns the artifact."""
+    pdf = student_report_artifact(db, student, upload_folder)
+    ensure_rendered(pdf)
+    return pdf
@@ -1,15 +1,22 @@
-"""Email helper utilities using Resend."""
+"""Email helper utilities.
+
+Templates live in ``app.utils.email_templates``; delivery goes through
+``app.utils.mail_providers``.
+"""
 from __future__ import annotations
 
-import os
-import re
-from typing import List, Sequence, Union
+from typing import Dict, List, Sequence, Union
 
-import resend
 from flask import current_app
 
+from app.utils.email_templates import get_template
+from app.utils.mail_providers import EmailDeliveryError, get_provider, get_rate_limiter
+
 RecipientList = Union[str, Sequence[str]]
 
+# Resend accepts at most 100 emails per batch request.
+BATCH_LIMIT = 100
+
 
 def _normalize_recipients(recipients: RecipientList | None) -> List[str]:
     if not recipients:
@@ -31,205 +38,101 @@ def _render_template(template: str, **context) -> str:
         return template
 
 
-def _strip_html(html: str) -> str:
-    return re.sub(r'<[^>]+>', '', html)
-
-
-def send_email(to: RecipientList, subject: str, template: str, **context) -> bool:
-    """Send an HTML email using Resend."""
-    recipients = _normalize_recipients(to)
+def send_message(message: Dict[str, str]) -> bool:
+    """Send one pre-rendered ``{'to', 'subject', 'html', 'text'}`` message."""
+    recipients = _normalize_recipients(message.get('to'))
     if not recipients:
-        current_app.logger.warning('Email not sent because no recipients were supplied for "%s".', subject)
+        current_app.logger.warning('Email not sent because no recipients were supplied for "%s".',
+                                   message.get('subject'))
         return False
-
-    if not current_app:
+    try:
+        get_rate_limiter().wait()
+        response = get_provider().send(dict(message, to=recipients))
+        current_app.logger.info('Sent email "%s" to %s recipients. Response: %s',
+                                message['subject'], len(recipients), response)
+        return True
+    except Exception as exc:  # pragma: no cover - logging only
+        current_app.logger.error('Failed to send email "%s": %s', message.get('subject'), exc)
         return False
 
-    # Set Resend API key
-    resend.api_key = current_app.config.get('RESEND_API_KEY')
 
-    # Get sender email
-    sender = current_app.config.get('MAIL_DEFAULT_SENDER', 'chronicle@kmats.in')
+def send_email(to: RecipientList, subject: str, template: str, **context) -> bool:
+    """Send an HTML email rendered from an ad-hoc ``str.format`` template."""
+    return send_message({'to': to, 'subject': subject, 'html': _render_template(template, **context)})
 
-    # Render template
-    body = _render_template(template, **context)
 
-    try:
-        # Send email via Resend
-        params = {
-            "from": sender,
-            "to": recipients,
-            "subject": subject,
-            "html": body,
-        }
-
-        response = resend.Emails.send(params)
-        current_app.logger.info('Sent email "%s" to %s recipients. Response: %s', subject, len(recipients), response)
-        return True
-    except Exception as exc:  # pragma: no cover - logging only
-        current_app.logger.error('Failed to send email "%s": %s', subject, exc)
-        return False
+def send_batch_emails(messages: Sequence[Dict[str, str]]) -> int:
+    """Send pre-rendered ``{'to', 'subject', 'html', 'text'}`` messages, ``BATCH_LIMIT`` per API call.
+
+    Every message goes to its own recipient. Returns how many were accepted;
+    a rejected chunk is logged and skipped.
+    """
+    messages = [message for message in messages if _normalize_recipients(message.get('to'))]
+    if not messages:
+        return 0
+
+    provider = get_provider()
+    limiter = get_rate_limiter()
+    sent = 0
+    for start in range(0, len(messages), BATCH_LIMIT):
+        chunk = messages[start:start + BATCH_LIMIT]
+        try:
+            limiter.wait()
+            provider.send_batch(chunk)
+            sent += len(chunk)
+        except EmailDeliveryError as exc:
+            current_app.logger.error('Failed to send %s batched emails: %s', len(chunk), exc)
+    current_app.logger.info('Sent %s of %s batched emails.', sent, len(messages))
+    return sent
 
 
 def send_welcome_email(student_email: str, student_name: str) -> bool:
-    template = """
-    <html>
-        <body style="font-family: Arial, sans-serif; padding: 20px;">
-            <h2>Welcome to Chronicle College Social Network!</h2>
-            <p>Dear {name},</p>
-            <p>Your account has been successfully created. You can now login and access all features.</p>
-            <p>Please keep your login credentials secure.</p>
-            <br>
-            <p>Best regards,<br>Chronicle College Administration</p>
-        </body>
-    </html>
-    """
-    return send_email(
-        student_email,
-        'Welcome to Chronicle College',
-        template,
-        name=student_name,
-    )
+    return send_message(get_template('welcome').message(student_email, name=student_name))
 
 
 def send_password_reset_email(email: str, name: str, reset_token: str) -> bool:
-    template = """
-    <html>
-        <body style="font-family: Arial, sans-serif; padding: 20px;">
-            <h2>Password Reset Request</h2>
-            <p>Dear {name},</p>
-            <p>You have requested to reset your password. Use the following token to reset your password:</p>
-            <div style="background-color: #f0f0f0; padding: 20px; margin: 20px 0; border-radius: 5px;">
-                <p style="margin: 0; font-size: 14px; color: #666;">Reset Token:</p>
-                <p style="margin: 10px 0 0 0; font-family: monospace; font-size: 16px; word-break: break-all;">
-                    {token}
-                </p>
-            </div>
-            <p><strong>This token will expire in 1 hour.</strong></p>
-            <p>If you did not request this reset, please ignore this email.</p>
-            <br>
-            <p>Best regards,<br>Chronicle College Administration</p>
-        </body>
-    </html>
-    """
-    return send_email(
-        email,
-        'Password Reset Request - Chronicle College',
-        template,
-        name=name,
-        token=reset_token,
-    )
+    return send_message(get_template('password_reset').message(email, name=name, token=reset_token))
+
+
+def certificate_issued_message(email: str, student_name: str, certificate_type: str) -> Dict[str, str]:
+    """Build the certificate-issued email as a ``send_batch_emails`` message."""
+    return get_template('certificate_issued').message(email, name=student_name, cert_type=certificate_type)
 
 
 def send_certificate_issued_email(email: str, student_name: str, certificate_type: str) -> bool:
-    template = """
-    <html>
-        <body style="font-family: Arial, sans-serif; padding: 20px;">
-            <h2>Certificate Issued</h2>
-            <p>Dear {name},</p>
-            <p>A <strong>{cert_type}</strong> has been issued to you.</p>
-            <p>You can download your certificate by logging into your account and visiting the "My Certificates" section.</p>
-            <br>
-            <p>Best regards,<br>Chronicle College Administration</p>
-        </body>
-    </html>
-    """
-    return send_email(
-        email,
-        f'{certificate_type} Issued - Chronicle College',
-        template,
-        name=student_name,
-        cert_type=certificate_type,
-    )
+    return send_message(certificate_issued_message(email, student_name, certificate_type))
+
+
+def quiz_published_message(email: str, student_name: str, quiz_title: str, subject_name: str) -> Dict[str, str]:
+    """Build the quiz-published email as a ``send_batch_emails`` message."""
+    return get_template('quiz_published').message(email, name=student_name, quiz=quiz_title, subject=subject_name)
 
 
 def send_quiz_published_email(email: str, student_name: str, quiz_title: str, subject_name: str) -> bool:
-    template = """
-    <html>
-        <body style="font-family: Arial, sans-serif; padding: 20px;">
-            <h2>New Quiz Available</h2>
-            <p>Dear {name},</p>
-            <p>A new quiz "<strong>{quiz}</strong>" has been published for <strong>{subject}</strong>.</p>
-            <p>Login to your account to attempt the quiz.</p>
-            <br>
-            <p>Best regards,<br>Chronicle College Administration</p>
-        </body>
-    </html>
-    """
-    return send_email(
-        email,
-        f'New Quiz: {quiz_title}',
-        template,
-        name=student_name,
-        quiz=quiz_title,
-        subject=subject_name,
-    )
+    return send_message(quiz_published_message(email, student_name, quiz_title, subject_name))
+
+
+def notice_message(email: RecipientList, student_name: str, notice_title: str, notice_type: str) -> Dict[str, str]:
+    """Build the new-notice email as a ``send_batch_emails`` message."""
+    return get_template('notice').message(email, name=student_name, title=notice_title, type=notice_type)
 
 
 def send_notice_email(email: RecipientList, student_name: str, notice_title: str, notice_type: str) -> bool:
-    template = """
-    <html>
-        <body style="font-family: Arial, sans-serif; padding: 20px;">
-            <h2>New {type}: {title}</h2>
-            <p>Dear {name},</p>
-            <p>A new {type} has been posted on Chronicle College Social Network.</p>
-            <p>Please login to view the complete details.</p>
-            <br>
-            <p>Best regards,<br>Chronicle College Administration</p>
-        </body>
-    </html>
-    """
-    return send_email(
-        email,
-        f'New {notice_type}: {notice_title}',
-        template,
-        name=student_name,
-        title=notice_title,
-        type=notice_type,
+    return send_message(notice_message(email, student_name, notice_title, notice_type))
+
+
+def study_material_message(email: str, student_name: str, material_title: str, subject_name: str) -> Dict[str, str]:
+    """Build the new-material email as a ``send_batch_emails`` message."""
+    return get_template('study_material').message(
+        email, name=student_name, material=material_title, subject=subject_name,
     )
 
 
 def send_study_material_email(email: str, student_name: str, material_title: str, subject_name: str) -> bool:
-    template = """
-    <html>
-        <body style="font-family: Arial, sans-serif; padding: 20px;">
-            <h2>New Study Material Available</h2>
-            <p>Dear {name},</p>
-            <p>New study material "<strong>{material}</strong>" has been uploaded for <strong>{subject}</strong>.</p>
-            <p>Login to download and access the material.</p>
-            <br>
-            <p>Best regards,<br>Chronicle College Administration</p>
-        </body>
-    </html>
-    """
-    return send_email(
-        email,
-        f'New Study Material: {material_title}',
-        template,
-        name=student_name,
-        material=material_title,
-        subject=subject_name,
-    )
+    return send_message(study_material_message(email, student_name, material_title, subject_name))
 
 
 def send_discussion_reply_email(email: str, recipient_name: str, discussion_title: str, replier_name: str) -> bool:
-    template = """
-    <html>
-        <body style="font-family: Arial, sans-serif; padding: 20px;">
-            <h2>New Reply to Your Discussion</h2>
-            <p>Dear {name},</p>
-            <p><strong>{replier}</strong> just replied to your discussion "<strong>{title}</strong>".</p>
-            <p>Login to Chronicle College to read the full response and continue the conversation.</p>
-            <br>
-            <p>Best regards,<br>Chronicle College Administration</p>
-        </body>
-    </html>
-    """
-    return send_email(
-        email,
-        f'New Reply: {discussion_title}',
-        template,
-        name=recipient_name,
-        replier=replier_name,
-        title=discussion_title,
-    )
+    return send_message(get_template('discussion_reply').message(
+        email, name=recipient_name, replier=replier_name, title=discussion_title,
+    ))
@@ -0,0 +1,259 @@
+"""Registry of the HTML email templates, compiled once at import.
+
+Each template is parsed into literal/field segments a single time and gets a
+plain-text twin derived from its source, so no regex runs per message.
+``bind(**shared)`` renders the fields shared by a whole fan-out (notice
+title, quiz name, ...) up front; the bound template then only joins the
+cached literal runs with the per-recipient fields (usually just ``name``).
+Values are HTML-escaped in the HTML part and inserted as-is in the text part;
+a ``Fragment`` carries pre-rendered markup for the HTML part instead.
+"""
+from __future__ import annotations
+
+import html
+import re
+from string import Formatter
+from typing import Dict, List, Tuple
+
+_LINE_BREAK_TAGS = re.compile(r'<br\s*/?>|</(p|h[1-6]|div|li|tr)>', re.IGNORECASE)
+_TAGS = re.compile(r'<[^>]+>')
+
+
+def html_to_text(source: str) -> str:
+    """Plain-text version of an HTML snippet: tags dropped, one block per line."""
+    text = _TAGS.sub('', _LINE_BREAK_TAGS.sub('\n', source))
+    lines = (' '.join(line.split()) for line in text.splitlines())
+    paragraphs = []
+    for line in lines:
+        if line or (paragraphs and paragraphs[-1]):
+            paragraphs.append(line)
+    # Entities are unescaped per literal in _compile so that values stay untouched.
+    return '\n'.join(paragraphs).strip()
+
+
+Segment = Tuple[str, str]  # (literal, field) -- field is '' after the last literal
+
+
+def _compile(source: str, unescape: bool = False) -> List[Segment]:
+    segments = []
+    for literal, field, spec, conversion in Formatter().parse(source):
+        if spec or conversion:
+            raise ValueError(f'Email templates support plain {{field}} placeholders only: {field!r}')
+        if unescape:
+            literal = html.unescape(literal)
+        segments.append((literal, field or ''))
+    return segments
+
+
+def _bind(segments: List[Segment], shared: Dict[str, str], escape) -> List[Segment]:
+    """Substitute ``shared`` fields and merge the literal runs around them."""
+    bound = []
+    pending = ''
+    for literal, field in segments:
+        pending += literal
+        if not field:
+            continue
+        if field in shared:
+            pending += escape(shared[field])
+        else:
+            bound.append((pending, field))
+            pending = ''
+    bound.append((pending, ''))
+    return bound
+
+
+def _renderer(segments: List[Segment], escape):
+    """A ``context -> str`` callable; the common one-field case is prefix + value + suffix."""
+    if len(segments) == 1:
+        literal = segments[0][0]
+        return lambda context: literal
+    if len(segments) == 2:
+        (prefix, field), (suffix, _) = segments
+        return lambda context: prefix + escape(context[field]) + suffix
+    return lambda context: ''.join(literal + (escape(context[field]) if field else '')
+                                   for literal, field in segments)
+
+
+class Fragment(str):
+    """Pre-rendered content: the string itself is the text part, ``html`` goes in unescaped."""
+
+    def __new__(cls, text: str, markup: str):
+        fragment = super().__new__(cls, text)
+        fragment.markup = markup
+        return fragment
+
+    def __html__(self) -> str:
+        return self.markup
+
+
+def _escape_html(value) -> str:
+    render = getattr(value, '__html__', None)
+    return render() if render else html.escape(str(value))
+
+
+_as_text = str
+
+
+class BoundTemplate:
+    """A template with its shared fields rendered; ``message`` fills in the rest."""
+
+    def __init__(self, template: 'EmailTemplate', shared: Dict[str, str]):
+        self.name = template.name
+        self._subject = _renderer(_bind(template.subject_segments, shared, _as_text), _as_text)
+        self._html = _renderer(_bind(template.html_segments, shared, _escape_html), _escape_html)
+        self._text = _renderer(_bind(template.text_segments, shared, _as_text), _as_text)
+
+    def message(self, to, **context) -> Dict[str, str]:
+        """A ``{'to', 'subject', 'html', 'text'}`` message for one recipient."""
+        return {
+            'to': to,
+            'subject': self._subject(context),
+            'html': self._html(context),
+            'text': self._text(context),
+        }
+
+
+class EmailTemplate:
+    """Subject and HTML body with ``{field}`` placeholders, compiled once."""
+
+    def __init__(self, name: str, subject: str, body: str):
+        self.name = name
+        self.subject_segments = _compile(subject)
+        self.html_segments = _compile(body)
+        self.text_segments = _compile(html_to_text(body), unescape=True)
+        self.fields = {field for _, field in self.html_segments + self.subject_segments if field}
+
+    def bind(self, **shared) -> BoundTemplate:
+        return BoundTemplate(self, shared)
+
+    def message(self, to, **context) -> Dict[str, str]:
+        return self.bind().message(to, **context)
+
+
+TEMPLATES: Dict[str, EmailTemplate] = {}
+
+
+def register(name: str, subject: str, body: str) -> EmailTemplate:
+    template = EmailTemplate(name, subject, body)
+    TEMPLATES[name] = template
+    return template
+
+
+def get_template(name: str) -> EmailTemplate:
+    try:
+        return TEMPLATES[name]
+    except KeyError:
+        raise ValueError(f'Unknown email template: {name}') from None
+
+
+register('welcome', 'Welcome to Chronicle College', """
+    <html>
+        <body style="font-family: Arial, sans-serif; padding: 20px;">
+            <h2>Welcome to Chronicle College Social Network!</h2>
+            <p>Dear {name},</p>
+            <p>Your account has been successfully created. You can now login and access all features.</p>
+            <p>Please keep your login credentials secure.</p>
+            <br>
+            <p>Best regards,<br>Chronicle College Administration</p>
+        </body>
+    </html>
+    """)
+
+register('password_reset', 'Password Reset Request - Chronicle College', """
+    <html>
+        <body style="font-family: Arial, sans-serif; padding: 20px;">
+            <h2>Password Reset Request</h2>
+            <p>Dear {name},</p>
+            <p>You have requested to reset your password. Use the following token to reset your password:</p>
+            <div style="background-color: #f0f0f0; padding: 20px; margin: 20px 0; border-radius: 5px;">
+                <p style="margin: 0; font-size: 14px; color: #666;">Reset Token:</p>
+                <p style="margin: 10px 0 0 0; font-family: monospace; font-size: 16px; word-break: break-all;">
+                    {token}
+                </p>
+            </div>
+            <p><strong>This token will expire in 1 hour.</strong></p>
+            <p>If you did not request this reset, please ignore this email.</p>
+            <br>
+            <p>Best regards,<br>Chronicle College Administration</p>
+        </body>
+    </html>
+    """)
+
+register('certificate_issued', '{cert_type} Issued - Chronicle College', """
+    <html>
+        <body style="font-family: Arial, sans-serif; padding: 20px;">
+            <h2>Certificate Issued</h2>
+            <p>Dear {name},</p>
+            <p>A <strong>{cert_type}</strong> has been issued to you.</p>
+            <p>You can download your certificate by logging into your account and visiting the "My Certificates" section.</p>
+            <br>
+            <p>Best regards,<br>Chronicle College Administration</p>
+        </body>
+    </html>
+    """)
+
+register('quiz_published', 'New Quiz: {quiz}', """
+    <html>
+        <body style="font-family: Arial, sans-serif; padding: 20px;">
+            <h2>New Quiz Available</h2>
+            <p>Dear {name},</p>
+            <p>A new quiz "<strong>{quiz}</strong>" has been published for <strong>{subject}</strong>.</p>
+            <p>Login to your account to attempt the quiz.</p>
+            <br>
+            <p>Best regards,<br>Chronicle College Administration</p>
+        </body>
+    </html>
+    """)
+
+register('notice', 'New {type}: {title}', """
+    <html>
+        <body style="font-family: Arial, sans-serif; padding: 20px;">
+            <h2>New {type}: {title}</h2>
+            <p>Dear {name},</p>
+            <p>A new {type} has been posted on Chronicle College Social Network.</p>
+            <p>Please login to view the complete details.</p>
+            <br>
+            <p>Best regards,<br>Chronicle College Administration</p>
+        </body>
+    </html>
+    """)
+
+register('study_material', 'New Study Material: {material}', """
+    <html>
+        <body style="font-family: Arial, sans-serif; padding: 20px;">
+            <h2>New Study Material Available</h2>
+            <p>Dear {name},</p>
+            <p>New study material "<strong>{material}</strong>" has been uploaded for <strong>{subject}</strong>.</p>
+            <p>Login to download and access the material.</p>
+            <br>
+            <p>Best regards,<br>Chronicle College Administration</p>
+        </body>
+    </html>
+    """)
+
+register('discussion_reply', 'New Reply: {title}', """
+    <html>
+        <body style="font-family: Arial, sans-serif; padding: 20px;">
+            <h2>New Reply to Your Discussion</h2>
+            <p>Dear {name},</p>
+            <p><strong>{replier}</strong> just replied to your discussion "<strong>{title}</strong>".</p>
+            <p>Login to Chronicle College to read the full response and continue the conversation.</p>
+            <br>
+            <p>Best regards,<br>Chronicle College Administration</p>
+        </body>
+    </html>
+    """)
+
+register('digest', 'Your {period} digest: {count} update(s) from Chronicle College', """
+    <html>
+        <body style="font-family: Arial, sans-serif; padding: 20px;">
+            <h2>Your {period} digest</h2>
+            <p>Dear {name},</p>
+            <p>Here is what was posted on Chronicle College Social Network since your last digest:</p>
+            {items}
+            <p>Login to your account to view the complete details.</p>
+            <br>
+            <p>Best regards,<br>Chronicle College Administration</p>
+        </body>
+    </html>
+    """)
@@ -0,0 +1,115 @@
+"""Streaming CSV / NDJSON / ZIP exports built straight from MongoDB cursors."""
+import csv
+import io
+import zipfile
+from itertools import islice
+
+from flask import Response, stream_with_context
+
+from app.utils.serialization import dumps
+
+EXPORT_FORMATS = ('json', 'csv', 'ndjson')
+STREAM_BATCH_SIZE = 500
+
+_MIMETYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def iter_batches(iterable, size=STREAM_BATCH_SIZE):
+    """Yield lists of up to ``size`` items without materializing the source."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _csv_chunks(rows, columns, batch_size):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore', lineterminator='\n')
+    writer.writeheader()
+    # The header goes out before the first cursor batch is fetched.
+    yield buffer.getvalue().encode('utf-8')
+    for batch in iter_batches(rows, batch_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(batch)
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _ndjson_chunks(rows, batch_size):
+    for batch in iter_batches(rows, batch_size):
+        yield b''.join(dumps(row) + b'\n' for row in batch)
+
+
+def encode_rows(rows, columns, fmt, batch_size=STREAM_BATCH_SIZE):
+    """Yield ``rows`` encoded as CSV or NDJSON, one bytes chunk per batch."""
+    if fmt == 'csv':
+        return _csv_chunks(rows, columns, batch_size)
+    return _ndjson_chunks(rows, batch_size)
+
+
+def stream_rows(rows, columns, fmt, filename, batch_size=STREAM_BATCH_SIZE):
+    """Stream ``rows`` (a lazy iterable of dicts) as a CSV or NDJSON attachment.
+
+    Rows are encoded ``batch_size`` at a time, so memory stays bounded by one
+    batch however large the export is. Pass a cursor-backed generator with a
+    matching ``cursor.batch_size`` so each chunk is one MongoDB round trip.
+    """
+    return Response(
+        stream_with_context(encode_rows(rows, columns, fmt, batch_size)),
+        mimetype=_MIMETYPES[fmt],
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}.{fmt}"',
+            'Cache-Control': 'no-store',
+            # Stop nginx from buffering the whole body before the first byte.
+            'X-Accel-Buffering': 'no',
+        },
+    )
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, non-seekable sink that hands written bytes back in chunks."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _zip_chunks(files):
+    # Without seek(), zipfile writes data descriptors, so nothing is buffered
+    # beyond the member being added. PDFs are already compressed: store them.
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for arcname, path in files:
+            archive.write(path, arcname)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def stream_zip(files, filename):
+    """Stream ``(arcname, path)`` pairs as a ZIP attachment, one member at a time."""
+    return Response(
+        stream_with_context(_zip_chunks(files)),
+        mimetype='application/zip',
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}.zip"',
+            'Cache-Control': 'no-store',
+            'X-Accel-Buffering': 'no',
+        },
+    )
@@ -183,3 +183,11 @@ class FileHandler:
         if not filename:
             return None
         return f"{base_url}/{filename}"
+
+    @staticmethod
+    def upload_url(path):
+        """Get full URL for a stored ``/uploads/...`` path (other paths are used as-is)."""
+        if not path:
+            return None
+        relative = path.replace('/uploads/', '') if path.startswith('/uploads/') else path
+        return FileHandler.get_file_url(relative)
@@ -0,0 +1,181 @@
+"""Email delivery providers behind ``EMAIL_PROVIDER``.
+
+``resend`` posts to the Resend HTTP API over one pooled ``requests.Session``
+per process (the ``resend`` SDK opens a new connection for every call), and
+``fake`` keeps messages in memory for tests and local development. Both
+raise ``EmailDeliveryError`` so the outbox worker can tell retryable
+failures (throttling, 5xx, network) from permanent ones.
+"""
+import logging
+import os
+import threading
+import time
+
+import requests
+import resend
+from flask import current_app, has_app_context
+
+logger = logging.getLogger(__name__)
+
+PROVIDERS = ('resend', 'fake')
+
+_providers = {}
+_limiters = {}
+_lock = threading.Lock()
+
+
+class EmailDeliveryError(Exception):
+    """A send failed; ``retryable`` says whether trying again later can help."""
+
+    def __init__(self, message, retryable=True, retry_after=None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Space calls at least ``1 / rate`` seconds apart across threads (0 disables)."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+class ResendProvider:
+    """Resend HTTP API over a keep-alive session."""
+
+    name = 'resend'
+
+    def __init__(self, api_key, sender, api_url=None, timeout=10):
+        self.sender = sender
+        self.api_url = (api_url or resend.api_url).rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Accept': 'application/json',
+            'Authorization': f'Bearer {api_key}',
+            'User-Agent': 'chronicle-mailer',
+        })
+
+    def _post(self, path, payload):
+        try:
+            response = self.session.post(f'{self.api_url}{path}', json=payload, timeout=self.timeout)
+        except requests.RequestException as exc:
+            raise EmailDeliveryError(f'Resend request failed: {exc}') from exc
+        if response.status_code < 300:
+            return response.json() if response.content else {}
+
+        retry_after = response.headers.get('Retry-After')
+        try:
+            detail = response.json().get('message') or response.text
+        except ValueError:
+            detail = response.text
+        raise EmailDeliveryError(
+            f'Resend returned {response.status_code}: {detail}',
+            retryable=response.status_code == 429 or response.status_code >= 500,
+            retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None,
+        )
+
+    def _params(self, message):
+        to = message['to']
+        params = {
+            'from': self.sender,
+            'to': [to] if isinstance(to, str) else list(to),
+            'subject': message['subject'],
+            'html': message['html'],
+        }
+        if message.get('text'):
+            params['text'] = message['text']
+        return params
+
+    def send(self, message):
+        """Send one message; returns the provider message id."""
+        return self._post('/emails', self._params(message)).get('id')
+
+    def send_batch(self, messages):
+        """Send up to 100 messages in one request; returns the provider ids."""
+        body = self._post('/emails/batch', [self._params(message) for message in messages])
+        return [item.get('id') for item in body.get('data', [])]
+
+
+class FakeProvider:
+    """Keeps sent messages in ``sent``; queue exceptions in ``failures`` to script errors."""
+
+    name = 'fake'
+
+    def __init__(self, sender='chronicle@localhost'):
+        self.sender = sender
+        self.sent = []
+        self.requests = 0
+        self.failures = []
+        self._lock = threading.Lock()
+
+    def send(self, message):
+        return self.send_batch([message])[0]
+
+    def send_batch(self, messages):
+        with self._lock:
+            self.requests += 1
+            if self.failures:
+                raise self.failures.pop(0)
+            start = len(self.sent)
+            self.sent.extend(dict(message, **{'from': self.sender}) for message in messages)
+            return [f'fake-{index}' for index in range(start, len(self.sent))]
+
+
+def _config(key, default=None):
+    if has_app_context():
+        value = current_app.config.get(key)
+        return default if value is None else value
+    return default
+
+
+def get_provider():
+    """The process-wide provider for the configured ``EMAIL_PROVIDER``."""
+    name = (_config('EMAIL_PROVIDER') or 'resend').lower()
+    if name not in PROVIDERS:
+        raise ValueError(f'Unknown EMAIL_PROVIDER: {name}')
+    sender = _config('MAIL_DEFAULT_SENDER', 'chronicle@kmats.in')
+    api_key = _config('RESEND_API_KEY')
+    key = (name, sender, api_key)
+    provider = _providers.get(key)
+    if provider is None:
+        with _lock:
+            provider = _providers.get(key)
+            if provider is None:
+                provider = FakeProvider(sender) if name == 'fake' else ResendProvider(api_key, sender)
+                _providers[key] = provider
+    return provider
+
+
+def get_rate_limiter():
+    """The process-wide limiter for provider requests (``EMAIL_RATE_LIMIT`` per second)."""
+    rate = float(_config('EMAIL_RATE_LIMIT', 2) or 0)
+    limiter = _limiters.get(rate)
+    if limiter is None:
+        with _lock:
+            limiter = _limiters.setdefault(rate, RateLimiter(rate))
+    return limiter
+
+
+def _reset_after_fork():
+    """HTTP connections must not be shared with a forked child."""
+    global _lock
+    _providers.clear()
+    _limiters.clear()
+    _lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -42,7 +42,7 @@ def resolve_subject_name(db, subject_id) -> Optional[str]:
     return subject.get('subject_name') or subject.get('subject_code')
 
 
-def _student_query(course_name=None, semester=None) -> Dict:
+def student_recipients_query(course_name=None, semester=None) -> Dict:
     query = {'status': 'Active'}
     if course_name:
         query['course'] = course_name
@@ -56,14 +56,14 @@ def _extract_recipient(doc, fallback_name='Member') -> Optional[Dict[str, str]]:
     if not email:
         return None
     name = doc.get('name') or doc.get('login_id') or fallback_name
-    return {'email': email, 'name': name}
+    return {'id': doc['_id'], 'email': email, 'name': name}
 
 
 def get_student_recipients(db, course_name=None, semester=None, fallback_to_all=False) -> List[Dict[str, str]]:
     """Return active students filtered by course/semester."""
     recipients = []
     projection = {'email': 1, 'name': 1, 'course': 1, 'semester': 1}
-    query = _student_query(course_name, semester)
+    query = student_recipients_query(course_name, semester)
 
     for student in db.students.find(query, projection):
         contact = _extract_recipient(student, fallback_name='Student')
@@ -79,11 +79,15 @@ def get_student_recipients(db, course_name=None, semester=None, fallback_to_all=
     return recipients
 
 
+def staff_recipients_query() -> Dict:
+    return {'status': 'Active'}
+
+
 def get_staff_recipients(db) -> List[Dict[str, str]]:
     """Return active staff/admin users with email addresses."""
     recipients = []
     projection = {'email': 1, 'name': 1, 'login_id': 1}
-    for user in db.users.find({'status': 'Active'}, projection):
+    for user in db.users.find(staff_recipients_query(), projection):
         contact = _extract_recipient(user, fallback_name='Staff')
         if contact:
             recipients.append(contact)
@@ -0,0 +1,106 @@
+"""Bounded fan-out for endpoints that run several independent read queries."""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from flask import current_app, has_app_context
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _config(key, default):
+    if has_app_context():
+        return int(current_app.config.get(key) or default)
+    return default
+
+
+def query_timeout_ms():
+    """Per-query budget; pass it to MongoDB as ``maxTimeMS`` so abandoned queries stop server-side too."""
+    return _config('QUERY_TIMEOUT_MS', 2000)
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=_config('QUERY_MAX_WORKERS', 8),
+                thread_name_prefix='chronicle-query',
+            )
+        return _pool
+
+
+class QueryResults:
+    """Values, timings and failures of one ``run_parallel`` call."""
+
+    def __init__(self):
+        self.values = {}
+        self.timings = {}
+        self.status = {}
+
+    @property
+    def partial(self):
+        return any(status != 'ok' for status in self.status.values())
+
+    def get(self, name, default=None):
+        return self.values.get(name, default)
+
+    def report(self):
+        return {
+            name: {'ms': round(self.timings[name], 2), 'status': self.status[name]}
+            for name in self.status
+        }
+
+    def server_timing(self):
+        """Value for a ``Server-Timing`` response header."""
+        return ', '.join(
+            f'{name};dur={self.timings[name]:.1f};desc="{self.status[name]}"' for name in self.status
+        )
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    try:
+        return fn(), None, (time.perf_counter() - start) * 1000
+    except Exception as exc:
+        return None, exc, (time.perf_counter() - start) * 1000
+
+
+def run_parallel(queries, timeout_ms=None):
+    """Run ``{name: callable}`` concurrently on the shared pool.
+
+    Callables run outside the request context, so they should close over
+    the request's ``db`` rather than call ``get_db()``; the pooled client is
+    thread-safe. A query that fails or exceeds ``timeout_ms`` is reported
+    with status ``error``/``timeout`` and left out of ``values``, so callers
+    fall back to defaults and still answer with partial results.
+    """
+    timeout_ms = timeout_ms or query_timeout_ms()
+    results = QueryResults()
+    pool = _get_pool()
+    started = time.perf_counter()
+    futures = {name: pool.submit(_timed, fn) for name, fn in queries.items()}
+    wait(futures.values(), timeout=timeout_ms / 1000)
+
+    for name, future in futures.items():
+        if not future.done():
+            future.cancel()
+            results.status[name] = 'timeout'
+            results.timings[name] = (time.perf_counter() - started) * 1000
+            continue
+        value, error, elapsed = future.result()
+        results.timings[name] = elapsed
+        if error is not None:
+            logger.warning('Query %s failed: %s', name, error)
+            results.status[name] = 'error'
+            continue
+        results.values[name] = value
+        results.status[name] = 'ok'
+
+    if results.partial:
+        logger.warning('Partial results: %s', results.report())
+    return results
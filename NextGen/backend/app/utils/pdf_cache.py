@@ -0,0 +1,265 @@
+"""Content-addressed cache for generated PDFs.
+
+A PDF is stored as ``<prefix><key>.pdf`` where ``key`` hashes the render
+payload together with the template version, so an unchanged certificate or
+report is never rendered twice and the key doubles as a strong ``ETag``.
+Renders run in a small process pool off the request thread, and the cached
+files of each prefix are trimmed back to ``PDF_CACHE_MAX_BYTES`` (least
+recently served first) after every render. Eviction only ever touches
+``<prefix><key>.pdf`` names, so other files sharing the directory are safe. Pool processes are spawned rather than forked,
+since the server process runs many threads (Socket.IO, the scheduler) whose
+locks a forked child would inherit mid-use.
+"""
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import re
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+from flask import Response, current_app, has_app_context, request, send_file
+
+logger = logging.getLogger(__name__)
+
+PdfArtifact = namedtuple('PdfArtifact', 'key path download_name render payload prefix')
+
+LOCK_STRIPES = 64
+
+_pool = None
+_pool_lock = threading.Lock()
+_daemon_warned = False
+# Striped by path, so the number of locks stays fixed however many PDFs are served.
+_render_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+
+class RenderTimeout(RuntimeError):
+    """A render outlived ``PDF_RENDER_TIMEOUT``; the pool running it was torn down."""
+
+
+def _config(key, default):
+    if has_app_context():
+        value = current_app.config.get(key)
+        return default if value is None else int(value)
+    return default
+
+
+def _reset_after_fork():
+    """A forked server worker must not reuse the parent's render pool."""
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+    _render_locks[:] = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def cache_key(kind, version, payload):
+    """Stable hash of everything that affects the rendered bytes."""
+    material = json.dumps(
+        {'kind': kind, 'version': version, 'payload': payload},
+        sort_keys=True, default=_json_default, separators=(',', ':'),
+    )
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()[:32]
+
+
+def artifact(kind, version, payload, render, directory, download_name, prefix=''):
+    """Describe a cached PDF; nothing is rendered until ``ensure_rendered``."""
+    key = cache_key(kind, version, payload)
+    return PdfArtifact(key, os.path.join(directory, f'{prefix}{key}.pdf'), download_name, render, payload, prefix)
+
+
+def _get_pool(workers):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def _render_pool():
+    """The shared render pool, or None when renders must stay in-process."""
+    global _daemon_warned
+    workers = _config('PDF_RENDER_WORKERS', 2)
+    if workers <= 0:
+        return None
+    # Celery prefork children are daemonic and may not start processes.
+    if multiprocessing.current_process().daemon:
+        if not _daemon_warned:
+            logger.warning('Daemonic worker process (Celery prefork pool?): PDFs render serially in-process; '
+                           'run the worker with --pool threads.')
+            _daemon_warned = True
+        return None
+    return _get_pool(workers)
+
+
+def _discard_pool(terminate=False):
+    """Drop the shared pool; ``terminate`` also stops renders still running in it."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is None or not terminate:
+        return
+    # A running task cannot be cancelled: stop the processes so a late render
+    # does not write into a temporary file the caller already removed.
+    for process in list((getattr(pool, '_processes', None) or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _render_lock(path):
+    return _render_locks[hash(path) % LOCK_STRIPES]
+
+
+def _tmp_path(pdf):
+    return f'{pdf.path}.{os.getpid()}.part'
+
+
+def _render(pdf, tmp_path):
+    pool = _render_pool()
+    if pool is None:
+        pdf.render(pdf.payload, tmp_path)
+        return
+    timeout = _config('PDF_RENDER_TIMEOUT', 30)
+    future = pool.submit(pdf.render, pdf.payload, tmp_path)
+    try:
+        future.result(timeout=timeout)
+    except FutureTimeout:
+        future.cancel()
+        _discard_pool(terminate=True)
+        raise RenderTimeout(f'PDF rendering took longer than {timeout}s; please try again.') from None
+    except BrokenProcessPool:
+        logger.warning('PDF render pool died; rendering %s in-process', pdf.path)
+        _discard_pool()
+        pdf.render(pdf.payload, tmp_path)
+
+
+def ensure_rendered(pdf):
+    """Render ``pdf`` unless it is cached; returns True on a cache hit.
+
+    Raises ``RenderTimeout`` when the render outlives ``PDF_RENDER_TIMEOUT``.
+    """
+    with _render_lock(pdf.path):
+        if os.path.exists(pdf.path):
+            # mtime doubles as the last-served time for eviction.
+            os.utime(pdf.path)
+            return True
+        directory = os.path.dirname(pdf.path)
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = _tmp_path(pdf)
+        try:
+            _render(pdf, tmp_path)
+            os.replace(tmp_path, pdf.path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    evict(directory, _config('PDF_CACHE_MAX_BYTES', 256 * 1024 * 1024), prefix=pdf.prefix, keep={pdf.path})
+    return False
+
+
+def render_many(pdfs, on_progress=None):
+    """Render every uncached artifact concurrently on the render pool.
+
+    ``on_progress(done, total)`` is called as renders finish. Files of this
+    batch are exempt from the eviction that follows. Returns how many PDFs
+    were rendered (cache hits are skipped).
+    """
+    missing = [pdf for pdf in pdfs if not os.path.exists(pdf.path)]
+    total = len(missing)
+    for directory in {os.path.dirname(pdf.path) for pdf in missing}:
+        os.makedirs(directory, exist_ok=True)
+
+    pool = _render_pool()
+    done = 0
+    try:
+        if pool is None:
+            for pdf in missing:
+                pdf.render(pdf.payload, _tmp_path(pdf))
+                os.replace(_tmp_path(pdf), pdf.path)
+                done += 1
+                if on_progress:
+                    on_progress(done, total)
+        else:
+            futures = {pool.submit(pdf.render, pdf.payload, _tmp_path(pdf)): pdf for pdf in missing}
+            for future in as_completed(futures):
+                future.result()
+                pdf = futures[future]
+                os.replace(_tmp_path(pdf), pdf.path)
+                done += 1
+                if on_progress:
+                    on_progress(done, total)
+    except BrokenProcessPool:
+        _discard_pool()
+        raise
+    finally:
+        for pdf in missing:
+            if os.path.exists(_tmp_path(pdf)):
+                os.remove(_tmp_path(pdf))
+
+    keep = {pdf.path for pdf in pdfs}
+    for directory, prefix in {(os.path.dirname(pdf.path), pdf.prefix) for pdf in pdfs}:
+        evict(directory, _config('PDF_CACHE_MAX_BYTES', 256 * 1024 * 1024), prefix=prefix, keep=keep)
+    return done
+
+
+def evict(directory, max_bytes, prefix='', keep=()):
+    """Delete the least recently used ``<prefix><key>.pdf`` files until they fit in ``max_bytes``.
+
+    Other files in ``directory`` are neither counted nor removed.
+    """
+    cached_name = re.compile(rf'{re.escape(prefix)}[0-9a-f]{{32}}\.pdf')
+    entries = []
+    total = 0
+    with os.scandir(directory) as scan:
+        for entry in scan:
+            if not entry.is_file() or not cached_name.fullmatch(entry.name):
+                continue
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path in keep:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+
+def send_pdf(pdf):
+    """Serve ``pdf`` as an attachment with its key as a strong ETag.
+
+    A client that already holds this version gets ``304`` before anything is
+    read or rendered.
+    """
+    if request.if_none_match.contains(pdf.key):
+        response = Response(status=304)
+        response.set_etag(pdf.key)
+    else:
+        ensure_rendered(pdf)
+        response = send_file(
+            pdf.path, as_attachment=True, download_name=pdf.download_name,
+            etag=pdf.key, conditional=True, max_age=0,
+        )
+    # Personal documents: browsers may keep them but must revalidate.
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
@@ -1,7 +1,11 @@
 """PDF generation utilities for certificates, reports, and materials."""
 from __future__ import annotations
 
+import copy
+import io
+import logging
 import os
+import threading
 from datetime import datetime
 
 from reportlab.lib import colors
@@ -9,17 +13,93 @@ from reportlab.lib.enums import TA_CENTER
 from reportlab.lib.pagesizes import A4, letter
 from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
 from reportlab.lib.units import inch
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfdoc
 from reportlab.pdfgen import canvas
 from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
 
+try:  # ReportLab-private (pinned in requirements.txt); without it the logo is encoded per document
+    from reportlab.pdfbase.pdfdoc import _digester
+except ImportError:
+    _digester = None
 
-class CertificatePDF:
-    """Generate branded certificates."""
+logger = logging.getLogger(__name__)
 
-    def __init__(self, output_path: str, page_size=A4):
-        self.output_path = output_path
+# Bump when a layout changes so cached PDFs (app.utils.pdf_cache) are re-rendered.
+CERTIFICATE_TEMPLATE_VERSION = 1
+STUDENT_REPORT_TEMPLATE_VERSION = 1
+
+
+# No logo ships with the repo; point CERTIFICATE_LOGO_PATH at one to print it on certificates.
+DEFAULT_LOGO_PATH = os.getenv(
+    'CERTIFICATE_LOGO_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'static', 'logo.png'),
+)
+# Canvas document internals the pre-encoded logo is registered through.
+_DOC_HOOKS = ('Reference', 'addForm', 'getXObjectName')
+
+
+def certificate_version(logo_path=DEFAULT_LOGO_PATH):
+    """Cache version of a certificate: the template version, plus the logo's mtime when one is configured."""
+    try:
+        return f'{CERTIFICATE_TEMPLATE_VERSION}:{int(os.path.getmtime(logo_path))}'
+    except OSError:
+        return CERTIFICATE_TEMPLATE_VERSION
+
+
+class CertificateTemplate:
+    """Static layer of the certificate page, prepared once per process.
+
+    The logo is read and encoded (zlib + ASCII85, plus its alpha soft mask)
+    once; every canvas gets a copy of the encoded image pre-registered under
+    the name ``drawImage`` derives for the logo path, so it is never
+    re-encoded. Border, logo and fixed text are compiled into one form XObject
+    per document and each page only draws the variable fields on top.
+    Obtain instances through ``get_certificate_template``.
+
+    The pre-registration goes through ReportLab internals (``_digester``, the
+    canvas ``_doc``, the image's ``_smask``). When a ReportLab release lacks
+    them the logo is left to ``drawImage``, which encodes it once per document.
+    """
+
+    FORM_NAME = 'CertificateStatic'
+    LOGO_MASK = 'auto'
+
+    def __init__(self, page_size=A4, logo_path=DEFAULT_LOGO_PATH):
         self.page_size = page_size
         self.width, self.height = page_size
+        self.logo_path = logo_path
+        self._logo = self._encode_logo(logo_path)
+
+    def _logo_name(self):
+        # Same digest drawImage computes for a filename source.
+        return _digester(f'{self.logo_path}{self.LOGO_MASK}'.encode('utf-8'))
+
+    def _encode_logo(self, logo_path):
+        if not os.path.exists(logo_path) or _digester is None:
+            return None
+        with open(logo_path, 'rb') as handle:
+            reader = ImageReader(io.BytesIO(handle.read()))
+        try:
+            image = pdfdoc.PDFImageXObject(self._logo_name(), reader, mask=self.LOGO_MASK)
+        except (AttributeError, TypeError):
+            logger.warning('Cannot pre-encode the certificate logo with this ReportLab', exc_info=True)
+            return None
+        image.name = self._logo_name()
+        return image
+
+    def _register_logo(self, c):
+        """Add the pre-encoded logo (and soft mask) to this canvas's document; False if it cannot."""
+        doc = getattr(c, '_doc', None)
+        if self._logo is None or not all(hasattr(doc, hook) for hook in _DOC_HOOKS):
+            return False
+        image = copy.copy(self._logo)
+        smask = vars(image).pop('_smask', None)
+        doc.Reference(image, doc.getXObjectName(image.name))
+        doc.addForm(image.name, image)
+        if smask is not None:
+            image.smask = doc.Reference(copy.copy(smask), doc.getXObjectName(smask.name))
+        return True
 
     def _draw_border(self, c):
         c.setStrokeColor(colors.HexColor('#1e40af'))
@@ -28,33 +108,27 @@ class CertificatePDF:
         c.setLineWidth(1)
         c.rect(0.75 * inch, 0.75 * inch, self.width - 1.5 * inch, self.height - 1.5 * inch)
 
-    def _draw_logo(self, c, logo_path='static/logo.png'):
-        if os.path.exists(logo_path):
-            c.drawImage(
-                logo_path,
-                self.width / 2 - 1 * inch,
-                self.height - 2.5 * inch,
-                width=2 * inch,
-                height=1 * inch,
-                preserveAspectRatio=True,
-                mask='auto',
-            )
-
-    def generate(self, student_name, roll_no, course, certificate_type, issue_date, certificate_id):
-        """Render the certificate PDF."""
-        c = canvas.Canvas(self.output_path, pagesize=self.page_size)
-        self._draw_border(c)
-        self._draw_logo(c)
+    def _draw_logo(self, c):
+        if not os.path.exists(self.logo_path):
+            return
+        self._register_logo(c)
+        c.drawImage(
+            self.logo_path,
+            self.width / 2 - 1 * inch,
+            self.height - 2.5 * inch,
+            width=2 * inch,
+            height=1 * inch,
+            preserveAspectRatio=True,
+            mask=self.LOGO_MASK,
+        )
 
+    def _draw_static_text(self, c):
         c.setFont('Helvetica-Bold', 24)
         c.drawCentredString(self.width / 2, self.height - 3 * inch, 'CHRONICLE COLLEGE')
 
         c.setFont('Helvetica', 14)
         c.drawCentredString(self.width / 2, self.height - 3.5 * inch, 'College Social Network')
 
-        c.setFont('Helvetica-Bold', 18)
-        c.drawCentredString(self.width / 2, self.height - 4.5 * inch, certificate_type.upper())
-
         c.setStrokeColor(colors.HexColor('#1e40af'))
         c.setLineWidth(2)
         c.line(2 * inch, self.height - 4.75 * inch, self.width - 2 * inch, self.height - 4.75 * inch)
@@ -62,6 +136,39 @@ class CertificatePDF:
         c.setFont('Helvetica', 12)
         y = self.height - 5.5 * inch
         c.drawString(2 * inch, y, 'This is to certify that')
+        c.drawString(2 * inch, y - 2.25 * inch, 'has been a student of this institution and has maintained good')
+        c.drawString(2 * inch, y - 2.65 * inch, 'conduct and character during the period of study.')
+
+        c.setFont('Helvetica', 11)
+        c.drawString(self.width - 3.5 * inch, 2 * inch, 'Authorized Signature')
+        c.line(self.width - 4 * inch, 2.25 * inch, self.width - 1.5 * inch, 2.25 * inch)
+        c.setFont('Helvetica-Bold', 10)
+        c.drawString(self.width - 3.75 * inch, 1.5 * inch, 'Principal')
+        c.drawString(self.width - 4 * inch, 1.25 * inch, 'Chronicle College')
+
+        c.setFont('Helvetica', 8)
+        c.drawCentredString(
+            self.width / 2,
+            0.75 * inch,
+            'This is a computer-generated certificate and does not require a signature.',
+        )
+
+    def draw_static(self, c):
+        """Draw the static layer, defining its form XObject on first use in this document."""
+        if not c.hasForm(self.FORM_NAME):
+            c.beginForm(self.FORM_NAME)
+            self._draw_border(c)
+            self._draw_logo(c)
+            self._draw_static_text(c)
+            c.endForm()
+        c.doForm(self.FORM_NAME)
+
+    def draw_fields(self, c, student_name, roll_no, course, certificate_type, issue_date, certificate_id):
+        """Draw the per-certificate fields over the static layer."""
+        c.setFont('Helvetica-Bold', 18)
+        c.drawCentredString(self.width / 2, self.height - 4.5 * inch, certificate_type.upper())
+
+        y = self.height - 5.5 * inch
         c.setFont('Helvetica-Bold', 14)
         c.drawString(2 * inch, y - 0.5 * inch, f'Name: {student_name}')
 
@@ -69,9 +176,6 @@ class CertificatePDF:
         c.drawString(2 * inch, y - 1 * inch, f'Roll Number: {roll_no}')
         c.drawString(2 * inch, y - 1.5 * inch, f'Course: {course}')
 
-        c.drawString(2 * inch, y - 2.25 * inch, 'has been a student of this institution and has maintained good')
-        c.drawString(2 * inch, y - 2.65 * inch, 'conduct and character during the period of study.')
-
         issue = issue_date
         if isinstance(issue_date, str):
             try:
@@ -84,20 +188,43 @@ class CertificatePDF:
         c.setFont('Helvetica', 9)
         c.drawString(2 * inch, y - 4 * inch, f'Certificate ID: {certificate_id}')
 
-        c.setFont('Helvetica', 11)
-        c.drawString(self.width - 3.5 * inch, 2 * inch, 'Authorized Signature')
-        c.line(self.width - 4 * inch, 2.25 * inch, self.width - 1.5 * inch, 2.25 * inch)
-        c.setFont('Helvetica-Bold', 10)
-        c.drawString(self.width - 3.75 * inch, 1.5 * inch, 'Principal')
-        c.drawString(self.width - 4 * inch, 1.25 * inch, 'Chronicle College')
 
-        c.setFont('Helvetica', 8)
-        c.drawCentredString(
-            self.width / 2,
-            0.75 * inch,
-            'This is a computer-generated certificate and does not require a signature.',
-        )
+_templates = {}
+_templates_lock = threading.Lock()
 
+
+def get_certificate_template(page_size=A4, logo_path=DEFAULT_LOGO_PATH):
+    """Process-wide template for ``page_size``/``logo_path``; rebuilt when the logo file changes."""
+    try:
+        logo_mtime = os.path.getmtime(logo_path)
+    except OSError:
+        logo_mtime = None
+    key = (tuple(page_size), logo_path, logo_mtime)
+    template = _templates.get(key)
+    if template is None:
+        with _templates_lock:
+            template = _templates.get(key)
+            if template is None:
+                template = CertificateTemplate(page_size, logo_path)
+                _templates.clear()
+                _templates[key] = template
+    return template
+
+
+class CertificatePDF:
+    """Generate branded certificates."""
+
+    def __init__(self, output_path: str, page_size=A4, template=None):
+        self.output_path = output_path
+        self.page_size = page_size
+        self.width, self.height = page_size
+        self.template = template or get_certificate_template(page_size)
+
+    def generate(self, student_name, roll_no, course, certificate_type, issue_date, certificate_id):
+        """Render the certificate PDF."""
+        c = canvas.Canvas(self.output_path, pagesize=self.page_size)
+        self.template.draw_static(c)
+        self.template.draw_fields(c, student_name, roll_no, course, certificate_type, issue_date, certificate_id)
         c.save()
         return self.output_path
 
@@ -121,6 +248,23 @@ def _build_table(data, header_bg='#1e40af'):
     return table
 
 
+def render_certificate(payload, output_path):
+    """Render a certificate from a plain payload dict (picklable for the render pool)."""
+    return CertificatePDF(output_path).generate(
+        payload['student_name'],
+        payload['roll_no'],
+        payload['course'],
+        payload['certificate_type'],
+        payload['issue_date'],
+        payload['certificate_id'],
+    )
+
+
+def render_student_report(payload, output_path):
+    """Render a student report from a plain payload dict (picklable for the render pool)."""
+    return generate_student_report_pdf(payload['student'], payload['quiz_results'], None, output_path)
+
+
 def generate_student_report_pdf(student_data, quiz_results, attendance_data, output_path):
     """Build a comprehensive performance PDF."""
     doc = SimpleDocTemplate(output_path, pagesize=A4)
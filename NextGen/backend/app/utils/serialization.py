@@ -0,0 +1,167 @@
+"""Precompiled flask-restx model serializers that write JSON bytes directly.
+
+``@api.marshal_with`` walks every response through field objects after the
+helpers' ``to_dict`` has already built it once. A ``ModelSerializer`` is
+compiled once per ``api.model`` into a flat plan of getters and turns raw
+MongoDB documents into the same JSON shape in a single pass. Datetimes and
+ObjectIds are left to the encoder (orjson when installed).
+"""
+import json
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from flask import Response
+from flask_restx import fields
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def _orjson_default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def _json_default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc).isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+    def dumps(payload):
+        """Encode ``payload`` to JSON bytes; naive datetimes are treated as UTC."""
+        return orjson.dumps(payload, default=_orjson_default, option=_ORJSON_OPTIONS)
+else:
+    def dumps(payload):
+        """Encode ``payload`` to JSON bytes; naive datetimes are treated as UTC."""
+        return json.dumps(payload, default=_json_default, separators=(',', ':')).encode('utf-8')
+
+
+def json_response(payload, status=200):
+    """Wrap already-serializable data in a JSON response without marshalling."""
+    return Response(dumps(payload), status=status, mimetype='application/json')
+
+
+def _as_string(value):
+    # Datetimes stay native so the encoder formats them; everything else is str().
+    if value is None or value.__class__ is str or isinstance(value, datetime):
+        return value
+    return str(value)
+
+
+def _as_integer(value):
+    return None if value is None else int(value)
+
+
+def _as_float(value):
+    return None if value is None else float(value)
+
+
+def _as_boolean(value):
+    return None if value is None else bool(value)
+
+
+def _identity(value):
+    return value
+
+
+def _converter(field):
+    if isinstance(field, fields.Boolean):
+        return _as_boolean
+    if isinstance(field, fields.Integer):
+        return _as_integer
+    if isinstance(field, (fields.Float, fields.Arbitrary)):
+        return _as_float
+    if isinstance(field, (fields.String, fields.DateTime, fields.Date)):
+        return _as_string
+    return _identity
+
+
+class ModelSerializer:
+    """Serialize raw documents in the shape of a flask-restx model.
+
+    ``overrides`` maps a field name to a source key (``{'id': '_id'}``), a
+    callable taking the whole document, or another ``ModelSerializer`` for
+    nested fields. ``defaults`` fills in values for missing keys the way the
+    helpers' ``to_dict`` did.
+    """
+
+    def __init__(self, model, overrides=None, defaults=None):
+        self.model = model
+        overrides = overrides or {}
+        defaults = defaults or {}
+        self._plan = tuple(
+            (name, self._compile(name, field, overrides.get(name), defaults.get(name, field.default)))
+            for name, field in model.items()
+        )
+
+    @staticmethod
+    def _compile(name, field, override, default):
+        if callable(override) and not isinstance(override, ModelSerializer):
+            return override
+
+        source = override if isinstance(override, str) else name
+        nested = override if isinstance(override, ModelSerializer) else None
+
+        if isinstance(field, fields.List):
+            container = field.container
+            if nested is None and isinstance(container, fields.Nested):
+                nested = ModelSerializer(container.nested)
+            item = nested.convert if nested is not None else _converter(container)
+            empty = default if default is not None else []
+
+            def get_list(doc):
+                values = doc.get(source)
+                if values is None:
+                    return empty
+                return [item(value) for value in values]
+            return get_list
+
+        if isinstance(field, fields.Nested):
+            if nested is None:
+                nested = ModelSerializer(field.nested)
+            convert_nested = nested.convert
+
+            def get_nested(doc):
+                return convert_nested(doc.get(source))
+            return get_nested
+
+        convert = _converter(field)
+
+        def get_value(doc):
+            value = doc.get(source)
+            if value is None:
+                return default
+            return convert(value)
+        return get_value
+
+    def convert(self, doc):
+        """Return a JSON-ready dict for one document (``None`` passes through)."""
+        if doc is None:
+            return None
+        return {name: getter(doc) for name, getter in self._plan}
+
+    def dumps(self, doc):
+        return dumps(self.convert(doc))
+
+    def dumps_many(self, docs):
+        convert = self.convert
+        return dumps([convert(doc) for doc in docs])
+
+    def response(self, doc, status=200):
+        """JSON response for one document, bypassing ``marshal_with``."""
+        return Response(self.dumps(doc), status=status, mimetype='application/json')
+
+    def list_response(self, docs, status=200):
+        """JSON response for a top-level list, bypassing ``marshal_list_with``."""
+        return Response(self.dumps_many(docs), status=status, mimetype='application/json')
@@ -0,0 +1,8 @@
+"""Background worker: task implementations and job executors."""
+from .executor import EXECUTORS, dispatch, execute_job
+
+__all__ = [
+    'EXECUTORS',
+    'dispatch',
+    'execute_job',
+]
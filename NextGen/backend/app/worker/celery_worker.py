@@ -0,0 +1,34 @@
+"""Celery entry point for the ``chronicle.*`` tasks.
+
+    celery -A app.worker.celery_worker worker --pool threads --concurrency 4 --loglevel=info
+
+Run the API with ``TASK_EXECUTOR=celery`` so jobs are sent to this worker.
+Use the ``threads`` (or ``solo``) pool: jobs are I/O bound, and the default
+prefork children are daemonic, so they may not start the PDF render process
+pool and bulk certificate issuance would render serially in-process.
+"""
+import os
+
+from app import create_app
+from app.tasks.background import celery_app
+from app.worker.executor import execute_job
+from app.worker.tasks import TASKS
+
+if celery_app is None:
+    raise RuntimeError('Celery is not installed; use TASK_EXECUTOR=thread or eager instead.')
+
+flask_app = create_app(os.getenv('FLASK_ENV', 'production'))
+celery = celery_app
+
+
+def _register(name):
+    # The job document is authoritative; the payload kwargs are only for broker tooling.
+    @celery_app.task(name=name, acks_late=True, ignore_result=True)
+    def run(job_id, **payload):
+        return execute_job(flask_app, job_id)
+
+    return run
+
+
+for _task_name in TASKS:
+    _register(_task_name)
@@ -0,0 +1,84 @@
+"""Coalesce buffered notifications into one digest email per user."""
+import html
+from datetime import datetime, timezone
+
+from flask import current_app
+
+from app.models.digest import DigestHelper
+from app.models.outbox import EmailOutboxHelper
+from app.utils.email_templates import Fragment, get_template
+from app.utils.export import iter_batches
+
+QUEUE_BATCH = 500  # digests rendered and queued per outbox write
+
+
+def schedule():
+    """``(hour, weekday)`` digests go out at, from ``DIGEST_HOUR`` and ``DIGEST_WEEKDAY``."""
+    return int(current_app.config.get('DIGEST_HOUR', 7)), int(current_app.config.get('DIGEST_WEEKDAY', 0))
+
+
+def buffer_items(db, recipients, frequencies, kind, title, body=None, job_id=None):
+    """Buffer one event for the ``recipients`` whose ``frequencies`` entry is a digest."""
+    hour, weekday = schedule()
+    items = [
+        {'recipient_id': recipient['id'], 'email': recipient['email'], 'name': recipient.get('name'),
+         'frequency': frequencies[recipient['id']], 'kind': kind, 'title': title, 'body': body}
+        for recipient in recipients
+    ]
+    return DigestHelper.add_many(db, items, hour, weekday, job_id=job_id)
+
+
+def render_items(items, limit=DigestHelper.MAX_ITEMS):
+    """The digest's event list as a ``Fragment`` (bulleted text and an HTML list)."""
+    shown = items[:limit]
+    rows = []
+    lines = []
+    for item in shown:
+        title, body = item.get('title') or 'Update', item.get('body')
+        rows.append(f'<li style="margin-bottom: 10px;"><strong>{html.escape(title)}</strong>'
+                    + (f'<br>{html.escape(body)}' if body else '') + '</li>')
+        lines.append(f'- {title}' + (f': {body}' if body else ''))
+    markup = f'<ul>{"".join(rows)}</ul>'
+    if len(items) > limit:
+        more = f'...and {len(items) - limit} more update(s).'
+        markup += f'<p>{more}</p>'
+        lines.append(more)
+    return Fragment('\n'.join(lines) + '\n', markup)
+
+
+def queue_due(db, job_id, cutoff, on_progress=None):
+    """Queue one digest email per address with items due by ``cutoff``; returns ``(digests, items)``.
+
+    Items are removed once their digest is in ``email_outbox``. The outbox is
+    unique per ``(job_id, to)``, so a redelivered job re-reading the same
+    items queues nothing twice.
+    """
+    template = get_template('digest')
+    digests = items = 0
+    for groups in iter_batches(DigestHelper.due_groups(db, cutoff), QUEUE_BATCH):
+        messages = [
+            template.message(group['email'], name=group.get('name') or 'Chronicle Member',
+                             period=group.get('frequency') or 'daily', count=len(group['items']),
+                             items=render_items(group['items']))
+            for group in groups
+        ]
+        EmailOutboxHelper.add_many(db, job_id, messages, source={'kind': 'digest'})
+        items += DigestHelper.remove(db, [item_id for group in groups for item_id in group['ids']])
+        digests += len(groups)
+        if on_progress:
+            on_progress(digests, items)
+    return digests, items
+
+
+def sweep(db, interval_seconds, logger=None):
+    """Queue a ``send_digests`` job when buffered items are due, once per interval."""
+    from app.stats import claim_lease
+    from app.tasks.background import enqueue_digest_delivery
+
+    cutoff = datetime.now(timezone.utc)
+    if not DigestHelper.has_due(db, cutoff) or not claim_lease(db, 'digest_sweep', interval_seconds):
+        return None
+    job = enqueue_digest_delivery(cutoff)
+    if logger:
+        logger.info('Digest sweep queued job %s', job['_id'])
+    return job
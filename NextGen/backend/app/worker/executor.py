@@ -0,0 +1,80 @@
+"""Run queued jobs on Celery, a local thread pool, or inline.
+
+``TASK_EXECUTOR`` picks the backend:
+
+* ``celery`` sends the task to the broker for ``app.worker.celery_worker``;
+* ``thread`` (default) runs it on an in-process pool for single-node installs;
+* ``eager`` runs it before the request returns, for tests and scripts.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+from app.db import get_db
+from app.models.job import JobHelper
+
+logger = logging.getLogger(__name__)
+
+EXECUTORS = ('celery', 'thread', 'eager')
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(app):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=int(app.config.get('TASK_MAX_WORKERS') or 2),
+                thread_name_prefix='chronicle-worker',
+            )
+        return _pool
+
+
+def execute_job(app, job_id):
+    """Run one job to completion and record the outcome; returns the result."""
+    from app.worker.tasks import TASKS
+
+    with app.app_context():
+        db = get_db()
+        job = JobHelper.start(db, job_id)
+        if job is None:
+            logger.info('Job %s already finished; skipping', job_id)
+            return None
+
+        def progress(percent, message=None):
+            JobHelper.set_progress(db, job['_id'], percent, message)
+
+        try:
+            task = TASKS.get(job['task'])
+            if task is None:
+                raise ValueError(f"Unknown task: {job['task']}")
+            result = task(db, job, progress, **job.get('params', {}))
+        except Exception as exc:
+            logger.exception('Job %s (%s) failed', job_id, job['task'])
+            JobHelper.fail(db, job['_id'], exc)
+            return None
+        JobHelper.succeed(db, job['_id'], result)
+        return result
+
+
+def dispatch(job):
+    """Hand a freshly created job to the configured executor."""
+    app = current_app._get_current_object()
+    mode = (app.config.get('TASK_EXECUTOR') or 'thread').lower()
+    job_id = str(job['_id'])
+
+    if mode == 'celery':
+        from app.tasks.background import celery_app
+
+        if celery_app is not None:
+            celery_app.send_task(job['task'], kwargs={**job['params'], 'job_id': job_id})
+            return
+        logger.warning('TASK_EXECUTOR=celery but Celery is not installed; running %s in-process', job['task'])
+    if mode == 'eager':
+        execute_job(app, job_id)
+        return
+    _get_pool(app).submit(execute_job, app, job_id)
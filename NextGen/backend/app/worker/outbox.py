@@ -0,0 +1,66 @@
+"""Deliver queued ``email_outbox`` messages through the configured provider."""
+import logging
+
+from app.models.outbox import EmailOutboxHelper
+from app.utils.email import BATCH_LIMIT
+from app.utils.mail_providers import EmailDeliveryError, get_provider, get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+
+def deliver(db, job_id=None, on_progress=None):
+    """Send due messages in ``BATCH_LIMIT`` batches until none is due.
+
+    Only messages of ``job_id`` are sent when it is given. Provider requests
+    go through the shared rate limiter. A failed batch is rescheduled with
+    backoff and left ``pending``: the job does not sleep on an executor
+    thread, and ``sweep`` queues a new delivery once the backoff has passed.
+    ``on_progress(sent, failed)`` is called after each batch. Returns
+    ``(sent, failed)``.
+    """
+    provider = get_provider()
+    limiter = get_rate_limiter()
+    EmailOutboxHelper.release_stale(db)
+    sent = failed = 0
+    while True:
+        batch = EmailOutboxHelper.claim(db, BATCH_LIMIT, job_id)
+        if not batch:
+            break
+
+        ids = [doc['_id'] for doc in batch]
+        limiter.wait()
+        try:
+            provider.send_batch([
+                {'to': doc['to'], 'subject': doc['subject'], 'html': doc['html'], 'text': doc.get('text')}
+                for doc in batch
+            ])
+        except EmailDeliveryError as exc:
+            rescheduled = EmailOutboxHelper.mark_failed(db, ids, exc, exc.retryable, exc.retry_after)
+            failed += len(ids) - rescheduled
+            logger.warning('Email batch of %s failed (%s rescheduled): %s', len(ids), rescheduled, exc)
+        else:
+            EmailOutboxHelper.mark_sent(db, ids)
+            sent += len(ids)
+        if on_progress:
+            on_progress(sent, failed)
+    return sent, failed
+
+
+def sweep(db, interval_seconds, logger=None):
+    """Queue a ``deliver_outbox`` job for retries and abandoned messages, once per interval.
+
+    Covers messages whose retry backoff has passed (``deliver`` does not wait
+    for them) and fan-out jobs that died mid-delivery. Live jobs claim due
+    messages promptly, so only messages due for ``SWEEP_GRACE`` count. Runs
+    from the scheduler with an application context.
+    """
+    from app.stats import claim_lease
+    from app.tasks.background import enqueue_outbox_delivery
+
+    EmailOutboxHelper.release_stale(db)
+    if not EmailOutboxHelper.has_overdue(db) or not claim_lease(db, 'outbox_sweep', interval_seconds):
+        return None
+    job = enqueue_outbox_delivery()
+    if logger:
+        logger.info('Email outbox sweep queued job %s', job['_id'])
+    return job
@@ -0,0 +1,377 @@
+"""Implementations of the ``chronicle.*`` background tasks.
+
+Every task runs inside an application context and is called as
+``task(db, job, progress, **params)``; ``progress(percent, message=None)``
+updates the job record and the return value becomes ``job.result``.
+Artefacts are written under ``UPLOAD_FOLDER`` and returned as
+``/uploads/...`` paths.
+"""
+import os
+from collections import namedtuple
+from datetime import datetime
+
+from bson import ObjectId
+from flask import current_app
+from pymongo import UpdateOne
+
+from app.models.certificate import CertificateHelper, CertificateTypeHelper
+from app.models.digest import DigestHelper
+from app.models.notification import NotificationHelper
+from app.models.outbox import EmailOutboxHelper
+from app.models.student import StudentHelper
+from app.utils.documents import certificate_artifacts, render_certificate_pdf, render_student_report_pdf
+from app.utils.email import send_batch_emails, send_email
+from app.utils.email_templates import get_template
+from app.utils.export import encode_rows, iter_batches
+from app.utils.file_handler import FileHandler
+from app.utils.notification_helpers import (
+    combine_recipients,
+    get_staff_recipients,
+    get_student_recipients,
+    resolve_course_name,
+    resolve_subject_name,
+)
+from app.utils.pdf_cache import render_many
+from app.worker.digest import buffer_items, queue_due
+from app.worker.outbox import deliver
+
+REPORT_FORMATS = ('csv', 'ndjson')
+OPTIMIZED_IMAGE_SIZE = (1200, 1200)
+
+
+def _upload_folder():
+    return current_app.config['UPLOAD_FOLDER']
+
+
+def _resolve_upload(path):
+    """Map an ``/uploads/...`` path to a file inside the upload folder."""
+    root = os.path.realpath(_upload_folder())
+    relative = path[len('/uploads/'):] if path.startswith('/uploads/') else path.lstrip('/')
+    full_path = os.path.realpath(os.path.join(root, relative))
+    if not full_path.startswith(root + os.sep):
+        raise ValueError('Path is outside the upload folder.')
+    return full_path, os.path.relpath(full_path, root).replace(os.sep, '/')
+
+
+def _write_atomic(path, chunks):
+    tmp_path = f'{path}.part'
+    with open(tmp_path, 'wb') as handle:
+        for chunk in chunks:
+            handle.write(chunk)
+    os.replace(tmp_path, path)
+
+
+def generate_report(db, job, progress, report_type, filters=None):
+    """Write a report export to ``JOB_RESULTS_FOLDER``, downloadable from ``/api/jobs/<id>/result``."""
+    from app.blueprints.reports import REPORTS
+
+    if report_type not in REPORTS:
+        raise ValueError(f'Unknown report type: {report_type}')
+    rows_for, columns, collection_name = REPORTS[report_type]
+    filters = filters or {}
+    fmt = (filters.get('format') or 'csv').lower()
+    if fmt not in REPORT_FORMATS:
+        fmt = 'csv'
+    limit = int(filters.get('limit') or 0)
+    estimate = db[collection_name].estimated_document_count()
+    total = max(min(limit, estimate) if limit else estimate, 1)
+
+    written = [0]
+
+    def counted_rows():
+        for row in rows_for(db, limit):
+            written[0] += 1
+            yield row
+
+    def chunks():
+        for chunk in encode_rows(counted_rows(), columns, fmt):
+            yield chunk
+            progress(min(99, written[0] * 100 // total), f'{written[0]} rows written')
+
+    results_dir = current_app.config['JOB_RESULTS_FOLDER']
+    os.makedirs(results_dir, exist_ok=True)
+    filename = f"{report_type}-report-{job['_id']}.{fmt}"
+    _write_atomic(os.path.join(results_dir, filename), chunks())
+    return {
+        'file': f"/api/jobs/{job['_id']}/result",
+        'filename': filename,
+        'records': written[0],
+        'format': fmt,
+    }
+
+
+def generate_pdf(db, job, progress, entity, entity_id):
+    """Render a certificate or a student performance report to PDF."""
+    if entity == 'certificate':
+        certificate = CertificateHelper.find_by_id(db, entity_id)
+        if not certificate:
+            raise ValueError('Certificate not found')
+        pdf = render_certificate_pdf(db, certificate, _upload_folder())
+        return {'file': f'/uploads/certificates/{os.path.basename(pdf.path)}', 'download_name': pdf.download_name}
+
+    if entity == 'student_report':
+        student = StudentHelper.find_by_id(db, entity_id)
+        if not student:
+            raise ValueError('Student not found')
+        pdf = render_student_report_pdf(db, student, _upload_folder())
+        return {'file': f'/uploads/reports/{os.path.basename(pdf.path)}', 'download_name': pdf.download_name}
+
+    raise ValueError(f'Unsupported PDF entity: {entity}')
+
+
+def optimize_image(db, job, progress, path):
+    """Recompress an uploaded image, keeping the result only when it is smaller."""
+    full_path, relative = _resolve_upload(path)
+    with open(full_path, 'rb') as handle:
+        original = handle.read()
+    optimized = FileHandler.optimize_image(original, max_size=OPTIMIZED_IMAGE_SIZE)
+    if len(optimized) >= len(original):
+        return {'file': f'/uploads/{relative}', 'bytes_before': len(original), 'bytes_after': len(original)}
+
+    # optimize_image always emits JPEG; other formats get a .jpg sibling.
+    stem, ext = os.path.splitext(full_path)
+    target = full_path if ext.lower() in ('.jpg', '.jpeg') else f'{stem}.jpg'
+    _write_atomic(target, [optimized])
+    return {
+        'file': f"/uploads/{os.path.splitext(relative)[0] + os.path.splitext(target)[1]}",
+        'bytes_before': len(original),
+        'bytes_after': len(optimized),
+    }
+
+
+def email_notification(db, job, progress, recipient, subject, body):
+    """Send one email; a failed send fails the job."""
+    if not send_email(recipient, subject, body):
+        raise RuntimeError('Email delivery failed')
+    return {'sent': True}
+
+
+def email_batch(db, job, progress, messages):
+    """Send pre-rendered messages through the provider's batch API."""
+    sent = send_batch_emails(messages)
+    if messages and not sent:
+        raise RuntimeError('Email delivery failed')
+    return {'sent': sent, 'failed': len(messages) - sent}
+
+
+# What one publication fans out: the recipients, their rendered emails and the in-app notification.
+Publication = namedtuple('Publication', 'recipients messages notification')
+NOTHING = Publication([], [], None)
+
+
+def _notice_publication(db, notice):
+    if notice.get('status') != 'published':
+        return NOTHING
+    recipients = combine_recipients(get_student_recipients(db, fallback_to_all=True), get_staff_recipients(db))
+    title = notice.get('title', 'New Notice')
+    notice_type = (notice.get('type') or 'Notice').title()
+    template = get_template('notice').bind(title=title, type=notice_type)
+    return Publication(
+        recipients,
+        [template.message(recipient['email'], name=recipient.get('name', 'Chronicle Member'))
+         for recipient in recipients],
+        NotificationHelper.build('notice', f'New {notice_type}: {title}', notice.get('summary'),
+                                 f"/notices/{notice['_id']}", notice['_id']),
+    )
+
+
+def _quiz_publication(db, quiz):
+    if quiz.get('status') != 'published':
+        return NOTHING
+    course_name = resolve_course_name(db, quiz.get('course_id'))
+    subject_name = resolve_subject_name(db, quiz.get('subject_id'))
+    recipients = get_student_recipients(db, course_name=course_name, semester=quiz.get('semester'),
+                                        fallback_to_all=True)
+    title = quiz.get('title', 'New Quiz')
+    subject = subject_name or course_name or 'your course'
+    template = get_template('quiz_published').bind(quiz=title, subject=subject)
+    return Publication(
+        recipients,
+        [template.message(student['email'], name=student.get('name', 'Student')) for student in recipients],
+        NotificationHelper.build('quiz', f'New Quiz: {title}', f'Published for {subject}',
+                                 f"/quizzes/{quiz['_id']}", quiz['_id']),
+    )
+
+
+def _material_publication(db, material):
+    course_name = resolve_course_name(db, material.get('course_id'))
+    subject_name = resolve_subject_name(db, material.get('subject_id'))
+    recipients = get_student_recipients(db, course_name=course_name, semester=material.get('semester'),
+                                        fallback_to_all=True)
+    title = material.get('title', 'Study Material')
+    subject = subject_name or course_name or 'your course'
+    template = get_template('study_material').bind(material=title, subject=subject)
+    return Publication(
+        recipients,
+        [template.message(recipient['email'], name=recipient.get('name', 'Student')) for recipient in recipients],
+        NotificationHelper.build('material', f'New Study Material: {title}', f'Uploaded for {subject}',
+                                 f"/materials/{material['_id']}", material['_id']),
+    )
+
+
+# kind -> (collection, publication builder) for notify_publication.
+PUBLICATIONS = {
+    'notice': ('notices', _notice_publication),
+    'quiz': ('quizzes', _quiz_publication),
+    'material': ('materials', _material_publication),
+}
+
+
+def notify_publication(db, job, progress, kind, entity_id):
+    """Notify everyone a notice, quiz or material is published to, in the app and by email.
+
+    The in-app notifications are written first, in bulk, and pushed to the
+    recipients' sockets. Recipients who chose a daily or weekly digest get a
+    ``email_digest_buffer`` item; the others' messages are rendered once into
+    ``email_outbox`` and delivered in provider batches by ``deliver``. Every
+    write is keyed by the job, so a redelivered job adds no duplicates.
+    """
+    if kind not in PUBLICATIONS:
+        raise ValueError(f'Unknown publication kind: {kind}')
+    collection_name, build_publication = PUBLICATIONS[kind]
+    entity = db[collection_name].find_one({'_id': ObjectId(entity_id)})
+    if not entity:
+        raise ValueError(f'{kind.title()} not found')
+
+    publication = build_publication(db, entity)
+    if not publication.recipients:
+        return {'recipients': 0, 'notified': 0, 'digested': 0, 'sent': 0, 'failed': 0}
+    notification = publication.notification
+    notified = NotificationHelper.create_many(db, [recipient['id'] for recipient in publication.recipients],
+                                              notification, job_id=job['_id'])
+
+    frequencies = DigestHelper.frequencies(db, [recipient['id'] for recipient in publication.recipients])
+    digested = [recipient for recipient in publication.recipients if recipient['id'] in frequencies]
+    buffer_items(db, digested, frequencies, kind, notification['title'], notification['body'], job_id=job['_id'])
+    messages = [message for recipient, message in zip(publication.recipients, publication.messages)
+                if recipient['id'] not in frequencies]
+    queued = EmailOutboxHelper.add_many(db, job['_id'], messages, source={'kind': kind, 'id': entity['_id']})
+    total = max(len(messages), 1)
+    progress(5, f'{notified} notification(s) created, {len(digested)} held for digests, {queued} email(s) queued')
+
+    sent, failed = deliver(
+        db, job_id=job['_id'],
+        on_progress=lambda sent, failed: progress(5 + 95 * (sent + failed) // total, f'{sent} sent, {failed} failed'),
+    )
+    counts = EmailOutboxHelper.count_by_status(db, job['_id'])
+    if messages and not counts['sent'] and not counts['pending']:
+        raise RuntimeError('Email delivery failed')
+    return {'recipients': len(publication.recipients), 'notified': notified, 'digested': len(digested),
+            'sent': counts['sent'], 'failed': counts['failed'], 'retrying': counts['pending']}
+
+
+def deliver_outbox(db, job, progress):
+    """Send every due ``email_outbox`` message, e.g. after a worker restart."""
+    sent, failed = deliver(db)
+    return {'sent': sent, 'failed': failed}
+
+
+def send_digests(db, job, progress, cutoff):
+    """Email every user with buffered items due by ``cutoff`` one combined digest."""
+    digests, items = queue_due(
+        db, job['_id'], datetime.fromisoformat(cutoff),
+        on_progress=lambda digests, items: progress(5, f'{digests} digest(s) queued from {items} item(s)'),
+    )
+    total = max(digests, 1)
+    sent, failed = deliver(
+        db, job_id=job['_id'],
+        on_progress=lambda sent, failed: progress(5 + 95 * (sent + failed) // total, f'{sent} sent, {failed} failed'),
+    )
+    return {'digests': digests, 'items': items, 'sent': sent, 'failed': failed}
+
+
+def issue_certificates(db, job, progress, certificate_type_id, issue_date, student_ids=None, filters=None,
+                       remarks=None, notify=True):
+    """Issue one certificate type to many students, render the PDFs and queue the emails.
+
+    Students come from ``student_ids`` or an Active-student ``filters`` match.
+    Students already holding the type are skipped (one ``distinct``), the rest
+    are inserted with one ``insert_many`` tagged ``batch_id=job._id``, and the
+    PDFs render concurrently on the render pool. A redelivered job resumes
+    from the certificates its batch already holds; each certificate records
+    ``notified_at`` once its email and notification are queued, so resumed
+    certificates still reach their holders exactly once.
+    """
+    type_oid = ObjectId(certificate_type_id)
+    cert_type = CertificateTypeHelper.find_by_id(db, type_oid)
+    if not cert_type:
+        raise ValueError('Certificate type not found')
+
+    if student_ids:
+        query = {'_id': {'$in': [ObjectId(student_id) for student_id in student_ids]}}
+    else:
+        query = {'status': 'Active', **(filters or {})}
+    students = {
+        doc['_id']: doc
+        for doc in db.students.find(query, {'name': 1, 'roll_no': 1, 'course': 1, 'email': 1})
+    }
+
+    resumed = list(CertificateHelper.find_by_batch(db, job['_id']))
+    held = CertificateHelper.existing_student_ids(db, type_oid, students.keys())
+    skipped = len(held) - len(resumed)
+    new_ids = [student_id for student_id in students if student_id not in held]
+    progress(5, f'Issuing {len(new_ids)} certificate(s); {skipped} student(s) already hold one')
+
+    created = CertificateHelper.create_many(
+        db, new_ids, type_oid, datetime.fromisoformat(issue_date), remarks=remarks, batch_id=job['_id'],
+    )
+    certificates = resumed + created
+    progress(10, f'{len(certificates)} certificate(s) issued; rendering PDFs')
+
+    artifacts = certificate_artifacts(db, certificates, _upload_folder())
+    rendered = render_many(
+        [pdf for _, pdf in artifacts],
+        on_progress=lambda done, total: progress(10 + 80 * done // total, f'{done}/{total} PDFs rendered'),
+    )
+
+    for batch in iter_batches(artifacts, 1000):
+        db.certificates.bulk_write([
+            UpdateOne({'_id': certificate['_id']},
+                      {'$set': {'certificate_file': f'/uploads/certificates/{os.path.basename(pdf.path)}'}})
+            for certificate, pdf in batch
+        ], ordered=False)
+
+    emails_queued = 0
+    if notify:
+        # Notifications and outbox rows are unique per job, so a redelivery
+        # that dies before mark_notified queues nothing twice.
+        pending = [certificate for certificate in certificates
+                   if not certificate.get('notified_at') and certificate['student_id'] in students]
+        NotificationHelper.create_many(
+            db, [certificate['student_id'] for certificate in pending],
+            NotificationHelper.build('certificate', f"{cert_type.get('certificate_type', 'Certificate')} issued",
+                                     'Download it from My Certificates.', '/certificates'),
+            job_id=job['_id'],
+        )
+        template = get_template('certificate_issued').bind(cert_type=cert_type.get('certificate_type', 'Certificate'))
+        messages = [
+            template.message(student['email'], name=student.get('name', 'Student'))
+            for student in (students[certificate['student_id']] for certificate in pending)
+            if student.get('email')
+        ]
+        EmailOutboxHelper.add_many(db, job['_id'], messages, source={'kind': 'certificate', 'id': type_oid})
+        CertificateHelper.mark_notified(db, [certificate['_id'] for certificate in pending])
+        emails_queued = len(messages)
+        progress(92, f'{emails_queued} email(s) queued')
+        deliver(db, job_id=job['_id'])
+
+    return {
+        'issued': len(certificates),
+        'skipped': skipped,
+        'rendered': rendered,
+        'emails_queued': emails_queued,
+        'download': f"/api/certificates/bulk/{job['_id']}/download",
+    }
+
+
+TASKS = {
+    'chronicle.generate_report': generate_report,
+    'chronicle.generate_pdf': generate_pdf,
+    'chronicle.optimize_image': optimize_image,
+    'chronicle.email_notification': email_notification,
+    'chronicle.email_batch': email_batch,
+    'chronicle.issue_certificates': issue_certificates,
+    'chronicle.notify_publication': notify_publication,
+    'chronicle.deliver_outbox': deliver_outbox,
+    'chronicle.send_digests': send_digests,
+}
@@ -0,0 +1,74 @@
+"""Compare per-certificate template setup against the shared certificate template.
+
+"cold" builds a fresh CertificateTemplate for every certificate, which reads
+and encodes the logo each time like the old CertificatePDF did; "shared" uses
+the process-wide template. Uses the configured certificate logo
+(CERTIFICATE_LOGO_PATH) when present, otherwise a generated 600x300 RGBA logo:
+
+    python bench_certificates.py --count 1000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.pdf_generator import DEFAULT_LOGO_PATH, CertificatePDF, CertificateTemplate, get_certificate_template
+
+
+def _sample_logo(directory):
+    from PIL import Image, ImageDraw
+
+    path = os.path.join(directory, 'logo.png')
+    image = Image.new('RGBA', (600, 300), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    for i in range(0, 300, 6):
+        draw.ellipse((i, i // 2, 600 - i, 300 - i // 2), outline=(30, 64, 175, 255 - i // 2), width=3)
+    image.save(path)
+    return path
+
+
+def _render(count, directory, template_for):
+    issue_date = datetime(2024, 6, 1).isoformat()
+    start = time.perf_counter()
+    for i in range(count):
+        CertificatePDF(os.path.join(directory, f'{i}.pdf'), template=template_for()).generate(
+            f'Student {i}', f'R{i:05d}', 'B.Tech', 'Bonafide Certificate', issue_date, f'{i:024x}',
+        )
+    elapsed = time.perf_counter() - start
+    size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+    with open(os.path.join(directory, '0.pdf'), 'rb') as handle:
+        if not handle.read(5) == b'%PDF-':
+            raise SystemExit('rendered file is not a PDF')
+    return elapsed, size
+
+
+def run(count, logo_path):
+    with tempfile.TemporaryDirectory() as tmp:
+        if not os.path.exists(logo_path):
+            logo_path = _sample_logo(tmp)
+        cases = [
+            ('cold', lambda: CertificateTemplate(logo_path=logo_path)),
+            ('shared', lambda: get_certificate_template(logo_path=logo_path)),
+        ]
+        results = {}
+        print(f'{"template":9} {"total s":>8} {"ms/cert":>8} {"certs/s":>8} {"avg KB":>7}')
+        for name, template_for in cases:
+            directory = os.path.join(tmp, name)
+            os.makedirs(directory)
+            elapsed, size = _render(count, directory, template_for)
+            results[name] = elapsed
+            print(f'{name:9} {elapsed:8.2f} {elapsed * 1000 / count:8.2f} {count / elapsed:8.0f} '
+                  f'{size / count / 1024:7.1f}')
+        print(f'speed-up: {results["cold"] / results["shared"]:.1f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=1000)
+    parser.add_argument('--logo', default=DEFAULT_LOGO_PATH)
+    args = parser.parse_args()
+    run(args.count, args.logo)
@@ -0,0 +1,64 @@
+"""Compare per-message str.format + regex rendering against the compiled email templates.
+
+"format" renders the whole HTML body and subject for every recipient and
+strips tags with a regex for the text part (the old approach); "bound"
+binds the shared publication fields once and only fills in each name:
+
+    python bench_email_templates.py --count 10000
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.email_templates import get_template
+
+TAGS = re.compile(r'<[^>]+>')
+
+
+def _best(fn, rounds):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(count, rounds):
+    template = get_template('notice')
+    source = ''.join(literal + (f'{{{field}}}' if field else '') for literal, field in template.html_segments)
+    recipients = [(f'student{i}@example.com', f'Student {i}') for i in range(count)]
+    shared = {'title': 'Mid-term examination schedule', 'type': 'News'}
+
+    def legacy():
+        return [
+            {'to': email, 'subject': f"New {shared['type']}: {shared['title']}",
+             'html': source.format(name=name, **shared),
+             'text': TAGS.sub('', source.format(name=name, **shared))}
+            for email, name in recipients
+        ]
+
+    def bound():
+        compiled = template.bind(**shared)
+        return [compiled.message(email, name=name) for email, name in recipients]
+
+    if [m['html'] for m in legacy()] != [m['html'] for m in bound()]:
+        raise SystemExit('compiled HTML differs from str.format output')
+    legacy_s = _best(legacy, rounds)
+    bound_s = _best(bound, rounds)
+    print(f'{"renderer":9} {"total ms":>9} {"us/email":>9}')
+    print(f'{"format":9} {legacy_s * 1000:9.1f} {legacy_s * 1e6 / count:9.2f}')
+    print(f'{"bound":9} {bound_s * 1000:9.1f} {bound_s * 1e6 / count:9.2f}')
+    print(f'speed-up: {legacy_s / bound_s:.1f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=10000)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+    run(args.count, args.rounds)
@@ -0,0 +1,115 @@
+"""Compare to_dict + marshal_with against the compiled serializers.
+
+Builds synthetic documents, so no database is needed:
+
+    python bench_serialization.py --items 1000 --rounds 20
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from dotenv import load_dotenv
+
+load_dotenv()
+os.environ.setdefault('INDEX_SYNC_MODE', 'off')
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask_restx import marshal
+
+from app import create_app
+from app.blueprints import chats, materials, notices, timeline
+from app.models import ChatMessageHelper, NoticeHelper, StudyMaterialHelper, TimelinePostHelper
+
+
+def _notice(i, now):
+    return {
+        '_id': ObjectId(), 'title': f'Notice {i}', 'summary': 'Summary', 'content': '<p>Body</p>' * 10,
+        'type': 'news', 'status': 'published', 'is_featured': i % 5 == 0,
+        'publish_start': now, 'publish_end': None, 'cover_image': f'/uploads/notices/{i}.png',
+        'attachments': [{'id': ObjectId(), 'name': 'a.pdf', 'url': '/uploads/a.pdf',
+                         'uploaded_at': now, 'type': 'application/pdf', 'size': 1024}],
+        'created_at': now, 'updated_at': now, 'created_by': ObjectId(), 'updated_by': ObjectId(),
+    }
+
+
+def _material(i, now):
+    return {
+        '_id': ObjectId(), 'title': f'Material {i}', 'description': 'Description', 'course_id': ObjectId(),
+        'subject_id': ObjectId(), 'semester': i % 8 + 1, 'tags': ['exam', 'notes'],
+        'attachments': [{'id': str(i), 'name': f'{i}.pdf', 'original_name': 'notes.pdf',
+                         'path': f'/uploads/materials/{i}.pdf', 'content_type': 'application/pdf',
+                         'file_size': 2048, 'download_count': 3, 'uploaded_at': now}],
+        'download_count': 3, 'created_at': now, 'updated_at': now,
+        'created_by': ObjectId(), 'updated_by': ObjectId(),
+    }
+
+
+def _message(i, now):
+    return {
+        '_id': ObjectId(), 'chat_id': ObjectId(), 'group_id': None, 'sender_id': ObjectId(),
+        'content': f'Message {i}', 'attachments': [], 'message_type': 'text', 'meta': {},
+        'created_at': now, 'updated_at': now,
+    }
+
+
+def _post(i, now):
+    return {
+        '_id': ObjectId(), 'content': f'Post {i}', 'visibility': 'public', 'tags': ['campus'], 'audience': [],
+        'media': [{'id': str(i), 'name': f'{i}.jpg', 'original_name': 'photo.jpg',
+                   'path': f'/uploads/timeline/{i}.jpg', 'file_url': f'http://localhost:5000/uploads/timeline/{i}.jpg',
+                   'content_type': 'image/jpeg', 'media_type': 'image', 'file_size': 4096, 'uploaded_at': now}],
+        'media_count': 1, 'likes_count': i, 'comments_count': 2, 'is_liked': i % 2 == 0,
+        'created_at': now, 'updated_at': now, 'created_by': ObjectId(),
+        'author_name': 'Author', 'author_role': 'student', 'author_avatar': None,
+    }
+
+
+def _best(fn, rounds):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(items, rounds):
+    now = datetime.utcnow() - timedelta(days=1)
+    cases = [
+        ('notices', [_notice(i, now) for i in range(items)], notices.notice_model,
+         NoticeHelper.to_dict, notices.notice_serializer),
+        ('materials', [_material(i, now) for i in range(items)], materials.material_model,
+         StudyMaterialHelper.to_dict, materials.material_serializer),
+        ('chat_messages', [_message(i, now) for i in range(items)], chats.message_model,
+         ChatMessageHelper.to_dict, chats.message_serializer),
+        ('timeline', [_post(i, now) for i in range(items)], timeline.post_model,
+         lambda doc: TimelinePostHelper.to_dict(doc, is_liked=doc['is_liked']), timeline.post_serializer),
+    ]
+
+    print(f'{"payload":15} {"marshal ms":>11} {"compiled ms":>12} {"speed-up":>9}')
+    for name, docs, model, to_dict, serializer in cases:
+        def legacy():
+            return json.dumps(marshal([to_dict(doc) for doc in docs], model)).encode('utf-8')
+
+        def compiled():
+            return serializer.dumps_many(docs)
+
+        if json.loads(legacy()) != json.loads(compiled()):
+            raise SystemExit(f'{name}: compiled output differs from marshal_with output')
+        legacy_s = _best(legacy, rounds)
+        compiled_s = _best(compiled, rounds)
+        print(f'{name:15} {legacy_s * 1000:11.2f} {compiled_s * 1000:12.2f} {legacy_s / compiled_s:8.1f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=1000)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+    with create_app('testing').app_context():
+        run(args.items, args.rounds)
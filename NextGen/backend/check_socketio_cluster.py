@@ -0,0 +1,181 @@
+"""Integration check: Socket.IO emits and presence must cross worker boundaries.
+
+Starts several Socket.IO workers (separate servers on their own ports, each
+with its own client manager) joined by a message queue, connects a client to
+each, and checks that a room emit issued on one worker -- as the REST chat
+handlers do -- reaches a socket held by another, and that presence is
+shared. Presence checks cover contact-only status updates, several tabs of
+one user and the debounce window; the chat contacts are seeded into a
+throw-away "<MONGO_DB_NAME>_socketio_check" database, dropped afterwards.
+``memory://`` joins workers inside this process; pass a Redis URL to go
+through a real broker:
+
+    python check_socketio_cluster.py
+    python check_socketio_cluster.py --queue redis://localhost:6379/0
+"""
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+
+import socketio as socketio_client
+from bson import ObjectId
+from dotenv import load_dotenv
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+from flask_socketio import SocketIO
+from pymongo import MongoClient
+from werkzeug.serving import make_server
+
+load_dotenv()
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.config import Config, TestingConfig
+from app.models.notification import user_room
+from app.presence import get_presence, init_presence
+from app.socketio_handlers import _room_for_chat, register_socketio_events
+
+TIMEOUT = 5
+FLUSH_SECONDS = 0.5
+DB_NAME = f'{Config.MONGO_DB_NAME}_socketio_check'
+
+
+class Worker:
+    """One API process: a Flask app, its own SocketIO server and an HTTP listener."""
+
+    def __init__(self, index, queue):
+        self.app = Flask(f'chronicle-worker-{index}')
+        self.app.config.from_object(TestingConfig)
+        self.app.config.update(MONGO_URI=Config.MONGO_URI, MONGO_DB_NAME=DB_NAME,
+                               PRESENCE_FLUSH_SECONDS=FLUSH_SECONDS)
+        if queue.startswith(('redis://', 'rediss://')):
+            self.app.config.update(SOCKETIO_BACKEND='redis', REDIS_URL=queue)
+        else:
+            self.app.config.update(SOCKETIO_BACKEND='memory', SOCKETIO_MESSAGE_QUEUE=queue)
+        JWTManager(self.app)
+        self.socketio = SocketIO(self.app, async_mode='threading', **init_presence(self.app))
+        register_socketio_events(self.socketio)
+        self.server = make_server('127.0.0.1', 0, self.app, threaded=True)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server.server_port}'
+
+    def token(self, user_id):
+        with self.app.app_context():
+            return create_access_token(identity=user_id, additional_claims={'user_id': user_id, 'role': 'student'})
+
+    def emit(self, event, data, room):
+        with self.app.app_context():
+            self.socketio.emit(event, data, to=room)
+
+
+class Client:
+    """A browser tab: records every event it receives."""
+
+    def __init__(self, worker, user_id):
+        self.user_id = user_id
+        self.events = []
+        self.sio = socketio_client.Client()
+        self.sio.on('*', lambda event, data=None: self.events.append((event, data)))
+        self.sio.connect(f'{worker.url}?token={worker.token(user_id)}', transports=['polling'])
+
+    def wait_for(self, event, predicate=lambda data: True, timeout=TIMEOUT):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            for name, data in self.events:
+                if name == event and predicate(data):
+                    return data
+            time.sleep(0.05)
+        return None
+
+    def statuses(self, user_id):
+        return [data['event'] for name, data in self.events if name == 'status' and data.get('user_id') == user_id]
+
+    def close(self):
+        if self.sio.connected:
+            self.sio.disconnect()
+
+
+def _seed(db, users):
+    """The first and last users share a direct chat; the others are strangers."""
+    db.chat_sessions.insert_one({'participants': sorted({ObjectId(users[0]), ObjectId(users[-1])}),
+                                 'updated_at': time.time()})
+
+
+def run(queue, workers):
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    mongo = MongoClient(Config.MONGO_URI)
+    cluster = [Worker(index, queue) for index in range(workers)]
+    users = [str(ObjectId()) for _ in range(workers + 1)]
+    _seed(mongo[DB_NAME], users)
+    first, watcher = users[0], users[-1]
+    clients = []
+    checks = []
+
+    def connect(worker, user_id):
+        client = Client(worker, user_id)
+        clients.append(client)
+        return client, client.wait_for('connected')
+
+    try:
+        tab, _ = connect(cluster[0], first)
+        strangers = [connect(cluster[index % workers], user_id)[0] for index, user_id in enumerate(users[1:-1], 1)]
+        contact, connected = connect(cluster[-1], watcher)
+        checks.append(('presence lists every worker\'s users', set(get_presence().online_user_ids()) >= set(users)))
+        checks.append(('connect lists online contacts only',
+                       connected is not None and connected['online_users'] == [first]))
+
+        contact.sio.emit('join_chat', {'chat_id': 'cluster-check'})
+        checks.append(('join_chat acknowledged', contact.wait_for('joined_chat') is not None))
+
+        room = _room_for_chat('cluster-check')
+        cluster[0].emit('message_received', {'content': 'hello', 'room': room}, room)
+        received = contact.wait_for('message_received', lambda data: data.get('room') == room)
+        checks.append(('chat room emit crosses workers', received is not None))
+
+        cluster[0].emit('notification', {'title': 'cluster check'}, user_room(watcher))
+        checks.append(('user room emit crosses workers', contact.wait_for('notification') is not None))
+
+        time.sleep(FLUSH_SECONDS * 3)  # let the connect-time changes flush
+        seen = len(contact.statuses(first))
+        second_tab, _ = connect(cluster[-1], first)
+        tab.close()
+        time.sleep(FLUSH_SECONDS * 3)
+        checks.append(('closing one of two tabs keeps the user online', len(contact.statuses(first)) == seen))
+
+        second_tab.close()
+        reload, _ = connect(cluster[0], first)
+        time.sleep(FLUSH_SECONDS * 3)
+        checks.append(('a reload inside the debounce window sends nothing', len(contact.statuses(first)) == seen))
+
+        reload.close()
+        offline = contact.wait_for('status', lambda data: data == {'event': 'offline', 'user_id': first})
+        checks.append(('last tab closing on another worker reaches the contact', offline is not None))
+        checks.append(('disconnected user left presence', first not in get_presence().online_user_ids()))
+        checks.append(('strangers receive no status', all(not client.statuses(first) for client in strangers)))
+    finally:
+        for client in clients:
+            client.close()
+        for worker in cluster:
+            worker.server.shutdown()
+        mongo.drop_database(DB_NAME)
+        mongo.close()
+
+    for name, ok in checks:
+        print(f"{'ok  ' if ok else 'FAIL'} {name}")
+    return all(ok for _, ok in checks)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--queue', default='memory://', help='Message queue URL (memory:// or redis://...)')
+    parser.add_argument('--workers', type=int, default=2)
+    args = parser.parse_args()
+    ok = run(args.queue, max(args.workers, 2))
+    print('OK' if ok else 'CROSS-WORKER DELIVERY FAILED')
+    sys.exit(0 if ok else 1)
@@ -3,15 +3,15 @@ import os
 import sys
 from datetime import datetime
 import bcrypt
-from pymongo import MongoClient
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# MongoDB connection
-MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017')
-MONGO_DB_NAME = os.getenv('MONGO_DB_NAME', 'chronicle_db')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.config import Config
+from app.db import close_client, get_database
 
 def hash_password(password):
     """Hash password using bcrypt."""
@@ -20,9 +20,8 @@ def hash_password(password):
 def seed_test_users():
     """Create test users for Admin, Teacher, and Student."""
     try:
-        # Connect to MongoDB
-        client = MongoClient(MONGO_URI)
-        db = client[MONGO_DB_NAME]
+        # Connect to MongoDB through the shared pooled client
+        db = get_database(Config)
 
         print("=" * 60)
         print("CREATING TEST USERS FOR CHRONICLE")
@@ -141,7 +140,7 @@ def seed_test_users():
         print("=" * 60)
 
         # Close connection
-        client.close()
+        close_client()
 
     except Exception as e:
         print(f"\n❌ Error creating test users: {e}")
@@ -80,46 +80,11 @@ def create_admin_user():
         print(f"\n❌ Failed to create admin user: {e}")
         sys.exit(1)
 
-    # Create indexes
+    # Create indexes from the shared manifest
     try:
-        db.students.create_index('roll_no', unique=True)
-        db.students.create_index('email', unique=True)
-        db.users.create_index('login_id', unique=True)
-        db.users.create_index('email', unique=True)
-        db.notices.create_index('type')
-        db.notices.create_index('status')
-        db.notices.create_index('is_featured')
-        db.notices.create_index('publish_start')
-        db.materials.create_index('course_id')
-        db.materials.create_index('subject_id')
-        db.materials.create_index('semester')
-        db.materials.create_index('title')
-        db.materials.create_index('created_at')
-        db.quizzes.create_index('course_id')
-        db.quizzes.create_index('subject_id')
-        db.quizzes.create_index('semester')
-        db.quizzes.create_index('status')
-        db.questions.create_index('quiz_id')
-        db.quiz_attempts.create_index('quiz_id')
-        db.quiz_attempts.create_index('student_id')
-        db.discussions.create_index('course_id')
-        db.discussions.create_index('subject_id')
-        db.discussions.create_index('semester')
-        db.discussions.create_index('updated_at')
-        db.discussion_replies.create_index('discussion_id')
-        db.discussion_replies.create_index('parent_reply_id')
-        db.chat_sessions.create_index('participants')
-        db.chat_sessions.create_index('updated_at')
-        db.group_chats.create_index('member_ids')
-        db.group_chats.create_index('updated_at')
-        db.chat_messages.create_index('chat_id')
-        db.chat_messages.create_index('group_id')
-        db.chat_messages.create_index('created_at')
-        db.timeline_posts.create_index('created_at')
-        db.timeline_posts.create_index('created_by')
-        db.timeline_posts.create_index('visibility')
-        db.timeline_comments.create_index('post_id')
-        db.timeline_comments.create_index('created_at')
+        from app.indexes import sync_indexes
+
+        sync_indexes(db, force=True)
         print("Indexes created successfully")
     except Exception as e:
         print(f"Warning: Could not create indexes: {e}")
@@ -0,0 +1,66 @@
+"""Concurrency check for like/unlike: likes_count must match the likes collection.
+
+Runs against a throw-away "<MONGO_DB_NAME>_like_stress" database, which is
+dropped afterwards:
+
+    python stress_likes.py --workers 200 --toggles 20
+"""
+import argparse
+import os
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from bson import ObjectId
+from dotenv import load_dotenv
+
+load_dotenv()
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.config import Config
+from app.db import close_client, get_client
+from app.indexes import sync_indexes
+from app.models.like import LikeHelper
+from app.models.timeline import TimelinePostHelper
+
+
+def run(workers, toggles):
+    client = get_client(Config)
+    db_name = f'{Config.MONGO_DB_NAME}_like_stress'
+    client.drop_database(db_name)
+    db = client[db_name]
+    try:
+        sync_indexes(db, force=True)
+        post = TimelinePostHelper.create_post(db, ObjectId(), 'Stress', 'staff', content='stress')
+        post_id = post['_id']
+        # A few users share ids so the same (post, user) pair is contended too.
+        users = [ObjectId() for _ in range(max(1, workers // 4))]
+
+        def toggler(seed):
+            rng = random.Random(seed)
+            user_id = rng.choice(users)
+            for _ in range(toggles):
+                choice = rng.choice([None, True, False])
+                TimelinePostHelper.set_like(db, post_id, user_id, like=choice)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(toggler, range(workers)))
+
+        counter = db.timeline_posts.find_one({'_id': post_id})['likes_count']
+        actual = LikeHelper._collection(db).count_documents({'target_id': post_id})
+        print(f'workers={workers} toggles={toggles} likes_count={counter} likes={actual}')
+        return counter == actual
+    finally:
+        client.drop_database(db_name)
+        close_client()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=200)
+    parser.add_argument('--toggles', type=int, default=20)
+    args = parser.parse_args()
+    ok = run(args.workers, args.toggles)
+    print('OK' if ok else 'MISMATCH')
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,8 @@
+"""Shared fixtures. Database tests run on mongomock and are skipped without it."""
+import pytest
+
+
+@pytest.fixture
+def db():
+    mongomock = pytest.importorskip('mongomock')
+    return mongomock.MongoClient().chronicle_test
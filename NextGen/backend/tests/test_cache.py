@@ -0,0 +1,70 @@
+import pytest
+from flask import Flask
+
+import app.cache as cache_module
+from app.cache import MemoryCacheBackend, ResponseCache, cached_response, invalidate_tags
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ResponseCache(MemoryCacheBackend(max_entries=8), default_ttl=60)
+    monkeypatch.setattr(cache_module, '_cache', cache)
+    return cache
+
+
+def test_invalidating_a_tag_retires_only_its_keys(cache):
+    notices = cache.build_key('/notices', ('notices',), ['/notices'])
+    courses = cache.build_key('/courses', ('courses', 'subjects'), ['/courses'])
+
+    invalidate_tags('subjects')
+
+    assert cache.build_key('/notices', ('notices',), ['/notices']) == notices
+    assert cache.build_key('/courses', ('courses', 'subjects'), ['/courses']) != courses
+    assert cache.stats()['invalidations'] == {'subjects': 1}
+
+
+def test_lru_evicts_the_oldest_entry():
+    backend = MemoryCacheBackend(max_entries=2)
+    for key in ('a', 'b', 'c'):
+        backend.set(key, key, ttl=60)
+
+    assert backend.get('a') is None
+    assert (backend.get('b'), backend.get('c')) == ('b', 'c')
+
+
+def test_cached_response_serves_hits_until_its_tag_is_invalidated(cache):
+    app = Flask(__name__)
+    calls = []
+
+    @app.route('/items')
+    @cached_response('items')
+    def items():
+        calls.append(1)
+        return {'count': len(calls)}
+
+    client = app.test_client()
+    assert client.get('/items').get_json() == {'count': 1}
+    assert client.get('/items').get_json() == {'count': 1}
+    assert client.get('/items?page=2').get_json() == {'count': 2}
+
+    invalidate_tags('items')
+
+    assert client.get('/items').get_json() == {'count': 3}
+    assert cache.stats()['routes']['/items']['hits'] == 1
+
+
+def test_error_responses_are_not_cached(cache):
+    app = Flask(__name__)
+    calls = []
+
+    @app.route('/broken')
+    @cached_response('items')
+    def broken():
+        calls.append(1)
+        return {'message': 'nope'}, 500
+
+    client = app.test_client()
+    client.get('/broken')
+    client.get('/broken')
+
+    assert len(calls) == 2
@@ -0,0 +1,65 @@
+from bson import ObjectId
+
+from app.models.chat import ChatMessageHelper, ChatReadStateHelper, is_member
+
+
+def _chat(db, *participants):
+    return db.chat_sessions.insert_one({'participants': list(participants)}).inserted_id
+
+
+def test_messages_get_increasing_seq_per_conversation(db):
+    sender = ObjectId()
+    chat_a, chat_b = _chat(db, sender), _chat(db, sender)
+
+    seqs = [ChatMessageHelper.create_message(db, sender, content='hi', chat_id=chat)['seq']
+            for chat in (chat_a, chat_a, chat_b, chat_a)]
+
+    assert seqs == [1, 2, 1, 3]
+
+
+def test_watermarks_only_move_forward(db):
+    user, chat = ObjectId(), ObjectId()
+
+    assert ChatReadStateHelper.mark_read(db, user, chat, 5) is True
+    assert ChatReadStateHelper.mark_read(db, user, chat, 3) is False
+    assert ChatReadStateHelper.mark_read(db, user, chat, 5) is False
+    assert ChatReadStateHelper.mark_read(db, user, chat, 7) is True
+
+    state = db.chat_read_state.find_one({'conversation_id': chat, 'user_id': user})
+    assert (state['read_up_to'], state['delivered_up_to']) == (7, 7)
+
+
+def test_delivery_does_not_move_the_read_watermark(db):
+    user, chat = ObjectId(), ObjectId()
+    ChatReadStateHelper.mark_read(db, user, chat, 2)
+
+    assert ChatReadStateHelper.mark_delivered(db, user, chat, 9) is True
+    assert ChatReadStateHelper.mark_delivered(db, user, chat, 4) is False
+
+    state = db.chat_read_state.find_one({'conversation_id': chat, 'user_id': user})
+    assert (state['read_up_to'], state['delivered_up_to']) == (2, 9)
+
+
+def test_unread_counts_skip_read_and_own_messages(db):
+    reader, writer = ObjectId(), ObjectId()
+    chat, quiet = _chat(db, reader, writer), _chat(db, reader, writer)
+    messages = [ChatMessageHelper.create_message(db, writer, content=str(i), chat_id=chat) for i in range(4)]
+    ChatMessageHelper.create_message(db, reader, content='mine', chat_id=chat)
+    ChatMessageHelper.create_message(db, writer, content='other', chat_id=quiet)
+
+    ChatReadStateHelper.mark_read(db, reader, chat, messages[1]['seq'])
+
+    assert ChatReadStateHelper.unread_counts(db, reader, [chat, quiet]) == {chat: 2, quiet: 1}
+
+
+def test_read_state_lists_current_members_only(db):
+    member, departed = ObjectId(), ObjectId()
+    chat = _chat(db, member)
+    ChatReadStateHelper.mark_read(db, member, chat, 1)
+    ChatReadStateHelper.mark_read(db, departed, chat, 1)
+
+    states = ChatReadStateHelper.for_conversation(db, chat, [member])
+
+    assert [state['user_id'] for state in states] == [member]
+    assert is_member(db, member, chat_id=chat)
+    assert not is_member(db, departed, chat_id=chat)
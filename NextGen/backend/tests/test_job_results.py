@@ -0,0 +1,65 @@
+import os
+
+import pytest
+from bson import ObjectId
+from flask_jwt_extended import create_access_token
+
+import app.blueprints.jobs as jobs_module
+from app import create_app
+from app.models.job import JobHelper
+from app.worker.tasks import generate_report
+
+
+@pytest.fixture
+def app(db, tmp_path, monkeypatch):
+    app = create_app('testing')
+    app.config.update(UPLOAD_FOLDER=str(tmp_path / 'uploads'), JOB_RESULTS_FOLDER=str(tmp_path / 'results'))
+    monkeypatch.setattr(jobs_module, 'get_db', lambda: db)
+    return app
+
+
+def _headers(app, user_id, role):
+    with app.app_context():
+        token = create_access_token(identity=str(user_id), additional_claims={'user_id': str(user_id), 'role': role})
+    return {'Authorization': f'Bearer {token}'}
+
+
+def _finished_report(app, db, owner):
+    db.quizzes.insert_one({'title': 'Midterm'})
+    job = JobHelper.create(db, 'chronicle.generate_report', created_by=owner)
+    with app.app_context():
+        result = generate_report(db, job, lambda *args: None, 'quizzes', {'format': 'csv'})
+    db.jobs.update_one({'_id': job['_id']}, {'$set': {'status': 'succeeded', 'result': result}})
+    return job['_id'], result
+
+
+def test_report_exports_are_written_outside_the_upload_folder(app, db):
+    job_id, result = _finished_report(app, db, ObjectId())
+
+    assert result['file'] == f'/api/jobs/{job_id}/result'
+    assert os.listdir(app.config['JOB_RESULTS_FOLDER']) == [result['filename']]
+    assert not os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], 'reports', result['filename']))
+
+
+def test_only_the_owner_or_an_admin_can_download_the_result(app, db):
+    owner = ObjectId()
+    job_id, _ = _finished_report(app, db, owner)
+    client = app.test_client()
+    url = f'/api/jobs/{job_id}/result'
+
+    owned = client.get(url, headers=_headers(app, owner, 'staff'))
+    assert owned.status_code == 200
+    assert b'Midterm' in owned.data
+    owned.close()
+    assert client.get(url, headers=_headers(app, ObjectId(), 'admin')).status_code == 200
+    assert client.get(url, headers=_headers(app, ObjectId(), 'staff')).status_code == 403
+    assert client.get(url).status_code == 401
+
+
+def test_unfinished_jobs_have_no_result(app, db):
+    owner = ObjectId()
+    job = JobHelper.create(db, 'chronicle.generate_report', created_by=owner)
+
+    response = app.test_client().get(f"/api/jobs/{job['_id']}/result", headers=_headers(app, owner, 'staff'))
+
+    assert response.status_code == 404
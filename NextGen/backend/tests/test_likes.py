@@ -0,0 +1,49 @@
+from bson import ObjectId
+
+from app.models.like import LikeHelper
+
+
+def _post(db):
+    db.likes.create_index([('target_id', 1), ('user_id', 1)], unique=True)
+    return db.timeline_posts.insert_one({'likes_count': 0}).inserted_id
+
+
+def test_like_and_unlike_move_the_counter_once(db):
+    post_id, user_id = _post(db), ObjectId()
+
+    assert LikeHelper.apply(db, LikeHelper.TIMELINE_POST, post_id, user_id, like=True)['likes_count'] == 1
+    assert LikeHelper.apply(db, LikeHelper.TIMELINE_POST, post_id, user_id, like=True)['likes_count'] == 1
+    target = LikeHelper.apply(db, LikeHelper.TIMELINE_POST, post_id, user_id, like=False)
+    assert target['likes_count'] == 0
+    assert target['is_liked'] is False
+    assert LikeHelper.apply(db, LikeHelper.TIMELINE_POST, post_id, user_id, like=False)['likes_count'] == 0
+
+
+def test_toggle_flips_state(db):
+    post_id, user_id = _post(db), ObjectId()
+
+    assert LikeHelper.apply(db, LikeHelper.TIMELINE_POST, post_id, user_id)['is_liked'] is True
+    assert LikeHelper.apply(db, LikeHelper.TIMELINE_POST, post_id, user_id)['is_liked'] is False
+    assert db.likes.count_documents({}) == 0
+
+
+def test_missing_target_leaves_no_like(db):
+    _post(db)
+    assert LikeHelper.apply(db, LikeHelper.TIMELINE_POST, ObjectId(), ObjectId(), like=True) is None
+    assert db.likes.count_documents({}) == 0
+
+
+def test_recount_repairs_drifted_counters(db):
+    post_id = _post(db)
+    for _ in range(3):
+        LikeHelper.apply(db, LikeHelper.TIMELINE_POST, post_id, ObjectId())
+    LikeHelper.add(db, LikeHelper.TIMELINE_POST, post_id, ObjectId())  # crash before the counter moved
+    db.discussions.insert_one({'likes_count': 5})
+
+    fixed = LikeHelper.recount(db, batch_size=1)
+
+    assert fixed['timeline_posts'] == 1
+    assert fixed['discussions'] == 1
+    assert db.timeline_posts.find_one({'_id': post_id})['likes_count'] == 4
+    assert db.discussions.find_one()['likes_count'] == 0
+    assert sum(LikeHelper.recount(db).values()) == 0
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.models.outbox import EmailOutboxHelper
+
+
+@pytest.mark.parametrize('attempts, base', [(0, 2), (1, 2), (2, 4), (3, 8), (10, 60)])
+def test_backoff_doubles_with_jitter_up_to_the_cap(attempts, base):
+    delays = [EmailOutboxHelper.backoff(attempts) for _ in range(50)]
+
+    assert all(base * 0.8 <= delay <= base * 1.2 for delay in delays)
+
+
+def test_backoff_honours_retry_after():
+    assert EmailOutboxHelper.backoff(1, retry_after=30) == 30
+
+
+def _claimed(db, count=1):
+    job_id = ObjectId()
+    EmailOutboxHelper.add_many(db, job_id, [
+        {'to': f'user{i}@example.com', 'subject': 'Hi', 'html': '<p>Hi</p>', 'text': 'Hi'} for i in range(count)
+    ])
+    return EmailOutboxHelper.claim(db, count, job_id=job_id)
+
+
+def test_failed_send_is_rescheduled_with_backoff(db):
+    message = _claimed(db)[0]
+
+    assert EmailOutboxHelper.mark_failed(db, [message['_id']], 'timeout') == 1
+
+    doc = db.email_outbox.find_one({'_id': message['_id']})
+    assert doc['status'] == 'pending'
+    assert doc['attempts'] == 1
+    assert 'claim' not in doc
+    assert doc['next_attempt_at'] > datetime.utcnow() + timedelta(seconds=1)
+    assert EmailOutboxHelper.claim(db, 1) == []
+
+
+def test_exhausted_and_permanent_failures_stop_retrying(db):
+    exhausted, permanent = _claimed(db, 2)
+    db.email_outbox.update_one({'_id': exhausted['_id']}, {'$set': {'attempts': EmailOutboxHelper.MAX_ATTEMPTS - 1}})
+
+    EmailOutboxHelper.mark_failed(db, [exhausted['_id']], 'timeout')
+    EmailOutboxHelper.mark_failed(db, [permanent['_id']], 'bad address', retryable=False)
+
+    for message in (exhausted, permanent):
+        doc = db.email_outbox.find_one({'_id': message['_id']})
+        assert doc['status'] == 'failed'
+        assert doc['expires_at'] is not None
@@ -0,0 +1,31 @@
+import os
+
+from app.utils.pdf_cache import cache_key, evict
+
+
+def _write(directory, name, size, mtime):
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as handle:
+        handle.write(b'x' * size)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_evict_only_removes_cached_pdfs_of_its_prefix(tmp_path):
+    oldest = _write(tmp_path, f'certificate_{cache_key("certificate", 1, {"n": 1})}.pdf', 100, 1)
+    newest = _write(tmp_path, f'certificate_{cache_key("certificate", 1, {"n": 2})}.pdf', 100, 3)
+    other_kind = _write(tmp_path, f'student_report_{cache_key("report", 1, {})}.pdf', 100, 0)
+    export = _write(tmp_path, 'quizzes-report-123.csv', 500, 0)
+    issued = _write(tmp_path, 'uploaded-certificate.pdf', 500, 0)
+
+    assert evict(str(tmp_path), 150, prefix='certificate_') == 1
+
+    assert not os.path.exists(oldest)
+    assert all(os.path.exists(path) for path in (newest, other_kind, export, issued))
+
+
+def test_evict_spares_kept_files(tmp_path):
+    kept = _write(tmp_path, f'{cache_key("certificate", 1, {})}.pdf', 100, 1)
+
+    assert evict(str(tmp_path), 0, keep={kept}) == 0
+    assert os.path.exists(kept)
@@ -0,0 +1,69 @@
+import pytest
+
+import app.presence as presence
+import app.socketio_handlers as handlers
+from app.presence import MemoryPresenceStore, PresenceChanges, presence_room
+
+
+class RecordingSocketIO:
+    def __init__(self):
+        self.emitted = []
+
+    def emit(self, event, payload, to=None):
+        self.emitted.append((event, payload, to))
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = MemoryPresenceStore(ttl=60)
+    monkeypatch.setattr(presence, '_store', store)
+    monkeypatch.setattr(handlers, 'presence_changes', PresenceChanges())
+    return store
+
+
+def test_only_the_first_tab_and_the_last_tab_change_presence():
+    store = MemoryPresenceStore(ttl=60)
+
+    assert store.connect('tab-1', 'u1') is True
+    assert store.connect('tab-2', 'u1') is False
+    assert store.disconnect('tab-1')[1] is False
+    assert store.disconnect('tab-2')[1] is True
+    assert store.online_user_ids() == []
+
+
+def test_changes_keep_the_state_from_before_the_window():
+    changes = PresenceChanges()
+    changes.record('u1', was_online=True)
+    changes.record('u1', was_online=False)
+
+    assert changes.drain() == {'u1': True}
+    assert changes.drain() == {}
+
+
+def test_a_reload_inside_the_window_sends_nothing(store):
+    socketio = RecordingSocketIO()
+    store.connect('old-tab', 'u1')
+
+    store.disconnect('old-tab')
+    handlers.presence_changes.record('u1', was_online=True)
+    store.connect('new-tab', 'u1')
+    handlers.presence_changes.record('u1', was_online=False)
+
+    assert handlers.flush_presence(socketio) == 0
+    assert socketio.emitted == []
+
+
+def test_real_changes_send_one_status_to_the_contacts_room(store):
+    socketio = RecordingSocketIO()
+    store.connect('tab', 'u1')
+    handlers.presence_changes.record('u1', was_online=False)
+    store.connect('tab-2', 'u2')
+    store.disconnect('tab-2')
+    handlers.presence_changes.record('u2', was_online=True)
+
+    assert handlers.flush_presence(socketio) == 2
+    assert sorted(socketio.emitted, key=lambda item: item[2]) == [
+        ('status', {'event': 'online', 'user_id': 'u1'}, presence_room('u1')),
+        ('status', {'event': 'offline', 'user_id': 'u2'}, presence_room('u2')),
+    ]
+    assert handlers.flush_presence(socketio) == 0
@@ -0,0 +1,117 @@
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from flask_jwt_extended import create_access_token
+
+import app.blueprints.courses as courses_module
+from app import create_app
+from app.blueprints.reports import _discussion_rows, _quiz_rows
+from app.models.discussion import DiscussionHelper
+
+QUERY_METHODS = ('find', 'find_one', 'aggregate', 'count_documents', 'distinct')
+
+
+class CountingCollection:
+    def __init__(self, collection, queries):
+        self._collection = collection
+        self._queries = queries
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if name not in QUERY_METHODS:
+            return attr
+
+        def counted(*args, **kwargs):
+            self._queries[f'{self._collection.name}.{name}'] += 1
+            return attr(*args, **kwargs)
+        return counted
+
+
+class CountingDatabase:
+    """Wraps a database and counts the queries sent to each collection."""
+
+    def __init__(self, db):
+        self._db = db
+        self.queries = Counter()
+
+    def __getitem__(self, name):
+        return CountingCollection(self._db[name], self.queries)
+
+    def __getattr__(self, name):
+        return self[name]
+
+
+def _seed_quizzes(db, count):
+    start = datetime(2024, 1, 1)
+    quiz_ids = db.quizzes.insert_many([
+        {'title': f'Quiz {i}', 'status': 'published', 'created_at': start + timedelta(minutes=i)}
+        for i in range(count)
+    ]).inserted_ids
+    db.quiz_attempts.insert_many([
+        {'quiz_id': quiz_id, 'student_id': ObjectId(), 'percentage': percentage}
+        for quiz_id in quiz_ids for percentage in (40, 80)
+    ])
+
+
+def _seed_discussions(db, count):
+    start = datetime(2024, 1, 1)
+    discussion_ids = db.discussions.insert_many([
+        {'title': f'Thread {i}', 'reply_count': 0, 'created_at': start, 'updated_at': start + timedelta(minutes=i)}
+        for i in range(count)
+    ]).inserted_ids
+    db.discussion_replies.insert_many([
+        {'discussion_id': discussion_id, 'content': 'reply'} for discussion_id in discussion_ids
+    ])
+
+
+@pytest.mark.parametrize('report, seed', [(_quiz_rows, _seed_quizzes), (_discussion_rows, _seed_discussions)])
+def test_reports_cost_the_same_queries_for_any_row_count(db, report, seed):
+    queries = {}
+    for count in (3, 40):
+        counting = CountingDatabase(db.client[f'report_rows_{count}'])
+        seed(counting._db, count)
+        assert len(list(report(counting))) == count
+        queries[count] = counting.queries
+
+    assert queries[3] and queries[3] == queries[40]
+
+
+def test_quiz_report_counts_attempts_per_quiz(db):
+    _seed_quizzes(db, 2)
+    db.quizzes.insert_one({'title': 'Unattempted', 'created_at': datetime(2025, 1, 1)})
+
+    rows = list(_quiz_rows(db))
+
+    assert [(row['attempts'], row['avg_percentage']) for row in rows] == [(0, None), (2, 60.0), (2, 60.0)]
+
+
+def test_reply_recount_costs_the_same_queries_for_any_thread_count(db):
+    queries = {}
+    for count in (3, 40):
+        counting = CountingDatabase(db.client[f'recount_{count}'])
+        _seed_discussions(counting._db, count)
+        assert DiscussionHelper.recount_replies(counting) == count
+        queries[count] = counting.queries
+
+    assert queries[3] and queries[3] == queries[40]
+
+
+def test_course_list_counts_subjects_in_one_query(db, monkeypatch):
+    app = create_app('testing')
+    counting = CountingDatabase(db)
+    monkeypatch.setattr(courses_module, 'get_db', lambda: counting)
+    course_ids = db.courses.insert_many([
+        {'course_name': f'Course {i}', 'status': 'Active'} for i in range(12)
+    ]).inserted_ids
+    db.subjects.insert_many([{'course_id': course_id} for course_id in course_ids for _ in range(2)])
+
+    with app.app_context():
+        token = create_access_token(identity=str(ObjectId()), additional_claims={'role': 'staff'})
+    response = app.test_client().get('/api/courses?limit=10', headers={'Authorization': f'Bearer {token}'})
+
+    assert response.status_code == 200
+    assert [course['subject_count'] for course in response.get_json()['courses']] == [2] * 10
+    assert counting.queries['subjects.aggregate'] == 1
+    assert counting.queries['subjects.count_documents'] == 0
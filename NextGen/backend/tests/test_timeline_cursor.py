@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+
+from app.models.timeline import TimelinePostHelper, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trips():
+    oid = ObjectId()
+    created_at = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+
+    assert decode_cursor(encode_cursor({'_id': oid, 'created_at': created_at})) == (created_at, oid)
+
+
+def test_naive_timestamps_are_read_as_utc():
+    oid = ObjectId()
+    created_at, _ = decode_cursor(encode_cursor({'_id': oid, 'created_at': datetime(2024, 5, 1, 12, 30)}))
+
+    assert created_at == datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize('token', ['', 'not-a-cursor', encode_cursor({'_id': 'zz', 'created_at': datetime.now()})])
+def test_malformed_cursors_raise_value_error(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
+
+
+def test_keyset_pages_cover_ties_without_gaps_or_repeats(db):
+    author = ObjectId()
+    start = datetime(2024, 1, 1)
+    # Pairs of posts share a timestamp, so pages must break ties on _id.
+    db.timeline_posts.insert_many([
+        {'created_by': author, 'visibility': 'public', 'created_at': start + timedelta(minutes=i // 2)}
+        for i in range(7)
+    ])
+
+    seen, cursor = [], None
+    while True:
+        posts, cursor = TimelinePostHelper.list_user_posts(db, author, limit=2, cursor=cursor, viewer_id=author)
+        seen.extend(post['_id'] for post in posts)
+        if cursor is None:
+            break
+
+    expected = [doc['_id'] for doc in db.timeline_posts.find().sort([('created_at', -1), ('_id', -1)])]
+    assert seen == expected
@@ -1,8 +1,9 @@
-import { useMemo } from 'react'
-import { useQuery } from '@tanstack/react-query'
+import { useEffect, useMemo } from 'react'
+import { useQuery, useQueryClient } from '@tanstack/react-query'
 import { Bar, BarChart, CartesianGrid, Legend, Line, LineChart, ResponsiveContainer, Tooltip, XAxis, YAxis } from 'recharts'
 import { Activity, AlertTriangle, Loader2 } from 'lucide-react'
 import useAuthStore from '../../store/authStore'
+import useChatStore from '../../store/chatStore'
 import { fetchAdminActivity, fetchAdminDashboard, fetchAdminStatistics } from './adminApi'
 import { Card, Alert } from '../../components/ui'
 import Skeleton from '../../components/ui/Skeleton'
@@ -22,6 +23,8 @@ const StatCard = ({ label, value, accent }) => (
 const AdminDashboard = () => {
   const { role } = useAuthStore()
   const toast = useToast()
+  const queryClient = useQueryClient()
+  const socket = useChatStore((state) => state.socket)
   const isStudent = role === 'student'
 
   const { data: dashboardData, isLoading: dashboardLoading, error: dashboardError } = useQuery({
@@ -42,6 +45,20 @@ const AdminDashboard = () => {
     enabled: !isStudent,
   })
 
+  useEffect(() => {
+    if (!socket || isStudent) return undefined
+    // New events are pushed to staff/admin sockets; prepend them to the cached feed.
+    const handleActivity = (events) => {
+      queryClient.setQueryData(['admin', 'activity'], (current) => {
+        if (!current) return current
+        const logs = [...[...events].reverse(), ...(current.logs || [])].slice(0, 30)
+        return { ...current, logs, count: logs.length }
+      })
+    }
+    socket.on('activity', handleActivity)
+    return () => socket.off('activity', handleActivity)
+  }, [socket, isStudent, queryClient])
+
   const summary = dashboardData?.summary || {}
   const activity = activityData?.logs || []
 
@@ -175,7 +192,7 @@ const AdminDashboard = () => {
         ) : (
           <div className="divide-y divide-gray-100">
             {activity.map((item) => (
-              <div key={`${item.type}-${item.timestamp}-${item.title}`} className="py-3 flex justify-between">
+              <div key={item.id || `${item.type}-${item.timestamp}-${item.title}`} className="py-3 flex justify-between">
                 <div>
                   <p className="font-semibold text-gray-900">{item.title}</p>
                   <p className="text-xs text-gray-500 capitalize">
@@ -29,3 +29,8 @@ export const fetchReport = async (type, params = {}) => {
   const response = await api.get(`/reports/${type}`, { params })
   return response.data
 }
+
+export const downloadReport = async (type, format = 'csv') => {
+  const response = await api.get(`/reports/${type}`, { params: { format }, responseType: 'blob' })
+  return response.data
+}
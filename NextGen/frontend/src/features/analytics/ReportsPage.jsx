@@ -2,7 +2,7 @@ import { useState } from 'react'
 import { useQuery } from '@tanstack/react-query'
 import { Download, FileSpreadsheet } from 'lucide-react'
 import useAuthStore from '../../store/authStore'
-import { fetchReport } from '../admin/adminApi'
+import { downloadReport, fetchReport } from '../admin/adminApi'
 import { Card, Button, Select } from '../../components/ui'
 import EmptyState from '../../components/ui/EmptyState'
 import Skeleton from '../../components/ui/Skeleton'
@@ -14,6 +14,8 @@ const REPORT_TYPES = [
   { value: 'discussions', label: 'Discussions' },
 ]
 
+const PREVIEW_ROWS = 20
+
 const ReportsPage = () => {
   const { role } = useAuthStore()
   const toast = useToast()
@@ -24,7 +26,8 @@ const ReportsPage = () => {
 
   const { data, isFetching, refetch } = useQuery({
     queryKey: ['reports', reportType],
-    queryFn: () => fetchReport(reportType),
+    // The preview only renders 20 rows; the 21st tells us whether there is more.
+    queryFn: () => fetchReport(reportType, { limit: PREVIEW_ROWS + 1 }),
     enabled: !isStudent,
   })
 
@@ -40,24 +43,24 @@ const ReportsPage = () => {
 
   const rows = data?.rows || []
 
-  const downloadCSV = () => {
+  const downloadCSV = async () => {
     if (!rows.length) {
       toast.error('No rows available to export.')
       return
     }
-    const headers = Object.keys(rows[0])
-    const csv = [
-      headers.join(','),
-      ...rows.map((row) => headers.map((key) => JSON.stringify(row[key] ?? '')).join(',')),
-    ].join('\n')
-    const blob = new Blob([csv], { type: 'text/csv;charset=utf-8;' })
-    const url = URL.createObjectURL(blob)
-    const a = document.createElement('a')
-    a.href = url
-    a.download = `${reportType}-report.csv`
-    a.click()
-    URL.revokeObjectURL(url)
-    toast.success('CSV exported successfully.')
+    try {
+      // The server streams the full export; only the preview is held in memory here.
+      const blob = await downloadReport(reportType, 'csv')
+      const url = URL.createObjectURL(blob)
+      const a = document.createElement('a')
+      a.href = url
+      a.download = `${reportType}-report.csv`
+      a.click()
+      URL.revokeObjectURL(url)
+      toast.success('CSV exported successfully.')
+    } catch (error) {
+      toast.error('Could not export the report.')
+    }
   }
 
   return (
@@ -132,7 +135,7 @@ const ReportsPage = () => {
                 </tr>
               </thead>
               <tbody className="divide-y divide-gray-100 bg-white">
-                {rows.slice(0, 20).map((row) => (
+                {rows.slice(0, PREVIEW_ROWS).map((row) => (
                   <tr key={row.id || row.title}>
                     {Object.keys(rows[0]).map((key) => (
                       <td key={`${row.id}-${key}`} className="px-4 py-2 text-gray-800">
@@ -143,7 +146,7 @@ const ReportsPage = () => {
                 ))}
               </tbody>
             </table>
-            {rows.length > 20 && (
+            {rows.length > PREVIEW_ROWS && (
               <p className="px-4 py-2 text-xs text-gray-500">
                 Showing first 20 rows. Use CSV export for the full dataset.
               </p>
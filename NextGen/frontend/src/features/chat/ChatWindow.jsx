@@ -32,11 +32,10 @@ const formatTime = (isoString) => {
   }
 }
 
-const MessageBubble = ({ message, isOwn, showAuthor, previousMessageSameSender }) => {
+const MessageBubble = ({ message, isOwn, isRead, showAuthor, previousMessageSameSender }) => {
   const senderName =
     message.meta?.sender?.name || message.meta?.author?.name || message.meta?.name || 'Someone'
   const time = formatTime(message.created_at)
-  const readCount = message.read_by?.length || 0
 
   return (
     <div className={`flex w-full ${isOwn ? 'justify-end' : 'justify-start'}`}>
@@ -90,7 +89,7 @@ const MessageBubble = ({ message, isOwn, showAuthor, previousMessageSameSender }
           }`}
         >
           <span>{time}</span>
-          {isOwn && (readCount > 1 ? <CheckCheck className="h-3 w-3" /> : <Check className="h-3 w-3" />)}
+          {isOwn && (isRead ? <CheckCheck className="h-3 w-3" /> : <Check className="h-3 w-3" />)}
         </div>
       </div>
     </div>
@@ -124,6 +123,7 @@ const ChatWindow = ({ windowConfig, variant = 'floating' }) => {
   const clearUnread = useChatStore((state) => state.clearUnread)
 
   const messages = useChatStore((state) => state.messages[key] || [])
+  const readState = useChatStore((state) => state.readState[key])
   const messageState = useChatStore((state) => state.messageState[key] || {})
   const typingInfo = useChatStore((state) => state.typingState[getRoomKey(type, id)])
   const groupDetails = useChatStore((state) =>
@@ -162,21 +162,26 @@ const ChatWindow = ({ windowConfig, variant = 'floating' }) => {
     }
   }, [minimized, clearUnread, key])
 
+  // Anyone else's watermark at or past an own message means it was read.
+  const othersReadUpTo = useMemo(
+    () =>
+      Object.entries(readState || {})
+        .filter(([userId]) => userId !== currentUserId)
+        .reduce((latest, [, upTo]) => (upTo != null && upTo > latest ? upTo : latest), -Infinity),
+    [readState, currentUserId]
+  )
+
   useEffect(() => {
-    const unreadIds = messages
-      .filter(
-        (msg) =>
-          msg.sender_id &&
-          msg.sender_id !== currentUserId &&
-          !(msg.read_by || []).includes(currentUserId)
-      )
-      .map((msg) => msg.id)
+    const latestIncoming = [...messages]
+      .reverse()
+      .find((msg) => msg.sender_id && msg.sender_id !== currentUserId)
+    const ownReadUpTo = readState?.[currentUserId]
 
-    if (unreadIds.length && !minimized) {
-      emitReadReceipt(type, id, unreadIds)
+    if (latestIncoming?.seq != null && !minimized && (ownReadUpTo == null || latestIncoming.seq > ownReadUpTo)) {
+      emitReadReceipt(type, id, latestIncoming)
       clearUnread(key)
     }
-  }, [messages, minimized, currentUserId, emitReadReceipt, type, id, key, clearUnread])
+  }, [messages, readState, minimized, currentUserId, emitReadReceipt, type, id, key, clearUnread])
 
   useEffect(() => {
     const container = scrollContainerRef.current
@@ -443,6 +448,7 @@ const ChatWindow = ({ windowConfig, variant = 'floating' }) => {
                   key={message.id}
                   message={message}
                   isOwn={isOwn}
+                  isRead={isOwn && message.seq != null && othersReadUpTo >= message.seq}
                   showAuthor={showAuthor}
                   previousMessageSameSender={sameSenderAsPrevious}
                 />
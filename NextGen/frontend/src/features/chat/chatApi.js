@@ -18,6 +18,11 @@ export const fetchChatMessages = async (chatId, params = {}) => {
   return response.data
 }
 
+export const fetchChatReadState = async (chatId) => {
+  const response = await api.get(`/chats/${chatId}/read-state`)
+  return response.data
+}
+
 export const sendChatMessage = async (chatId, payload, files = []) => {
   if (!files.length) {
     const response = await api.post(`/chats/${chatId}/messages`, payload)
@@ -67,6 +72,11 @@ export const fetchGroupMessages = async (groupId, params = {}) => {
   return response.data
 }
 
+export const fetchGroupReadState = async (groupId) => {
+  const response = await api.get(`/group-chats/${groupId}/read-state`)
+  return response.data
+}
+
 export const sendGroupMessage = async (groupId, payload, files = []) => {
   if (!files.length) {
     const response = await api.post(`/group-chats/${groupId}/messages`, payload)
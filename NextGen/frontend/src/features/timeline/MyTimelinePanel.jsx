@@ -11,7 +11,7 @@ const MyTimelinePanel = () => {
 
   const { data, isLoading } = useQuery({
     queryKey: ['timeline', 'student', studentId],
-    queryFn: () => fetchStudentTimeline(studentId, { page: 1, limit: 3 }),
+    queryFn: () => fetchStudentTimeline(studentId, { limit: 3, includeTotal: true }),
     enabled: Boolean(studentId),
     staleTime: 60 * 1000,
   })
@@ -19,10 +19,10 @@ const TimelinePage = () => {
     isFetching,
   } = useInfiniteQuery({
     queryKey: ['timeline', 'feed'],
-    queryFn: ({ pageParam = 1 }) => fetchTimeline({ page: pageParam, limit: 6 }),
+    queryFn: ({ pageParam }) => fetchTimeline({ cursor: pageParam, limit: 6 }),
     getNextPageParam: (lastPage) => {
       if (!lastPage) return undefined
-      return lastPage.has_more ? lastPage.next_page : undefined
+      return lastPage.has_more ? lastPage.next_cursor : undefined
     },
     staleTime: 60 * 1000,
   })
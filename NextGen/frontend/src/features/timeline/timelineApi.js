@@ -1,15 +1,18 @@
 import api from '../../lib/api'
 
-export const fetchTimeline = async ({ page = 1, limit = 10 } = {}) => {
+export const fetchTimeline = async ({ cursor, limit = 10 } = {}) => {
   const response = await api.get('/timeline', {
-    params: { page, limit },
+    params: { cursor, limit },
   })
   return response.data
 }
 
-export const fetchStudentTimeline = async (studentId, { page = 1, limit = 10 } = {}) => {
+export const fetchStudentTimeline = async (
+  studentId,
+  { cursor, limit = 10, includeTotal = false } = {},
+) => {
   const response = await api.get(`/students/${studentId}/timeline`, {
-    params: { page, limit },
+    params: { cursor, limit, include_total: includeTotal || undefined },
   })
   return response.data
 }
@@ -3,8 +3,10 @@ import { io } from 'socket.io-client'
 import {
   fetchChats,
   fetchChatMessages,
+  fetchChatReadState,
   fetchGroupChats,
   fetchGroupMessages,
+  fetchGroupReadState,
   sendChatMessage,
   sendGroupMessage,
 } from '../features/chat/chatApi'
@@ -51,6 +53,12 @@ const playNotificationSound = (() => {
   }
 })()
 
+// Watermarks are message seqs, numbered by the server in conversation order.
+const laterSeq = (a, b) => (a == null || (b != null && b > a) ? b : a)
+
+const unreadFromList = (type, items) =>
+  Object.fromEntries(items.map((item) => [roomKey(type, item.id), item.unread_count || 0]))
+
 const mergeMessages = (current = [], incoming = []) => {
   const map = new Map()
   current.forEach((msg) => {
@@ -72,6 +80,7 @@ const useChatStore = create((set, get) => ({
   typingState: {},
   onlineUsers: {},
   unreadCounts: {},
+  readState: {},
   openWindows: [],
   isListOpen: false,
   searchTerm: '',
@@ -89,7 +98,11 @@ const useChatStore = create((set, get) => ({
     set({ isLoadingChats: true, error: null })
     try {
       const data = await fetchChats()
-      set({ chats: data, isLoadingChats: false })
+      set((state) => ({
+        chats: data,
+        isLoadingChats: false,
+        unreadCounts: { ...state.unreadCounts, ...unreadFromList('chat', data) },
+      }))
       return data
     } catch (error) {
       console.error('Failed to load chats', error)
@@ -102,7 +115,11 @@ const useChatStore = create((set, get) => ({
     set({ isLoadingGroups: true, error: null })
     try {
       const data = await fetchGroupChats()
-      set({ groupChats: data, isLoadingGroups: false })
+      set((state) => ({
+        groupChats: data,
+        isLoadingGroups: false,
+        unreadCounts: { ...state.unreadCounts, ...unreadFromList('group', data) },
+      }))
       return data
     } catch (error) {
       console.error('Failed to load group chats', error)
@@ -115,6 +132,15 @@ const useChatStore = create((set, get) => ({
     await Promise.all([get().loadChats(), get().loadGroupChats()])
   },
 
+  loadReadState: async (type, id) => {
+    try {
+      const states = type === 'group' ? await fetchGroupReadState(id) : await fetchChatReadState(id)
+      states.forEach((entry) => get().updateReadState(roomKey(type, id), entry.user_id, entry.read_up_to))
+    } catch (error) {
+      console.error('Failed to load read state', error)
+    }
+  },
+
   ensureMessages: async (type, id, { reset = false } = {}) => {
     const key = roomKey(type, id)
     const { messages, messageState } = get()
@@ -128,6 +154,7 @@ const useChatStore = create((set, get) => ({
           [key]: { loading: true, hasMore: true, error: null },
         },
       }))
+      get().loadReadState(type, id)
       try {
         const history =
           type === 'group'
@@ -331,25 +358,18 @@ const useChatStore = create((set, get) => ({
     }
   },
 
-  updateReadState: (room, messageIds, userId) => {
+  updateReadState: (room, userId, readUpTo) => {
+    if (!userId || readUpTo == null) return
     set((state) => {
-      const current = state.messages[room] || []
-      if (!current.length) {
+      const current = state.readState[room] || {}
+      const next = laterSeq(current[userId], readUpTo)
+      if (next === current[userId]) {
         return {}
       }
       return {
-        messages: {
-          ...state.messages,
-          [room]: current.map((msg) =>
-            messageIds.includes(msg.id)
-              ? {
-                  ...msg,
-                  read_by: msg.read_by?.includes(userId)
-                    ? msg.read_by
-                    : [...(msg.read_by || []), userId],
-                }
-              : msg
-          ),
+        readState: {
+          ...state.readState,
+          [room]: { ...current, [userId]: next },
         },
       }
     })
@@ -434,7 +454,7 @@ const useChatStore = create((set, get) => ({
           ? await sendGroupMessage(id, payload, files)
           : await sendChatMessage(id, payload, files)
       get().addMessage(response)
-      get().emitReadReceipt(type, id, [response.id])
+      get().emitReadReceipt(type, id, response)
       return response
     } catch (error) {
       console.error('Failed to send message', error)
@@ -451,12 +471,13 @@ const useChatStore = create((set, get) => ({
     })
   },
 
-  emitReadReceipt: (type, id, messageIds) => {
+  emitReadReceipt: (type, id, message) => {
     const socket = get().socket
-    if (!socket) return
+    if (!socket || !message?.id) return
+    get().updateReadState(roomKey(type, id), get().currentUserId(), message.seq)
     socket.emit('read_receipt', {
       room: socketRoom(type, id),
-      message_ids: messageIds,
+      message_id: message.id,
     })
   },
 
@@ -539,14 +560,16 @@ const useChatStore = create((set, get) => ({
         const open = get().openWindows
         const active = open.some((win) => win.key === key && !win.minimized)
         if (active) {
-          get().emitReadReceipt(type, id, [payload.id])
+          get().emitReadReceipt(type, id, payload)
+        } else {
+          newSocket.emit('delivery_receipt', { room: socketRoom(type, id), message_id: payload.id })
         }
       }
     })
 
     newSocket.on('read_receipt', (payload) => {
-      if (!payload?.room || !payload?.message_ids) return
-      get().updateReadState(payload.room, payload.message_ids, payload.user_id)
+      if (!payload?.room || payload?.read_up_to == null) return
+      get().updateReadState(payload.room, payload.user_id, payload.read_up_to)
     })
   },
 